@@ -36,7 +36,6 @@ import sys
 import ast
 import time
 from urllib.parse import urlparse
-from urllib.request import urlopen, url2pathname
 import tempfile
 import logging
 
@@ -337,6 +336,7 @@ class CLIDbManager:
             # Allow URL names here; make temp file if necessary
             url = urlparse(filename)
             if url.scheme != "":
+                from urllib.request import urlopen, url2pathname
                 if url.scheme == "file":
                     filename = url2pathname(filename[7:])
                 else:
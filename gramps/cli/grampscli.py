@@ -63,6 +63,7 @@ from gramps.gen.db.exceptions import (DbUpgradeRequiredError,
                                       DbConnectionError)
 from gramps.gen.plug import BasePluginManager
 from gramps.gen.utils.config import get_researcher
+from gramps.gen.utils import startup
 from gramps.gen.recentfiles import recent_files
 
 #-------------------------------------------------------------------------
@@ -175,6 +176,7 @@ class CLIDbLoader:
         try:
             self.dbstate.db.load(filename, self._pulse_progress, mode,
                                  username=username, password=password)
+            startup.mark(startup.DATABASE_LOADED)
         except DbEnvironmentError as msg:
             self.dbstate.no_database()
             self._errordialog(_("Cannot open database"), str(msg))
@@ -337,6 +339,7 @@ class CLIManager:
         """
         self._pmgr.reg_plugins(PLUGINS_DIR, dbstate, uistate, rescan=rescan)
         self._pmgr.reg_plugins(USER_PLUGINS, dbstate, uistate, load_on_reg=True)
+        startup.mark(startup.PLUGINS_REGISTERED)
         if rescan:  # supports updated plugin installs
             self._pmgr.reload_plugins()
 
@@ -209,18 +209,7 @@ class CommandLineReport:
                  noopt=False):
 
         pmgr = BasePluginManager.get_instance()
-        self.__textdoc_plugins = []
-        self.__drawdoc_plugins = []
-        self.__bookdoc_plugins = []
-        for plugin in pmgr.get_docgen_plugins():
-            if plugin.get_text_support() and plugin.get_extension():
-                self.__textdoc_plugins.append(plugin)
-            if plugin.get_draw_support() and plugin.get_extension():
-                self.__drawdoc_plugins.append(plugin)
-            if (plugin.get_extension()
-                    and plugin.get_text_support()
-                    and plugin.get_draw_support()):
-                self.__bookdoc_plugins.append(plugin)
+        self.__docgen_plugins = pmgr.get_docgen_plugins()
 
         self.database = database
         self.category = category
@@ -271,6 +260,29 @@ class CommandLineReport:
         self.init_report_options_help()
         self.show_options()
 
+    def __get_doc_plugins(self, extension=None):
+        """
+        Return the docgen plugins which can produce the document of the
+        report, with the extension if it is given: only the modules of these
+        plugins are imported.
+        """
+        plugins = []
+        for plugin in self.__docgen_plugins:
+            if not plugin.get_extension():
+                continue
+            if extension is not None and plugin.get_extension() != extension:
+                continue
+            if self.category == CATEGORY_TEXT:
+                supported = plugin.get_text_support()
+            elif self.category == CATEGORY_DRAW:
+                supported = plugin.get_draw_support()
+            else:
+                supported = (plugin.get_text_support() and
+                             plugin.get_draw_support())
+            if supported:
+                plugins.append(plugin)
+        return plugins
+
     def init_standard_options(self, noopt):
         """
         Initialize the options that are hard-coded into the report system.
@@ -314,18 +326,14 @@ class CommandLineReport:
         self.options_help['of'][2] = os.path.join(USER_HOME,
                                                   "whatever_name")
 
-        if self.category == CATEGORY_TEXT:
-            for plugin in self.__textdoc_plugins:
-                self.options_help['off'][2].append(
-                    plugin.get_extension() + "\t" + plugin.get_description())
-        elif self.category == CATEGORY_DRAW:
-            for plugin in self.__drawdoc_plugins:
-                self.options_help['off'][2].append(
-                    plugin.get_extension() + "\t" + plugin.get_description())
-        elif self.category == CATEGORY_BOOK:
-            for plugin in self.__bookdoc_plugins:
-                self.options_help['off'][2].append(
-                    plugin.get_extension() + "\t" + plugin.get_description())
+        if self.category in [CATEGORY_TEXT, CATEGORY_DRAW, CATEGORY_BOOK]:
+            # listing the formats loads all the document generators, so
+            # only do it when they are shown
+            if self.show == 'off':
+                for plugin in self.__get_doc_plugins():
+                    self.options_help['off'][2].append(
+                        plugin.get_extension() + "\t"
+                        + plugin.get_description())
         elif self.category == CATEGORY_GRAPHVIZ:
             for graph_format in graphdoc.FORMATS:
                 self.options_help['off'][2].append(
@@ -487,19 +495,13 @@ class CommandLineReport:
         self.doc_option_class = None
         if self.category in [CATEGORY_TEXT, CATEGORY_DRAW, CATEGORY_BOOK]:
             if self.category == CATEGORY_TEXT:
-                plugins = self.__textdoc_plugins
                 self.css_filename = self.options_dict['css']
-            elif self.category == CATEGORY_DRAW:
-                plugins = self.__drawdoc_plugins
-            elif self.category == CATEGORY_BOOK:
-                plugins = self.__bookdoc_plugins
-            for plugin in plugins:
-                if plugin.get_extension() == self.options_dict['off']:
-                    self.format = plugin.get_basedoc()
-                    self.doc_option_class = plugin.get_doc_option_class()
+            for plugin in self.__get_doc_plugins(self.options_dict['off']):
+                self.format = plugin.get_basedoc()
+                self.doc_option_class = plugin.get_doc_option_class()
             if self.format is None:
                 # Pick the first one as the default.
-                plugin = plugins[0]
+                plugin = self.__get_doc_plugins()[0]
                 self.format = plugin.get_basedoc()
                 self.doc_option_class = plugin.get_doc_option_class()
                 _chosen_format = plugin.get_extension()
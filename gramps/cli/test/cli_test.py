@@ -24,10 +24,13 @@ import sys
 import os
 import unittest
 import re
+import shutil
 import subprocess
+import tempfile
 
 from gramps.gen.const import TEMP_DIR
 from gramps.gen.dbstate import DbState
+from gramps.gen.utils import startup
 from gramps.test.test_util import Gramps
 
 test_ged = """0 HEAD
@@ -48,6 +51,9 @@ example_copy = os.path.join(ddir, "copy.gramps")
 example = os.path.join(ddir, "..", "..", "..",
                        "example", "gramps", "data.gramps")
 
+# time in seconds allowed to start the CLI and load a family tree
+STARTUP_TARGET = 1.5
+
 class Test(unittest.TestCase):
     def setUp(self):
         self.tearDown()
@@ -177,6 +183,66 @@ class CLITest(unittest.TestCase):
     def test1b_cli(self):
         self.call("-O", "Test: test1_cli", "--export", example_copy)
 
+class StartupTest(unittest.TestCase):
+    """
+    Check that the CLI does not take longer than STARTUP_TARGET to load a
+    family tree.
+    """
+    @classmethod
+    def setUpClass(cls):
+        from gramps.cli.clidbman import CLIDbManager
+        from gramps.gen.config import set as setconfig, get as getconfig
+        from gramps.gen.db import DbTxn
+        from gramps.gen.db.utils import make_database
+        from gramps.gen.lib import Person
+        cls.home = tempfile.mkdtemp()
+        old_path = getconfig('database.path')
+        setconfig('database.path', cls.home)
+        try:
+            cls.db_path = CLIDbManager(DbState()).create_new_db_cli(
+                'Test: startup', dbid='sqlite')[0]
+        finally:
+            setconfig('database.path', old_path)
+        db = make_database('sqlite')
+        db.load(cls.db_path)
+        with DbTxn('Add person', db) as trans:
+            db.add_person(Person(), trans)
+        db.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.home)
+
+    def startup_time(self):
+        """
+        Run a report on the family tree, and return the time taken to load
+        it, from the startup report.
+        """
+        env = dict(os.environ, GRAMPSHOME=self.home)
+        env[startup.ENV_VAR] = '1'
+        gcmd = [sys.executable, "Gramps.py", "-O", self.db_path,
+                "-a", "report", "-p", "name=summary,off=txt,of=%s"
+                % os.path.join(self.home, "summary.txt")]
+        process = subprocess.Popen(gcmd, env=env,
+                                   stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE)
+        result_str, err_str = process.communicate()
+        self.assertEqual(process.returncode, 0,
+                         "executed CLI command %r" % gcmd)
+        match = re.search(r"^startup time: ([0-9.]+)s \| %s$"
+                          % startup.DATABASE_LOADED,
+                          err_str.decode('utf-8', 'replace'), re.M)
+        self.assertTrue(match, "found the startup time")
+        return float(match.group(1))
+
+    def test_startup_time(self):
+        # the first run writes the plugin registration cache
+        self.startup_time()
+        elapsed = self.startup_time()
+        self.assertLess(elapsed, STARTUP_TARGET,
+                        "family tree loaded in %.3fs" % elapsed)
+
 if __name__ == "__main__":
     unittest.main()
 
@@ -165,6 +165,8 @@ register('database.autobackup', 0)
 register('database.path', os.path.join(HOME_DIR, 'grampsdb'))
 register('database.host', '')
 register('database.port', '')
+register('database.undo-depth', 0)
+register('database.undo-size', 1024)
 
 register('export.proxy-order',
          [["privacy", 0],
@@ -39,38 +39,12 @@ from ..const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.sgettext
 # import prerequisites for localized handlers
 from ._datehandler import (LANG, LANG_SHORT, LANG_TO_PARSER, LANG_TO_DISPLAY,
-                           locale_tformat, main_locale)
+                           locale_tformat, main_locale, load_handler)
 from . import _datestrings
 
-# Import all the localized handlers
-from . import _date_ar
-from . import _date_bg
-from . import _date_ca
-from . import _date_cs
-from . import _date_da
-from . import _date_de
-from . import _date_el
-from . import _date_es
-from . import _date_fi
-from . import _date_fr
-from . import _date_hr
-from . import _date_hu
-from . import _date_is
-from . import _date_it
-from . import _date_ja
-from . import _date_lt
-from . import _date_nb
-from . import _date_nl
-from . import _date_pl
-from . import _date_pt
-from . import _date_ru
-from . import _date_sk
-from . import _date_sl
-from . import _date_sr
-from . import _date_sv
-from . import _date_uk
-from . import _date_zh_CN
-from . import _date_zh_TW
+# Import the localized handler of the language, the other handlers are
+# imported when they are needed
+load_handler(LANG)
 
 # Initialize global parser
 try:
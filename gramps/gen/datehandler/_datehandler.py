@@ -29,6 +29,7 @@ Class handling language-specific selection for date parser and displayer.
 #
 #-------------------------------------------------------------------------
 import os
+import importlib
 
 #-------------------------------------------------------------------------
 #
@@ -73,18 +74,87 @@ else:
 LANG = str(LANG)
 LANG_SHORT = str(LANG_SHORT)
 
-LANG_TO_PARSER = {
+# The languages of the modules of the localized handlers
+HANDLER_LANGS = ('ar', 'bg', 'ca', 'cs', 'da', 'de', 'el', 'es', 'fi', 'fr',
+                 'hr', 'hu', 'is', 'it', 'ja', 'lt', 'nb', 'nl', 'pl', 'pt',
+                 'ru', 'sk', 'sl', 'sr', 'sv', 'uk', 'zh_CN', 'zh_TW')
+
+_all_loaded = False
+
+def load_handler(lang):
+    """
+    Import the module of the localized handler of a language, if there is
+    one, so that it registers its date parser and displayer.
+    """
+    for name in (lang, lang.split('_')[0]):
+        if name in HANDLER_LANGS:
+            importlib.import_module('._date_' + name, __package__)
+            return
+
+def load_handlers():
+    """
+    Import the modules of all the localized handlers. Return False if they
+    were already imported.
+    """
+    global _all_loaded
+    if _all_loaded:
+        return False
+    _all_loaded = True
+    for name in HANDLER_LANGS:
+        importlib.import_module('._date_' + name, __package__)
+    return True
+
+class _LocaleMap(dict):
+    """
+    A dictionary augmented by calls to register_datehandler. The localized
+    handlers are imported when a missing language is looked up, or when the
+    dictionary is iterated.
+    """
+    def __missing__(self, key):
+        if load_handlers():
+            return self[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return (dict.__contains__(self, key) or
+                (load_handlers() and dict.__contains__(self, key)))
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        load_handlers()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        load_handlers()
+        return dict.__len__(self)
+
+    def keys(self):
+        load_handlers()
+        return dict.keys(self)
+
+    def values(self):
+        load_handlers()
+        return dict.values(self)
+
+    def items(self):
+        load_handlers()
+        return dict.items(self)
+
+LANG_TO_PARSER = _LocaleMap({
     'C'                     : DateParser,
-    }
+    })
 
-LANG_TO_DISPLAY = {
+LANG_TO_DISPLAY = _LocaleMap({
     'C'                     : DateDisplayEn,
     'ko_KR'                 : DateDisplay,
-    }
+    })
 
-main_locale = { } # this will be augmented by calls to register_datehandler
+# this will be augmented by calls to register_datehandler
+main_locale = _LocaleMap()
 
-locale_tformat = {} # locale "tformat" (date format) strings
+locale_tformat = _LocaleMap() # locale "tformat" (date format) strings
 
 for no_handler in (
     ('C', ('%d/%m/%Y',)),
@@ -35,6 +35,10 @@ import ast
 import sys
 import datetime
 import glob
+import struct
+import tempfile
+from array import array
+from itertools import chain
 
 #------------------------------------------------------------------------
 #
@@ -58,7 +62,7 @@ from ..lib import (Tag, Media, Person, Family, Source, Citation, Event,
                    Place, Repository, Note, NameOriginType)
 from ..lib.genderstats import GenderStats
 from ..config import config
-from ..const import GRAMPS_LOCALE as glocale
+from ..const import GRAMPS_LOCALE as glocale, TEMP_DIR
 _ = glocale.translation.gettext
 
 LOG = logging.getLogger(DBLOGNAME)
@@ -66,6 +70,20 @@ LOG = logging.getLogger(DBLOGNAME)
 SIGBASE = ('person', 'family', 'source', 'event', 'media',
            'place', 'repository', 'reference', 'note', 'tag', 'citation')
 
+# The length of a record of the undo log
+_UNDO_LENGTH = struct.Struct('<I')
+
+# The size of the forgotten records from which the undo log is compacted,
+# and of the blocks it is compacted by
+_UNDO_COMPACT = 1024 * 1024
+
+# The numbers of Gramps IDs from which the used numbers are kept in a set
+# rather than in the bitmap
+_ID_BITMAP_LIMIT = 1 << 27
+
+# A byte of the bitmap with a free number
+_ID_FREE_BYTE = re.compile(b'[^\xff]')
+
 def touch(fname, mode=0o666, dir_fd=None, **kwargs):
     ## After http://stackoverflow.com/questions/1158076/implement-touch-using-python
     if sys.version_info < (3, 3, 0):
@@ -78,50 +96,154 @@ def touch(fname, mode=0o666, dir_fd=None, **kwargs):
                      dir_fd=None if os.supports_fd else dir_fd, **kwargs)
 
 class DbGenericUndo(DbUndo):
+    """
+    The undo/redo log, stored in a file: the records of the transactions are
+    appended to the file, and only their offsets are kept in memory. The
+    records are read again when a transaction is undone or redone.
+
+    The oldest transactions are forgotten when there are more than
+    'database.undo-depth' of them, or when their records take more than
+    'database.undo-size' megabytes (0 for no limit). The file is compacted
+    when most of it is taken by forgotten transactions.
+    """
     def __init__(self, grampsdb, path):
         super(DbGenericUndo, self).__init__(grampsdb)
-        self.undodb = []
+        self.path = path
+        self.undodb = None
+        # the offsets in the file of the records, from record number base
+        self.offsets = array('q')
+        self.base = 0
 
     def open(self, value=None):
         """
-        Open the backing storage.  Needs to be overridden in the derived
-        class.
+        Open a new file of the log, a temporary file in TEMP_DIR: each
+        process opening the tree has its own, and the file is removed even
+        if the process does not close it.
         """
-        pass
+        self.offsets = array('q')
+        self.base = 0
+        dirname = TEMP_DIR if os.path.isdir(TEMP_DIR) else None
+        try:
+            self.undodb = tempfile.TemporaryFile(prefix='undo-', dir=dirname)
+        except (IOError, OSError) as msg:
+            LOG.warning("Could not open the undo log in %s: %s",
+                        dirname, msg)
+            self.undodb = tempfile.TemporaryFile()
 
     def close(self):
         """
-        Close the backing storage.  Needs to be overridden in the derived
-        class.
+        Close and remove the file of the log.
         """
-        pass
+        if self.undodb is not None:
+            self.undodb.close()
+            self.undodb = None
+        self.offsets = array('q')
+        self.base = 0
+        super(DbGenericUndo, self).clear()
 
     def append(self, value):
         """
-        Add a new entry on the end.  Needs to be overridden in the derived
-        class.
+        Add a new entry on the end, and return its record number.
         """
-        self.undodb.append(value)
+        self.undodb.seek(0, os.SEEK_END)
+        self.offsets.append(self.undodb.tell())
+        self.undodb.write(_UNDO_LENGTH.pack(len(value)))
+        self.undodb.write(value)
+        return self.base + len(self.offsets) - 1
 
     def __getitem__(self, index):
         """
-        Returns an entry by index number.  Needs to be overridden in the
-        derived class.
+        Returns an entry by index number.
         """
-        return self.undodb[index]
+        if not self.base <= index < len(self):
+            raise IndexError(index)
+        self.undodb.seek(self.offsets[index - self.base])
+        length = _UNDO_LENGTH.unpack(self.undodb.read(_UNDO_LENGTH.size))[0]
+        return self.undodb.read(length)
 
     def __setitem__(self, index, value):
         """
-        Set an entry to a value.  Needs to be overridden in the derived class.
+        Set an entry to a value.
         """
-        self.undodb[index] = value
+        if not self.base <= index < len(self):
+            raise IndexError(index)
+        self.append(value)
+        self.offsets[index - self.base] = self.offsets.pop()
 
     def __len__(self):
         """
-        Returns the number of entries.  Needs to be overridden in the derived
-        class.
+        Returns the number of entries.
+        """
+        return self.base + len(self.offsets)
+
+    def clear(self):
+        """
+        Clear the undo/redo list, and forget their records.
         """
-        return len(self.undodb)
+        super(DbGenericUndo, self).clear()
+        self.__forget()
+
+    def commit(self, txn, msg):
+        """
+        Commit the transaction, and forget the oldest transactions beyond
+        the limits of the log.
+        """
+        super(DbGenericUndo, self).commit(txn, msg)
+        depth = config.get('database.undo-depth')
+        size = config.get('database.undo-size') * 1024 * 1024
+        self.__forget()
+        while len(self.undoq) > 1 and (
+                (depth and len(self.undoq) > depth) or
+                (size and self.__get_size() > size)):
+            self.undoq.popleft()
+            self.__forget()
+
+    def __get_size(self):
+        """
+        Return the size of the records of the log.
+        """
+        if not self.offsets:
+            return 0
+        self.undodb.seek(0, os.SEEK_END)
+        return self.undodb.tell() - self.offsets[0]
+
+    def __forget(self):
+        """
+        Forget the records older than the transactions of the log, and the
+        transaction in progress.
+        """
+        first = len(self)
+        transaction = getattr(self.db, 'transaction', None)
+        for txn in chain(self.undoq, self.redoq, [transaction]):
+            if txn is not None and txn.first is not None:
+                first = min(first, txn.first)
+        if first <= self.base:
+            return
+        count = first - self.base
+        if count == len(self.offsets):
+            self.undodb.seek(0)
+            self.undodb.truncate()
+            self.offsets = array('q')
+            self.base = first
+            return
+        start = self.offsets[count]
+        self.undodb.seek(0, os.SEEK_END)
+        end = self.undodb.tell()
+        self.offsets = self.offsets[count:]
+        self.base = first
+        if start < _UNDO_COMPACT or start < end - start:
+            return
+        # move the records still needed to the start of the file
+        pos = 0
+        while start + pos < end:
+            self.undodb.seek(start + pos)
+            data = self.undodb.read(min(_UNDO_COMPACT, end - start - pos))
+            self.undodb.seek(pos)
+            self.undodb.write(data)
+            pos += len(data)
+        self.undodb.truncate(pos)
+        for index, offset in enumerate(self.offsets):
+            self.offsets[index] = offset - start
 
     def _redo(self, update_history):
         """
@@ -141,7 +263,7 @@ class DbGenericUndo(DbUndo):
             self.db._txn_begin()
             for record_id in subitems:
                 (key, trans_type, handle, old_data, new_data) = \
-                    pickle.loads(self.undodb[record_id])
+                    pickle.loads(self[record_id])
 
                 if key == REFERENCE_KEY:
                     self.db.undo_reference(new_data, handle)
@@ -190,7 +312,7 @@ class DbGenericUndo(DbUndo):
             self.db._txn_begin()
             for record_id in subitems:
                 (key, trans_type, handle, old_data, new_data) = \
-                        pickle.loads(self.undodb[record_id])
+                        pickle.loads(self[record_id])
 
                 if key == REFERENCE_KEY:
                     self.db.undo_reference(old_data, handle)
@@ -283,6 +405,129 @@ class Cursor:
     def close(self):
         pass
 
+class GrampsIdIndex:
+    """
+    The numbers used by the Gramps IDs of the objects of a class, for an ID
+    prefix: the IDs in the format of the prefix, eg I0012 for I%04d, are
+    marked in a bitmap, so the next free ID is found without querying the
+    database.
+
+    The numbers of removed or changed IDs stay marked, as other objects
+    may have the same ID: they are only skipped.
+    """
+    def __init__(self, prefix, gramps_ids):
+        """
+        @param: prefix     -- The ID prefix, eg I%04d
+        @param: gramps_ids -- The Gramps IDs of the objects of the class
+        """
+        self.prefix = prefix
+        self.bits = bytearray()
+        # the numbers above the bitmap
+        self.large = set()
+        match = re.match(r"(.*?)%[0 ]?\d*[diu](.*)$", prefix, re.S)
+        if match and '%' not in match.group(1) + match.group(2):
+            self.head, self.tail = match.groups()
+        else:
+            # the IDs are checked in the database
+            self.head = self.tail = None
+        for gramps_id in gramps_ids:
+            self.add(gramps_id)
+
+    def __number(self, gramps_id):
+        """
+        Return the number of a Gramps ID in the format of the prefix, or
+        None.
+        """
+        if (self.head is None or not gramps_id or
+                not gramps_id.startswith(self.head) or
+                not gramps_id.endswith(self.tail)):
+            return None
+        digits = gramps_id[len(self.head):len(gramps_id) - len(self.tail)]
+        if not digits.strip().isdigit():
+            return None
+        number = int(digits)
+        if self.prefix % number != gramps_id:
+            return None
+        return number
+
+    def add(self, gramps_id):
+        """
+        Mark the number of a Gramps ID as used.
+        """
+        number = self.__number(gramps_id)
+        if number is None:
+            return
+        if number >= _ID_BITMAP_LIMIT:
+            self.large.add(number)
+            return
+        byte = number >> 3
+        if byte >= len(self.bits):
+            self.bits.extend(bytes(max(byte + 1 - len(self.bits),
+                                       len(self.bits))))
+        self.bits[byte] |= 1 << (number & 7)
+
+    def find_next(self, number):
+        """
+        Return the first free number from number.
+        """
+        while number < _ID_BITMAP_LIMIT:
+            byte = number >> 3
+            if byte >= len(self.bits):
+                return number
+            if self.bits[byte] == 0xff:
+                # skip the full bytes
+                match = _ID_FREE_BYTE.search(self.bits, byte)
+                if match is None:
+                    number = len(self.bits) << 3
+                    continue
+                number = match.start() << 3
+            if not self.bits[number >> 3] & (1 << (number & 7)):
+                return number
+            number += 1
+        while number in self.large:
+            number += 1
+        return number
+
+class LazyAttribute:
+    """
+    An attribute of a database, read from it on first use after the
+    database is opened rather than when it is opened.
+    """
+    def __init__(self, name, load):
+        """
+        @param: name -- The name of the attribute
+        @param: load -- A function returning the value of the attribute,
+                        for the database
+        """
+        self.name = name
+        self.load = load
+
+    def __get__(self, db, owner=None):
+        if db is None:
+            return self
+        start = time.time()
+        value = self.load(db)
+        # the value is now found before the attribute
+        db.__dict__[self.name] = value
+        db._profile(self.name, start)
+        return value
+
+class LazyMetadata(LazyAttribute):
+    """
+    An attribute of a database stored in its metadata, read on first use,
+    and saved when the database is closed if it was read.
+    """
+    def __init__(self, name, key, default):
+        """
+        @param: name    -- The name of the attribute
+        @param: key     -- The metadata key
+        @param: default -- A function returning the value of the attribute
+                           when there is no metadata, eg set
+        """
+        LazyAttribute.__init__(self, name,
+                               lambda db: db._get_metadata(key, default()))
+        self.key = key
+
 class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     """
     A Gramps Database Backend. This replicates the grampsdb functions.
@@ -313,6 +558,29 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     VERSION = (18, 0, 0)
 
+    # Custom type values, sets
+    event_names = LazyMetadata('event_names', 'event_names', set)
+    family_attributes = LazyMetadata('family_attributes', 'fattr_names', set)
+    individual_attributes = LazyMetadata('individual_attributes',
+                                         'pattr_names', set)
+    source_attributes = LazyMetadata('source_attributes', 'sattr_names', set)
+    marker_names = LazyMetadata('marker_names', 'marker_names', set)
+    child_ref_types = LazyMetadata('child_ref_types', 'child_refs', set)
+    family_rel_types = LazyMetadata('family_rel_types', 'family_rels', set)
+    event_role_names = LazyMetadata('event_role_names', 'event_roles', set)
+    name_types = LazyMetadata('name_types', 'name_types', set)
+    origin_types = LazyMetadata('origin_types', 'origin_types', set)
+    repository_types = LazyMetadata('repository_types', 'repo_types', set)
+    note_types = LazyMetadata('note_types', 'note_types', set)
+    source_media_types = LazyMetadata('source_media_types', 'sm_types', set)
+    url_types = LazyMetadata('url_types', 'url_types', set)
+    media_attributes = LazyMetadata('media_attributes', 'mattr_names', set)
+    event_attributes = LazyMetadata('event_attributes', 'eattr_names', set)
+    place_types = LazyMetadata('place_types', 'place_types', set)
+
+    genderStats = LazyAttribute(
+        'genderStats', lambda db: GenderStats(db.get_gender_stats()))
+
     def __init__(self, directory=None):
         DbReadBase.__init__(self)
         DbWriteBase.__init__(self)
@@ -520,6 +788,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.set_note_id_prefix('N%04d')
         # ----------------------------------
         self.undodb = None
+        self._gramps_id_index = {}
         self.cmap_index = 0
         self.smap_index = 0
         self.emap_index = 0
@@ -540,6 +809,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.surname_list = []
         self.genderStats = GenderStats() # can pass in loaded stats as dict
         self.owner = Researcher()
+        self._load_profile = []
         if directory:
             self.load(directory)
 
@@ -585,18 +855,26 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             mode = DBMODE_R
 
         self.readonly = mode == DBMODE_R
+        self._load_profile = []
 
         if not self.readonly and directory != ':memory:':
             write_lock_file(directory)
 
         # run backend-specific code:
+        start = time.time()
         self._initialize(directory, username, password)
+        self._profile('backend', start)
 
+        start = time.time()
         if not self._schema_exists():
             self._create_schema()
             self._set_metadata('version', str(self.VERSION[0]))
+        elif not self.readonly:
+            self._update_schema()
+        self._profile('schema', start)
 
         # Load metadata
+        start = time.time()
         self.name_formats = self._get_metadata('name_formats')
         self.owner = self._get_metadata('researcher', default=Researcher())
 
@@ -610,43 +888,31 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.media_bookmarks.set(self._get_metadata('media_bookmarks'))
         self.place_bookmarks.set(self._get_metadata('place_bookmarks'))
         self.note_bookmarks.set(self._get_metadata('note_bookmarks'))
+        self._profile('metadata', start)
 
-        # Custom type values
-        self.event_names = self._get_metadata('event_names', set())
-        self.family_attributes = self._get_metadata('fattr_names', set())
-        self.individual_attributes = self._get_metadata('pattr_names', set())
-        self.source_attributes = self._get_metadata('sattr_names', set())
-        self.marker_names = self._get_metadata('marker_names', set())
-        self.child_ref_types = self._get_metadata('child_refs', set())
-        self.family_rel_types = self._get_metadata('family_rels', set())
-        self.event_role_names = self._get_metadata('event_roles', set())
-        self.name_types = self._get_metadata('name_types', set())
-        self.origin_types = self._get_metadata('origin_types', set())
-        self.repository_types = self._get_metadata('repo_types', set())
-        self.note_types = self._get_metadata('note_types', set())
-        self.source_media_types = self._get_metadata('sm_types', set())
-        self.url_types = self._get_metadata('url_types', set())
-        self.media_attributes = self._get_metadata('mattr_names', set())
-        self.event_attributes = self._get_metadata('eattr_names', set())
-        self.place_types = self._get_metadata('place_types', set())
-
-        # surname list
-        self.surname_list = self.get_surname_list()
+        # The custom type values and the gender statistics are read on
+        # first use
+        for attr in vars(DbGeneric).values():
+            if isinstance(attr, LazyAttribute):
+                self.__dict__.pop(attr.name, None)
+
+        # The surname list is kept by the backends
+        self.surname_list = []
 
         self._set_save_path(directory)
 
+        start = time.time()
         if self._directory:
             self.undolog = os.path.join(self._directory, DBUNDOFN)
         else:
             self.undolog = None
         self.undodb = DbGenericUndo(self, self.undolog)
         self.undodb.open()
-
-        # Other items to load
-        gstats = self.get_gender_stats()
-        self.genderStats = GenderStats(gstats)
+        self._profile('undo log', start)
 
         # Indexes:
+        start = time.time()
+        self._gramps_id_index = {}
         self.cmap_index = self._get_metadata('cmap_index', 0)
         self.smap_index = self._get_metadata('smap_index', 0)
         self.emap_index = self._get_metadata('emap_index', 0)
@@ -656,9 +922,36 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.omap_index = self._get_metadata('omap_index', 0)
         self.rmap_index = self._get_metadata('rmap_index', 0)
         self.nmap_index = self._get_metadata('nmap_index', 0)
+        self._profile('indexes', start)
+
+        LOG.debug("Database opened in %.3f s",
+                  sum(seconds for (step, seconds) in self._load_profile))
 
         self.db_is_open = True
 
+    def _profile(self, step, start):
+        """
+        Record the time taken by a step of the opening of the database,
+        started at start.
+        """
+        seconds = time.time() - start
+        self._load_profile.append((step, seconds))
+        LOG.debug("Loaded %s in %.3f s", step, seconds)
+
+    def get_load_profile(self):
+        """
+        Return a list of (step, seconds) tuples, with the time taken by the
+        steps of the opening of the database, and by the data read on first
+        use since.
+        """
+        return list(self._load_profile)
+
+    def _update_schema(self):
+        """
+        Add the tables missing from the schema of an existing database.
+        """
+        pass
+
     def _close(self):
         """
         Close database backend.
@@ -695,27 +988,15 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                 self._set_metadata('media_bookmarks', self.media_bookmarks.get())
                 self._set_metadata('note_bookmarks', self.note_bookmarks.get())
 
-                # Custom type values, sets
-                self._set_metadata('event_names', self.event_names)
-                self._set_metadata('fattr_names', self.family_attributes)
-                self._set_metadata('pattr_names', self.individual_attributes)
-                self._set_metadata('sattr_names', self.source_attributes)
-                self._set_metadata('marker_names', self.marker_names)
-                self._set_metadata('child_refs', self.child_ref_types)
-                self._set_metadata('family_rels', self.family_rel_types)
-                self._set_metadata('event_roles', self.event_role_names)
-                self._set_metadata('name_types', self.name_types)
-                self._set_metadata('origin_types', self.origin_types)
-                self._set_metadata('repo_types', self.repository_types)
-                self._set_metadata('note_types', self.note_types)
-                self._set_metadata('sm_types', self.source_media_types)
-                self._set_metadata('url_types', self.url_types)
-                self._set_metadata('mattr_names', self.media_attributes)
-                self._set_metadata('eattr_names', self.event_attributes)
-                self._set_metadata('place_types', self.place_types)
+                # Custom type values, sets, if they were read
+                for attr in vars(DbGeneric).values():
+                    if (isinstance(attr, LazyMetadata) and
+                            attr.name in self.__dict__):
+                        self._set_metadata(attr.key,
+                                           self.__dict__[attr.name])
 
                 # Save misc items:
-                if self.has_changed:
+                if self.has_changed and 'genderStats' in self.__dict__:
                     self.save_gender_stats(self.genderStats)
 
                 # Indexes:
@@ -731,11 +1012,14 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
             self._close()
 
-            try:
-                clear_lock_file(self.get_save_path())
-            except IOError:
-                pass
+            if not self.readonly:
+                try:
+                    clear_lock_file(self.get_save_path())
+                except IOError:
+                    pass
 
+        if self.undodb is not None:
+            self.undodb.close()
         self.db_is_open = False
         self._directory = None
 
@@ -1000,6 +1284,13 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         Helper function for find_next_<object>_gramps_id methods
         """
+        id_index = self._gramps_id_index.get(obj_key)
+        if id_index is None or id_index.prefix != prefix:
+            id_index = GrampsIdIndex(prefix, self._get_gramps_ids(obj_key))
+            self._gramps_id_index[obj_key] = id_index
+        if id_index.head is not None:
+            map_index = id_index.find_next(map_index)
+            return (map_index + 1, prefix % map_index)
         index = prefix % map_index
         while self._has_gramps_id(obj_key, index):
             map_index += 1
@@ -1007,6 +1298,14 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         map_index += 1
         return (map_index, index)
 
+    def _add_gramps_id(self, obj_key, obj):
+        """
+        Mark the Gramps ID of a committed object as used.
+        """
+        id_index = self._gramps_id_index.get(obj_key)
+        if id_index is not None:
+            id_index.add(obj.gramps_id)
+
     def find_next_person_gramps_id(self):
         """
         Return the next available GRAMPS' ID for a Person object based off the
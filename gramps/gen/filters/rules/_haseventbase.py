@@ -35,6 +35,7 @@ from ...datehandler import parser
 from ...lib.eventtype import EventType
 from . import Rule
 from ...utils.db import get_participant_from_event
+from ...utils.datetable import DateMatches
 from ...display.place import displayer as place_displayer
 
 #-------------------------------------------------------------------------
@@ -57,6 +58,7 @@ class HasEventBase(Rule):
     allow_regex = True
 
     def prepare(self, db, user):
+        self.date_matches = None
         self.date = None
         if self.list[0]:
             self.etype = EventType()
@@ -68,6 +70,14 @@ class HasEventBase(Rule):
                 self.date = parser.parse(self.list[1])
         except:
             pass
+        if self.date:
+            # the events whose date matches
+            self.date_matches = DateMatches(db, self.date)
+
+    def reset(self):
+        if self.date_matches is not None:
+            self.date_matches.close()
+        self.date_matches = None
 
     def apply(self, db, event):
         if self.etype:
@@ -81,7 +91,7 @@ class HasEventBase(Rule):
             return False
 
         if self.date:
-            if not event.get_date_object().match(self.date):
+            if event.get_handle() not in self.date_matches:
                 return False
 
         if self.list[2]:
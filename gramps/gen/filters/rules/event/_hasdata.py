@@ -34,6 +34,7 @@ _ = glocale.translation.gettext
 from ....datehandler import parser
 from ....display.place import displayer as place_displayer
 from ....lib.eventtype import EventType
+from ....utils.datetable import DateMatches
 from .. import Rule
 
 #-------------------------------------------------------------------------
@@ -52,6 +53,7 @@ class HasData(Rule):
     allow_regex = True
 
     def prepare(self, db, user):
+        self.date_matches = None
         self.event_type = self.list[0]
         self.date = self.list[1]
 
@@ -61,13 +63,20 @@ class HasData(Rule):
 
         if self.date:
             self.date = parser.parse(self.date)
+            # the events whose date matches
+            self.date_matches = DateMatches(db, self.date)
+
+    def reset(self):
+        if self.date_matches is not None:
+            self.date_matches.close()
+        self.date_matches = None
 
     def apply(self, db, event):
         if self.event_type and event.get_type() != self.event_type:
             # No match
             return False
 
-        if self.date and not event.get_date_object().match(self.date):
+        if self.date and event.get_handle() not in self.date_matches:
             # No match
             return False
 
@@ -35,6 +35,7 @@ from ....datehandler import parser
 from ....display.place import displayer as place_displayer
 from ....lib.eventroletype import EventRoleType
 from ....lib.eventtype import EventType
+from ....utils.datetable import DateMatches
 from .. import Rule
 
 #-------------------------------------------------------------------------
@@ -52,11 +53,19 @@ class HasDeath(Rule):
     allow_regex = True
 
     def prepare(self, db, user):
+        self.date_matches = None
         if self.list[0]:
             self.date = parser.parse(self.list[0])
+            # the events whose date matches
+            self.date_matches = DateMatches(db, self.date)
         else:
             self.date = None
 
+    def reset(self):
+        if self.date_matches is not None:
+            self.date_matches.close()
+        self.date_matches = None
+
     def apply(self,db,person):
         for event_ref in person.get_event_ref_list():
             if not event_ref:
@@ -72,7 +81,7 @@ class HasDeath(Rule):
                 # No match: wrong description
                 continue
             if self.date:
-                if not event.get_date_object().match(self.date):
+                if event.get_handle() not in self.date_matches:
                     # No match: wrong date
                     continue
             if self.list[1]:
@@ -34,6 +34,7 @@ _ = glocale.translation.gettext
 from ....datehandler import parser
 from ....display.place import displayer as place_displayer
 from ....lib.eventtype import EventType
+from ....utils.datetable import DateMatches
 from .. import Rule
 
 #-------------------------------------------------------------------------
@@ -55,12 +56,21 @@ class HasFamilyEvent(Rule):
     allow_regex = True
 
     def prepare(self, db, user):
+        self.date_matches = None
         self.date = None
         try:
             if self.list[1]:
                 self.date = parser.parse(self.list[1])
         except:
             pass
+        if self.date:
+            # the events whose date matches
+            self.date_matches = DateMatches(db, self.date)
+
+    def reset(self):
+        if self.date_matches is not None:
+            self.date_matches.close()
+        self.date_matches = None
 
     def apply(self,db,person):
         for f_id in person.get_family_handle_list():
@@ -82,7 +92,7 @@ class HasFamilyEvent(Rule):
                     if not self.match_substring(3, event.get_description()):
                         val = 0
                 if self.date:
-                    if not event.get_date_object().match(self.date):
+                    if event.get_handle() not in self.date_matches:
                         val = 0
                 if self.list[2]:
                     place_id = event.get_place_handle()
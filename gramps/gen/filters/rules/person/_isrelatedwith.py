@@ -32,6 +32,7 @@ _ = glocale.translation.gettext
 #
 #-------------------------------------------------------------------------
 from .. import Rule
+from ....relationship import get_related_handles
 
 #-------------------------------------------------------------------------
 #
@@ -48,57 +49,18 @@ class IsRelatedWith(Rule):
 
     def prepare(self, db, user):
         """prepare so the rule can be executed efficiently
-           we build the list of people related to <person> here,
-           so that apply is only a check into this list
+           we build the set of people related to <person> here,
+           so that apply is only a check into this set
         """
         self.db = db
 
-        self.relatives = []
-        self.add_relative(db.get_person_from_gramps_id(self.list[0]))
+        self.relatives = set()
+        person = db.get_person_from_gramps_id(self.list[0])
+        if person:
+            self.relatives = get_related_handles(db, person.handle)
 
     def reset(self):
-        self.relatives = []
+        self.relatives = set()
 
     def apply(self, db, person):
         return person.handle in self.relatives
-
-
-    def add_relative(self, start):
-        """Non-recursive function that scans relatives and add them to self.relatives"""
-        if not(start):
-            return
-
-        expand = [start]
-        relatives = {}
-
-        while expand:
-            person = expand.pop()
-            # Add the relative to the list
-            if person is None or (person.handle in relatives):
-                continue
-            relatives[person.handle] = True
-
-            for family_handle in person.get_parent_family_handle_list():
-                family = self.db.get_family_from_handle(family_handle)
-                if family:
-            # Check Parents
-                    for parent_handle in (family.get_father_handle(), family.get_mother_handle()):
-                        if parent_handle:
-                            expand.append(self.db.get_person_from_handle(parent_handle))
-            # Check Sibilings
-                    for child_ref in family.get_child_ref_list():
-                        expand.append(self.db.get_person_from_handle(child_ref.ref))
-
-            for family_handle in person.get_family_handle_list():
-                family = self.db.get_family_from_handle(family_handle)
-                if family:
-            # Check Spouse
-                    for parent_handle in (family.get_father_handle(), family.get_mother_handle()):
-                        if parent_handle:
-                            expand.append(self.db.get_person_from_handle(parent_handle))
-            # Check Children
-                    for child_ref in family.get_child_ref_list():
-                        expand.append(self.db.get_person_from_handle(child_ref.ref))
-
-        self.relatives = list(relatives.keys())
-        return
@@ -905,9 +905,13 @@ class Date:
             new_date.set_yr_mon_day(*dateval[:3])
             return new_date.offset(offset)
 
-        datecopy = Date(self)
         #we do all calculation in Gregorian calendar
-        datecopy.convert_calendar(Date.CAL_GREGORIAN)
+        if (self.calendar == Date.CAL_GREGORIAN and
+                self.newyear == Date.NEWYEAR_JAN1):
+            datecopy = self
+        else:
+            datecopy = Date(self)
+            datecopy.convert_calendar(Date.CAL_GREGORIAN)
 
         start = yr_mon_day(datecopy.get_start_date())
         stop = yr_mon_day(datecopy.get_stop_date())
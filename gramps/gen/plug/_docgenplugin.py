@@ -31,7 +31,8 @@ class DocGenPlugin(Plugin):
     This class represents a plugin for generating documents from Gramps
     """
     def __init__(self, name, description, basedoc,
-                 paper, style, extension, docoptclass, basedocname):
+                 paper, style, extension, docoptclass, basedocname,
+                 load=None, module_name=None):
         """
         :param name: A friendly name to call this plugin.
             Example: "Plain Text"
@@ -56,22 +57,45 @@ class DocGenPlugin(Plugin):
         :param basedocname: The BaseDoc name of this plugin.
             Example: "AsciiDoc"
         :type basedocname: string
+        :param load: If basedoc is None, a function returning the basedoc
+            and docoptclass, called when they are first needed, or None if
+            the module of the plugin cannot be loaded.
+        :type load: callable
+        :param module_name: If basedoc is None, the name of the module of
+            the plugin.
+        :type module_name: string
         :return: nothing
         """
-        Plugin.__init__(self, name, description, basedoc.__module__)
+        if basedoc is not None:
+            module_name = basedoc.__module__
+        Plugin.__init__(self, name, description, module_name)
         self.__basedoc = basedoc
         self.__paper = paper
         self.__style = style
         self.__extension = extension
         self.__docoptclass = docoptclass
         self.__basedocname = basedocname
+        self.__load = load if basedoc is None else None
+
+    def __load_basedoc(self):
+        """
+        Load the module of the plugin, the first time the :class:`.BaseDoc`
+        class is needed.
+        """
+        if self.__load is not None:
+            load, self.__load = self.__load, None
+            result = load()
+            if result is not None:
+                self.__basedoc, self.__docoptclass = result
 
     def get_basedoc(self):
         """
         Get the :class:`.BaseDoc` class for this plugin.
 
-        :return: the :class:`.BaseDoc` class passed into :meth:`__init__`
+        :return: the :class:`.BaseDoc` class passed into :meth:`__init__`, or
+                 None if the module of the plugin could not be loaded
         """
+        self.__load_basedoc()
         return self.__basedoc
 
     def get_paper_used(self):
@@ -104,6 +128,7 @@ class DocGenPlugin(Plugin):
 
         :return: the :class:`.DocOptions` subclass passed into :meth:`__init__`
         """
+        self.__load_basedoc()
         return self.__docoptclass
 
     def get_basedocname(self):
@@ -121,7 +146,8 @@ class DocGenPlugin(Plugin):
         :return: bool: True if :class:`.TextDoc` is supported; False if
                        :class:`.TextDoc` is not supported.
         """
-        return bool(issubclass(self.__basedoc, TextDoc))
+        basedoc = self.get_basedoc()
+        return basedoc is not None and issubclass(basedoc, TextDoc)
 
     def get_draw_support(self):
         """
@@ -130,4 +156,5 @@ class DocGenPlugin(Plugin):
         :return: bool: True if :class:`.DrawDoc` is supported; False if
                        :class:`.DrawDoc` is not supported.
         """
-        return bool(issubclass(self.__basedoc, DrawDoc))
+        basedoc = self.get_basedoc()
+        return basedoc is not None and issubclass(basedoc, DrawDoc)
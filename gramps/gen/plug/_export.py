@@ -22,6 +22,8 @@
 This module provides the :class:`.Plugin` class for export plugins.
 """
 
+import importlib
+
 from . import Plugin
 
 class ExportPlugin(Plugin):
@@ -48,8 +50,10 @@ class ExportPlugin(Plugin):
         :param extension: The extension for the output file.
             Example: "ged"
         :type extension: str
-        :param config: Options for the exporter
-        :type config: tuple (??,??)
+        :param config: The title and the class of the options of the
+            exporter. The class can be given by its full dotted name, so
+            that its module is only imported when the options are needed.
+        :type config: tuple (str, class or str)
         :return: nothing
         """
         Plugin.__init__(self, name, description, export_function.__module__)
@@ -77,6 +81,10 @@ class ExportPlugin(Plugin):
         """
         Get the config.
 
-        :return: (??,??)
+        :return: (title, options class)
         """
+        if self.__config and isinstance(self.__config[1], str):
+            module_name, class_name = self.__config[1].rsplit('.', 1)
+            module = importlib.import_module(module_name)
+            self.__config = (self.__config[0], getattr(module, class_name))
         return self.__config
@@ -38,6 +38,7 @@ importers, exporters, quick reports, and document generators.
 import os
 import sys
 import re
+from functools import partial
 import logging
 LOG = logging.getLogger('._manager')
 LOG.progagate = True
@@ -129,6 +130,7 @@ class BasePluginManager:
 
         if os.path.isdir(direct) and direct not in self.__scanned_dirs:
             self.__scanned_dirs.append(direct)
+            scanned = len(self.__pgr.get_scan_profile())
             for (dirpath, dirnames, filenames) in os.walk(direct,
                                                           topdown=True):
                 for dirname in dirnames[:]:
@@ -138,6 +140,14 @@ class BasePluginManager:
                         dirnames.remove(dirname)
                 # LOG.warning("Plugin dir scanned: %s", dirpath)
                 self.__pgr.scan_dir(dirpath, filenames, uistate=uistate)
+            self.__pgr.save_cache()
+            if LOG.isEnabledFor(logging.DEBUG):
+                profile = self.__pgr.get_scan_profile()[scanned:]
+                cached = [item for item in profile if item[2]]
+                LOG.debug("Plugin registration of %s: %.3fs, %d files "
+                          "cached, %d executed", direct,
+                          sum(item[1] for item in profile), len(cached),
+                          len(profile) - len(cached))
 
         if load_on_reg:
             # Run plugins that request to be loaded on startup and
@@ -559,8 +569,12 @@ class BasePluginManager:
                 mod = self.load_plugin(pdata)
                 if mod:
                     options = None
-                    if (pdata.export_options and
-                        hasattr(mod, pdata.export_options)):
+                    if '.' in (pdata.export_options or ''):
+                        # a class of another module, imported when the
+                        # options are asked for, ie only by the GUI
+                        options = pdata.export_options
+                    elif (pdata.export_options and
+                          hasattr(mod, pdata.export_options)):
                         options = getattr(mod, pdata.export_options)
                     exp = ExportPlugin(name=pdata.name_accell,
                         description     = pdata.description,
@@ -577,32 +591,40 @@ class BasePluginManager:
 
         :return: :class:`.DocGenPlugin` (a list of DocGenPlugin instances)
         """
-        ## TODO: would it not be better to return list of plugindata, and only
-        ##       import those docgen that will then actuallly be needed?
-        ##       So, only do import when docgen.get_basedoc() is requested
         if self.__docgen_plugins == []:
-            #The modules still need to be imported
+            # The modules are only imported when docgen.get_basedoc() is
+            # requested
             hiddenplugins = config.get("plugin.hiddenplugins")
             for pdata in self.get_reg_docgens():
                 if pdata.id in hiddenplugins:
                     continue
-                mod = self.load_plugin(pdata)
-                if mod:
-                    oclass = None
-                    if pdata.optionclass:
-                        oclass = getattr(mod, pdata.optionclass)
-                    dgp = DocGenPlugin(name=pdata.name,
-                            description = pdata.description,
-                            basedoc     = getattr(mod, pdata.docclass),
-                            paper       = pdata.paper,
-                            style       = pdata.style,
-                            extension   = pdata.extension,
-                            docoptclass = oclass,
-                            basedocname = pdata.docclass )
-                    self.__docgen_plugins.append(dgp)
+                dgp = DocGenPlugin(name=pdata.name,
+                        description = pdata.description,
+                        basedoc     = None,
+                        paper       = pdata.paper,
+                        style       = pdata.style,
+                        extension   = pdata.extension,
+                        docoptclass = None,
+                        basedocname = pdata.docclass,
+                        load        = partial(self.__load_docgen, pdata),
+                        module_name = pdata.mod_name)
+                self.__docgen_plugins.append(dgp)
 
         return self.__docgen_plugins
 
+    def __load_docgen(self, pdata):
+        """
+        Load the module of a docgen plugin, and return its
+        :class:`.BaseDoc` and :class:`.DocOptions` classes, or None.
+        """
+        mod = self.load_plugin(pdata)
+        if not mod:
+            return None
+        oclass = None
+        if pdata.optionclass:
+            oclass = getattr(mod, pdata.optionclass)
+        return (getattr(mod, pdata.docclass), oclass)
+
     def get_docgen_names(self):
         """
         Get the list of docgen plugin names.
@@ -40,7 +40,6 @@ import sys
 #
 #-------------------------------------------------------------------------
 from xml.sax import make_parser, handler, SAXParseException
-from xml.sax.saxutils import quoteattr
 
 #-------------------------------------------------------------------------
 #
@@ -201,6 +200,8 @@ class OptionListCollection:
         """
         Saves the current OptionListCollection to the associated file.
         """
+        # xml.sax.saxutils imports urllib.request, not needed at startup
+        from xml.sax.saxutils import quoteattr
         with open(self.filename, "w", encoding="utf-8") as file:
             file.write("<?xml version=\"1.0\" encoding=\"utf-8\"?>\n")
             file.write('<options>\n')
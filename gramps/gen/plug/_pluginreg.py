@@ -33,6 +33,9 @@ import os
 import sys
 import re
 import traceback
+import ast
+import pickle
+import time
 
 #-------------------------------------------------------------------------
 #
@@ -40,7 +43,7 @@ import traceback
 #
 #-------------------------------------------------------------------------
 from ...version import VERSION as GRAMPSVERSION, VERSION_TUPLE
-from ..const import IMAGE_DIR
+from ..const import IMAGE_DIR, PLUGIN_CACHE
 from ..const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 import logging
@@ -303,7 +306,9 @@ class PluginData:
     .. attribute:: export_function
        Function that produces the export
     .. attribute:: export_options
-       Class to set options
+       Class to set options, in the module of the plugin, or given by its
+       full dotted name, eg 'gramps.gui.plug.export.WriterOptionBox', to
+       import it only when the options are shown
     .. attribute:: export_options_title
        Title for the option page
 
@@ -1078,6 +1083,44 @@ def make_environment(**kwargs):
     env.update(kwargs)
     return env
 
+#-------------------------------------------------------------------------
+#
+# Cache of the registrations
+#
+#-------------------------------------------------------------------------
+# The version of the format of the cache
+_CACHE_VERSION = 1
+
+# The modules a registration file can import from, for its registrations to
+# be cached
+_REGISTRATION_MODULES = ('gramps.gen.plug._pluginreg', 'gramps.gen.const')
+
+def _only_registers(tree):
+    """
+    Return True if the code of a registration file does nothing but register
+    plugins, so that its registrations only depend on the file: it imports
+    no other module, and does not use the uistate.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            return False
+        if (isinstance(node, ast.ImportFrom) and
+                node.module not in _REGISTRATION_MODULES):
+            return False
+        if isinstance(node, ast.Name) and node.id == 'uistate':
+            return False
+    return True
+
+def _get_stamp(filename):
+    """
+    Return the modification time and size of a file, or None.
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
 #-------------------------------------------------------------------------
 #
 # PluginRegister
@@ -1110,6 +1153,12 @@ class PluginRegister:
             self.stable_only = False
         self.__plugindata  = []
         self.__id_to_pdata = {}
+        # The registrations of the registration files which only register
+        # plugins are cached in this file, see scan_dir
+        self.cache_file = PLUGIN_CACHE
+        self.__cache = None
+        self.__cache_changed = False
+        self.__scan_profile = []
 
     def add_plugindata(self, plugindata):
         """ This is used to add an entry to the registration list.  The way it
@@ -1131,13 +1180,19 @@ class PluginRegister:
 
         ext = r".gpr.py"
         extlen = -len(ext)
-        pymod = re.compile(r"^(.*)\.py$")
 
         for filename in filenames:
             if not filename[extlen:] == ext:
                 continue
             lenpd = len(self.__plugindata)
             full_filename = os.path.join(dir, filename)
+            start = time.time()
+            stamp = _get_stamp(full_filename)
+            if self.__restore(full_filename, stamp):
+                self.__scan_profile.append((full_filename,
+                                            time.time() - start, True))
+                self.__check_plugins(dir, filename, lenpd)
+                continue
             try:
                 with open(full_filename, "r", encoding='utf-8') as fd:
                     stream = fd.read()
@@ -1159,7 +1214,8 @@ class PluginRegister:
             else:
                 local_gettext = glocale.translation.gettext
             try:
-                exec (compile(stream, filename, 'exec'),
+                tree = ast.parse(stream, filename)
+                exec (compile(tree, filename, 'exec'),
                       make_environment(_=local_gettext), {'uistate': uistate})
                 for pdata in self.__plugindata[lenpd:]:
                     # should not be duplicate IDs in different plugins
@@ -1167,6 +1223,8 @@ class PluginRegister:
                     # if pdata.id in self.__id_to_pdata:
                     #     print("Error: %s is duplicated!" % pdata.id)
                     self.__id_to_pdata[pdata.id] = pdata
+                if stamp is not None and _only_registers(tree):
+                    self.__store(full_filename, stamp, lenpd)
             except ValueError as msg:
                 print(_('ERROR: Failed reading plugin registration %(filename)s') % \
                             {'filename' : filename})
@@ -1177,60 +1235,158 @@ class PluginRegister:
                             {'filename' : filename})
                 print("".join(traceback.format_exception(*sys.exc_info())))
                 self.__plugindata = self.__plugindata[:lenpd]
-            #check if:
-            #  1. plugin exists, if not remove, otherwise set module name
-            #  2. plugin not stable, if stable_only=True, remove
-            #  3. TOOL_DEBUG only if __debug__ True
-            rmlist = []
-            ind = lenpd-1
-            for plugin in self.__plugindata[lenpd:]:
-                #LOG.warning("\nPlugin scanned %s at registration", plugin.id)
-                ind += 1
-                plugin.directory = dir
-                if not valid_plugin_version(plugin.gramps_target_version):
-                    print(_('ERROR: Plugin file %(filename)s has a version of '
-                            '"%(gramps_target_version)s" which is invalid for Gramps '
-                            '"%(gramps_version)s".' %
-                            {'filename': os.path.join(dir, plugin.fname),
-                             'gramps_version': GRAMPSVERSION,
-                             'gramps_target_version': plugin.gramps_target_version,}
-                            ))
-                    rmlist.append(ind)
-                    continue
-                if not plugin.status == STABLE and self.stable_only:
-                    rmlist.append(ind)
-                    continue
-                if plugin.ptype == TOOL and plugin.category == TOOL_DEBUG \
-                and not __debug__:
-                    rmlist.append(ind)
-                    continue
-                if plugin.fname is None:
-                    continue
-                match = pymod.match(plugin.fname)
-                if not match:
-                    rmlist.append(ind)
-                    print(_('ERROR: Wrong python file %(filename)s in register file '
-                            '%(regfile)s')  % {
-                               'filename': os.path.join(dir, plugin.fname),
-                               'regfile': os.path.join(dir, filename)
-                            })
-                    continue
-                if not os.path.isfile(os.path.join(dir, plugin.fname)):
-                    rmlist.append(ind)
-                    print(_('ERROR: Python file %(filename)s in register file '
-                            '%(regfile)s does not exist')  % {
-                               'filename': os.path.join(dir, plugin.fname),
-                               'regfile': os.path.join(dir, filename)
-                            })
-                    continue
-                module = match.groups()[0]
-                plugin.mod_name = module
-                plugin.fpath = dir
-                #LOG.warning("\nPlugin added %s at registration", plugin.id)
-            rmlist.reverse()
-            for ind in rmlist:
-                del self.__id_to_pdata[self.__plugindata[ind].id]
-                del self.__plugindata[ind]
+            self.__scan_profile.append((full_filename, time.time() - start,
+                                        False))
+            self.__check_plugins(dir, filename, lenpd)
+
+    def __check_plugins(self, dir, filename, lenpd):
+        """
+        Check the plugins registered by the registration file filename, from
+        index lenpd, and set their module name.
+        """
+        pymod = re.compile(r"^(.*)\.py$")
+        #check if:
+        #  1. plugin exists, if not remove, otherwise set module name
+        #  2. plugin not stable, if stable_only=True, remove
+        #  3. TOOL_DEBUG only if __debug__ True
+        rmlist = []
+        ind = lenpd-1
+        for plugin in self.__plugindata[lenpd:]:
+            #LOG.warning("\nPlugin scanned %s at registration", plugin.id)
+            ind += 1
+            plugin.directory = dir
+            if not valid_plugin_version(plugin.gramps_target_version):
+                print(_('ERROR: Plugin file %(filename)s has a version of '
+                        '"%(gramps_target_version)s" which is invalid for Gramps '
+                        '"%(gramps_version)s".' %
+                        {'filename': os.path.join(dir, plugin.fname),
+                         'gramps_version': GRAMPSVERSION,
+                         'gramps_target_version': plugin.gramps_target_version,}
+                        ))
+                rmlist.append(ind)
+                continue
+            if not plugin.status == STABLE and self.stable_only:
+                rmlist.append(ind)
+                continue
+            if plugin.ptype == TOOL and plugin.category == TOOL_DEBUG \
+            and not __debug__:
+                rmlist.append(ind)
+                continue
+            if plugin.fname is None:
+                continue
+            match = pymod.match(plugin.fname)
+            if not match:
+                rmlist.append(ind)
+                print(_('ERROR: Wrong python file %(filename)s in register file '
+                        '%(regfile)s')  % {
+                           'filename': os.path.join(dir, plugin.fname),
+                           'regfile': os.path.join(dir, filename)
+                        })
+                continue
+            if not os.path.isfile(os.path.join(dir, plugin.fname)):
+                rmlist.append(ind)
+                print(_('ERROR: Python file %(filename)s in register file '
+                        '%(regfile)s does not exist')  % {
+                           'filename': os.path.join(dir, plugin.fname),
+                           'regfile': os.path.join(dir, filename)
+                        })
+                continue
+            module = match.groups()[0]
+            plugin.mod_name = module
+            plugin.fpath = dir
+            #LOG.warning("\nPlugin added %s at registration", plugin.id)
+        rmlist.reverse()
+        for ind in rmlist:
+            del self.__id_to_pdata[self.__plugindata[ind].id]
+            del self.__plugindata[ind]
+
+    def __restore(self, full_filename, stamp):
+        """
+        Add the plugins registered by a registration file from the cache, if
+        the file did not change since they were cached. Return True if they
+        were added.
+        """
+        if self.__cache is None:
+            self.__load_cache()
+        entry = self.__cache.get(full_filename)
+        if stamp is None or entry is None or entry[0] != stamp:
+            return False
+        plugins = pickle.loads(entry[1])
+        if any(pdata.id in self.__id_to_pdata for pdata in plugins):
+            # let the registration file report the duplicate
+            return False
+        for pdata in plugins:
+            self.__plugindata.append(pdata)
+            self.__id_to_pdata[pdata.id] = pdata
+        return True
+
+    def __store(self, full_filename, stamp, lenpd):
+        """
+        Cache the plugins registered by a registration file, from index
+        lenpd.
+        """
+        try:
+            data = pickle.dumps(self.__plugindata[lenpd:],
+                                pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # eg a plugin attribute is a function defined in the file
+            return
+        self.__cache[full_filename] = (stamp, data)
+        self.__cache_changed = True
+
+    def __get_cache_key(self):
+        """
+        Return what the registrations of the files depend on, besides the
+        files: the versions of Gramps and Python, and the languages of the
+        translations.
+        """
+        return (_CACHE_VERSION, GRAMPSVERSION, sys.version_info[:2],
+                glocale.lang, tuple(glocale.language), __debug__)
+
+    def __load_cache(self):
+        """
+        Read the cache of the registrations, if it is for the current
+        versions and languages.
+        """
+        self.__cache = {}
+        try:
+            with open(self.cache_file, 'rb') as cache:
+                key, files = pickle.load(cache)
+        except Exception:
+            # no cache, or a cache which cannot be read
+            return
+        if key == self.__get_cache_key():
+            self.__cache = files
+
+    def save_cache(self):
+        """
+        Save the cache of the registrations, if registration files were
+        executed since it was read.
+        """
+        if (not self.__cache_changed or
+                not os.path.isdir(os.path.dirname(self.cache_file))):
+            return
+        files = dict((filename, entry)
+                     for (filename, entry) in self.__cache.items()
+                     if os.path.exists(filename))
+        temp_file = self.cache_file + '.tmp'
+        try:
+            with open(temp_file, 'wb') as cache:
+                pickle.dump((self.__get_cache_key(), files), cache,
+                            pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_file, self.cache_file)
+        except (IOError, OSError) as msg:
+            LOG.warning("Could not save the plugin registrations in %s: %s",
+                        self.cache_file, msg)
+        self.__cache_changed = False
+
+    def get_scan_profile(self):
+        """
+        Return a list of (registration file, seconds, cached) tuples, with
+        the time taken by each registration file scanned, and whether its
+        registrations were read from the cache.
+        """
+        return list(self.__scan_profile)
 
     def get_plugin(self, id):
         """
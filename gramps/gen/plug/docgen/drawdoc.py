@@ -90,13 +90,25 @@ class DrawDoc(metaclass=ABCMeta):
         bottom = self.paper.get_bottom_margin()
         return height - (top + bottom)
 
+    def get_text_metrics(self):
+        """
+        Return the :class:`.TextMetrics` keeping the widths of the strings
+        measured in the document.
+        """
+        try:
+            return self.__text_metrics
+        except AttributeError:
+            self.__text_metrics = fontscale.TextMetrics()
+            return self.__text_metrics
+
     def string_width(self, fontstyle, text):
         "Determine the width need for text in given font"
-        return fontscale.string_width(fontstyle, text)
+        return self.get_text_metrics().string_width(fontstyle, text)
 
     def string_multiline_width(self, fontstyle, text):
         "Determine the width need for multiline text in given font"
-        return fontscale.string_multiline_width(fontstyle, text)
+        return self.get_text_metrics().string_multiline_width(fontstyle,
+                                                               text)
 
     @abstractmethod
     def draw_path(self, style, path):
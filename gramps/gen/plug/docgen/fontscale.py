@@ -23,6 +23,23 @@
 Provide a rough estimate of the width of a text string.
 """
 
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+from itertools import repeat
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ...utils.lru import LRU
+
+# number of strings whose width is kept, by font, by TextMetrics
+TEXT_METRICS_SIZE = 2000
+
 SWISS = [
 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000,
 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000, 0.000,
@@ -250,6 +267,11 @@ ROMAN_BI = [
 FONT_ARRAY = [ [SWISS, SWISS_B, SWISS_I, SWISS_BI ],
                [ROMAN, ROMAN_B, ROMAN_I, ROMAN_BI ] ]
 
+# the same, by character
+FONT_WIDTHS = [[dict((chr(index), width) for index, width in enumerate(table))
+                for table in tables]
+               for tables in FONT_ARRAY]
+
 #-------------------------------------------------------------------------
 #
 # string_width
@@ -264,13 +286,9 @@ def string_width(font, text):
     i = font.get_type_face()
     j = font.get_bold() + font.get_italic()*2
     s = font.get_size()
-    l = FONT_ARRAY[i][j]
-    r = 0
-    for c in text:
-        try:
-            r = r + l[ord(c)]
-        except:
-            r = r + l[ord('n')]
+    widths = FONT_WIDTHS[i][j]
+    # the characters not in the table are as wide as 'n'
+    r = sum(map(widths.get, text, repeat(widths['n'])))
     return (r+1)*s
 
 def string_multiline_width(font, text):
@@ -340,3 +358,49 @@ def string_trim(font, text, width, ellipses = "..."):
         sumlen += length
     # should not exit out the bottom!
     return text
+
+#-------------------------------------------------------------------------
+#
+# TextMetrics
+#
+#-------------------------------------------------------------------------
+class TextMetrics:
+    """
+    Keep the width of the strings measured, by font, as the same names,
+    dates and places are measured again and again in a report.
+
+    The number of strings measured again (hits) or for the first time
+    (misses) can be looked at when profiling a report.
+    """
+    def __init__(self, size=TEXT_METRICS_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.__widths = {}
+
+    def string_width(self, font, text):
+        """
+        returns with width of a string in the specified font
+        """
+        key = (font.get_type_face(), font.get_bold(), font.get_italic(),
+               font.get_size())
+        widths = self.__widths.get(key)
+        if widths is None:
+            widths = self.__widths[key] = LRU(self.size)
+        if text in widths:
+            self.hits += 1
+            return widths[text]
+        self.misses += 1
+        width = string_width(font, text)
+        widths[text] = width
+        return width
+
+    def string_multiline_width(self, font, text):
+        """
+        returns with width of the longest line of a string in the
+        specified font
+        """
+        width = 0
+        for line in text.splitlines():
+            width = max(width, self.string_width(font, line))
+        return width
@@ -34,9 +34,11 @@
 #-------------------------------------------------------------------------
 from abc import ABCMeta, abstractmethod
 import os
-from io import BytesIO
+import shutil
 import tempfile
-from subprocess import Popen, PIPE
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from subprocess import Popen, PIPE, call
 
 #-------------------------------------------------------------------------
 #
@@ -111,6 +113,20 @@ else:
     _DOT_FOUND = search_for("dot")
     _GS_CMD = where_is("gs")
 
+#------------------------------------------------------------------------------
+#
+# run_commands
+#
+#------------------------------------------------------------------------------
+def run_commands(commands):
+    """
+    Run the commands, each a list of the program and its arguments, in
+    parallel subprocesses and wait until all of them are finished. At most
+    one command per processor runs at a time.
+    """
+    with ThreadPoolExecutor(os.cpu_count() or 1) as executor:
+        list(executor.map(call, commands))
+
 
 #------------------------------------------------------------------------------
 #
@@ -399,6 +415,11 @@ class GVDocBase(BaseDoc, GVDoc):
         BaseDoc.__init__(self, None, paper_style, uistate=uistate)
 
         self._filename = None
+        # the dot source is written to a temporary file while it is
+        # generated, close() gives the file to Graphviz. The file is created
+        # by the first write after the header, so that a report failing
+        # before it writes its graph leaves no file behind
+        self._tmp_dot = None
         self._dot = BytesIO()
         self._paper = paper_style
 
@@ -478,19 +499,33 @@ class GVDocBase(BaseDoc, GVDoc):
             self.write('  node [style=filled fontsize=%d];\n'
                        % self.fontsize)
         self.write('\n')
+        self._header, self._dot = self._dot.getvalue(), None
 
     def write(self, text):
         """ Write text to the dot file """
+        if self._dot is None:
+            (handle, self._tmp_dot) = tempfile.mkstemp(".gv")
+            self._dot = os.fdopen(handle, "wb")
+            self._dot.write(self._header)
         self._dot.write(text.encode('utf8', 'xmlcharrefreplace'))
 
     def open(self, filename):
         """ Implement GVDocBase.open() """
         self._filename = os.path.normpath(os.path.abspath(filename))
 
+    def render(self, outputs):
+        """
+        Generate the files of outputs, a list of (format, filename), from the
+        dot file with Graphviz. The formats are rendered in parallel.
+        """
+        run_commands([['dot', '-T%s' % output_format, '-o%s' % filename,
+                       self._tmp_dot]
+                      for output_format, filename in outputs])
+
     def close(self):
         """
         This isn't useful by itself. Other classes need to override this and
-        actually generate a file.
+        actually generate a file, then delete the temporary dot file.
         """
         if self.note:
             # build up the label
@@ -511,6 +546,7 @@ class GVDocBase(BaseDoc, GVDoc):
                     '  fontsize="%d";\n' % self.notesize)
 
         self.write('}\n\n')
+        self._dot.close()
 
     def add_node(self, node_id, label, shape="", color="",
                  style="", fillcolor="", url="", htmloutput=False):
@@ -629,8 +665,8 @@ class GVDotDoc(GVDocBase):
         if self._filename[-3:] != ".gv":
             self._filename += ".gv"
 
-        with open(self._filename, "wb") as dotfile:
-            dotfile.write(self._dot.getvalue())
+        shutil.copyfile(self._tmp_dot, self._filename)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -645,7 +681,6 @@ class GVPsDoc(GVDocBase):
         # DPI must always be 72 for PDF.
         # GV documentation says dpi is only for image formats.
         options.menu.get_option_by_name('dpi').set_value(72)
-        GVDocBase.__init__(self, options, paper_style)
         # GV documentation allow multiple pages only for ps format,
         # But it does not work with -Tps:cairo in order to
         # show Non Latin-1 letters. Force to only 1 page.
@@ -662,12 +697,6 @@ class GVPsDoc(GVDocBase):
         if self._filename[-3:] != ".ps":
             self._filename += ".ps"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
-
         # Generate the PS file.
         # Reason for using -Tps:cairo. Needed for Non Latin-1 letters
         # Some testing with Tps:cairo. Non Latin-1 letters are OK i all cases:
@@ -683,7 +712,7 @@ class GVPsDoc(GVDocBase):
         # recent versions of Graphviz doesn't even try, just puts out a single
         # large page.
 
-        command = 'dot -Tps:cairo -o"%s" "%s"' % (self._filename, tmp_dot)
+        output_format = 'ps:cairo'
         dotversion = str(Popen(['dot', '-V'],
                                stderr=PIPE).communicate(input=None)[1])
         # Problem with dot 2.26.3 and later and multiple pages, which gives
@@ -691,10 +720,10 @@ class GVPsDoc(GVDocBase):
         # gives bad result for non-Latin-1 characters (utf-8).
         if (dotversion.find('2.26.3') or dotversion.find('2.28.0') != -1) and \
                 (self.vpages * self.hpages) > 1:
-            command = command.replace(':cairo', '')
-        os.system(command)
+            output_format = 'ps'
+        self.render([(output_format, self._filename)])
         # Delete the temporary dot file
-        os.remove(tmp_dot)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -720,16 +749,11 @@ class GVSvgDoc(GVDocBase):
         if self._filename[-4:] != ".svg":
             self._filename += ".svg"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
         # Generate the SVG file.
-        os.system('dot -Tsvg:cairo -o"%s" "%s"' % (self._filename, tmp_dot))
+        self.render([('svg:cairo', self._filename)])
 
         # Delete the temporary dot file
-        os.remove(tmp_dot)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -755,16 +779,11 @@ class GVSvgzDoc(GVDocBase):
         if self._filename[-5:] != ".svgz":
             self._filename += ".svgz"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
         # Generate the SVGZ file.
-        os.system('dot -Tsvgz -o"%s" "%s"' % (self._filename, tmp_dot))
+        self.render([('svgz', self._filename)])
 
         # Delete the temporary dot file
-        os.remove(tmp_dot)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -790,16 +809,11 @@ class GVPngDoc(GVDocBase):
         if self._filename[-4:] != ".png":
             self._filename += ".png"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
         # Generate the PNG file.
-        os.system('dot -Tpng -o"%s" "%s"' % (self._filename, tmp_dot))
+        self.render([('png', self._filename)])
 
         # Delete the temporary dot file
-        os.remove(tmp_dot)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -825,16 +839,11 @@ class GVJpegDoc(GVDocBase):
         if self._filename[-4:] != ".jpg":
             self._filename += ".jpg"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
         # Generate the JPEG file.
-        os.system('dot -Tjpg -o"%s" "%s"' % (self._filename, tmp_dot))
+        self.render([('jpg', self._filename)])
 
         # Delete the temporary dot file
-        os.remove(tmp_dot)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -860,16 +869,11 @@ class GVGifDoc(GVDocBase):
         if self._filename[-4:] != ".gif":
             self._filename += ".gif"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
         # Generate the GIF file.
-        os.system('dot -Tgif -o"%s" "%s"' % (self._filename, tmp_dot))
+        self.render([('gif', self._filename)])
 
         # Delete the temporary dot file
-        os.remove(tmp_dot)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -898,18 +902,11 @@ class GVPdfGvDoc(GVDocBase):
         if self._filename[-4:] != ".pdf":
             self._filename += ".pdf"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
-        fname = self._filename
-
         # Generate the PDF file.
-        os.system('dot -Tpdf -o"%s" "%s"' % (fname, tmp_dot))
+        self.render([('pdf', self._filename)])
 
         # Delete the temporary dot file
-        os.remove(tmp_dot)
+        os.remove(self._tmp_dot)
 
 
 #------------------------------------------------------------------------------
@@ -933,12 +930,6 @@ class GVPdfGsDoc(GVDocBase):
         if self._filename[-4:] != ".pdf":
             self._filename += ".pdf"
 
-        # Create a temporary dot file
-        (handle, tmp_dot) = tempfile.mkstemp(".gv")
-        dotfile = os.fdopen(handle, "wb")
-        dotfile.write(self._dot.getvalue())
-        dotfile.close()
-
         # Create a temporary PostScript file
         (handle, tmp_ps) = tempfile.mkstemp(".ps")
         os.close(handle)
@@ -950,8 +941,8 @@ class GVPdfGsDoc(GVDocBase):
         # recent versions of Graphviz doesn't even try, just puts out a single
         # large page, so we use Ghostscript to split it up.
 
-        command = 'dot -Tps:cairo -o"%s" "%s"' % (tmp_ps, tmp_dot)
-        os.system(command)
+        self.render([('ps:cairo', tmp_ps)])
+        os.remove(self._tmp_dot)
 
         # Add .5 to remove rounding errors.
         paper_size = self._paper.get_size()
@@ -959,11 +950,11 @@ class GVPdfGsDoc(GVDocBase):
         height_pt = int((paper_size.get_height_inches() * 72) + .5)
         if (self.vpages * self.hpages) == 1:
             # -dDEVICEWIDTHPOINTS=%d' -dDEVICEHEIGHTPOINTS=%d
-            command = '%s -q -sDEVICE=pdfwrite -dNOPAUSE '\
-                '-dDEVICEWIDTHPOINTS=%d -dDEVICEHEIGHTPOINTS=%d '\
-                '-sOutputFile="%s" "%s" -c quit' % (
-                    _GS_CMD, width_pt, height_pt, self._filename, tmp_ps)
-            os.system(command)
+            run_commands([[_GS_CMD, '-q', '-sDEVICE=pdfwrite', '-dNOPAUSE',
+                           '-dDEVICEWIDTHPOINTS=%d' % width_pt,
+                           '-dDEVICEHEIGHTPOINTS=%d' % height_pt,
+                           '-sOutputFile=%s' % self._filename, tmp_ps,
+                           '-c', 'quit']])
             os.remove(tmp_ps)
             return
         # Margins (in centimeters) to pixels 72/2.54=28.345
@@ -973,8 +964,9 @@ class GVPdfGsDoc(GVDocBase):
         margin_l = int(28.345 * self._paper.get_left_margin())
         margin_x = margin_l + margin_r
         margin_y = margin_t + margin_b
-        # Convert to PDF using ghostscript
+        # Convert to PDF using ghostscript, the pieces in parallel
         list_of_pieces = []
+        commands = []
 
         x_rng = range(1, self.hpages + 1) if 'L' in self.pagedir \
             else range(self.hpages, 0, -1)
@@ -991,26 +983,25 @@ class GVPdfGsDoc(GVDocBase):
             tmp_pdf_piece = "%s_%d_%d.pdf" % (tmp_ps, __x, __y)
             list_of_pieces.append(tmp_pdf_piece)
             # Generate Ghostscript code
-            command = '%s -q -dBATCH -dNOPAUSE -dSAFER -g%dx%d '\
-                '-sOutputFile="%s" -r72 -sDEVICE=pdfwrite '\
-                '-c "<</.HWMargins [%d %d %d %d] /PageOffset [%d %d]>> '\
-                'setpagedevice" -f "%s"' % (
-                    _GS_CMD, width_pt + 10, height_pt + 10, tmp_pdf_piece,
-                    margin_l, margin_b, margin_r, margin_t,
-                    page_offset_x + 5, page_offset_y + 5, tmp_ps)
-            # Execute Ghostscript
-            os.system(command)
+            commands.append([
+                _GS_CMD, '-q', '-dBATCH', '-dNOPAUSE', '-dSAFER',
+                '-g%dx%d' % (width_pt + 10, height_pt + 10),
+                '-sOutputFile=%s' % tmp_pdf_piece, '-r72', '-sDEVICE=pdfwrite',
+                '-c', '<</.HWMargins [%d %d %d %d] /PageOffset [%d %d]>> '
+                'setpagedevice' % (margin_l, margin_b, margin_r, margin_t,
+                                   page_offset_x + 5, page_offset_y + 5),
+                '-f', tmp_ps])
+        # Execute Ghostscript
+        run_commands(commands)
         # Merge pieces to single multipage PDF ;
-        command = '%s -q -dBATCH -dNOPAUSE '\
-            '-sOUTPUTFILE="%s" -r72 -sDEVICE=pdfwrite %s '\
-            % (_GS_CMD, self._filename, ' '.join(list_of_pieces))
-        os.system(command)
+        run_commands([[_GS_CMD, '-q', '-dBATCH', '-dNOPAUSE',
+                       '-sOUTPUTFILE=%s' % self._filename, '-r72',
+                       '-sDEVICE=pdfwrite'] + list_of_pieces])
 
         # Clean temporary files
         os.remove(tmp_ps)
         for tmp_pdf_piece in list_of_pieces:
             os.remove(tmp_pdf_piece)
-        os.remove(tmp_dot)
 
 #------------------------------------------------------------------------------
 #
@@ -30,12 +30,13 @@
 #
 #-------------------------------------------------------------------------
 import os
-from xml.sax.saxutils import escape
 
 def escxml(string):
     """
     Escapes XML special characters.
     """
+    # xml.sax.saxutils imports urllib.request, not needed at startup
+    from xml.sax.saxutils import escape
     return escape(string, { '"' : '&quot;' } )
 
 #-------------------------------------------------------------------------
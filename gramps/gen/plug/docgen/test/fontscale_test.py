@@ -0,0 +1,78 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the widths of the strings measured in draw reports """
+
+import unittest
+
+from ..fontstyle import FontStyle, FONT_SANS_SERIF
+from ..fontscale import string_width, string_multiline_width, TextMetrics
+
+class TextMetricsTest(unittest.TestCase):
+    """
+    Tests of the widths kept by TextMetrics.
+    """
+
+    def setUp(self):
+        self.font = FontStyle()
+        self.font.set_size(12)
+
+    def test_string_width(self):
+        self.assertAlmostEqual(string_width(self.font, ""), 12)
+        # the characters not in the tables are as wide as 'n'
+        self.assertEqual(string_width(self.font, "一€"),
+                         string_width(self.font, "nn"))
+
+    def test_widths(self):
+        metrics = TextMetrics()
+        bold = FontStyle(self.font)
+        bold.set_bold(1)
+        for text in ("Smith, John", "1 January 1900", "Smith, John"):
+            for font in (self.font, bold):
+                self.assertEqual(metrics.string_width(font, text),
+                                 string_width(font, text))
+        self.assertEqual(metrics.misses, 4)
+        self.assertEqual(metrics.hits, 2)
+        self.assertNotEqual(metrics.string_width(bold, "Smith, John"),
+                            metrics.string_width(self.font, "Smith, John"))
+
+    def test_font_changed(self):
+        metrics = TextMetrics()
+        width = metrics.string_width(self.font, "Smith")
+        self.font.set_type_face(FONT_SANS_SERIF)
+        self.assertNotEqual(metrics.string_width(self.font, "Smith"), width)
+        self.assertEqual(metrics.misses, 2)
+
+    def test_multiline_width(self):
+        metrics = TextMetrics()
+        text = "Smith, John\nb. 1 January 1900\nSmith, John"
+        self.assertEqual(metrics.string_multiline_width(self.font, text),
+                         string_multiline_width(self.font, text))
+        self.assertEqual(metrics.hits, 1)
+
+    def test_size(self):
+        metrics = TextMetrics(size=2)
+        for text in ("a", "b", "c", "a"):
+            metrics.string_width(self.font, text)
+        self.assertEqual(metrics.misses, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -48,7 +48,6 @@ LOG = logging.getLogger(".Book")
 #
 #-------------------------------------------------------------------------
 from xml.sax import make_parser, handler, SAXParseException
-from xml.sax.saxutils import escape
 
 #-------------------------------------------------------------------------
 #
@@ -495,6 +494,8 @@ class BookList:
         """
         Saves the current BookList to the associated file.
         """
+        # xml.sax.saxutils imports urllib.request, not needed at startup
+        from xml.sax.saxutils import escape
         with open(self.file, "w", encoding="utf-8") as b_f:
             b_f.write("<?xml version=\"1.0\" encoding=\"utf-8\"?>\n")
             b_f.write('<booklist>\n')
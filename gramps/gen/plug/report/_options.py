@@ -42,7 +42,6 @@ import copy
 #
 #-------------------------------------------------------------------------
 from xml.sax import make_parser, SAXParseException
-from xml.sax.saxutils import escape
 
 #------------------------------------------------------------------------
 #
@@ -67,6 +66,8 @@ from .. import MenuOptions
 from ...utils.cast import get_type_converter
 
 def escxml(word):
+    # xml.sax.saxutils imports urllib.request, not needed at startup
+    from xml.sax.saxutils import escape
     return escape(word, {'"' : '&quot;'})
 
 #-------------------------------------------------------------------------
@@ -38,7 +38,10 @@ from ...const import PAPERSIZE
 # Try to abstract SAX1 from SAX2
 #
 #-------------------------------------------------------------------------
-from xml.sax import make_parser, handler, SAXParseException
+from xml.sax import handler
+# the SAX parser is not used: xml.sax.make_parser imports urllib.request,
+# which is not needed at startup
+from xml.parsers.expat import ParserCreate, ExpatError
 
 #-------------------------------------------------------------------------
 #
@@ -76,12 +79,12 @@ class PageSizeParser(handler.ContentHandler):
 #
 #-------------------------------------------------------------------------
 try:
-    parser = make_parser()
-    parser.setContentHandler(PageSizeParser(paper_sizes))
-    with open(PAPERSIZE) as the_file:
-        parser.parse(the_file)
+    parser = ParserCreate()
+    parser.StartElementHandler = PageSizeParser(paper_sizes).startElement
+    with open(PAPERSIZE, 'rb') as the_file:
+        parser.ParseFile(the_file)
     paper_sizes.append(PaperSize("Custom Size", -1, -1)) # always in English
-except (IOError, OSError, SAXParseException):
+except (IOError, OSError, ExpatError):
     paper_sizes = [
         PaperSize("Letter",27.94,21.59),
         PaperSize("Legal",35.56,21.59),
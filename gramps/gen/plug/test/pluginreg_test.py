@@ -0,0 +1,110 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the cache of the plugin registrations """
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from .._pluginreg import PluginRegister
+
+REGISTRATION = '''
+from gramps.gen.plug._pluginreg import register, STABLE, GENERAL
+%s
+register(GENERAL,
+         id='%s',
+         name='Test plugin',
+         version='1.0',
+         gramps_target_version='5.1',
+         status=STABLE,
+         fname='testplugin.py',
+         )
+'''
+
+class PluginRegisterCacheTest(unittest.TestCase):
+    '''
+    Tests of the cache of the plugin registrations.
+    '''
+
+    def setUp(self):
+        self.pgr = PluginRegister.get_instance()
+        self.saved = (self.pgr._PluginRegister__plugindata,
+                      self.pgr._PluginRegister__id_to_pdata,
+                      self.pgr.cache_file)
+        self.directory = tempfile.mkdtemp()
+        self.pgr.cache_file = os.path.join(self.directory, 'cache')
+        self.pgr._PluginRegister__cache = None
+        with open(os.path.join(self.directory, 'testplugin.py'), 'w'):
+            pass
+
+    def tearDown(self):
+        (self.pgr._PluginRegister__plugindata,
+         self.pgr._PluginRegister__id_to_pdata,
+         self.pgr.cache_file) = self.saved
+        self.pgr._PluginRegister__cache = None
+        shutil.rmtree(self.directory)
+
+    def write(self, plugin_id, code=''):
+        filename = os.path.join(self.directory, 'test.gpr.py')
+        with open(filename, 'w') as gpr:
+            gpr.write(REGISTRATION % (code, plugin_id))
+        return filename
+
+    def scan(self):
+        """
+        Scan the directory in a new session, and return whether the
+        registration file was read from the cache.
+        """
+        self.pgr._PluginRegister__plugindata = []
+        self.pgr._PluginRegister__id_to_pdata = {}
+        self.pgr._PluginRegister__cache = None
+        self.pgr.scan_dir(self.directory, os.listdir(self.directory))
+        self.pgr.save_cache()
+        return self.pgr.get_scan_profile()[-1][2]
+
+    def test_cache(self):
+        self.write('test1')
+        self.assertFalse(self.scan())
+        self.assertTrue(self.scan())
+        plugin = self.pgr.get_plugin('test1')
+        self.assertEqual(plugin.name, 'Test plugin')
+        self.assertEqual(plugin.mod_name, 'testplugin')
+        self.assertEqual(plugin.fpath, self.directory)
+
+    def test_changed(self):
+        self.write('test1')
+        self.assertFalse(self.scan())
+        self.write('test2 with a longer id')
+        self.assertFalse(self.scan())
+        self.assertIsNone(self.pgr.get_plugin('test1'))
+        self.assertIsNotNone(self.pgr.get_plugin('test2 with a longer id'))
+        self.assertTrue(self.scan())
+
+    def test_not_cached(self):
+        self.write('test1', 'import os')
+        self.assertFalse(self.scan())
+        self.assertFalse(self.scan())
+        self.assertIsNotNone(self.pgr.get_plugin('test1'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -36,6 +36,7 @@ import logging
 from .lib import Person, ChildRefType, EventType, FamilyRelType
 from .plug import PluginRegister, BasePluginManager
 from .const import GRAMPS_LOCALE as glocale
+from .utils.lru import LRU
 _ = glocale.translation.sgettext
 
 MALE = Person.MALE
@@ -45,6 +46,10 @@ UNKNOWN = Person.UNKNOWN
 LOG = logging.getLogger("gen.relationship")
 LOG.addHandler(logging.StreamHandler())
 
+# number of ancestor maps kept by a relationship calculator connected to the
+# database signals, eg for the home person and the active person
+STORED_MAPS = 4
+
 #-------------------------------------------------------------------------
 #
 #
@@ -834,9 +839,9 @@ class RelationshipCalculator:
         self.state_signal_key = None
         self.storemap = False
         self.dirtymap = True
-        self.stored_map = None
-        self.map_handle = None
-        self.map_meta = None
+        # ancestor maps of the last persons searched from, by
+        # (handle, all_families, only_birth), kept while storemap is set
+        self.stored_maps = LRU(STORED_MAPS)
         self.__db_connected = False
         self.depth = 15
         try:
@@ -849,6 +854,9 @@ class RelationshipCalculator:
         self.__max_depth_reached = False
         self.__loop_detected = False
         self.__max_depth = 0
+        #rank of the relationships searched, the ancestors further away
+        #  are not looked up
+        self.__max_rank = None
         self.__all_families = False
         self.__all_dist = False
         self.__only_birth = False
@@ -1178,7 +1186,7 @@ class RelationshipCalculator:
                                       all_dist=False,
                                       only_birth=True):
         """
-        Return if all_dist == True a 'tuple, string':
+        Return if all_dist == False a 'tuple, string':
         (rank, person handle, firstRel_str, firstRel_fam,
         secondRel_str, secondRel_fam), msg
         or if all_dist == True a 'list of tuple, string':
@@ -1225,7 +1233,9 @@ class RelationshipCalculator:
                              all families are used
         :type all_families: bool
         :param all_dist: if False only the shortest distance is returned,
-                         otherwise all relationships
+                         otherwise all relationships. The search of the
+                         shortest distance stops at the closest common
+                         ancestors.
         :type all_dist:  bool
         :param only_birth: if True only parents with birth relation are
                            considered
@@ -1244,39 +1254,42 @@ class RelationshipCalculator:
         second_rel = -1
         self.__msg = []
 
+        if not all_dist:
+            #only the closest relationship is needed, no need to build the
+            #  maps of all the ancestors
+            common = self.__get_closest_relationship(db, orig_person,
+                                                     other_person)
+            self.__check_max_depth()
+            return common, self.__msg
+
         common = []
         first_map = {}
         second_map = {}
         rank = 9999999
 
+        if self.storemap and self.dirtymap:
+            #the database changed, the stored maps can no longer be used
+            self.stored_maps.clear()
+            self.dirtymap = False
+        map_key = (orig_person.handle, all_families, only_birth)
         try:
-            if (self.storemap and self.stored_map is not None
-                    and self.map_handle == orig_person.handle
-                    and not self.dirtymap):
-                first_map = self.stored_map
+            if self.storemap and map_key in self.stored_maps:
+                first_map, map_meta = self.stored_maps[map_key]
                 self.__max_depth_reached, self.__loop_detected, \
-                 self.__all_families,\
-                 self.__all_dist, self.__only_birth,\
-                 self.__crosslinks, self.__msg = self.map_meta
+                 self.__crosslinks, self.__msg = map_meta
                 self.__msg = list(self.__msg)
             else:
                 self.__apply_filter(db, orig_person, '', [], first_map)
-                self.map_meta = (self.__max_depth_reached,
-                                 self.__loop_detected,
-                                 self.__all_families,
-                                 self.__all_dist, self.__only_birth,
-                                 self.__crosslinks, list(self.__msg))
+                map_meta = (self.__max_depth_reached, self.__loop_detected,
+                            self.__crosslinks, list(self.__msg))
+                if self.storemap:
+                    self.stored_maps[map_key] = (first_map, map_meta)
             self.__apply_filter(db, other_person, '', [], second_map,
                                 stoprecursemap=first_map)
         except RuntimeError:
             return (-1, None, -1, [], -1, []), \
                             [_("Relationship loop detected")] + self.__msg
 
-        if self.storemap:
-            self.stored_map = first_map
-            self.dirtymap = False
-            self.map_handle = orig_person.handle
-
         for person_handle in second_map:
             if person_handle in first_map:
                 com = []
@@ -1328,11 +1341,7 @@ class RelationshipCalculator:
                         for index in deletelist:
                             del common[index]
         #check for extra messages
-        if self.__max_depth_reached:
-            self.__msg += [_('Family Tree reaches back more than the maximum '
-                             '%d generations searched.\nIt is possible that '
-                             'relationships have been missed') %
-                           (self.__max_depth)]
+        self.__check_max_depth()
 
         if common and not self.__all_dist:
             rank = common[0][0]
@@ -1352,6 +1361,16 @@ class RelationshipCalculator:
         else:
             return [(-1, None, '', [], '', [])], self.__msg
 
+    def __check_max_depth(self):
+        """
+        Add a message if the search reached the maximum depth
+        """
+        if self.__max_depth_reached:
+            self.__msg += [_('Family Tree reaches back more than the maximum '
+                             '%d generations searched.\nIt is possible that '
+                             'relationships have been missed') %
+                           (self.__max_depth)]
+
     def __apply_filter(self, db, person, rel_str, rel_fam, pmap,
                        depth=1, stoprecursemap=None):
         """
@@ -1376,6 +1395,8 @@ class RelationshipCalculator:
             #            '(' + rel_str + ').',\
             #            'Stopping relation algorithm.')
             return
+        if self.__max_rank is not None and len(rel_str) > self.__max_rank:
+            return
         depth += 1
 
         commonancestor = False
@@ -1418,6 +1439,38 @@ class RelationshipCalculator:
             #don't continue search, great speedup!
             return
 
+        try:
+            siblings = [] if stoprecursemap is None else None
+            parentstodo = self.__get_parents(db, person, rel_str, rel_fam,
+                                             siblings)
+            #family without parents, add brothers for orig person
+            #other person has recusemap, and will stop when seeing
+            #the brother.
+            for chandle, chrel_str, chrel_fam in siblings or []:
+                if chandle in pmap:
+                    pmap[chandle][0] += [chrel_str]
+                    pmap[chandle][1] += [chrel_fam]
+                    #person is already a grandparent in another branch
+                else:
+                    pmap[chandle] = [[chrel_str], [chrel_fam]]
+
+            for handle, data in parentstodo.items():
+                self.__apply_filter(db, data[0],
+                                    data[1], data[2],
+                                    pmap, depth, stoprecursemap)
+        except:
+            import traceback
+            traceback.print_exc()
+            return
+
+    def __get_parents(self, db, person, rel_str, rel_fam, siblings=None):
+        """
+        Return the parents of person to look up, as a dictionary of parent
+        handle to (parent, rel_str, rel_fam) where rel_str and rel_fam are
+        the paths from the person searched from.
+        If siblings is a list, the children of the families of person
+        without parents are added to it as (handle, rel_str, rel_fam).
+        """
         family_handles = []
         main = person.get_main_parents_family_handle()
         if main:
@@ -1425,74 +1478,280 @@ class RelationshipCalculator:
         if self.__all_families:
             family_handles = person.get_parent_family_handle_list()
 
-        try:
-            parentstodo = {}
-            fam = 0
+        parentstodo = {}
+        fam = 0
+        for family_handle in family_handles:
+            rel_fam_new = rel_fam + [fam]
+            family = db.get_family_from_handle(family_handle)
+            if not family:
+                continue
+            #obtain childref for this person
+            childrel = [(ref.get_mother_relation(),
+                         ref.get_father_relation())
+                        for ref in family.get_child_ref_list()
+                        if ref.ref == person.handle]
+            fhandle = family.father_handle
+            mhandle = family.mother_handle
+            for data in [(fhandle, self.REL_FATHER,
+                          self.REL_FATHER_NOTBIRTH, childrel[0][1]),
+                         (mhandle, self.REL_MOTHER,
+                          self.REL_MOTHER_NOTBIRTH, childrel[0][0])]:
+                if data[0] and data[0] not in parentstodo:
+                    persontodo = db.get_person_from_handle(data[0])
+                    if data[3] == ChildRefType.BIRTH:
+                        addstr = data[1]
+                    elif not self.__only_birth:
+                        addstr = data[2]
+                    else:
+                        addstr = ''
+                    if addstr:
+                        parentstodo[data[0]] = (persontodo,
+                                                rel_str + addstr,
+                                                rel_fam_new)
+                elif data[0] and data[0] in parentstodo:
+                    #this person is already scheduled to research
+                    #update family list
+                    famlist = parentstodo[data[0]][2]
+                    if not isinstance(famlist[-1], list) and \
+                            fam != famlist[-1]:
+                        famlist = famlist[:-1] + [[famlist[-1]]]
+                    if isinstance(famlist[-1], list) and \
+                            fam not in famlist[-1]:
+                        famlist = famlist[:-1] + [famlist[-1] + [fam]]
+                        parentstodo[data[0]] = (parentstodo[data[0]][0],
+                                                parentstodo[data[0]][1],
+                                                famlist)
+            if not fhandle and not mhandle and siblings is not None:
+                siblings.extend((ref.ref, rel_str + self.REL_SIBLING,
+                                 rel_fam_new)
+                                for ref in family.get_child_ref_list()
+                                if ref.ref != person.handle)
+            fam += 1
+        return parentstodo
+
+    def __get_closest_relationship(self, db, orig_person, other_person):
+        """
+        Return the closest common ancestor of orig_person and other_person,
+        as (rank, person handle, firstRel_str, firstRel_fam, secondRel_str,
+        secondRel_fam), see get_relationship_distance_new.
+
+        The ancestors of both persons are looked up generation by
+        generation at the same time, and the search stops as soon as no
+        closer common ancestor can be found, instead of building the map of
+        all the ancestors of the persons.
+        """
+        closest = (-1, None, '', [], '', [])
+        closest_key = None
+        if (orig_person is None or not orig_person.handle or
+                other_person is None or not other_person.handle):
+            return closest
+        #for orig person and other person, the path to the ancestors found,
+        #  and the ancestors whose parents are to be looked up next
+        maps = ({}, {})
+        todo = ([(orig_person, '', [])], [(other_person, '', [])])
+        done = (set(), set())
+        #number of generations looked up from each person
+        levels = [0, 0]
+        for side in (0, 1):
+            for person, rel_str, rel_fam in todo[side]:
+                maps[side][person.handle] = (rel_str, rel_fam)
+        if orig_person.handle == other_person.handle:
+            return (0, orig_person.handle, '', [], '', [])
+        while todo[0] or todo[1]:
+            #a common ancestor not yet found is at least as far as the next
+            #  generation of a person
+            if closest[0] != -1 and closest[0] <= min(
+                    levels[side] + 1 for side in (0, 1) if todo[side]):
+                break
+            if todo[0] and (not todo[1] or levels[0] <= levels[1]):
+                side = 0
+            else:
+                side = 1
+            pmap = maps[side]
+            othermap = maps[1 - side]
+            found = []
+            nexttodo = []
+            for person, rel_str, rel_fam in todo[side]:
+                if person.handle in done[side]:
+                    continue
+                done[side].add(person.handle)
+                siblings = [] if side == 0 else None
+                parentstodo = self.__get_parents(db, person, rel_str,
+                                                 rel_fam, siblings)
+                if parentstodo and len(rel_str) + 2 > self.__max_depth:
+                    self.__max_depth_reached = True
+                    parentstodo = {}
+                for handle, rel_str_new, rel_fam_new in (
+                        [(handle, data[1], data[2])
+                         for handle, data in parentstodo.items()] +
+                        (siblings or [])):
+                    if handle not in pmap:
+                        pmap[handle] = (rel_str_new, rel_fam_new)
+                        if handle in othermap:
+                            found.append(handle)
+                    elif (len(pmap[handle][0]) < len(rel_str_new) and
+                          rel_str_new.startswith(pmap[handle][0])):
+                        #loop, the person is reached again from himself
+                        self.__add_loop_message(
+                            db, handle, rel_str_new[len(pmap[handle][0]):])
+                for handle, data in parentstodo.items():
+                    nexttodo.append(data)
+            todo[side][:] = nexttodo
+            levels[side] += 1
+            for handle in found:
+                rel_orig, fam_orig = maps[0][handle]
+                rel_other, fam_other = maps[1][handle]
+                #of the closest common ancestors, take the first one found
+                #  going up first to the father, as the full search does
+                key = (len(rel_orig) + len(rel_other),
+                       self.__path_key(rel_other, fam_other),
+                       self.__path_key(rel_orig, fam_orig))
+                if closest_key is None or key < closest_key:
+                    closest_key = key
+                    closest = (key[0], handle, rel_orig, fam_orig,
+                               rel_other, fam_other)
+        return closest
+
+    def __add_loop_message(self, db, handle, rel_str):
+        """
+        Add the message of a loop, of the person to himself via rel_str
+        """
+        self.__loop_detected = True
+        person = db.get_person_from_handle(handle)
+        msg = (_("Relationship loop detected:") + " " +
+               _("Person %(person)s connects to himself via %(relation)s") %
+               {'person' : person.get_primary_name().get_name(),
+                'relation' : rel_str})
+        if msg not in self.__msg:
+            self.__msg += [msg]
+
+    def __path_key(self, rel_str, rel_fam):
+        """
+        Key to sort the paths to ancestors in the order they are looked up
+        """
+        return [(fam[0] if isinstance(fam, list) else fam,
+                 rel not in (self.REL_FATHER, self.REL_FATHER_NOTBIRTH))
+                for rel, fam in zip(rel_str, rel_fam)]
+
+    def get_relationship_table(self, db, orig_person, all_families=False,
+                               max_ascend=None, max_descend=None):
+        """
+        Return a :class:`RelationshipTable` with the relationships of
+        orig_person to all the blood relatives of orig_person at once, instead
+        of searching the relationship person by person.
+
+        The ancestors of orig_person are looked up, and after each ancestor
+        its descendants, skipping the child the ancestor was reached from.
+        With pedigree collapse, a relative is given every (Ga, Gb) it is
+        reached with, but each relative is only searched once for each
+        (Ga, Gb). The paths use only the REL_FATHER and REL_MOTHER steps,
+        birth and non birth relations are not told apart.
+
+        :param db: database to work on
+        :param orig_person: the person the relationships are computed to
+        :type orig_person: Person Obj
+        :param all_families: if False only the main family of the ancestors
+                             is searched, otherwise all families are used
+        :type all_families: bool
+        :param max_ascend: the maximum number of generations up to the
+                           common ancestors, default the depth searched
+        :type max_ascend: int
+        :param max_descend: the maximum number of generations down from the
+                            common ancestors, default the depth searched
+        :type max_descend: int
+        """
+        if max_ascend is None:
+            max_ascend = self.get_depth()
+        if max_descend is None:
+            max_descend = self.get_depth()
+        table = RelationshipTable(db, orig_person.handle)
+        table.add(orig_person.handle, 0, 0, orig_person.handle, '', '')
+        # the searches done, by (handle, Ga, Gb, skipped child)
+        searched = set()
+
+        def get_children(handle, rel_b):
+            """
+            Return the (child handle, path to the ancestor) of the children
+            of the person with handle, rel_b being the path of the person.
+            """
+            children = []
+            person = db.get_person_from_handle(handle)
+            if person is None:
+                return children
+            for family_handle in person.get_family_handle_list():
+                family = db.get_family_from_handle(family_handle)
+                if not family:
+                    continue
+                if family.mother_handle == handle:
+                    rel_str = self.REL_MOTHER + rel_b
+                else:
+                    rel_str = self.REL_FATHER + rel_b
+                children.extend((ref.ref, rel_str)
+                                for ref in family.get_child_ref_list())
+            return children
+
+        def get_parents(handle, rel_a):
+            """
+            Return the (parent handle, path from orig_person) of the parents
+            of the person with handle, rel_a being the path of the person.
+            """
+            parents = []
+            person = db.get_person_from_handle(handle)
+            if person is None:
+                return parents
+            if all_families:
+                family_handles = person.get_parent_family_handle_list()
+            else:
+                main = person.get_main_parents_family_handle()
+                family_handles = [main] if main else []
             for family_handle in family_handles:
-                rel_fam_new = rel_fam + [fam]
                 family = db.get_family_from_handle(family_handle)
                 if not family:
                     continue
-                #obtain childref for this person
-                childrel = [(ref.get_mother_relation(),
-                             ref.get_father_relation())
-                            for ref in family.get_child_ref_list()
-                            if ref.ref == person.handle]
-                fhandle = family.father_handle
-                mhandle = family.mother_handle
-                for data in [(fhandle, self.REL_FATHER,
-                              self.REL_FATHER_NOTBIRTH, childrel[0][1]),
-                             (mhandle, self.REL_MOTHER,
-                              self.REL_MOTHER_NOTBIRTH, childrel[0][0])]:
-                    if data[0] and data[0] not in parentstodo:
-                        persontodo = db.get_person_from_handle(data[0])
-                        if data[3] == ChildRefType.BIRTH:
-                            addstr = data[1]
-                        elif not self.__only_birth:
-                            addstr = data[2]
-                        else:
-                            addstr = ''
-                        if addstr:
-                            parentstodo[data[0]] = (persontodo,
-                                                    rel_str + addstr,
-                                                    rel_fam_new)
-                    elif data[0] and data[0] in parentstodo:
-                        #this person is already scheduled to research
-                        #update family list
-                        famlist = parentstodo[data[0]][2]
-                        if not isinstance(famlist[-1], list) and \
-                                fam != famlist[-1]:
-                            famlist = famlist[:-1] + [[famlist[-1]]]
-                        if isinstance(famlist[-1], list) and \
-                                fam not in famlist[-1]:
-                            famlist = famlist[:-1] + [famlist[-1] + [fam]]
-                            parentstodo[data[0]] = (parentstodo[data[0]][0],
-                                                    parentstodo[data[0]][1],
-                                                    famlist)
-                if not fhandle and not mhandle and stoprecursemap is None:
-                    #family without parents, add brothers for orig person
-                    #other person has recusemap, and will stop when seeing
-                    #the brother.
-                    child_list = [ref.ref for ref in family.get_child_ref_list()
-                                  if ref.ref != person.handle]
-                    addstr = self.REL_SIBLING
-                    for chandle in child_list:
-                        if chandle in pmap:
-                            pmap[chandle][0] += [rel_str + addstr]
-                            pmap[chandle][1] += [rel_fam_new]
-                            #person is already a grandparent in another branch
-                        else:
-                            pmap[chandle] = [[rel_str+addstr], [rel_fam_new]]
-                fam += 1
-
-            for handle, data in parentstodo.items():
-                self.__apply_filter(db, data[0],
-                                    data[1], data[2],
-                                    pmap, depth, stoprecursemap)
-        except:
-            import traceback
-            traceback.print_exc()
-            return
+                for parent_handle, rel in (
+                        (family.father_handle, self.REL_FATHER),
+                        (family.mother_handle, self.REL_MOTHER)):
+                    if parent_handle:
+                        parents.append((parent_handle, rel_a + rel))
+            return parents
+
+        def search_down(handle, Ga, Gb, ancestor, rel_a, rel_b, skip=None):
+            """
+            Add the descendants of the person with handle, who is Gb - 1
+            generations down from ancestor.
+            """
+            key = (handle, Ga, Gb, skip)
+            if key in searched:
+                return
+            searched.add(key)
+            for child_handle, rel_str in get_children(handle, rel_b):
+                if child_handle != skip:
+                    table.add(child_handle, Ga, Gb, ancestor, rel_a, rel_str)
+                    if Gb < max_descend:
+                        search_down(child_handle, Ga, Gb + 1, ancestor,
+                                    rel_a, rel_str)
+
+        def search_up(handle, Ga, rel_a):
+            """
+            Add the ancestors of the person with handle, who is Ga - 1
+            generations up from orig_person, and their descendants.
+            """
+            key = (handle, Ga, 0, None)
+            if key in searched:
+                return
+            searched.add(key)
+            for parent_handle, rel_str in get_parents(handle, rel_a):
+                table.add(parent_handle, Ga, 0, parent_handle, rel_str, '')
+                search_down(parent_handle, Ga, 1, parent_handle, rel_str, '',
+                            handle)
+                if Ga < max_ascend:
+                    search_up(parent_handle, Ga + 1, rel_str)
+
+        if max_descend > 0:
+            search_down(orig_person.handle, 0, 1, orig_person.handle, '', '')
+        if max_ascend > 0:
+            search_up(orig_person.handle, 1, '')
+        return table
 
     def collapse_relations(self, relations):
         """
@@ -1701,10 +1960,28 @@ class RelationshipCalculator:
             else:
                 return rel_str
 
-        data, msg = self.get_relationship_distance_new(
-            db, orig_person, other_person, all_dist=True, all_families=True,
-            only_birth=False)
-        if data[0][0] == -1:
+        #unless the ancestors of orig person are stored, the search of the
+        #  closest common ancestor, which stops early and goes through each
+        #  ancestor only once, tells first if the persons are related at all
+        related = True
+        if (not self.storemap or self.dirtymap or
+                (orig_person.handle, True, False) not in self.stored_maps):
+            closest, msg = self.get_relationship_distance_new(
+                db, orig_person, other_person, all_dist=False,
+                all_families=True, only_birth=False)
+            related = closest[0] != -1
+        if related:
+            if not self.storemap:
+                #the most relevant relationship is one of the rank of the
+                #  closest one, its common ancestors are not further away
+                self.__max_rank = closest[0]
+            try:
+                data, msg = self.get_relationship_distance_new(
+                    db, orig_person, other_person, all_dist=True,
+                    all_families=True, only_birth=False)
+            finally:
+                self.__max_rank = None
+        if not related or data[0][0] == -1:
             if extra_info:
                 return ('', -1, -1)
             else:
@@ -2254,7 +2531,7 @@ class RelationshipCalculator:
         dbstate.disconnect(self.state_signal_key)
         list(map(dbstate.db.disconnect, self.signal_keys))
         self.storemap = False
-        self.stored_map = None
+        self.stored_maps.clear()
 
     def _dbchange_callback(self, db):
         """
@@ -2274,6 +2551,132 @@ class RelationshipCalculator:
         """
         self.dirtymap = True
 
+#-------------------------------------------------------------------------
+#
+# RelationshipTable
+#
+#-------------------------------------------------------------------------
+class RelationshipTable:
+    """
+    The relationships of the blood relatives of a center person, as computed
+    by :meth:`RelationshipCalculator.get_relationship_table`.
+
+    The table maps the handle of each relative to a tuple
+    (Ga, Gb, common ancestor handle, rel_str_a, rel_str_b) where Ga and Gb
+    are the number of generations from the center person and from the
+    relative to the common ancestor, and rel_str_a and rel_str_b the paths
+    to the common ancestor, as in get_relationship_distance_new. This is the
+    closest relationship of the relative, the others are given by
+    get_relations. The center person is in the table with Ga = Gb = 0.
+    """
+    def __init__(self, db, handle):
+        self.db = db
+        self.handle = handle
+        self.kin = {}
+        # all the relationships of each relative, one for each (Ga, Gb)
+        self.relations = {}
+        # the handles of the relatives by (Ga, Gb), in the order found
+        self.groups = {}
+
+    def add(self, handle, Ga, Gb, ancestor, rel_a, rel_b):
+        """
+        Add a relationship of the person with handle, if the person has no
+        relationship with this Ga and Gb yet.
+        """
+        relations = self.relations.setdefault(handle, [])
+        if any(rel[:2] == (Ga, Gb) for rel in relations):
+            return
+        relation = (Ga, Gb, ancestor, rel_a, rel_b)
+        relations.append(relation)
+        self.groups.setdefault((Ga, Gb), []).append(handle)
+        closest = self.kin.get(handle)
+        # the closest relationship, the ancestors being closer on a tie
+        if closest is None or (Ga + Gb, Gb) < (closest[0] + closest[1],
+                                               closest[1]):
+            self.kin[handle] = relation
+
+    def __contains__(self, handle):
+        return handle in self.kin
+
+    def __getitem__(self, handle):
+        return self.kin[handle]
+
+    def __iter__(self):
+        return iter(self.kin)
+
+    def __len__(self):
+        return len(self.kin)
+
+    def get(self, handle, default=None):
+        """
+        Return the relationship of the person with handle, or default if the
+        person is not a blood relative of the center person
+        """
+        return self.kin.get(handle, default)
+
+    def get_relations(self, handle):
+        """
+        Return the list of all the relationships of the person with handle,
+        one for each (Ga, Gb), in the order found.
+        """
+        return self.relations.get(handle, [])
+
+    def get_groups(self):
+        """
+        Return the list of (Ga, Gb, handles) of the relatives, sorted by Ga
+        then Gb, without the center person. A relative is in the group of
+        each of its relationships.
+        """
+        return [(Ga, Gb, self.groups[(Ga, Gb)])
+                for Ga, Gb in sorted(self.groups) if Ga or Gb]
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def get_related_handles(db, handle, callback=None):
+    """
+    Return the set of the handles of all the people connected to the person
+    with handle by parents, children and spouses, in law relatives included.
+    Each family is searched once.
+
+    :param callback: called without argument for each person found
+    """
+    related = set()
+    person = db.get_person_from_handle(handle)
+    if person is None:
+        return related
+    related.add(person.handle)
+    if callback:
+        callback()
+    todo = [person]
+    families = set()
+    while todo:
+        person = todo.pop()
+        for family_handle in (person.get_parent_family_handle_list() +
+                              person.get_family_handle_list()):
+            if family_handle in families:
+                continue
+            families.add(family_handle)
+            family = db.get_family_from_handle(family_handle)
+            if not family:
+                continue
+            for relative_handle in ([family.father_handle,
+                                     family.mother_handle] +
+                                    [ref.ref for ref in
+                                     family.get_child_ref_list()]):
+                if not relative_handle or relative_handle in related:
+                    continue
+                relative = db.get_person_from_handle(relative_handle)
+                if relative is None:
+                    continue
+                related.add(relative_handle)
+                if callback:
+                    callback()
+                todo.append(relative)
+    return related
+
 #-------------------------------------------------------------------------
 #
 # define the default relationshipcalculator
@@ -0,0 +1,231 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the search of the common ancestors in relationship.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import random
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.relationship import (RelationshipCalculator,
+                                     get_related_handles)
+from gramps.test.test_util import add_family, add_person, make_memory_db
+
+def get_kinship(db, handle, max_ascend, max_descend):
+    """
+    Return the (Ga, Gb, handles) of the relatives of the person with handle,
+    as the kinship report used to search them, each path being followed.
+    """
+    kinship = {}
+
+    def add_kin(handle, Ga, Gb):
+        group = kinship.setdefault((Ga, Gb), [])
+        if handle not in group:
+            group.append(handle)
+
+    def traverse_down(handle, Ga, Gb, skip_handle=None):
+        person = db.get_person_from_handle(handle)
+        for family_handle in person.get_family_handle_list():
+            family = db.get_family_from_handle(family_handle)
+            for child_ref in family.get_child_ref_list():
+                if child_ref.ref != skip_handle:
+                    add_kin(child_ref.ref, Ga, Gb)
+                    if Gb < max_descend:
+                        traverse_down(child_ref.ref, Ga, Gb + 1)
+
+    def traverse_up(handle, Ga, Gb):
+        person = db.get_person_from_handle(handle)
+        family_handle = person.get_main_parents_family_handle()
+        if not family_handle:
+            return
+        family = db.get_family_from_handle(family_handle)
+        for parent_handle in (family.get_father_handle(),
+                              family.get_mother_handle()):
+            if parent_handle:
+                add_kin(parent_handle, Ga, Gb)
+                traverse_down(parent_handle, Ga, Gb + 1, handle)
+                if Ga < max_ascend:
+                    traverse_up(parent_handle, Ga + 1, 0)
+
+    traverse_down(handle, 0, 1)
+    traverse_up(handle, 1, 0)
+    return [(Ga, Gb, kinship[(Ga, Gb)]) for Ga, Gb in sorted(kinship)]
+
+#-------------------------------------------------------------------------
+#
+# RelationshipTest class
+#
+#-------------------------------------------------------------------------
+class RelationshipTest(unittest.TestCase):
+    '''
+    Tests of the search of the closest common ancestors.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = make_memory_db()
+        cls.generations = cls.make_tree(cls.db, 8, 12, 0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    @staticmethod
+    def make_tree(db, count, size, seed):
+        """
+        Add count generations of size people, the parents of each person
+        being taken at random in the generation before, so that the same
+        ancestors are reached by several paths.
+        """
+        rand = random.Random(seed)
+        generations = []
+        with DbTxn("Add tree", db) as trans:
+            for level in range(count):
+                people = []
+                for index in range(size):
+                    people.append(add_person(db, trans, gender=index % 2))
+                if generations:
+                    for person in people:
+                        father = mother = None
+                        if rand.random() < 0.9:
+                            father = rand.choice(generations[-1][1::2])
+                        if rand.random() < 0.9:
+                            mother = rand.choice(generations[-1][0::2])
+                        add_family(db, trans, father, mother, [person])
+                generations.append(people)
+        return generations
+
+    def pairs(self):
+        rand = random.Random(1)
+        people = [person for generation in self.generations
+                  for person in generation]
+        for dummy in range(100):
+            yield (self.db.get_person_from_handle(rand.choice(people).handle),
+                   self.db.get_person_from_handle(rand.choice(people).handle))
+
+    def test_closest(self):
+        calc = RelationshipCalculator()
+        for orig, other in self.pairs():
+            closest, msg = calc.get_relationship_distance_new(
+                self.db, orig, other, all_dist=False)
+            common, msg = calc.get_relationship_distance_new(
+                self.db, orig, other, all_dist=True)
+            self.assertEqual(closest[0], common[0][0])
+            if closest[0] != -1:
+                self.assertIn(closest, common)
+
+    def test_stored_maps(self):
+        calc = RelationshipCalculator()
+        expected = [calc.get_one_relationship(self.db, orig, other)
+                    for orig, other in self.pairs()]
+        calc.storemap = True
+        self.assertEqual([calc.get_one_relationship(self.db, orig, other)
+                          for orig, other in self.pairs()], expected)
+        self.assertTrue(list(calc.stored_maps.iterkeys()))
+        # the maps are looked up by the families searched
+        orig, other = next(self.pairs())
+        for all_families in (False, True):
+            calc.get_relationship_distance_new(self.db, orig, other,
+                                               all_families=all_families,
+                                               all_dist=True)
+        self.assertIn((orig.handle, False, True), calc.stored_maps)
+        self.assertIn((orig.handle, True, True), calc.stored_maps)
+        # and forgotten when the database changes
+        calc._datachange_callback([orig.handle])
+        calc.get_relationship_distance_new(self.db, orig, other,
+                                           all_dist=True)
+        self.assertEqual(list(calc.stored_maps.iterkeys()),
+                         [(orig.handle, False, True)])
+
+    def test_siblings(self):
+        # without parents, the children of a family are siblings
+        calc = RelationshipCalculator()
+        first, second = self.generations[0][:2]
+        with DbTxn("Add family", self.db) as trans:
+            add_family(self.db, trans, children=[first, second])
+        closest, msg = calc.get_relationship_distance_new(
+            self.db, first, second, all_dist=False)
+        self.assertEqual(closest[:3], (1, second.handle, 's'))
+
+    def test_loop(self):
+        # a person who is his own grandfather
+        calc = RelationshipCalculator()
+        db = make_memory_db()
+        with DbTxn("Add loop", db) as trans:
+            people = [add_person(db, trans) for dummy in range(3)]
+            add_family(db, trans, people[0], children=[people[1]])
+            add_family(db, trans, people[1], children=[people[0]])
+        closest, msg = calc.get_relationship_distance_new(
+            db, people[0], people[2], all_dist=False)
+        db.close()
+        self.assertEqual(closest[0], -1)
+        self.assertEqual(len(msg), 1)
+        self.assertTrue(msg[0].startswith("Relationship loop detected:"))
+
+    def test_table(self):
+        calc = RelationshipCalculator()
+        for orig, other in self.pairs():
+            table = calc.get_relationship_table(self.db, orig)
+            self.assertEqual(table[orig.handle], (0, 0, orig.handle, '', ''))
+            self.assertTrue(set(table) <=
+                            get_related_handles(self.db, orig.handle))
+            closest, msg = calc.get_relationship_distance_new(
+                self.db, orig, other, all_dist=False)
+            if calc.REL_SIBLING in closest[2] + closest[4]:
+                # siblings without parents have no common ancestor
+                continue
+            if closest[0] == -1:
+                self.assertNotIn(other.handle, table)
+                continue
+            Ga, Gb, ancestor, rel_a, rel_b = table[other.handle]
+            self.assertEqual(Ga + Gb, closest[0])
+            self.assertEqual((len(rel_a), len(rel_b)), (Ga, Gb))
+            self.assertEqual(ancestor, table.get(ancestor)[2])
+
+    def test_table_kinship(self):
+        # the tree has pedigree collapse: the relatives reached by several
+        # paths are in the group of each (Ga, Gb), as in the kinship report
+        calc = RelationshipCalculator()
+        collapse = False
+        for orig, other in self.pairs():
+            for max_ascend, max_descend in ((3, 3), (5, 2), (1, 1)):
+                table = calc.get_relationship_table(
+                    self.db, orig, max_ascend=max_ascend,
+                    max_descend=max_descend)
+                self.assertEqual(table.get_groups(),
+                                 get_kinship(self.db, orig.handle,
+                                             max_ascend, max_descend))
+                collapse = collapse or any(
+                    len(table.get_relations(handle)) > 1 for handle in table)
+        self.assertTrue(collapse)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+A table of the dates of the events of a database, kept in columns of
+integers, to compare many dates with the same date without building the
+Event and Date objects.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+from array import array
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from ..lib.date import Date
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# index of the date in the raw data of an event
+_DATE = 3
+
+# the number of lookups comparing the date of each event, before the table
+# of the dates is read
+_LOOKUPS = 500
+
+# the tables shared by the users of the dates of a database, by the id of
+# the database: [database, table or None, number of users]
+_SHARED = {}
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def get_day_key(ymd):
+    """
+    Return a (year, month, day) tuple as an integer, sorting as the tuple.
+    """
+    return ymd[0] * 10000 + ymd[1] * 100 + ymd[2]
+
+def get_range_keys(date):
+    """
+    Return the minimal start and maximal stop of the date, as given by
+    :meth:`.Date.get_start_stop_range`, as day keys.
+    """
+    start, stop = date.get_start_stop_range()
+    return get_day_key(start), get_day_key(stop)
+
+# the comparisons of Date.match, of (self_start, self_stop, other_start,
+# other_stop)
+_COMPARISONS = {
+    "=": lambda start, stop, other_start, other_stop: (
+        start <= other_start <= stop or start <= other_stop <= stop or
+        other_start <= start <= other_stop or
+        other_start <= stop <= other_stop),
+    "==": lambda start, stop, other_start, other_stop: start == other_start,
+    "<": lambda start, stop, other_start, other_stop: start < other_stop,
+    "<=": lambda start, stop, other_start, other_stop: start <= other_stop,
+    "<<": lambda start, stop, other_start, other_stop: stop < other_start,
+    ">": lambda start, stop, other_start, other_stop: stop > other_start,
+    ">=": lambda start, stop, other_start, other_stop: stop >= other_start,
+    ">>": lambda start, stop, other_start, other_stop: start > other_stop,
+    }
+
+def get_comparison(comparison):
+    """
+    Return the function comparing two ranges of day keys as
+    :meth:`.Date.match` compares the ranges of two dates, with the arguments
+    (self_start, self_stop, other_start, other_stop).
+    """
+    if comparison not in _COMPARISONS:
+        raise AttributeError("invalid match comparison operator: '%s'" %
+                             comparison)
+    return _COMPARISONS[comparison]
+
+#-------------------------------------------------------------------------
+#
+# DateTable class
+#
+#-------------------------------------------------------------------------
+class DateTable:
+    """
+    The dates of the events of a database, read in one pass of the event
+    table.
+
+    Each event with a date has a row, the columns being arrays of integers:
+    the sort value, modifier and quality of the date, and the minimal start
+    and maximal stop of the date range as day keys. The events without a
+    date have no row.
+    """
+    def __init__(self, db, callback=None):
+        """
+        :param callback: called without argument for each event read
+        """
+        self.handles = []
+        self.index = {}
+        self.sortval = array('l')
+        self.modifier = array('b')
+        self.quality = array('b')
+        self.start = array('l')
+        self.stop = array('l')
+        # the texts of the dates that have one
+        self.text = {}
+        date = Date()
+        with db.get_event_cursor() as cursor:
+            for handle, data in cursor:
+                if callback:
+                    callback()
+                if data[_DATE] is None:
+                    continue
+                date.unserialize(data[_DATE])
+                if date.text:
+                    self.text[handle] = date.text
+                if date.sortval:
+                    start, stop = get_range_keys(date)
+                else:
+                    start = stop = 0
+                self.index[handle] = len(self.handles)
+                self.handles.append(handle)
+                self.sortval.append(date.sortval)
+                self.modifier.append(date.modifier)
+                self.quality.append(date.quality)
+                self.start.append(start)
+                self.stop.append(stop)
+
+    def __len__(self):
+        return len(self.handles)
+
+    def __contains__(self, handle):
+        return handle in self.index
+
+    def get_sort_value(self, handle):
+        """
+        Return the sort value of the date of the event, 0 if it has no date.
+        """
+        row = self.index.get(handle)
+        return 0 if row is None else self.sortval[row]
+
+    def get_range(self, handle):
+        """
+        Return the minimal start and maximal stop of the date of the event,
+        as day keys, or None if it has no date.
+        """
+        row = self.index.get(handle)
+        if row is None or not self.sortval[row]:
+            return None
+        return self.start[row], self.stop[row]
+
+    def match(self, other_date, comparison="="):
+        """
+        Return the set of the handles of the events whose date matches
+        other_date, as :meth:`.Date.match` would for each of them.
+        """
+        if other_date.modifier == Date.MOD_TEXTONLY:
+            return self._match_text(other_date, comparison,
+                                    range(len(self.handles)))
+        # the text only dates are only compared by their text
+        matches = self._match_text(other_date, comparison,
+                                   [row for row, modifier
+                                    in enumerate(self.modifier)
+                                    if modifier == Date.MOD_TEXTONLY])
+        if not other_date.sortval:
+            return matches
+        compare = get_comparison(comparison)
+        other_start, other_stop = get_range_keys(other_date)
+        handles = self.handles
+        matches.update(handles[row] for row, (sortval, start, stop)
+                       in enumerate(zip(self.sortval, self.start, self.stop))
+                       if sortval and compare(start, stop,
+                                              other_start, other_stop))
+        return matches
+
+    def _match_text(self, other_date, comparison, rows):
+        """
+        Return the set of the handles of the rows whose date text matches
+        the text of other_date.
+        """
+        handles = self.handles
+        texts = self.text
+        if comparison == "=":
+            text = other_date.text.upper()
+            return set(handles[row] for row in rows
+                       if texts.get(handles[row], "").upper().find(text) != -1)
+        elif comparison == "==":
+            return set(handles[row] for row in rows
+                       if texts.get(handles[row], "") == other_date.text)
+        return set()
+
+#-------------------------------------------------------------------------
+#
+# DateMatches class
+#
+#-------------------------------------------------------------------------
+class DateMatches:
+    """
+    The handles of the events of a database whose date matches a date, eg
+    for a filter rule while it is applied.
+
+    The first lookups compare the date of each event with
+    :meth:`.Date.match`, as a filter applied to a few handles, eg to update
+    a row of a view, only does a few of them. The next ones find the
+    matches in the table of the dates of the database. The instances open
+    on the same database at the same time, eg the rules of the filters
+    applied together, share one table. The table is dropped when the last
+    of them is closed.
+    """
+    def __init__(self, db, date, comparison="="):
+        self.db = db
+        self.date = date
+        self.comparison = comparison
+        self.matches = None
+        self.lookups = _LOOKUPS
+        entry = _SHARED.setdefault(id(db), [db, None, 0])
+        entry[2] += 1
+
+    def __contains__(self, handle):
+        if self.matches is None:
+            entry = _SHARED[id(self.db)]
+            if entry[1] is None and self.lookups > 0:
+                self.lookups -= 1
+                return self._match(handle)
+            if entry[1] is None:
+                entry[1] = DateTable(self.db)
+            self.matches = entry[1].match(self.date, self.comparison)
+        return handle in self.matches
+
+    def _match(self, handle):
+        """
+        Return True if the date of the event matches, read from the event.
+        """
+        data = self.db.get_raw_event_data(handle)
+        if data is None or data[_DATE] is None:
+            return False
+        date = Date()
+        date.unserialize(data[_DATE])
+        return date.match(self.date, self.comparison)
+
+    def close(self):
+        """
+        Stop using the table of the dates of the database.
+        """
+        if self.db is None:
+            return
+        entry = _SHARED[id(self.db)]
+        entry[2] -= 1
+        if entry[2] == 0:
+            del _SHARED[id(self.db)]
+        self.db = self.matches = None
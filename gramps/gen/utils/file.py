@@ -33,6 +33,7 @@ import os
 import sys
 import shutil
 import hashlib
+import pickle
 import logging
 LOG = logging.getLogger(".gen.utils.file")
 
@@ -42,7 +43,8 @@ LOG = logging.getLogger(".gen.utils.file")
 #
 #-------------------------------------------------------------------------
 from ..constfunc import win, mac, get_env_var
-from ..const import TEMP_DIR, USER_HOME, ENV, GRAMPS_LOCALE as glocale
+from ..const import (TEMP_DIR, USER_HOME, ENV, VERSION_DIR,
+                     GRAMPS_LOCALE as glocale)
 
 #-------------------------------------------------------------------------
 #
@@ -259,3 +261,39 @@ def create_checksum(full_path):
     except UnicodeEncodeError:
             md5sum = ''
     return md5sum
+
+def get_stored_filename(path, extension):
+    """
+    Return the file of the user's Gramps directory where data computed for
+    path, a database or report directory, is stored between sessions. The
+    file is named after the md5 hash of path.
+    """
+    if isinstance(path, str):
+        path = path.encode('utf-8')
+    return os.path.join(VERSION_DIR, hashlib.md5(path).hexdigest() +
+                        os.path.extsep + extension)
+
+def load_stored(filename):
+    """
+    Return the data stored in filename by :func:`save_stored`, or None if
+    the file cannot be read, eg when it is corrupt or was stored by another
+    version.
+    """
+    try:
+        with open(filename, 'rb') as file:
+            return pickle.load(file)
+    except (IOError, EOFError, pickle.UnpicklingError, AttributeError,
+            ImportError, ValueError, IndexError, TypeError):
+        return None
+
+def save_stored(filename, data):
+    """
+    Store data in filename. Return True on success.
+    """
+    try:
+        with open(filename, 'wb') as file:
+            pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+        return True
+    except IOError as msg:
+        LOG.warning("Could not store %s: %s", filename, msg)
+        return False
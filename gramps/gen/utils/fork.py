@@ -0,0 +1,97 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+The context to start worker processes by forking the current process, and
+the pool of worker processes sharing the work prepared by this one.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import multiprocessing
+import os
+import threading
+from contextlib import contextmanager
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+if 'fork' in multiprocessing.get_all_start_methods():
+    # The workers inherit what the current process prepared for them, the
+    # tables, rules or report, and do not start Gramps again to build it
+    FORK_CONTEXT = multiprocessing.get_context('fork')
+else:
+    # the work is then done in the current process
+    FORK_CONTEXT = None
+
+# The work shared with the worker processes, set by worker_pool
+_WORK = None
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def can_fork():
+    """
+    Return True if worker processes can be forked from this one: the fork
+    start method is available, there is more than one processor, and no
+    other thread is running, eg in the GUI, as the workers would inherit
+    its locks in whatever state they are.
+    """
+    return (FORK_CONTEXT is not None and (os.cpu_count() or 1) > 1 and
+            threading.active_count() == 1)
+
+def get_work():
+    """
+    Return the work given to :func:`worker_pool`, in the functions it maps.
+    """
+    return _WORK
+
+@contextmanager
+def worker_pool(work, parallel=True, processes=None, initializer=None):
+    """
+    Share work, eg tables or rules, with the functions mapped over tasks,
+    which read it with :func:`get_work`.
+
+    Return a function mapping a function over tasks in order, as
+    :meth:`multiprocessing.pool.Pool.imap` does in worker processes forked
+    from this one, if parallel and :func:`can_fork`, or as :func:`map` in
+    this process otherwise.
+
+    :param processes: number of worker processes, one per processor if None
+    :param initializer: called without argument in each worker process
+    """
+    global _WORK
+    _WORK = work
+    try:
+        if parallel and can_fork():
+            with FORK_CONTEXT.Pool(processes,
+                                   initializer=initializer) as pool:
+                yield pool.imap
+        else:
+            yield map
+    finally:
+        _WORK = None
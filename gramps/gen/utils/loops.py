@@ -0,0 +1,178 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Search of the loops of a family tree, where a person is their own ancestor.
+
+The links from the parents to the children are read once from the raw data
+of the families, without building the Family objects, and the loops are
+only searched in the strongly connected components of the graph of these
+links.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# indexes in the raw data of a family and of its child references
+_FATHER = 2
+_MOTHER = 3
+_CHILD_REFS = 4
+_REF = 3
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def get_child_map(db, callback=None):
+    """
+    Return the children of the people of the database, as a dictionary of
+    parent handle to the list of (child handle, family handle) of the
+    families where the person is a parent.
+
+    :param callback: called without argument for each family read
+    """
+    children = {}
+    with db.get_family_cursor() as cursor:
+        for family_handle, data in cursor:
+            links = [(ref[_REF], family_handle) for ref in data[_CHILD_REFS]]
+            for parent_handle in (data[_FATHER], data[_MOTHER]):
+                if parent_handle and links:
+                    if parent_handle in children:
+                        children[parent_handle].extend(links)
+                    else:
+                        children[parent_handle] = list(links)
+            if callback:
+                callback()
+    return children
+
+def get_strongly_connected(graph):
+    """
+    Return the strongly connected components of graph, a dictionary of node
+    to the list of (node, link) of its links, as lists of nodes.
+
+    The components are searched with the algorithm of Tarjan, walking the
+    graph with a stack instead of recursive calls, as the depth of a family
+    tree can exceed the recursion limit. The nodes without links are not
+    returned.
+    """
+    index = {}
+    lowlink = {}
+    stack = []
+    on_stack = set()
+    components = []
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        # the nodes being visited, with the links left to follow
+        path = [(root, iter(graph[root]))]
+        while path:
+            node, links = path[-1]
+            for child, dummy in links:
+                if child not in graph:
+                    # no link from child, it cannot be in a cycle
+                    continue
+                if child not in index:
+                    index[child] = lowlink[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    path.append((child, iter(graph[child])))
+                    break
+                if child in on_stack and index[child] < lowlink[node]:
+                    lowlink[node] = index[child]
+            else:
+                # all the links of node followed
+                path.pop()
+                if path and lowlink[node] < lowlink[path[-1][0]]:
+                    lowlink[path[-1][0]] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    member = None
+                    while member != node:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                    components.append(component)
+    return components
+
+def get_cycles(graph, component):
+    """
+    Return the elementary cycles of graph in component, a strongly connected
+    component of graph, as lists of (node, child, link) of their links.
+
+    Each cycle is listed once, starting from its node that comes first in
+    component: the paths from each node are searched through the nodes that
+    come after it.
+    """
+    order = dict((node, number) for number, node in enumerate(component))
+    cycles = []
+    for start in component:
+        first = order[start]
+        # the links of the path being searched, and its nodes
+        path = []
+        on_path = set([start])
+        todo = [(start, iter(graph[start]))]
+        while todo:
+            node, links = todo[-1]
+            for child, link in links:
+                if order.get(child, -1) < first:
+                    # not in component, or its cycles are already listed
+                    continue
+                if child == start:
+                    cycles.append(path + [(node, child, link)])
+                elif child not in on_path:
+                    on_path.add(child)
+                    path.append((node, child, link))
+                    todo.append((child, iter(graph[child])))
+                    break
+            else:
+                # all the links of node followed
+                todo.pop()
+                on_path.discard(node)
+                if path:
+                    path.pop()
+    return cycles
+
+def find_loops(db, callback=None):
+    """
+    Return the loops of the database, where a person is their own ancestor.
+    Each loop is a list of (parent handle, child handle, family handle) going
+    from a person back to the same person, and each loop is listed once.
+
+    :param callback: called without argument for each family read
+    """
+    children = get_child_map(db, callback)
+    loops = []
+    found = set()
+    for component in get_strongly_connected(children):
+        if len(component) == 1 and component[0] not in (
+                child for child, dummy in children[component[0]]):
+            continue
+        for loop in get_cycles(children, component):
+            # a child may be twice in a family
+            if tuple(loop) not in found:
+                found.add(tuple(loop))
+                loops.append(loop)
+    return loops
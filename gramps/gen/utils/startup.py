@@ -0,0 +1,176 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Report of the time taken by Gramps to start.
+
+When the GRAMPS_IMPORTTIME environment variable is set, Gramps writes to the
+standard error, when it exits, the time taken to import each module, in the
+format of the -X importtime option of Python, followed by the time at which
+the steps of the startup were reached (see :func:`mark`), eg when the first
+database was loaded.
+
+This module only uses the standard library, so that it can be installed
+before the other modules of Gramps are imported.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Python modules
+#
+#-------------------------------------------------------------------------
+import atexit
+import os
+import sys
+import time
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# The environment variable enabling the report
+ENV_VAR = 'GRAMPS_IMPORTTIME'
+
+# The steps of the startup
+PLUGINS_REGISTERED = 'plugins registered'
+DATABASE_LOADED = 'database loaded'
+
+_TIMER = None
+
+#-------------------------------------------------------------------------
+#
+# ImportTimer
+#
+#-------------------------------------------------------------------------
+class ImportTimer:
+    """
+    A finder of the import system, which times the execution of the modules
+    found by the other finders.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        # (depth, module name, self time, cumulative time), in the order
+        # in which the modules were imported
+        self.imports = []
+        # (step, time since the start)
+        self.marks = []
+        # time taken by the imports nested in the modules being imported
+        self.__nested = []
+
+    def find_spec(self, fullname, path=None, target=None):
+        """
+        Find the module with the other finders, and time its loader.
+        """
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(self, spec.loader)
+            return spec
+        return None
+
+    def exec_module(self, loader, module):
+        """
+        Execute a module with its loader, and record the time taken.
+        """
+        start = time.perf_counter()
+        self.__nested.append(0)
+        try:
+            loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self.__nested.pop()
+            if self.__nested:
+                self.__nested[-1] += elapsed
+            self.imports.append((len(self.__nested), module.__name__,
+                                 elapsed - nested, elapsed))
+
+    def mark(self, step):
+        """
+        Record the time at which a step of the startup was reached.
+        """
+        self.marks.append((step, time.perf_counter() - self.start))
+
+    def report(self, file):
+        """
+        Write the report to a file.
+        """
+        print("import time: self [us] | cumulative | imported package",
+              file=file)
+        # like Python, the imports are written as they end
+        for depth, name, own, cumulative in self.imports:
+            print("import time: %9d | %10d | %s%s"
+                  % (own * 1e6, cumulative * 1e6, "  " * depth, name),
+                  file=file)
+        for step, elapsed in self.marks:
+            print("startup time: %.3fs | %s" % (elapsed, step), file=file)
+
+class _TimedLoader:
+    """
+    A loader executing the modules with another loader, timed by an
+    ImportTimer.
+    """
+    def __init__(self, timer, loader):
+        self.__timer = timer
+        self.__loader = loader
+
+    def create_module(self, spec):
+        if hasattr(self.__loader, 'create_module'):
+            return self.__loader.create_module(spec)
+        return None
+
+    def exec_module(self, module):
+        self.__timer.exec_module(self.__loader, module)
+
+    def __getattr__(self, name):
+        return getattr(self.__loader, name)
+
+#-------------------------------------------------------------------------
+#
+# Functions
+#
+#-------------------------------------------------------------------------
+def install():
+    """
+    Start timing the imports, if the GRAMPS_IMPORTTIME environment variable
+    is set, and write the report when Gramps exits.
+    """
+    global _TIMER
+    if _TIMER is not None or not os.environ.get(ENV_VAR):
+        return
+    _TIMER = ImportTimer()
+    sys.meta_path.insert(0, _TIMER)
+    atexit.register(_report)
+
+def mark(step):
+    """
+    Record the time at which a step of the startup was reached, if the
+    imports are timed.
+    """
+    if _TIMER is not None:
+        _TIMER.mark(step)
+
+def _report():
+    sys.meta_path.remove(_TIMER)
+    _TIMER.report(sys.stderr)
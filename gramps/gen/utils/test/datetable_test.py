@@ -0,0 +1,157 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for datetable.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import unittest
+from unittest.mock import patch
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.lib import Date
+from gramps.gen.utils import datetable
+from gramps.gen.utils.datetable import DateMatches, DateTable, get_day_key
+from gramps.test.test_util import add_event, make_memory_db
+
+DATES = [
+    (1850, 0, 0), (1850, 6, 0), (1850, 6, 15), (1900, 1, 1), (1750, 12, 31)]
+COMPARISONS = ["=", "==", "<", "<=", "<<", ">", ">=", ">>"]
+
+def make_dates():
+    """
+    Return dates with all the modifiers and qualities.
+    """
+    dates = []
+    for ymd in DATES:
+        for modifier in (Date.MOD_NONE, Date.MOD_BEFORE, Date.MOD_AFTER,
+                         Date.MOD_ABOUT):
+            for quality in (Date.QUAL_NONE, Date.QUAL_ESTIMATED):
+                date = Date()
+                date.set(quality, modifier, Date.CAL_GREGORIAN,
+                         (ymd[2], ymd[1], ymd[0], False))
+                dates.append(date)
+    for modifier in (Date.MOD_RANGE, Date.MOD_SPAN):
+        date = Date()
+        date.set(Date.QUAL_NONE, modifier, Date.CAL_GREGORIAN,
+                 (0, 0, 1840, False, 0, 0, 1860, False))
+        dates.append(date)
+    date = Date()
+    date.set(Date.QUAL_NONE, Date.MOD_NONE, Date.CAL_JULIAN,
+             (10, 3, 1700, False))
+    dates.append(date)
+    date = Date()
+    date.set_as_text("about the war")
+    dates.append(date)
+    return dates
+
+#-------------------------------------------------------------------------
+#
+# DateTableTest class
+#
+#-------------------------------------------------------------------------
+class DateTableTest(unittest.TestCase):
+    '''
+    Tests of the table of the dates of the events.
+    '''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = make_memory_db()
+        cls.dates = {}
+        with DbTxn("Add events", cls.db) as trans:
+            for date in make_dates() + [None]:
+                event = add_event(cls.db, trans, date=date)
+                cls.dates[event.handle] = event.get_date_object()
+        cls.table = DateTable(cls.db)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.close()
+
+    def test_day_key(self):
+        keys = [get_day_key(ymd) for ymd in sorted(DATES)]
+        self.assertEqual(keys, sorted(keys))
+        self.assertLess(get_day_key((-5, 12, 31)), get_day_key((-4, 1, 1)))
+
+    def test_columns(self):
+        self.assertEqual(len(self.table), len(self.dates) - 1)
+        for handle, date in self.dates.items():
+            self.assertEqual(self.table.get_sort_value(handle),
+                             date.get_sort_value())
+
+    def test_match(self):
+        others = make_dates()
+        other = Date()
+        other.set_as_text("war")
+        others.append(other)
+        for other in others:
+            for comparison in COMPARISONS:
+                expected = set(handle for handle, date in self.dates.items()
+                               if date.match(other, comparison))
+                self.assertEqual(self.table.match(other, comparison),
+                                 expected, (str(other), comparison))
+        self.assertRaises(AttributeError, self.table.match, others[0], "<>")
+
+    @patch.object(datetable, '_LOOKUPS', 0)
+    def test_shared(self):
+        date = make_dates()[0]
+        first = DateMatches(self.db, date)
+        second = DateMatches(self.db, date, "<")
+        # the table is only read by the first lookup, and shared
+        self.assertIsNone(datetable._SHARED[id(self.db)][1])
+        for matches, comparison in ((first, "="), (second, "<")):
+            expected = self.table.match(date, comparison)
+            for handle in self.dates:
+                self.assertEqual(handle in matches, handle in expected)
+        table = datetable._SHARED[id(self.db)][1]
+        self.assertIsNotNone(table)
+        first.close()
+        self.assertIs(datetable._SHARED[id(self.db)][1], table)
+        second.close()
+        second.close()
+        self.assertNotIn(id(self.db), datetable._SHARED)
+
+    @patch.object(datetable, '_LOOKUPS', 10)
+    def test_few_lookups(self):
+        others = make_dates()
+        for comparison in COMPARISONS:
+            expected = self.table.match(others[0], comparison)
+            matches = DateMatches(self.db, others[0], comparison)
+            # a few lookups do not read the table
+            for handle in list(self.dates)[:10]:
+                self.assertEqual(handle in matches, handle in expected)
+            self.assertIsNone(datetable._SHARED[id(self.db)][1])
+            for handle in self.dates:
+                self.assertEqual(handle in matches, handle in expected)
+            self.assertIsNotNone(datetable._SHARED[id(self.db)][1])
+            matches.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
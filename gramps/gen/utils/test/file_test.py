@@ -31,6 +31,7 @@ File tests.
 #
 #-------------------------------------------------------------------------
 import os
+import tempfile
 import unittest
 
 #-------------------------------------------------------------------------
@@ -39,7 +40,8 @@ import unittest
 #
 #-------------------------------------------------------------------------
 from ...const import TEMP_DIR, USER_HOME, USER_PLUGINS, VERSION
-from ...utils.file import media_path, get_empty_tempdir
+from ...utils.file import (media_path, get_empty_tempdir,
+                           get_stored_filename, load_stored, save_stored)
 from ...db.utils import make_database
 
 #-------------------------------------------------------------------------
@@ -106,6 +108,34 @@ class FileTest(unittest.TestCase):
         # Restore environment
         os.environ = old_env
 
+    def test_stored(self):
+        """
+        Test the data stored between sessions.
+        """
+        first = get_stored_filename('/a/tree', 'ext')
+        self.assertTrue(first.endswith(os.path.extsep + 'ext'))
+        self.assertEqual(first, get_stored_filename(b'/a/tree', 'ext'))
+        self.assertNotEqual(first, get_stored_filename('/b/tree', 'ext'))
+
+        with tempfile.TemporaryDirectory() as dirname:
+            filename = os.path.join(dirname, 'stored')
+            self.assertIsNone(load_stored(filename))
+            data = {'version': 1, 'items': [1, 2, 3]}
+            self.assertTrue(save_stored(filename, data))
+            self.assertEqual(load_stored(filename), data)
+            with open(filename, 'wb') as file:
+                file.write(b'garbage')
+            self.assertIsNone(load_stored(filename))
+            # stored by a version with other modules
+            with open(filename, 'wb') as file:
+                file.write(b'cno_such_module\nNoClass\n.')
+            self.assertIsNone(load_stored(filename))
+            with open(filename, 'wb') as file:
+                file.write(b'cos\nno_such_function\n.')
+            self.assertIsNone(load_stored(filename))
+            self.assertFalse(save_stored(os.path.join(dirname, 'no', 'file'),
+                                         data))
+
 
 #-------------------------------------------------------------------------
 #
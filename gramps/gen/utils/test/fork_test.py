@@ -0,0 +1,81 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for fork.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import threading
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.utils.fork import can_fork, get_work, worker_pool
+
+def _add_work(task):
+    return task + get_work(), os.getpid()
+
+#-------------------------------------------------------------------------
+#
+# ForkTest class
+#
+#-------------------------------------------------------------------------
+class ForkTest(unittest.TestCase):
+    '''
+    Tests of the pool of worker processes.
+    '''
+
+    def run_pool(self, parallel=True):
+        with worker_pool(10, parallel, processes=2) as pool_map:
+            results = list(pool_map(_add_work, range(20)))
+        self.assertIsNone(get_work())
+        self.assertEqual([result for result, pid in results],
+                         list(range(10, 30)))
+        return set(pid for result, pid in results)
+
+    def test_serial(self):
+        self.assertEqual(self.run_pool(False), {os.getpid()})
+
+    @unittest.skipUnless(can_fork(), "Requires forking worker processes")
+    def test_fork(self):
+        self.assertNotIn(os.getpid(), self.run_pool())
+
+    def test_thread(self):
+        # no worker process is forked while another thread is running
+        event = threading.Event()
+        thread = threading.Thread(target=event.wait)
+        thread.start()
+        try:
+            self.assertFalse(can_fork())
+            self.assertEqual(self.run_pool(), {os.getpid()})
+        finally:
+            event.set()
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
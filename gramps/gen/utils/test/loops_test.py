@@ -0,0 +1,126 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for loops.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import sys
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.utils.loops import (find_loops, get_child_map,
+                                    get_strongly_connected)
+from gramps.test.test_util import add_family, add_person, make_memory_db
+
+#-------------------------------------------------------------------------
+#
+# LoopsTest class
+#
+#-------------------------------------------------------------------------
+class LoopsTest(unittest.TestCase):
+    '''
+    Tests of the search of the loops of a family tree.
+    '''
+
+    def setUp(self):
+        self.db = make_memory_db()
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_people(self, count):
+        with DbTxn("Add people", self.db) as trans:
+            return [add_person(self.db, trans) for dummy in range(count)]
+
+    def add_family(self, father, mother, children):
+        with DbTxn("Add family", self.db) as trans:
+            return add_family(self.db, trans, father, mother, children).handle
+
+    def test_no_loop(self):
+        grandpa, father, mother, son, daughter = self.add_people(5)
+        self.add_family(grandpa, None, [father])
+        family = self.add_family(father, mother, [son, daughter])
+        calls = []
+        children = get_child_map(self.db, lambda: calls.append(1))
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(children[mother.handle],
+                         [(son.handle, family), (daughter.handle, family)])
+        self.assertNotIn(son.handle, children)
+        self.assertEqual(find_loops(self.db), [])
+
+    def test_loops(self):
+        first, second, third, other, alone = self.add_people(5)
+        first_fam = self.add_family(first, other, [second])
+        second_fam = self.add_family(second, None, [third])
+        third_fam = self.add_family(None, third, [first, other])
+        self_fam = self.add_family(alone, None, [alone])
+        loops = find_loops(self.db)
+        # first -> second -> third -> first, and other -> second -> third
+        # -> other
+        self.assertEqual(len(loops), 3)
+        for loop in loops:
+            # each loop goes back to the person it starts from
+            for (dummy, child, dummy), (parent, dummy, dummy) in zip(
+                    loop, loop[1:] + loop[:1]):
+                self.assertEqual(child, parent)
+        self.assertIn([(alone.handle, alone.handle, self_fam)], loops)
+        people = sorted(sorted(parent for parent, dummy, dummy in loop)
+                        for loop in loops if len(loop) > 1)
+        self.assertEqual(people, sorted(
+            sorted(person.handle for person in loop_people)
+            for loop_people in ((first, second, third),
+                                (other, second, third))))
+        for loop in loops:
+            if len(loop) > 1:
+                self.assertEqual(
+                    sorted(family for dummy, dummy, family in loop),
+                    sorted([first_fam, second_fam, third_fam]))
+
+    def test_every_loop(self):
+        # two people, each the parent of the other in two families
+        first, second = self.add_people(2)
+        self.add_family(first, None, [second])
+        self.add_family(first, None, [second])
+        self.add_family(second, None, [first])
+        self.assertEqual(len(find_loops(self.db)), 2)
+
+    def test_deep_graph(self):
+        # deeper than the recursion limit
+        count = sys.getrecursionlimit() * 10
+        graph = {node: [(node + 1, None)] for node in range(count)}
+        self.assertEqual(get_strongly_connected(graph),
+                         [[node] for node in reversed(range(count))])
+        graph[count - 1].append((0, None))
+        components = get_strongly_connected(graph)
+        self.assertEqual(len(components), 1)
+        self.assertEqual(sorted(components[0]), list(range(count)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -35,6 +35,10 @@ import logging
 
 LOG = logging.getLogger(".")
 
+# Time the imports from now on, if requested
+from .gen.utils import startup
+startup.install()
+
 from subprocess import Popen, PIPE
 
 #-------------------------------------------------------------------------
@@ -54,6 +54,7 @@ from gi.repository import GObject
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 from gramps.gen.db.dbconst import DBBACKEND
 from gramps.gen.db.utils import make_database
+from gramps.gen.utils import startup
 _ = glocale.translation.gettext
 from gramps.cli.grampscli import CLIDbLoader
 from gramps.gen.config import config
@@ -204,6 +205,7 @@ class DbLoader(CLIDbLoader):
                             force_python_upgrade,
                             username=username,
                             password=password)
+                    startup.mark(startup.DATABASE_LOADED)
                     if self.dbstate.is_open():
                         self.dbstate.db.close(
                             user=User(callback=self._pulse_progress,
@@ -31,7 +31,7 @@ try:
     from ._guioptions import make_gui_option, add_gui_options
     from ._dialogs import ReportPluginDialog, ToolPluginDialog
     from . import _windows as PluginWindows
-except TypeError: # No GUI
+except (TypeError, ImportError, ValueError): # No GUI, or no GTK
     pass
 
 from gramps.gen.plug import MenuOptions
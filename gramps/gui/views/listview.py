@@ -179,6 +179,9 @@ class ListView(NavigationView):
                                 Gtk.PolicyType.AUTOMATIC)
         scrollwindow.set_shadow_type(Gtk.ShadowType.ETCHED_IN)
         scrollwindow.add(self.list)
+        self.__scroll_value = 0
+        scrollwindow.get_vadjustment().connect('value-changed',
+                                               self.__prefetch)
 
         self.vbox.pack_start(filter_box, False, True, 0)
         self.vbox.pack_start(scrollwindow, True, True, 0)
@@ -666,6 +669,26 @@ class ListView(NavigationView):
         LOG.debug('   ' + self.__class__.__name__ + ' column_clicked ' +
                     str(time.clock() - cput) + ' sec')
 
+    def __prefetch(self, adjustment):
+        """
+        Have the model prepare the rows ahead of the scroll position.
+        """
+        value = adjustment.get_value()
+        backwards = value < self.__scroll_value
+        self.__scroll_value = value
+        if not self.model or not self.model.prefetcher:
+            return
+        # (start, end) or (valid, start, end) depending on PyGObject
+        visible = self.list.get_visible_range()
+        if not visible or not visible[0]:
+            return
+        start, end = visible[-2:]
+        columns = [pair[1] for pair in self.column_order() if pair[0]]
+        color = self.model.color_column()
+        if color is not None:
+            columns.append(color)
+        self.model.prefetch(start if backwards else end, columns, backwards)
+
     def __display_column_sort(self):
         for i, c in enumerate(self.columns):
             c.set_sort_indicator(i == self.sort_col)
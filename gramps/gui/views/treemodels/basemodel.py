@@ -33,6 +33,10 @@ class BaseModel:
     # LRU cache size
     _CACHE_SIZE = config.get('interface.treemodel-cache-size')
 
+    # Prefetcher filling the cache in the background, set by inheriting
+    # classes that support it
+    prefetcher = None
+
     def __init__(self):
         self.lru_data  = LRU(BaseModel._CACHE_SIZE)
         self.lru_path = LRU(BaseModel._CACHE_SIZE)
@@ -41,6 +45,9 @@ class BaseModel:
         """
         Destroy the items in memory.
         """
+        if self.prefetcher:
+            self.prefetcher.stop()
+            self.prefetcher = None
         self.lru_data = None
         self.lru_path = None
 
@@ -49,6 +56,8 @@ class BaseModel:
         Clear the LRU cache. Always clear lru_path, because paths may have
         changed.
         """
+        if self.prefetcher:
+            self.prefetcher.invalidate()
         if handle:
             if handle in self.lru_data:
                 del self.lru_data[handle]
@@ -57,6 +66,58 @@ class BaseModel:
         # Invalidates all paths
         self.lru_path.clear()
 
+    def prefetch(self, path, columns, backwards=False):
+        """
+        Have the prefetcher compute the values of the given model columns
+        for the rows following path, or preceding it if backwards is True,
+        which are not in the cache yet.
+        """
+        if not self.prefetcher:
+            return
+        count = self._CACHE_SIZE // 4
+        handles = [handle for handle in
+                   self.get_handles_near(path, count, backwards)
+                   if handle not in self.lru_data]
+        self.prefetcher.request(handles, columns)
+
+    def get_handles_near(self, path, count, backwards=False):
+        """
+        Return the handles of at most count rows following path, or
+        preceding it if backwards is True, nearest first.
+        Must be implemented in the inheriting class to use prefetch.
+        """
+        return []
+
+    def get_cache_values(self, handle, columns):
+        """
+        Return the cache entries of a row, for the given model columns, as a
+        dictionary. Return None if there is no object with that handle.
+        This is called by the prefetcher, on a model of its own.
+        """
+        data = self.map(handle)
+        if data is None:
+            return None
+        for col in columns:
+            if self.fmap[col] is not None:
+                self.fmap[col](data)
+        values = {}
+        if handle in self.lru_data:
+            values.update(self.lru_data[handle])
+            del self.lru_data[handle]
+        values.update((col, data) for col in columns)
+        return values
+
+    def set_cache_values(self, rows):
+        """
+        Store the (handle, cache entries) of rows, computed by the
+        prefetcher, in the cache. Rows already in the cache are left as
+        they are.
+        """
+        for handle, values in rows:
+            if handle not in self.lru_data:
+                for col, value in values.items():
+                    self.set_cached_value(handle, col, value)
+
     def get_cached_value(self, handle, col):
         """
         Get the value of a "col". col may be a number (position in a model)
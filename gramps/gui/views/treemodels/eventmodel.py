@@ -40,7 +40,7 @@ from gi.repository import Gtk
 #
 #-------------------------------------------------------------------------
 from gramps.gen.datehandler import format_time, get_date, get_date_valid
-from gramps.gen.lib import Event, EventType
+from gramps.gen.lib import Date, Event, EventType
 from gramps.gen.utils.db import get_participant_from_event
 from gramps.gen.display.place import displayer as place_displayer
 from gramps.gen.config import config
@@ -70,10 +70,13 @@ INVALID_DATE_FORMAT = config.get('preferences.invalid-date-format')
 #
 #-------------------------------------------------------------------------
 class EventModel(FlatBaseModel):
+    _SORT_TABLE = 'Event'
+    _SORT_COLUMNS = {0: ('description',), 1: ('gramps_id',), 7: ('change',)}
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         self.gen_cursor = db.get_event_cursor
+        self.number_items = db.get_number_of_events
         self.map = db.get_raw_event_data
 
         self.fmap = [
@@ -109,6 +112,7 @@ class EventModel(FlatBaseModel):
         """
         self.db = None
         self.gen_cursor = None
+        self.number_items = None
         self.map = None
         self.fmap = None
         self.smap = None
@@ -167,10 +171,11 @@ class EventModel(FlatBaseModel):
 
     def sort_date(self,data):
         if data[COLUMN_DATE]:
-            event = Event()
-            event.unserialize(data)
-            retval = "%09d" % event.get_date_object().get_sort_value()
-            if not get_date_valid(event):
+            # only the date is needed, not the whole event
+            date = Date()
+            date.unserialize(data[COLUMN_DATE])
+            retval = "%09d" % date.get_sort_value()
+            if not date.get_valid():
                 return INVALID_DATE_FORMAT % retval
             else:
                 return retval
@@ -42,6 +42,12 @@ The class FlatNodeMap keeps a sortkeyhandle list with (sortkey, handle) entries,
 and a handle2path dictionary. As the Map is flat, the index in sortkeyhandle
 corresponds to the path.
 
+The class FlatWindowNodeMap has the same interface, but does not keep the
+sortkeyhandle list. On databases that support it, it reads only the rows that
+are shown from the database, sorted on the database columns of the sort
+column. It is used for unfiltered views, so that they open without reading
+the whole table.
+
 The class FlatBaseModel, is the base class for all flat treeview models.
 It keeps a FlatNodeMap, and obtains data from database as needed
 """
@@ -72,6 +78,7 @@ from gi.repository import Gtk
 #-------------------------------------------------------------------------
 from gramps.gen.filters import SearchFilter, ExactSearchFilter
 from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.gen.utils.lru import LRU
 from .basemodel import BaseModel
 from ...user import User
 
@@ -201,6 +208,22 @@ class FlatNodeMap:
             self._hndl2index = dict((key[1], index)
                 for index, key in enumerate(self._index2hndl))
 
+    def _set_corr(self, reverse):
+        """
+        Set up the index <-> path correction for the current number of rows.
+        """
+        if reverse:
+            self.__corr = (len(self) - 1, -1)
+        else:
+            self.__corr = (0, 1)
+
+    def has_sortkey_list(self):
+        """
+        Return True if the sorted list of (sortkey, handle) of all rows is
+        kept in memory, so that it can be bisected.
+        """
+        return True
+
     def real_path(self, index):
         """
         Given the index in the maps, return the real path.
@@ -337,7 +360,7 @@ class FlatNodeMap:
                 return False
         else:
             index += 1
-            if index >= len(self._index2hndl):
+            if index >= len(self):
                 return False
         iter.user_data = index
         return True
@@ -435,6 +458,227 @@ class FlatNodeMap:
             self._hndl2index[hndl] -= 1
         return Gtk.TreePath((delpath,))
 
+#-------------------------------------------------------------------------
+#
+# FlatWindowNodeMap
+#
+#-------------------------------------------------------------------------
+class FlatWindowNodeMap(FlatNodeMap):
+    """
+    A FlatNodeMap that does not keep the (sortkey, handle) list of all rows
+    in memory. It is used for unfiltered views on databases that can return
+    windows of sorted rows (feature "sort-window").
+
+    The rows are read from the database in chunks of CHUNK_SIZE rows as the
+    treeview asks for them. The last key of every chunk read is remembered,
+    so that the following chunk can be read with keyset pagination: the
+    database only has to return the rows sorting after that key, no matter
+    how far down the list the chunk is. Only the MAX_CHUNKS most recently
+    used chunks are kept, so memory use depends on what is on screen, not on
+    the size of the table.
+
+    Sort keys are the raw values of the database sort columns, not the
+    glocale.sort_key of the display values used by FlatNodeMap.
+    """
+    CHUNK_SIZE = 500
+    MAX_CHUNKS = 8
+
+    def __init__(self, db, table, columns, count_func, stamp=0):
+        """
+        Create a new instance.
+
+        :param db: the database, which must support the sort-window feature
+        :param table: the primary object class name, eg 'Event'
+        :param columns: the secondary database columns to sort on
+        :param count_func: function returning the number of rows
+        :param stamp: the stamp of the map this map replaces
+        """
+        FlatNodeMap.__init__(self)
+        self.db = db
+        self.table = table
+        self.columns = columns
+        self.count_func = count_func
+        self.stamp = stamp + 1
+        self._index2hndl = None
+        self._fullhndl = None
+        self._count = 0
+        # chunk number -> (list of (sortkey, handle), {handle: offset})
+        self._chunks = LRU(self.MAX_CHUNKS)
+        # chunk number -> last key of that chunk
+        self._bounds = {}
+
+    def destroy(self):
+        """
+        Unset all elements that can prevent garbage collection
+        """
+        FlatNodeMap.destroy(self)
+        self.db = None
+        self.count_func = None
+        self._chunks = None
+        self._bounds = None
+
+    def set_window(self, reverse=False):
+        """
+        Set up the map for all rows of the table.
+        """
+        self.stamp += 1
+        self._count = self.count_func()
+        self._reverse = reverse
+        self._set_corr(reverse)
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Forget all chunks read, they must be read again from the database.
+        Return the indexes of the rows that were in memory.
+        """
+        indexes = [chunk * self.CHUNK_SIZE + offset
+                   for chunk in self._chunks.iterkeys()
+                   for offset in range(len(self._chunks[chunk][0]))]
+        self._chunks.clear()
+        self._bounds = {}
+        return indexes
+
+    def has_sortkey_list(self):
+        return False
+
+    def full_srtkey_hndl_map(self):
+        return None
+
+    def reverse_order(self):
+        self._reverse = not self._reverse
+        self._set_corr(self._reverse)
+
+    def clear_map(self):
+        self._count = 0
+        self.invalidate()
+
+    def _get_chunk(self, chunk):
+        """
+        Return the rows of the given chunk, reading it if needed.
+        """
+        if chunk in self._chunks:
+            # set it again to mark it as most recently used
+            self._chunks[chunk] = self._chunks[chunk]
+            return self._chunks[chunk][0]
+        if chunk == 0:
+            rows = self.db.get_sort_window(self.table, self.columns,
+                                           limit=self.CHUNK_SIZE)
+        elif chunk - 1 in self._bounds:
+            rows = self.db.get_sort_window(self.table, self.columns,
+                                           after=self._bounds[chunk - 1],
+                                           limit=self.CHUNK_SIZE)
+        else:
+            # a jump, eg by dragging the scrollbar
+            rows = self.db.get_sort_window(self.table, self.columns,
+                                           offset=chunk * self.CHUNK_SIZE,
+                                           limit=self.CHUNK_SIZE)
+        if rows:
+            self._bounds[chunk] = rows[-1]
+        self._chunks[chunk] = (rows, dict((key[1], offset)
+                                          for offset, key in enumerate(rows)))
+        return rows
+
+    def _get_key(self, index):
+        """
+        Return the (sortkey, handle) at the given index.
+        """
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        chunk, offset = divmod(index, self.CHUNK_SIZE)
+        return self._get_chunk(chunk)[offset]
+
+    def loaded_index(self, handle):
+        """
+        Return the index of handle if it is in a chunk in memory, else None.
+        """
+        for chunk in self._chunks.iterkeys():
+            offset = self._chunks[chunk][1].get(handle)
+            if offset is not None:
+                return chunk * self.CHUNK_SIZE + offset
+        return None
+
+    def _index(self, handle):
+        """
+        Return the index of handle, or None if it is not in the table.
+        """
+        index = self.loaded_index(handle)
+        if index is None:
+            index = self.db.get_sort_position(self.table, self.columns,
+                                              handle)
+        return index
+
+    def get_path_from_handle(self, handle):
+        index = self._index(handle)
+        if index is None or index >= self._count:
+            return None
+        return Gtk.TreePath((self.real_path(index),))
+
+    def get_sortkey(self, handle):
+        index = self.loaded_index(handle)
+        return None if index is None else self._get_key(index)[0]
+
+    def new_iter(self, handle):
+        return self.new_iter_from_index(self._index(handle))
+
+    def new_iter_from_index(self, index):
+        """
+        Return a new iter for the row at the given index.
+        """
+        iter = Gtk.TreeIter()
+        iter.stamp = self.stamp
+        iter.user_data = index
+        return iter
+
+    def get_iter(self, path):
+        index = self.real_index(path)
+        if not 0 <= index < self._count:
+            raise IndexError(path)
+        return self.new_iter_from_index(index)
+
+    def get_handle(self, path):
+        return self._get_key(self.real_index(path))[1]
+
+    def __len__(self):
+        return self._count
+
+    def max_rows(self):
+        return self._count
+
+    def insert(self, srtkey_hndl, allkeyonly=False):
+        """
+        Insert the row of an object that was added to the database.
+        Returns the path of the inserted row, or None.
+        """
+        index = self.db.get_sort_position(self.table, self.columns,
+                                          srtkey_hndl[1])
+        if index is None:
+            return None
+        self._count += 1
+        self._set_corr(self._reverse)
+        self.invalidate()
+        return Gtk.TreePath((self.real_path(index),))
+
+    def delete(self, srtkey_hndl):
+        """
+        Delete the row of an object that was removed from the database.
+        Returns the path of the deleted row.
+
+        The object is no longer in the database, so unless its row is in
+        memory its old position is unknown. The last row is then reported
+        as deleted, the caller should refresh the rows in memory.
+        """
+        index = self.loaded_index(srtkey_hndl[1])
+        if index is None:
+            index = self._count - 1
+        if index < 0:
+            return None
+        delpath = self.real_path(index)
+        self._count -= 1
+        self._set_corr(self._reverse)
+        self.invalidate()
+        return Gtk.TreePath((delpath,))
+
 #-------------------------------------------------------------------------
 #
 # FlatBaseModel
@@ -446,7 +690,16 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
     It keeps a FlatNodeMap, and obtains data from database as needed
     ..Note: glocale.sort_key is applied to the underlying sort key,
             so as to have localized sort
+
+    Derived classes can set _SORT_TABLE to the primary object class name and
+    _SORT_COLUMNS to a dictionary of model column: tuple of database
+    columns. If the database supports the sort-window feature, an
+    unfiltered view sorted on one of those columns then uses a
+    FlatWindowNodeMap, and only reads the rows that are shown. Such
+    classes must also set number_items to the function counting the rows.
     """
+    _SORT_TABLE = None
+    _SORT_COLUMNS = {}
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(),
@@ -476,6 +729,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         # get the function that maps data to sort_keys
         self.sort_func = lambda x: glocale.sort_key(self.smap[col](x))
         self.sort_col = scol
+        self.sort_model_col = col
         self.skip = skip
         self._in_build = False
 
@@ -558,6 +812,46 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         return None
 
+    def _window_columns(self):
+        """
+        Return the database columns to read a window of sorted rows, or None
+        if the view must keep the sort keys of all rows in memory.
+        """
+        if (self._SORT_TABLE is None
+                or not self.db.get_feature("sort-window")):
+            return None
+        return self._SORT_COLUMNS.get(self.sort_model_col)
+
+    def _is_windowed(self):
+        """
+        Return True if the node map only reads the rows that are shown.
+        """
+        return isinstance(self.node_map, FlatWindowNodeMap)
+
+    def _set_node_map(self, windowed):
+        """
+        Make sure the node map is of the required type, keeping the stamp.
+        """
+        if windowed == self._is_windowed():
+            return
+        stamp = self.node_map.stamp
+        self.node_map.destroy()
+        if windowed:
+            self.node_map = FlatWindowNodeMap(self.db, self._SORT_TABLE,
+                                              self._window_columns(),
+                                              self.number_items, stamp)
+        else:
+            self.node_map = FlatNodeMap()
+            self.node_map.stamp = stamp + 1
+
+    def _rebuild_window(self):
+        """
+        Build the view of all rows from windows of sorted database rows.
+        """
+        self.clear_cache()
+        self._set_node_map(True)
+        self.node_map.set_window(reverse=self._reverse)
+
     def sort_keys(self):
         """
         Return the (sort_key, handle) list of all data that can maximally
@@ -576,9 +870,15 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """ function called when view must be build, given a search text
             in the top search bar
         """
+        if ((self.db is not None) and self.db.is_open() and
+                not (self.search and self.search.text) and
+                ignore is None and not self.skip and self._window_columns()):
+            self._rebuild_window()
+            return
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
+            self._set_node_map(False)
             allkeys = self.node_map.full_srtkey_hndl_map()
             if not allkeys:
                 allkeys = self.sort_keys()
@@ -605,9 +905,15 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """ function called when view must be build, given filter options
             in the filter sidebar
         """
+        if ((self.db is not None) and self.db.is_open() and
+                not self.search and ignore is None and
+                self._window_columns()):
+            self._rebuild_window()
+            return
         self.clear_cache()
         self._in_build = True
         if (self.db is not None) and self.db.is_open():
+            self._set_node_map(False)
             allkeys = self.node_map.full_srtkey_hndl_map()
             if not allkeys:
                 allkeys = self.sort_keys()
@@ -638,6 +944,9 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Row is only added if search/filter data is such that it must be shown
         """
         assert isinstance(handle, str)
+        if self._is_windowed():
+            self._update_window(handle)
+            return
         if self.node_map.get_path_from_handle(handle) is not None:
             return # row is already displayed
         data = self.map(handle)
@@ -658,6 +967,9 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Delete a row, called after the object with handle is deleted
         """
         assert isinstance(handle, str)
+        if self._is_windowed():
+            self._update_window(handle)
+            return
         if self.node_map.get_path_from_handle(handle) is None:
             return # row is not currently displayed
         self.clear_cache(handle)
@@ -671,6 +983,9 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Update a row, called after the object with handle is changed
         """
+        if self._is_windowed():
+            self._update_window(handle)
+            return
         if self.node_map.get_path_from_handle(handle) is None:
             return # row is not currently displayed
         self.clear_cache(handle)
@@ -687,6 +1002,44 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             node = self.do_get_iter(path)[1]
             self.row_changed(path, node)
 
+    def _update_window(self, handle):
+        """
+        Update the view after the object with handle was added, changed or
+        deleted, when the node map reads windows of sorted database rows.
+        The database is the reference for what is in the view, so the
+        number of rows in the database tells if a row must be added or
+        deleted.
+        """
+        self.clear_cache(handle)
+        old_index = self.node_map.loaded_index(handle)
+        count = self.number_items()
+        refresh = []
+        if count > len(self.node_map):
+            path = self.node_map.insert((None, handle))
+            if path is not None:
+                self.row_inserted(path, self.do_get_iter(path)[1])
+        elif count < len(self.node_map):
+            if old_index is None:
+                refresh = self.node_map.invalidate()
+            path = self.node_map.delete((None, handle))
+            if path is not None:
+                self.row_deleted(path)
+        else:
+            new_path = self.node_map.get_path_from_handle(handle)
+            if new_path is None:
+                return
+            new_index = self.node_map.real_index(new_path[0])
+            if old_index is None or old_index != new_index:
+                # the order changed, all rows in between moved
+                refresh = self.node_map.invalidate()
+                refresh.append(new_index)
+            else:
+                self.row_changed(new_path, self.do_get_iter(new_path)[1])
+        for index in sorted(set(refresh)):
+            if index < len(self.node_map):
+                path = Gtk.TreePath((self.node_map.real_path(index),))
+                self.row_changed(path, self.do_get_iter(path)[1])
+
     def get_iter_from_handle(self, handle):
         """
         Get the iter for a gramps handle.
@@ -709,6 +1062,18 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         path = self.node_map.real_path(index)
         return self.node_map.get_handle(path)
 
+    def get_handles_near(self, path, count, backwards=False):
+        """
+        Return the handles of at most count rows following path, or
+        preceding it if backwards is True, nearest first.
+        """
+        row = path.get_indices()[0]
+        if backwards:
+            rows = range(row - 1, max(row - 1 - count, -1), -1)
+        else:
+            rows = range(row + 1, min(row + 1 + count, len(self.node_map)))
+        return [self.node_map.get_handle(row) for row in rows]
+
     # The following implement the public interface of Gtk.TreeModel
 
     def do_get_flags(self):
@@ -793,7 +1158,7 @@ class FlatBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             ##        when using user_data for that!
             ##upstream bug: https://bugzilla.gnome.org/show_bug.cgi?id=698366
             index = 0
-        handle = self.node_map._index2hndl[index][1]
+        handle = self.node_map.get_handle(self.node_map.real_path(index))
         val = self._get_value(handle, col)
         #print 'val is', val, type(val)
 
@@ -51,10 +51,14 @@ from .flatbasemodel import FlatBaseModel
 #
 #-------------------------------------------------------------------------
 class MediaModel(FlatBaseModel):
+    _SORT_TABLE = 'Media'
+    _SORT_COLUMNS = {0: ('desc',), 1: ('gramps_id',), 3: ('path',),
+                     7: ('change',)}
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         self.gen_cursor = db.get_media_cursor
+        self.number_items = db.get_number_of_media
         self.map = db.get_raw_media_data
 
         self.fmap = [
@@ -89,6 +93,7 @@ class MediaModel(FlatBaseModel):
         """
         self.db = None
         self.gen_cursor = None
+        self.number_items = None
         self.map = None
         self.fmap = None
         self.smap = None
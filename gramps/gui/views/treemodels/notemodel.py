@@ -52,10 +52,14 @@ from gramps.gen.lib import (Note, NoteType, StyledText)
 class NoteModel(FlatBaseModel):
     """
     """
+    _SORT_TABLE = 'Note'
+    _SORT_COLUMNS = {1: ('gramps_id',), 5: ('change',)}
+
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         """Setup initial values for instance variables."""
         self.gen_cursor = db.get_note_cursor
+        self.number_items = db.get_number_of_notes
         self.map = db.get_raw_note_data
         self.fmap = [
             self.column_preview,
@@ -84,6 +88,7 @@ class NoteModel(FlatBaseModel):
         """
         self.db = None
         self.gen_cursor = None
+        self.number_items = None
         self.map = None
         self.fmap = None
         self.smap = None
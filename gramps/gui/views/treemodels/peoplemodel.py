@@ -63,6 +63,7 @@ from gramps.gen.datehandler import format_time, get_date, get_date_valid
 from .flatbasemodel import FlatBaseModel
 from .treebasemodel import TreeBaseModel
 from .basemodel import BaseModel
+from .prefetch import Prefetcher
 from gramps.gen.config import config
 
 #-------------------------------------------------------------------------
@@ -568,9 +569,16 @@ class PersonListModel(PeopleBaseModel, FlatBaseModel):
     """
     Listed people model.
     """
+    _SORT_TABLE = 'Person'
+    _SORT_COLUMNS = {0: ('surname', 'given_name'), 1: ('gramps_id',),
+                     14: ('change',)}
+
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         PeopleBaseModel.__init__(self, db)
+        self.number_items = db.get_number_of_people
+        if db.get_feature("reader"):
+            self.prefetcher = Prefetcher(self, PeopleBaseModel)
         FlatBaseModel.__init__(self, db, uistate, search=search, skip=skip,
                                scol=scol, order=order, sort_map=sort_map)
 
@@ -579,6 +587,7 @@ class PersonListModel(PeopleBaseModel, FlatBaseModel):
         Unset all elements that can prevent garbage collection
         """
         PeopleBaseModel.destroy(self)
+        self.number_items = None
         FlatBaseModel.destroy(self)
 
 class PersonTreeModel(PeopleBaseModel, TreeBaseModel):
@@ -588,6 +597,8 @@ class PersonTreeModel(PeopleBaseModel, TreeBaseModel):
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         PeopleBaseModel.__init__(self, db)
+        if db.get_feature("reader"):
+            self.prefetcher = Prefetcher(self, PeopleBaseModel)
         TreeBaseModel.__init__(self, db, uistate, search=search, skip=skip,
                                scol=scol, order=order, sort_map=sort_map)
 
@@ -0,0 +1,164 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Computation of the column values of the rows ahead of the scroll position
+of a view, in a worker thread.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import threading
+import logging
+
+_LOG = logging.getLogger(".gui.prefetch")
+
+#-------------------------------------------------------------------------
+#
+# GTK modules
+#
+#-------------------------------------------------------------------------
+from gi.repository import GLib
+
+#-------------------------------------------------------------------------
+#
+# Prefetcher
+#
+#-------------------------------------------------------------------------
+class Prefetcher:
+    """
+    Compute the values of the columns of rows that will soon be shown in a
+    worker thread, and store them in the cache of the model, so the model
+    does not have to read the database while the view is scrolled.
+
+    The worker reads the database with its own connection, see
+    open_reader of the database, and computes the values with its own
+    instance of worker_class, a model class without GTK parts, constructed
+    with that connection as only argument. The values are handed to the
+    model in the main loop. Values computed before the cache of the model
+    was cleared are dropped.
+
+    Only the latest request is handled, a new request abandons the one
+    being computed.
+    """
+    # Number of rows computed before they are handed to the model
+    BATCH_SIZE = 25
+
+    def __init__(self, model, worker_class):
+        """
+        Create a new instance.
+
+        :param model: the model to store the values in
+        :param worker_class: the model class computing the values
+        """
+        self.model = model
+        self.db = model.db
+        self.worker_class = worker_class
+        self.generation = 0
+        self.__request = None
+        self.__stopped = False
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__thread = None
+
+    def request(self, handles, columns):
+        """
+        Compute the values of the given model columns for the rows of the
+        given handles, in this order.
+        """
+        if self.__stopped or not handles:
+            return
+        with self.__lock:
+            self.__request = (self.generation, handles, columns)
+        self.__wake.set()
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__run,
+                                             name='prefetch', daemon=True)
+            self.__thread.start()
+
+    def invalidate(self):
+        """
+        Drop the values being computed, as the data they are based on has
+        changed.
+        """
+        self.generation += 1
+
+    def stop(self):
+        """
+        Stop the worker thread.
+        """
+        self.__stopped = True
+        self.__wake.set()
+        self.model = None
+
+    def __run(self):
+        """
+        Main function of the worker thread.
+        """
+        reader = self.db.open_reader()
+        if reader is None:
+            return
+        try:
+            worker = self.worker_class(reader)
+            worker._in_build = False
+            while not self.__stopped:
+                self.__wake.wait()
+                self.__wake.clear()
+                with self.__lock:
+                    request, self.__request = self.__request, None
+                if request is not None:
+                    self.__compute(worker, *request)
+            worker.destroy()
+        finally:
+            reader.close()
+
+    def __compute(self, worker, generation, handles, columns):
+        """
+        Compute the values of the rows of a request, in batches.
+        """
+        batch = []
+        for handle in handles:
+            if self.__wake.is_set():
+                # stopped, or there is a newer request
+                break
+            try:
+                values = worker.get_cache_values(handle, columns)
+            except Exception:
+                # eg an object removed since the request
+                _LOG.debug("prefetch of %s failed", handle, exc_info=True)
+                continue
+            if values is not None:
+                batch.append((handle, values))
+            if len(batch) == self.BATCH_SIZE:
+                GLib.idle_add(self.__store, generation, batch)
+                batch = []
+        if batch:
+            GLib.idle_add(self.__store, generation, batch)
+
+    def __store(self, generation, batch):
+        """
+        Store computed values in the cache of the model, in the main loop.
+        """
+        if generation == self.generation and self.model is not None:
+            self.model.set_cache_values(batch)
+        return False
@@ -48,10 +48,13 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 #
 #-------------------------------------------------------------------------
 class RepositoryModel(FlatBaseModel):
+    _SORT_TABLE = 'Repository'
+    _SORT_COLUMNS = {0: ('name',), 1: ('gramps_id',), 14: ('change',)}
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         self.gen_cursor = db.get_repository_cursor
+        self.number_items = db.get_number_of_repositories
         self.get_handles = db.get_repository_handles
         self.map = db.get_raw_repository_data
         self.fmap = [
@@ -101,6 +104,7 @@ class RepositoryModel(FlatBaseModel):
         """
         self.db = None
         self.gen_cursor = None
+        self.number_items = None
         self.get_handles = None
         self.map = None
         self.fmap = None
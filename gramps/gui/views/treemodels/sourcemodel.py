@@ -48,11 +48,15 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 #
 #-------------------------------------------------------------------------
 class SourceModel(FlatBaseModel):
+    _SORT_TABLE = 'Source'
+    _SORT_COLUMNS = {0: ('title',), 1: ('gramps_id',), 2: ('author',), 3: ('abbrev',),
+                     4: ('pubinfo',), 7: ('change',)}
 
     def __init__(self, db, uistate, scol=0, order=Gtk.SortType.ASCENDING,
                  search=None, skip=set(), sort_map=None):
         self.map = db.get_raw_source_data
         self.gen_cursor = db.get_source_cursor
+        self.number_items = db.get_number_of_sources
         self.fmap = [
             self.column_title,
             self.column_id,
@@ -84,6 +88,7 @@ class SourceModel(FlatBaseModel):
         """
         self.db = None
         self.gen_cursor = None
+        self.number_items = None
         self.map = None
         self.fmap = None
         self.smap = None
@@ -19,28 +19,69 @@
 #
 
 import unittest
-from ..treebasemodel import Node, NodeMap
+from ..treebasemodel import NodeStore
 
 class NodeTest(unittest.TestCase):
 
     def test_addremovechildren(self):
-        n = Node('1', '', 'key_to_sort_on', None, None)
-        nm = NodeMap()
-        nm.add_node(n)
-
-        n2 = Node('2', '', 'key_to_sort_on2', None, None)
-        n.add_child(n2, nm)
-        nm.add_node(n2)
-
-        n3 = Node('2', '', '', None, None)
-        n.add_child(n3, nm)
-        nm.add_node(n3)
-
-        n.remove_child(n3, nm)
-        nm.del_node(n3)
-        n.remove_child(n2, nm)
-        nm.del_node(n2)
-        self.assertEqual(len(n.children), 0)
+        nm = NodeStore()
+        n = nm.add('1', NodeStore.ROOT, 'key_to_sort_on', None)
+        n2 = nm.add('2', n, 'key_to_sort_on2', None)
+        n3 = nm.add('2', n, '', None)
+        self.assertEqual(list(nm.childids[n]), [n3, n2])
+        self.assertEqual(nm.next[n3], n2)
+        self.assertEqual(nm.prev[n2], n3)
+
+        nm.remove(n3)
+        self.assertEqual(nm.prev[n2], 0)
+        nm.remove(n2)
+        self.assertEqual(nm.n_children(n), 0)
+        self.assertEqual(len(nm), 2)
+
+    def test_siblings(self):
+        nm = NodeStore()
+        root = NodeStore.ROOT
+        nodes = [nm.add(name, root, name, name) for name in 'dbeac']
+        ids = list(nm.childids[root])
+        self.assertEqual([nm.name[nodeid] for nodeid in ids],
+                         ['a', 'b', 'c', 'd', 'e'])
+        for index, nodeid in enumerate(ids):
+            self.assertEqual(nm.index(nodeid), index)
+            self.assertEqual(nm.prev[nodeid], ids[index - 1] if index else 0)
+            self.assertEqual(nm.next[nodeid],
+                             ids[index + 1] if index < 4 else 0)
+
+        # the node id of a removed node is reused
+        nm.remove(nodes[0])
+        self.assertEqual(nm.next[nodes[3]], nodes[1])
+        nodeid = nm.add('f', root, 'f', 'f')
+        self.assertEqual(nodeid, nodes[0])
+        self.assertEqual(nm.index(nodeid), 4)
+        self.assertEqual(nm.next[nodes[2]], nodeid)
+
+    def test_equal_names(self):
+        nm = NodeStore()
+        root = NodeStore.ROOT
+        nodes = [nm.add(ref, root, 'Smith', ref) for ref in 'abc']
+        self.assertEqual(list(nm.childids[root]), nodes)
+        # the sort key is calculated once and shared
+        self.assertIs(nm.sortkey[nodes[0]], nm.sortkey[nodes[2]])
+        nm.remove(nodes[1])
+        self.assertEqual(nm.index(nodes[2]), 1)
+        self.assertEqual(nm.next[nodes[0]], nodes[2])
+
+    def test_node(self):
+        nm = NodeStore()
+        n = nm.add('1', NodeStore.ROOT, 'group', None)
+        n2 = nm.add('2', n, 'child', 'handle', True)
+        node = nm.node(n)
+        self.assertEqual(node.name, 'group')
+        self.assertIsNone(node.handle)
+        self.assertEqual(node.parent, NodeStore.ROOT)
+        self.assertEqual([nodeid for key, nodeid in node.children], [n2])
+        self.assertTrue(nm.node(n2).secondary)
+        nm.set_handle(n, 'handle2')
+        self.assertEqual(node.handle, 'handle2')
 
 
 if __name__ == "__main__":
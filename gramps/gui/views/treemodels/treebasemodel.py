@@ -32,6 +32,7 @@ This module provides the model that is used for all hierarchical treeviews.
 # Standard python modules
 #
 #-------------------------------------------------------------------------
+from array import array
 import time
 import logging
 
@@ -54,179 +55,246 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 import gramps.gui.widgets.progressdialog as progressdlg
 from ...user import User
-from bisect import bisect_right
+from bisect import bisect_left, bisect_right
 from gramps.gen.filters import SearchFilter, ExactSearchFilter
 from .basemodel import BaseModel
 
 #-------------------------------------------------------------------------
 #
-# Node
+# NodeStore
 #
 #-------------------------------------------------------------------------
-class Node:
+class NodeStore:
     """
-    This class defines an individual node of a tree in the model.  The node
-    stores the following data:
+    This class stores the nodes of a tree in the model.  A node is an integer
+    node id, which indexes a set of parallel arrays.  No Python object is
+    created per node, which keeps the memory use of trees with hundreds of
+    thousands of rows down.  Node id 0 means no node, the hidden root node of
+    the tree has node id ROOT.  The ids of removed nodes are reused.
 
+    For every node the following data is stored:
+
+    ref         Reference to this node in the tree dictionary.
     name        Textual description of the node.
     sortkey     A key which defines the sort order of the node.
-    ref         Reference to this node in the tree dictionary.
     handle      A Gramps handle.  Can be None if no Gramps object is
                 associated with the node.
-    parent      id of the parent node.
-    prev        Link to the previous sibling via id.
-    next        Link to the next sibling via id.
-
-    children    A list of (sortkey, nodeid) tuples for the children of the node.
-                This list is always kept sorted.
+    secondary   1 if the handle is of the secondary object type.
+    parent      Node id of the parent node.
+    prev        Node id of the previous sibling.
+    next        Node id of the next sibling.
+    childkeys   The sorted list of sortkeys of the children of the node, or
+                None if the node has no children.
+    childids    An array of the node ids of the children of the node, in the
+                order of childkeys, or None if the node has no children.
+
+    Sort keys are interned: nodes with the same name share a single sort
+    key, which is only calculated once.
     """
-    __slots__ = ('name', 'sortkey', 'ref', 'handle', 'secondary', 'parent',
-                 'prev', 'next', 'children')#, '__weakref__')
-
-    def __init__(self, ref, parent, sortkey, handle, secondary):
-        if sortkey:
-            self.name = sortkey
-            #sortkey must be localized sort, so
-            self.sortkey = glocale.sort_key(sortkey)
-            if not self.sortkey:
-                self.sortkey = glocale.sort_key('')
-        else:
-            self.name = ''
-            self.sortkey = glocale.sort_key('')
-        self.ref = ref
-        self.handle = handle
-        self.secondary = secondary
-        self.parent = parent
-        self.prev = None
-        self.next = None
-        self.children = []
-
-    def set_handle(self, handle, secondary=False):
-        """
-        Assign the handle of a Gramps object to this node.
-        """
-        if not self.handle or handle is None:
-            self.handle = handle
-            self.secondary = secondary
-        else:
-            print ('WARNING: Attempt to add handle twice to the node (%s)' %
-                    handle)
-
-    def add_child(self, node, nodemap):
-        """
-        Add a node to the list of children for this node using the id's in
-        nodemap.
-        """
-        nodeid = id(node)
-        if len(self.children):
-            index = bisect_right(self.children, (node.sortkey, nodeid))
-            if index == 0:
-                node.prev = None
-                next_nodeid = self.children[0][1]
-                next_node = nodemap.node(next_nodeid)
-                next_node.prev = nodeid
-                node.next = next_nodeid
-            elif index == len(self.children):
-                prev_nodeid = self.children[-1][1]
-                prev_node = nodemap.node(prev_nodeid)
-                prev_node.next = nodeid
-                node.prev = prev_nodeid
-                node.next = None
-            else:
-                prev_nodeid = self.children[index - 1][1]
-                next_nodeid = self.children[index][1]
-                prev_node = nodemap.node(prev_nodeid)
-                next_node = nodemap.node(next_nodeid)
-                prev_node.next = nodeid
-                next_node.prev = nodeid
-                node.prev = prev_nodeid
-                node.next = next_nodeid
-
-            self.children.insert(index, (node.sortkey, nodeid))
-
-        else:
-            self.children.append((node.sortkey, nodeid))
-
-    def remove_child(self, node, nodemap):
-        """
-        Remove a node from the list of children for this node, using nodemap.
-        """
-        nodeid = id(node)
-        index = bisect_right(self.children, (node.sortkey, nodeid)) - 1
-        if not (self.children[index] == (node.sortkey, nodeid)):
-            raise ValueError(str(node.name) + \
-                        ' not present in self.children: ' + str(self.children)\
-                        + ' at index ' + str(index))
-        if index == 0:
-            if len(self.children) > 1:
-                nodemap.node(self.children[index+1][1]).prev = None
-        elif index == len(self.children)-1:
-            nodemap.node(self.children[index - 1][1]).next = None
-        else:
-            nodemap.node(self.children[index - 1][1]).next = \
-                        self.children[index + 1][1]
-            nodemap.node(self.children[index + 1][1]).prev = \
-                        self.children[index - 1][1]
+    ROOT = 1
 
-        self.children.pop(index)
-
-#-------------------------------------------------------------------------
-#
-# NodeMap
-#
-#-------------------------------------------------------------------------
-class NodeMap:
-    """
-    Map of id of Node classes to real object
-    """
     def __init__(self):
-        self.id2node = {}
+        self.clear()
+
+    def clear(self):
+        """
+        Remove all nodes, except for a new root node.
+        """
+        self._keys = {}
+        self._free = []
+        self.ref = [None]
+        self.name = [None]
+        self.sortkey = [None]
+        self.handle = [None]
+        self.secondary = bytearray(1)
+        self.parent = array('L', [0])
+        self.prev = array('L', [0])
+        self.next = array('L', [0])
+        self.childkeys = [None]
+        self.childids = [None]
+        self.add(None, 0, None, None)
 
     def destroy(self):
         """
         Unset all elements that can prevent garbage collection
         """
-##        for key, item in self.id2node.iteritems():
-##            item.prev = None
-##            item.next = None
-##            item.parent = None
-##            item.children = []
-        self.id2node.clear()
+        self.clear()
 
-    def add_node(self, node):
+    def __len__(self):
         """
-        Add a Node object to the map and return id of this node
+        Return the number of nodes, including the root node.
         """
-        nodeid = id(node)
-        self.id2node[nodeid] = node
-        return nodeid
+        return len(self.ref) - 1 - len(self._free)
+
+    def forget_keys(self):
+        """
+        Forget the interned sort keys, to free memory once the tree is built.
+        Nodes keep sharing the sort keys they have.
+        """
+        self._keys = {}
 
-    def del_node(self, node):
+    def _intern(self, name):
         """
-        Remove a Node object from the map and return nodeid
+        Return the sort key for name, shared with other nodes of that name.
         """
-        nodeid = id(node)
-        del self.id2node[nodeid]
+        try:
+            return self._keys[name]
+        except KeyError:
+            #sortkey must be localized sort, so
+            sortkey = glocale.sort_key(name) or glocale.sort_key('')
+            self._keys[name] = sortkey
+            return sortkey
+
+    def add(self, ref, parent, name, handle, secondary=False):
+        """
+        Add a node as child of the parent node and return its node id.
+        """
+        name = name or ''
+        sortkey = self._intern(name)
+        if self._free:
+            nodeid = self._free.pop()
+            self.ref[nodeid] = ref
+            self.name[nodeid] = name
+            self.sortkey[nodeid] = sortkey
+            self.handle[nodeid] = handle
+            self.secondary[nodeid] = secondary
+            self.parent[nodeid] = parent
+        else:
+            nodeid = len(self.ref)
+            self.ref.append(ref)
+            self.name.append(name)
+            self.sortkey.append(sortkey)
+            self.handle.append(handle)
+            self.secondary.append(secondary)
+            self.parent.append(parent)
+            self.prev.append(0)
+            self.next.append(0)
+            self.childkeys.append(None)
+            self.childids.append(None)
+        if parent:
+            self._add_child(parent, nodeid)
         return nodeid
 
-    def del_nodeid(self, nodeid):
+    def _add_child(self, parent, nodeid):
         """
-        Remove Node with id nodeid from the map
+        Add a node to the children of parent, keeping them sorted.
         """
-        del self.id2node[nodeid]
+        keys = self.childkeys[parent]
+        sortkey = self.sortkey[nodeid]
+        if keys is None:
+            self.childkeys[parent] = [sortkey]
+            self.childids[parent] = array('L', [nodeid])
+            self.prev[nodeid] = self.next[nodeid] = 0
+            return
+        ids = self.childids[parent]
+        index = bisect_right(keys, sortkey)
+        keys.insert(index, sortkey)
+        ids.insert(index, nodeid)
+        prev = ids[index - 1] if index else 0
+        next = ids[index + 1] if index + 1 < len(ids) else 0
+        self.prev[nodeid] = prev
+        self.next[nodeid] = next
+        if prev:
+            self.next[prev] = nodeid
+        if next:
+            self.prev[next] = nodeid
+
+    def remove(self, nodeid):
+        """
+        Remove a node without children from the tree.
+        """
+        parent = self.parent[nodeid]
+        index = self.index(nodeid)
+        keys = self.childkeys[parent]
+        ids = self.childids[parent]
+        del keys[index]
+        del ids[index]
+        if not ids:
+            self.childkeys[parent] = self.childids[parent] = None
+        prev = self.prev[nodeid]
+        next = self.next[nodeid]
+        if prev:
+            self.next[prev] = next
+        if next:
+            self.prev[next] = prev
+        self.ref[nodeid] = self.name[nodeid] = self.sortkey[nodeid] = None
+        self.handle[nodeid] = None
+        self.parent[nodeid] = self.prev[nodeid] = self.next[nodeid] = 0
+        self._free.append(nodeid)
+
+    def index(self, nodeid):
+        """
+        Return the index of a node in the children of its parent.
+        """
+        parent = self.parent[nodeid]
+        keys = self.childkeys[parent]
+        ids = self.childids[parent]
+        index = bisect_left(keys, self.sortkey[nodeid])
+        end = bisect_right(keys, self.sortkey[nodeid], index)
+        for index in range(index, end):
+            if ids[index] == nodeid:
+                return index
+        raise ValueError(str(self.name[nodeid]) +
+                         ' not present in the children of its parent')
+
+    def set_handle(self, nodeid, handle, secondary=False):
+        """
+        Assign the handle of a Gramps object to a node.
+        """
+        if not self.handle[nodeid] or handle is None:
+            self.handle[nodeid] = handle
+            self.secondary[nodeid] = secondary
+        else:
+            print ('WARNING: Attempt to add handle twice to the node (%s)' %
+                    handle)
 
-    def node(self, nodeid):
+    def n_children(self, nodeid):
         """
-        Obtain the node object from it's id
+        Return the number of children of a node.
         """
-        return self.id2node[nodeid]
+        ids = self.childids[nodeid]
+        return len(ids) if ids else 0
 
-    def clear(self):
+    def node(self, nodeid):
         """
-        clear the map
+        Return a Node giving access to the data of a node.
         """
-        self.id2node.clear()
+        return Node(self, nodeid)
+
+#-------------------------------------------------------------------------
+#
+# Node
+#
+#-------------------------------------------------------------------------
+class Node:
+    """
+    Read-only access to the data of a single node in a NodeStore, for use
+    outside of the model, eg in column_header.
 
+    children    A list of (sortkey, nodeid) tuples for the children of the
+                node.
+    """
+    __slots__ = ('store', 'nodeid')
+
+    def __init__(self, store, nodeid):
+        self.store = store
+        self.nodeid = nodeid
+
+    ref = property(lambda self: self.store.ref[self.nodeid])
+    name = property(lambda self: self.store.name[self.nodeid])
+    sortkey = property(lambda self: self.store.sortkey[self.nodeid])
+    handle = property(lambda self: self.store.handle[self.nodeid])
+    secondary = property(lambda self: bool(self.store.secondary[self.nodeid]))
+    parent = property(lambda self: self.store.parent[self.nodeid] or None)
+    prev = property(lambda self: self.store.prev[self.nodeid] or None)
+    next = property(lambda self: self.store.next[self.nodeid] or None)
+
+    @property
+    def children(self):
+        keys = self.store.childkeys[self.nodeid]
+        if keys is None:
+            return []
+        return list(zip(keys, self.store.childids[self.nodeid]))
 #-------------------------------------------------------------------------
 #
 # TreeBaseModel
@@ -244,15 +312,14 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
     The following data is stored:
 
     tree        A dictionary of unique identifiers which correspond to nodes in
-                the hierarchy.  Each entry is a node object.
-    handle2node A dictionary of gramps handles.  Each entry is a node object.
-    nodemap     A NodeMap, mapping id's of the nodes to the node objects. Node
+                the hierarchy.  Each entry is a node id.
+    handle2node A dictionary of gramps handles.  Each entry is a node id.
+    nodemap     A NodeStore, holding the data of the nodes by node id. Nodes
                 refer to other nodes via id's in a linked list form.
 
     The model obtains data from database as needed and holds a cache of most
     recently used data.
-    As iter for generictreemodel, node is used. This will be the handle for
-    database objects.
+    The user_data of an iter is the node id.
 
     Creation:
     db      :   the database
@@ -306,7 +373,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
 
         # Initialise data structures
         self.tree = {}
-        self.nodemap = NodeMap()
+        self.nodemap = NodeStore()
         self.handle2node = {}
 
         #GTK3 We leak ref, yes??
@@ -414,11 +481,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         self.tree.clear()
         self.handle2node.clear()
         self.stamp += 1
+        #start with a new hidden root node
         self.nodemap.clear()
-        #start with creating the new iters
-        topnode = Node(None, None, None, None, False)
-        self.nodemap.add_node(topnode)
-        self.tree[None] = topnode
+        self.tree[None] = NodeStore.ROOT
 
     def set_search(self, search):
         """
@@ -496,6 +561,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             self._build_data(self.current_filter, self.current_filter2, skip)
         else:
             self._build_data(self.current_filter, None, skip)
+        self.nodemap.forget_keys()
 
         self._in_build = False
 
@@ -627,12 +693,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             self._add_dup_node(child_node, parent, child, sortkey, handle,
                                secondary)
         else:
-            parent_node = self.tree[parent]
-            child_node = Node(child, id(parent_node), sortkey, handle,
-                              secondary)
-            parent_node.add_child(child_node, self.nodemap)
+            child_node = self.nodemap.add(child, self.tree[parent], sortkey,
+                                          handle, secondary)
             self.tree[child] = child_node
-            self.nodemap.add_node(child_node)
 
             if not self._in_build:
                 # emit row_inserted signal
@@ -658,32 +721,31 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
                    % (str(parent), str(child)))
             return
         if handle:
-            node.set_handle(handle, secondary)
+            self.nodemap.set_handle(node, handle, secondary)
             if not self._in_build:
                 self.__total += 1
                 self.__displayed += 1
 
     def remove_node(self, node):
         """
-        Remove a node from the map.
+        Remove a node, given by its node id, from the map.
         """
         self.clear_path_cache()
-        if node.children:
-            del self.handle2node[node.handle]
-            node.set_handle(None)
+        nodemap = self.nodemap
+        if nodemap.childids[node]:
+            del self.handle2node[nodemap.handle[node]]
+            nodemap.set_handle(node, None)
             self.__displayed -= 1
             self.__total -= 1
-        elif node.parent: # don't remove the hidden root node
+        elif nodemap.parent[node]: # don't remove the hidden root node
             iternode = self._get_iter(node)
             path = self.do_get_path(iternode)
-            self.nodemap.node(node.parent).remove_child(node, self.nodemap)
-            del self.tree[node.ref]
-            if node.handle is not None:
-                del self.handle2node[node.handle]
+            del self.tree[nodemap.ref[node]]
+            if nodemap.handle[node] is not None:
+                del self.handle2node[nodemap.handle[node]]
                 self.__displayed -= 1
                 self.__total -= 1
-            self.nodemap.del_node(node)
-            del node
+            nodemap.remove(node)
 
             # emit row_deleted signal
             self.row_deleted(path)
@@ -707,9 +769,10 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         changes to reverse the level, and reattach the model, so the view
         does not update for every change signal.
         """
-        if node.children:
-            rows = list(range(len(node.children)-1,-1,-1))
-            if node.parent is None:
+        children = self.nodemap.childids[node]
+        if children:
+            rows = list(range(len(children)-1,-1,-1))
+            if not self.nodemap.parent[node]:
                 path = iter = None
             else:
                 iternode = self._get_iter(node)
@@ -719,8 +782,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
             if False:
                 self.rows_reordered(path, iter, rows)
             if self.nrgroups > 1:
-                for child in node.children:
-                    self._reverse_level(self.nodemap.node(child[1]))
+                for child in children:
+                    self._reverse_level(child)
 
     def get_tree_levels(self):
         """
@@ -770,13 +833,14 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         if node is None:
             return # row not currently displayed
 
-        parent = self.nodemap.node(node.parent)
+        nodemap = self.nodemap
+        parent = nodemap.parent[node]
         self.remove_node(node)
 
-        while parent is not None:
-            next_parent = parent.parent and self.nodemap.node(parent.parent)
-            if not parent.children:
-                if parent.handle:
+        while parent:
+            next_parent = nodemap.parent[parent]
+            if not nodemap.childids[parent]:
+                if nodemap.handle[parent]:
                     # emit row_has_child_toggled signal
                     iternode = self._get_iter(parent)
                     path = self.do_get_path(iternode)
@@ -819,8 +883,6 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         iter = Gtk.TreeIter()
         iter.stamp = self.stamp
-        #user data should be an object, so we store the long as str
-
         iter.user_data = nodeid
         return iter
 
@@ -832,17 +894,17 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Will raise IndexError if the maps are not filled yet, or if it is empty.
         Caller should take care of this if it allows calling with invalid path
 
-        :param path: node as it appears in the treeview
-        :type path: Node
+        :param node: node id of the node
+        :type node: int
         """
-        if node is None:
+        if not node:
             raise Exception('Not allowed to add None as node')
-        iter = self._new_iter(id(node))
+        iter = self._new_iter(node)
         return iter
 
     def _get_node(self, handle):
         """
-        Get the node for a handle.
+        Get the node id for a handle, or None.
         """
         return self.handle2node.get(handle)
 
@@ -861,8 +923,32 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Get the gramps handle for an iter.  Return None if the iter does
         not correspond to a gramps object.
         """
-        node = self.get_node_from_iter(iter)
-        return node.handle
+        if iter and iter.user_data:
+            return self.nodemap.handle[iter.user_data]
+        return None
+
+    def get_handles_near(self, path, count, backwards=False):
+        """
+        Return the handles of at most count rows following path, or
+        preceding it if backwards is True, nearest first. Only the rows at
+        the level of path are returned, as those of other levels may not be
+        shown.
+        """
+        valid, iter = self.do_get_iter(path)
+        if not valid:
+            return []
+        nodemap = self.nodemap
+        if backwards != self.__reverse:
+            siblings = nodemap.prev
+        else:
+            siblings = nodemap.next
+        handles = []
+        node = siblings[iter.user_data]
+        while node and len(handles) < count:
+            if nodemap.handle[node] is not None:
+                handles.append(nodemap.handle[node])
+            node = siblings[node]
+        return handles
 
     # The following implement the public interface of Gtk.TreeModel
 
@@ -894,8 +980,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         See Gtk.TreeModel
         """
         nodeid = iter.user_data
-        node = self.nodemap.node(nodeid)
-        if node.handle is None:
+        handle = self.nodemap.handle[nodeid]
+        if handle is None:
             # Header rows dont get the foreground color set
             if col == self.color_column():
                 #color must not be utf-8
@@ -903,14 +989,15 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
 
             # Return the node name for the first column
             if col == 0:
-                val = self.column_header(node)
+                val = self.column_header(self.nodemap.node(nodeid))
             else:
                 #no value to show in other header column
                 val = ''
         else:
             # return values for 'data' row, calling a function
             # according to column_defs table
-            val = self._get_value(node.handle, col, node.secondary)
+            val = self._get_value(handle, col,
+                                  bool(self.nodemap.secondary[nodeid]))
 
         if val is None:
             return ''
@@ -951,8 +1038,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Returns a node from a given path.
         """
-        if not self.tree or not self.tree[None].children:
+        if not self.tree or not self.nodemap.childids[self.tree[None]]:
             return False, Gtk.TreeIter()
+        childids = self.nodemap.childids
         node = self.tree[None]
         if isinstance(path, tuple):
             pathlist = path
@@ -961,15 +1049,15 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         for index in pathlist:
             _index = (-index - 1) if self.__reverse else index
             try:
-                if len(node.children[_index]) > 0:
-                    node = self.nodemap.node(node.children[_index][1])
-                else:
-                    return False, Gtk.TreeIter()
-            except IndexError:
+                node = childids[node][_index]
+            except (IndexError, TypeError):
                 return False, Gtk.TreeIter()
         return True, self._get_iter(node)
 
     def get_node_from_iter(self, iter):
+        """
+        Return a Node giving access to the data of the node of an iter.
+        """
         if iter and iter.user_data:
             return self.nodemap.node(iter.user_data)
         else:
@@ -984,36 +1072,17 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         if cached:
             (treepath, pathtup) = path
             return treepath
-        node = self.get_node_from_iter(iter)
+        nodemap = self.nodemap
+        node = iter.user_data
         pathlist = []
-        while node.parent is not None:
-            parent = self.nodemap.node(node.parent)
-            index = -1
-            while node is not None:
-                # Step backwards
-                nodeid = node.next if self.__reverse else node.prev
-                # Let's see if sibling is cached:
-                cached,  sib_path = self.get_cached_path(nodeid)
-                if cached:
-                    (sib_treepath, sib_pathtup) = sib_path
-                    # Does it have an actual path?
-                    if sib_pathtup:
-                        # Compute path to here from sibling:
-                        # parent_path + sib_path + offset
-                        newtup = (sib_pathtup[:-1] +
-                                  (sib_pathtup[-1] + index + 2, ) +
-                                  tuple(reversed(pathlist)))
-                        #print("computed path:", iter.user_data, newtup)
-                        retval = Gtk.TreePath(newtup)
-                        self.set_cached_path(iter.user_data, (retval, newtup))
-                        return retval
-                node = nodeid and self.nodemap.node(nodeid)
-                index += 1
+        while nodemap.parent[node]:
+            index = nodemap.index(node)
+            if self.__reverse:
+                index = nodemap.n_children(nodemap.parent[node]) - 1 - index
             pathlist.append(index)
-            node = parent
+            node = nodemap.parent[node]
         if pathlist:
             pathlist.reverse()
-            #print("actual path :", iter.user_data, tuple(pathlist))
             retval = Gtk.TreePath(tuple(pathlist))
         else:
             retval = None
@@ -1026,8 +1095,9 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         See Gtk.TreeModel
         Get the next node with the same parent as the given node.
         """
-        node = self.get_node_from_iter(iter)
-        val = node.prev if self.__reverse else node.next
+        nodeid = iter.user_data
+        val = self.nodemap.prev[nodeid] if self.__reverse else \
+                self.nodemap.next[nodeid]
         if val:
             #user_data contains the nodeid
             iter.user_data = val
@@ -1040,11 +1110,11 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         Get the first child of the given node.
         """
         if iterparent is None:
-            nodeid = id(self.tree[None])
+            nodeid = self.tree[None]
         else:
-            nodeparent = self.get_node_from_iter(iterparent)
-            if nodeparent.children:
-                nodeid = nodeparent.children[-1 if self.__reverse else 0][1]
+            children = self.nodemap.childids[iterparent.user_data]
+            if children:
+                nodeid = children[-1 if self.__reverse else 0]
             else:
                 return False, None
         return True, self._new_iter(nodeid)
@@ -1053,8 +1123,7 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Find if the given node has any children.
         """
-        node = self.get_node_from_iter(iter)
-        return True if node.children else False
+        return True if self.nodemap.childids[iter.user_data] else False
 
     def do_iter_n_children(self, iter):
         """
@@ -1063,8 +1132,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         if iter is None:
             node = self.tree[None]
         else:
-            node = self.get_node_from_iter(iter)
-        return len(node.children)
+            node = iter.user_data
+        return self.nodemap.n_children(node)
 
     def do_iter_nth_child(self, iterparent, index):
         """
@@ -1073,11 +1142,12 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         if iterparent is None:
             node = self.tree[None]
         else:
-            node = self.get_node_from_iter(iterparent)
-        if node.children:
-            if len(node.children) > index:
+            node = iterparent.user_data
+        children = self.nodemap.childids[node]
+        if children:
+            if len(children) > index:
                 _index = (-index - 1) if self.__reverse else index
-                return True, self._new_iter(node.children[_index][1])
+                return True, self._new_iter(children[_index])
             else:
                 return False, None
         else:
@@ -1087,8 +1157,8 @@ class TreeBaseModel(GObject.GObject, Gtk.TreeModel, BaseModel):
         """
         Get the parent of the given node.
         """
-        node = self.get_node_from_iter(iterchild)
-        if node.parent:
-            return True, self._new_iter(node.parent)
+        parent = self.nodemap.parent[iterchild.user_data]
+        if parent:
+            return True, self._new_iter(parent)
         else:
             return False, None
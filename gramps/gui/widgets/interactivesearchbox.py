@@ -484,7 +484,8 @@ class InteractiveSearchBox:
     def search_iter(self, selection, cur_iter, text, count, n):
         model = self._treeview.get_model()
         is_listonly = (model.get_flags() & Gtk.TreeModelFlags.LIST_ONLY)
-        if is_listonly and hasattr(model, "node_map"):
+        if (is_listonly and hasattr(model, "node_map")
+                and model.node_map.has_sortkey_list()):
             return self.search_iter_sorted_column_flat(selection, cur_iter,
                                                        text, count, n)
         else:
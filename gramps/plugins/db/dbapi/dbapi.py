@@ -39,7 +39,7 @@ from gramps.gen.db.dbconst import (DBLOGNAME, DBBACKEND, KEY_TO_NAME_MAP,
                                    PERSON_KEY, FAMILY_KEY, SOURCE_KEY,
                                    EVENT_KEY, MEDIA_KEY, PLACE_KEY, NOTE_KEY,
                                    TAG_KEY, CITATION_KEY, REPOSITORY_KEY,
-                                   REFERENCE_KEY)
+                                   REFERENCE_KEY, ARRAYSIZE)
 from gramps.gen.db.generic import DbGeneric
 from gramps.gen.lib import (Tag, Media, Person, Family, Source,
                             Citation, Event, Place, Repository, Note)
@@ -53,6 +53,16 @@ class DBAPI(DbGeneric):
     """
     Database backends class for DB-API 2.0 databases
     """
+    def __init__(self, directory=None):
+        DbGeneric.__init__(self, directory)
+        # Flat views can fetch windows of sorted rows from us:
+        self.set_feature("sort-window", True)
+        # Views can read from us in another thread, see open_reader:
+        self.set_feature("reader", True)
+        # The number of people with each surname is kept, see
+        # get_surname_counts:
+        self.set_feature("surname-counts", True)
+
     def _initialize(self, directory, username, password):
         raise NotImplementedError
 
@@ -150,6 +160,7 @@ class DBAPI(DbGeneric):
                            'male INTEGER, '
                            'unknown INTEGER'
                            ')')
+        self._create_surname_table()
 
         self._create_secondary_columns()
 
@@ -195,6 +206,30 @@ class DBAPI(DbGeneric):
 
         self.dbapi.commit()
 
+    def _create_surname_table(self):
+        """
+        Create the table of the number of people with each surname, the
+        surname of the primary name of the people.
+        """
+        self.dbapi.execute('CREATE TABLE surname '
+                           '('
+                           'surname TEXT PRIMARY KEY NOT NULL, '
+                           'people INTEGER'
+                           ')')
+
+    def _update_schema(self):
+        """
+        Add the table of surnames to a database created without it.
+        """
+        if self.dbapi.table_exists("surname"):
+            return
+        self.dbapi.begin()
+        self._create_surname_table()
+        self.dbapi.execute("INSERT INTO surname (surname, people) "
+                           "SELECT surname, count(1) FROM person "
+                           "WHERE surname IS NOT NULL GROUP BY surname")
+        self.dbapi.commit()
+
     def _close(self):
         self.dbapi.close()
 
@@ -559,6 +594,127 @@ class DBAPI(DbGeneric):
         row = self.dbapi.fetchone()
         return row[0]
 
+    def _sort_expressions(self, table, columns, locale):
+        """
+        Return the SQL table name and the list of SQL sort expressions for
+        the given secondary columns of a primary object table.
+        """
+        cls = self._get_table_func(table, "class_func")
+        types = dict((field, schema_type) for (field, schema_type, max_length)
+                     in cls.get_secondary_fields())
+        if table == 'Person':
+            types.update({'given_name': 'string', 'surname': 'string'})
+        if locale != glocale:
+            self.dbapi.check_collation(locale)
+        exprs = []
+        for column in columns:
+            if column not in types:
+                raise ValueError("%s is not a secondary column of %s" %
+                                 (column, table))
+            if types[column] == 'string':
+                exprs.append("COALESCE(%s, '') COLLATE \"%s\"" %
+                             (column, locale.get_collation()))
+            else:
+                exprs.append("COALESCE(%s, 0)" % column)
+        return table.lower(), exprs
+
+    @staticmethod
+    def _sort_key_condition(exprs, operator):
+        """
+        Return a SQL condition selecting the rows that sort before ('<') or
+        after ('>') a given (sort_values, handle) key, and a function
+        turning that key into the matching list of SQL parameters.
+
+        The condition is the expanded form of the row value comparison
+        (expr1, expr2, ..., handle) > (?, ?, ..., ?), so that it can make
+        use of the collation of each sort expression.
+        """
+        terms = []
+        for pos, expr in enumerate(exprs + ['handle']):
+            term = ["%s = ?" % prev for prev in (exprs + ['handle'])[:pos]]
+            term.append("%s %s ?" % (expr, operator))
+            terms.append("(%s)" % " AND ".join(term))
+
+        def params(key):
+            values = list(key[0]) + [key[1]]
+            result = []
+            for pos in range(len(values)):
+                result.extend(values[:pos + 1])
+            return result
+        return " OR ".join(terms), params
+
+    def get_sort_window(self, table, columns, after=None, offset=0,
+                        limit=ARRAYSIZE, locale=glocale):
+        """
+        Return a list of (sort_values, handle) tuples, one for each object of
+        the table, in the order given by the secondary columns and then by
+        handle. Only a window of at most limit rows is returned.
+
+        :param table: The primary object class name, eg. 'Person'.
+        :type table: str
+        :param columns: The secondary columns to sort on.
+        :type columns: tuple of str
+        :param after: If given, return the rows directly following this
+                      (sort_values, handle) key. This keyset pagination
+                      avoids reading all rows before the window.
+        :type after: tuple
+        :param offset: Number of rows to skip when after is not given.
+        :type offset: int
+        :param limit: Maximum number of rows to return.
+        :type limit: int
+        :param locale: The locale to use for collation.
+        :type locale: A GrampsLocale object.
+        """
+        table_name, exprs = self._sort_expressions(table, columns, locale)
+        sql = "SELECT %s, handle FROM %s " % (", ".join(exprs), table_name)
+        if after is None:
+            params = [limit, offset]
+            limit_sql = "LIMIT ? OFFSET ?"
+        else:
+            condition, key_params = self._sort_key_condition(exprs, ">")
+            sql += "WHERE %s " % condition
+            params = key_params(after) + [limit]
+            limit_sql = "LIMIT ?"
+        sql += "ORDER BY %s, handle %s" % (", ".join(exprs), limit_sql)
+        self.dbapi.execute(sql, params)
+        return [(tuple(row[:-1]), row[-1]) for row in self.dbapi.fetchall()]
+
+    def get_sort_position(self, table, columns, handle, locale=glocale):
+        """
+        Return the position of the object with the given handle in the
+        order used by :meth:`get_sort_window`, or None if there is no
+        such object.
+        """
+        table_name, exprs = self._sort_expressions(table, columns, locale)
+        self.dbapi.execute("SELECT %s FROM %s WHERE handle = ?" %
+                           (", ".join(exprs), table_name), [handle])
+        row = self.dbapi.fetchone()
+        if row is None:
+            return None
+        condition, key_params = self._sort_key_condition(exprs, "<")
+        self.dbapi.execute("SELECT count(1) FROM %s WHERE %s" %
+                           (table_name, condition),
+                           key_params((tuple(row), handle)))
+        return self.dbapi.fetchone()[0]
+
+    def open_reader(self):
+        """
+        Open a new, read-only connection to this database, to read it from
+        another thread, eg to prefetch data for the views. The returned
+        database must only be used, and closed, in the thread that opened it.
+
+        Return None if there can be no other connection to this database,
+        eg for an in-memory database.
+        """
+        if not self._directory or self._directory == ':memory:':
+            return None
+        reader = self.__class__()
+        reader.readonly = True
+        reader._initialize(self._directory, None, None)
+        reader._set_save_path(self._directory)
+        reader.db_is_open = True
+        return reader
+
     def has_name_group_key(self, key):
         """
         Return if a key exists in the name_group table.
@@ -606,6 +762,7 @@ class DBAPI(DbGeneric):
                                [obj.handle,
                                 pickle.dumps(obj.serialize())])
         self._update_secondary_values(obj)
+        self._add_gramps_id(obj_key, obj)
         if not trans.batch:
             self._update_backlinks(obj, trans)
             if old_data:
@@ -669,6 +826,8 @@ class DBAPI(DbGeneric):
             data = self._get_raw_data(obj_key, handle)
             obj_class = KEY_TO_CLASS_MAP[obj_key]
             self._remove_backlinks(obj_class, handle, transaction)
+            if obj_key == PERSON_KEY:
+                self._update_surname(handle, None)
             table = KEY_TO_NAME_MAP[obj_key]
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
@@ -900,6 +1059,8 @@ class DBAPI(DbGeneric):
         cls = KEY_TO_CLASS_MAP[obj_key]
         table = cls.lower()
         if data is None:
+            if obj_key == PERSON_KEY:
+                self._update_surname(handle, None)
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
         else:
@@ -911,18 +1072,76 @@ class DBAPI(DbGeneric):
                 self.dbapi.execute(sql, [handle, pickle.dumps(data)])
             obj = self._get_table_func(cls)["class_func"].create(data)
             self._update_secondary_values(obj)
+            self._add_gramps_id(obj_key, obj)
 
     def get_surname_list(self):
         """
         Return the list of locale-sorted surnames contained in the database.
         """
-        self.dbapi.execute("SELECT DISTINCT surname "
-                           "FROM person "
-                           "ORDER BY surname")
-        surname_list = []
-        for row in self.dbapi.fetchall():
-            surname_list.append(row[0])
-        return surname_list
+        return [surname for (surname, count) in self.get_surname_counts()]
+
+    def get_surname_counts(self, locale=glocale):
+        """
+        Return a list of (surname, count) tuples, with the number of people
+        with each surname as the first surname of their primary name,
+        sorted by surname.
+
+        :param locale: The locale to use for collation.
+        :type locale: A GrampsLocale object.
+        """
+        if locale != glocale:
+            self.dbapi.check_collation(locale)
+        if self.dbapi.table_exists("surname"):
+            sql = ("SELECT surname, people FROM surname "
+                   "ORDER BY surname COLLATE \"%s\"")
+        else:
+            # a read-only database created without the table
+            sql = ("SELECT surname, count(1) FROM person "
+                   "WHERE surname IS NOT NULL GROUP BY surname "
+                   "ORDER BY surname COLLATE \"%s\"")
+        self.dbapi.execute(sql % locale.get_collation())
+        return self.dbapi.fetchall()
+
+    def add_to_surname_list(self, person, batch_transaction):
+        """
+        The table of surnames is updated with the secondary values of the
+        people.
+        """
+        pass
+
+    def remove_from_surname_list(self, person):
+        """
+        The table of surnames is updated with the secondary values of the
+        people.
+        """
+        pass
+
+    def _update_surname(self, handle, surname):
+        """
+        Count a person in the table of surnames with a new surname, or None
+        for a removed person, instead of the surname stored with the person.
+        """
+        self.dbapi.execute("SELECT surname FROM person WHERE handle = ?",
+                           [handle])
+        row = self.dbapi.fetchone()
+        old_surname = row[0] if row else None
+        if old_surname == surname:
+            return
+        if old_surname is not None:
+            self.dbapi.execute("UPDATE surname SET people = people - 1 "
+                               "WHERE surname = ?", [old_surname])
+            self.dbapi.execute("DELETE FROM surname "
+                               "WHERE surname = ? AND people <= 0",
+                               [old_surname])
+        if surname is not None:
+            self.dbapi.execute("SELECT people FROM surname WHERE surname = ?",
+                               [surname])
+            if self.dbapi.fetchone() is None:
+                self.dbapi.execute("INSERT INTO surname (surname, people) "
+                                   "VALUES (?, 1)", [surname])
+            else:
+                self.dbapi.execute("UPDATE surname SET people = people + 1 "
+                                   "WHERE surname = ?", [surname])
 
     def _sql_type(self, schema_type, max_length):
         """
@@ -972,6 +1191,7 @@ class DBAPI(DbGeneric):
         # Derived fields
         if table == 'Person':
             given_name, surname = self._get_person_data(obj)
+            self._update_surname(obj.handle, surname)
             sets.append("given_name = ?")
             values.append(given_name)
             sets.append("surname = ?")
@@ -23,6 +23,9 @@
 # Standard python modules
 #
 #-------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
 import unittest
 
 #-------------------------------------------------------------------------
@@ -30,10 +33,12 @@ import unittest
 # Gramps modules
 #
 #-------------------------------------------------------------------------
-from gramps.gen.db import DbTxn
+from gramps.gen.config import config
+from gramps.gen.db import DbTxn, generic
 from gramps.gen.db.utils import make_database
 from gramps.gen.lib import (Person, Family, Event, Place, Repository, Source,
-                            Citation, Media, Note, Tag, Researcher, Surname)
+                            Citation, Media, Note, Tag, Researcher, Surname,
+                            EventType)
 
 #-------------------------------------------------------------------------
 #
@@ -745,6 +750,34 @@ class DbEmptyTest(unittest.TestCase):
         person = self.db.find_initial_person()
         self.assertIsNone(person)
 
+    ################################################################
+    #
+    # Test reader connections
+    #
+    ################################################################
+
+    def test_no_reader_in_memory(self):
+        self.assertTrue(self.db.get_feature("reader"))
+        self.assertIsNone(self.db.open_reader())
+
+    def test_reader(self):
+        directory = tempfile.mkdtemp()
+        try:
+            db = make_database("sqlite")
+            db.load(directory)
+            with DbTxn('Add test objects', db) as trans:
+                handle = db.add_person(Person(), trans)
+            reader = db.open_reader()
+            self.assertTrue(reader.readonly)
+            self.assertEqual(reader.get_raw_person_data(handle),
+                             db.get_raw_person_data(handle))
+            reader.close()
+            # closing the reader does not remove the lock of the database
+            self.assertTrue(os.path.exists(os.path.join(directory, 'lock')))
+            db.close()
+        finally:
+            shutil.rmtree(directory)
+
     ################################################################
     #
     # Test researcher methods
@@ -850,6 +883,31 @@ class DbPersonTest(unittest.TestCase):
         for surname in surname_list:
             self.assertIn(surname, self.all_surnames)
 
+    def test_surname_counts(self):
+        self.assertEqual(self.db.get_surname_counts(),
+                         [('Allen', 2), ('Baker', 2), ('Clark', 2),
+                          ('Davis', 2), ('Evans', 2)])
+        handles = self.db.get_person_handles(sort_handles=True)
+        with DbTxn('Edit people', self.db) as trans:
+            person = self.db.get_person_from_handle(handles[0])
+            person.primary_name.get_surname_list()[0].set_surname('Baker')
+            self.db.commit_person(person, trans)
+            self.db.remove_person(handles[1], trans)
+            self.db.remove_person(handles[9], trans)
+        self.assertEqual(self.db.get_surname_counts(),
+                         [('Baker', 3), ('Clark', 2), ('Davis', 2),
+                          ('Evans', 1)])
+        self.db.undo()
+        self.assertEqual(self.db.get_surname_counts(),
+                         [('Allen', 2), ('Baker', 2), ('Clark', 2),
+                          ('Davis', 2), ('Evans', 2)])
+
+    def test_surname_table(self):
+        counts = self.db.get_surname_counts()
+        self.db.dbapi.execute("DROP TABLE surname")
+        self.db._update_schema()
+        self.assertEqual(self.db.get_surname_counts(), counts)
+
     ################################################################
     #
     # Test gender stats
@@ -865,6 +923,232 @@ class DbPersonTest(unittest.TestCase):
         self.assertEqual(saved['John'], (3, 1, 1))
         self.assertEqual(saved['Mary'], (1, 4, 0))
 
+    ################################################################
+    #
+    # Test sorted windows
+    #
+    ################################################################
+
+    def test_sort_window_feature(self):
+        self.assertTrue(self.db.get_feature("sort-window"))
+
+    def test_sort_window(self):
+        columns = ('surname', 'given_name')
+        rows = self.db.get_sort_window('Person', columns)
+        self.assertEqual(len(rows), 10)
+        names = [key for key, handle in rows]
+        self.assertEqual(names[:3], [('Allen', 'John'), ('Allen', 'Mary'),
+                                     ('Baker', 'John')])
+        self.assertEqual(names[-1], ('Evans', 'Mary'))
+        # keyset pagination returns the same rows as an offset
+        for offset in range(1, 10):
+            self.assertEqual(
+                self.db.get_sort_window('Person', columns,
+                                        after=rows[offset - 1], limit=3),
+                self.db.get_sort_window('Person', columns,
+                                        offset=offset, limit=3))
+
+    def test_sort_position(self):
+        columns = ('surname', 'given_name')
+        rows = self.db.get_sort_window('Person', columns)
+        for index, (key, handle) in enumerate(rows):
+            self.assertEqual(
+                self.db.get_sort_position('Person', columns, handle), index)
+        self.assertIsNone(
+            self.db.get_sort_position('Person', columns, 'nonexistent'))
+
+    def test_sort_window_bad_column(self):
+        self.assertRaises(ValueError, self.db.get_sort_window,
+                          'Person', ('nonexistent',))
+
+#-------------------------------------------------------------------------
+#
+# DbLoadTest class
+#
+#-------------------------------------------------------------------------
+class DbLoadTest(unittest.TestCase):
+    '''
+    Tests of the opening of a database.
+    '''
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def __load(self):
+        db = make_database("sqlite")
+        db.load(self.directory)
+        return db
+
+    def test_lazy(self):
+        db = self.__load()
+        self.assertNotIn('event_names', db.__dict__)
+        self.assertNotIn('genderStats', db.__dict__)
+        with DbTxn('Add event', db) as trans:
+            event = Event()
+            event.set_type((EventType.CUSTOM, 'Party'))
+            db.add_event(event, trans)
+        self.assertEqual(db.get_event_types(), ['Party'])
+        steps = [step for (step, seconds) in db.get_load_profile()]
+        self.assertEqual(steps[:2], ['backend', 'schema'])
+        self.assertIn('event_names', steps)
+        self.assertNotIn('genderStats', steps)
+        db.close()
+
+        db = self.__load()
+        self.assertEqual(db.get_event_types(), ['Party'])
+        self.assertEqual(db.get_person_attribute_types(), [])
+        db.close()
+
+#-------------------------------------------------------------------------
+#
+# DbUndoTest class
+#
+#-------------------------------------------------------------------------
+class DbUndoTest(unittest.TestCase):
+    '''
+    Tests of the undo log.
+    '''
+
+    def setUp(self):
+        self.depth = config.get('database.undo-depth')
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+        config.set('database.undo-depth', self.depth)
+
+    def __add_notes(self, count):
+        handles = []
+        for index in range(count):
+            with DbTxn('Add note %d' % index, self.db) as trans:
+                note = Note('note %d' % index)
+                self.db.add_note(note, trans)
+                handles.append(note.handle)
+        return handles
+
+    def test_undo_redo(self):
+        handles = self.__add_notes(3)
+        self.assertTrue(self.db.undo())
+        self.assertFalse(self.db.has_note_handle(handles[2]))
+        self.assertTrue(self.db.redo())
+        self.assertEqual(self.db.get_note_from_handle(handles[2]).get(),
+                         'note 2')
+
+    def test_depth(self):
+        config.set('database.undo-depth', 2)
+        handles = self.__add_notes(5)
+        undodb = self.db.get_undodb()
+        self.assertEqual(undodb.undo_count, 2)
+        self.assertEqual(len(undodb.offsets), 2)
+        self.assertTrue(self.db.undo())
+        self.assertTrue(self.db.undo())
+        self.assertFalse(self.db.undo())
+        self.assertEqual(self.db.get_number_of_notes(), 3)
+        self.assertTrue(self.db.redo())
+        self.assertTrue(self.db.has_note_handle(handles[3]))
+
+    def test_compact(self):
+        config.set('database.undo-depth', 1)
+        compact = generic._UNDO_COMPACT
+        generic._UNDO_COMPACT = 1
+        try:
+            handles = self.__add_notes(5)
+        finally:
+            generic._UNDO_COMPACT = compact
+        undodb = self.db.get_undodb()
+        # the file is compacted when the dropped records are as large as
+        # the records still needed
+        undodb.undodb.seek(0, os.SEEK_END)
+        self.assertLess(undodb.offsets[0],
+                        undodb.undodb.tell() - undodb.offsets[0])
+        self.assertTrue(self.db.undo())
+        self.assertFalse(self.db.has_note_handle(handles[4]))
+        self.assertTrue(self.db.has_note_handle(handles[3]))
+
+    def test_files(self):
+        dirname = tempfile.mkdtemp()
+        try:
+            path = os.path.join(dirname, 'undo.db')
+            first = generic.DbGenericUndo(self.db, path)
+            second = generic.DbGenericUndo(self.db, path)
+            first.open()
+            second.open()
+            # no file is left in the directory of the tree
+            self.assertEqual(os.listdir(dirname), [])
+            first.append(b'first')
+            second.append(b'second')
+            self.assertEqual(first[0], b'first')
+            first.close()
+            self.assertEqual(second[0], b'second')
+            second.close()
+        finally:
+            shutil.rmtree(dirname)
+
+#-------------------------------------------------------------------------
+#
+# DbGrampsIdTest class
+#
+#-------------------------------------------------------------------------
+class DbGrampsIdTest(unittest.TestCase):
+    '''
+    Tests of the allocation of Gramps IDs.
+    '''
+
+    def setUp(self):
+        self.db = make_database("sqlite")
+        self.db.load(":memory:")
+
+    def tearDown(self):
+        self.db.close()
+
+    def __add_people(self, gramps_ids):
+        with DbTxn('Add people', self.db) as trans:
+            for gramps_id in gramps_ids:
+                person = Person()
+                person.set_gramps_id(gramps_id)
+                self.db.add_person(person, trans)
+
+    def test_next_id(self):
+        self.__add_people(['I%04d' % number for number in range(100)] +
+                          ['I0101', 'I102', 'X0103'])
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'I0100')
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'I0102')
+        self.__add_people(['I0103'])
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'I0104')
+
+    def test_add(self):
+        self.__add_people(['I0001'])
+        with DbTxn('Add people', self.db) as trans:
+            for dummy in range(3):
+                self.db.add_person(Person(), trans)
+        self.assertEqual(sorted(self.db.get_person_gramps_ids()),
+                         ['I0000', 'I0001', 'I0002', 'I0003'])
+
+    def test_undo(self):
+        self.__add_people(['I0000'])
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'I0001')
+        person = self.db.get_person_from_gramps_id('I0000')
+        with DbTxn('Edit person', self.db) as trans:
+            person.set_gramps_id('I0005')
+            self.db.commit_person(person, trans)
+        self.db.undo()
+        self.db.pmap_index = 0
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'I0001')
+
+    def test_prefix(self):
+        self.__add_people(['I0000', 'X1', 'X2', 'Y%3'])
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'I0001')
+        self.db.set_person_id_prefix('X%d')
+        self.db.pmap_index = 1
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'X3')
+        self.db.set_person_id_prefix('Y%%%d')
+        self.db.pmap_index = 3
+        self.assertEqual(self.db.find_next_person_gramps_id(), 'Y%4')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -52,7 +52,6 @@ from gramps.gen.plug.docgen import (
     PAPER_PORTRAIT, INDEX_TYPE_TOC, PARA_ALIGN_CENTER, PARA_ALIGN_LEFT,
     INDEX_TYPE_ALP, PARA_ALIGN_RIGHT, URL_PATTERN, LOCAL_HYPERLINK,
     LOCAL_TARGET)
-from gramps.gen.plug.docgen.fontscale import string_width
 from gramps.plugins.lib.libodfbackend import OdfBackend
 from gramps.gen.const import PROGRAM_NAME, URL_HOMEPAGE
 from gramps.version import VERSION
@@ -1734,7 +1733,7 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         height = size * (len(text))
         width = 0
         for line in text:
-            width = max(width, string_width(font, line))
+            width = max(width, self.string_width(font, line))
         wcm = utils.pt2cm(width)
         hcm = utils.pt2cm(height)
 
@@ -1824,7 +1823,7 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         para_name = box_style.get_paragraph_style()
         pstyle = style_sheet.get_paragraph_style(para_name)
         font = pstyle.get_font()
-        sw = utils.pt2cm(string_width(font, text))*1.3
+        sw = utils.pt2cm(self.string_width(font, text))*1.3
 
         self._write_mark(mark, text)
 
@@ -1904,7 +1903,7 @@ class ODFDoc(BaseDoc, TextDoc, DrawDoc):
         pstyle = style_sheet.get_paragraph_style(para_name)
         font = pstyle.get_font()
 
-        size = (string_width(font, text) / 72.0) * 2.54
+        size = (self.string_width(font, text) / 72.0) * 2.54
 
         self._write_mark(mark, text)
 
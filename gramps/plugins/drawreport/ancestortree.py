@@ -387,14 +387,13 @@ class LRTransform:
     def __init__(self, canvas, max_generations):
         self.canvas = canvas
         self.rept_opts = canvas.report_opts
+        self.layout = ColumnLayout(self.rept_opts)
         self.y_offset = self.rept_opts.littleoffset*2 + self.canvas.title.height
 
     def _place(self, box):
         """ put the box in it's correct spot """
         #1. cm_x
-        box.x_cm = self.rept_opts.littleoffset
-        box.x_cm += (box.level[LVL_GEN] *
-                     (self.rept_opts.col_width + self.rept_opts.max_box_width))
+        box.x_cm = self.layout.column_x(box.level[LVL_GEN])
         #2. cm_y
         box.y_cm = self.rept_opts.max_box_height + self.rept_opts.box_pgap
         box.y_cm *= box.level[LVL_Y]
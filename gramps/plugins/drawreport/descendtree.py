@@ -966,7 +966,7 @@ class MakeReport:
 
         self.ind_spouse = ind_spouse
         self.compress_tree = compress_tree
-        self.cols = [[]]
+        self.layout = ColumnLayout(canvas.report_opts)
         #self.max_generations = 0
 
     #already done in recurse,
@@ -980,34 +980,18 @@ class MakeReport:
         if box.height > self.canvas.report_opts.max_box_height:
             self.canvas.report_opts.max_box_height = box.height
 
-        while len(self.cols) <= box.level[0]:
-            self.cols.append([])
-
-        self.cols[box.level[0]].append(box)
-
         #tmp = box.level[0]
         #if tmp > self.max_generations:
         #    self.max_generations = tmp
 
     def __move_col_from_here_down(self, box, amount):
         """Move me and everyone below me in this column only down"""
-        while box:
-            box.y_cm += amount
-            box = box.linked_box
+        self.layout.move_down(box, amount)
 
     def __move_next_cols_from_here_down(self, box, amount):
         """Move me, everyone below me in this column,
         and all of our children (and childrens children) down."""
-        col = [box]
-        while col:
-            if len(col) == 1 and col[0].line_to:
-                col.append(col[0].line_to.end[0])
-
-            col[0].y_cm += amount
-
-            col[0] = col[0].linked_box
-            if col[0] is None:
-                col.pop(0)
+        self.layout.move_down(box, amount, next_cols=True)
 
     def __next_family_group(self, box):
         """ a helper function.  Assume box is at the start of a family block.
@@ -1055,8 +1039,8 @@ class MakeReport:
     def __reverse_family_group(self):
         """ go through the n-1 to 0 cols of boxes looking for families
         (parents with children) that may need to be moved. """
-        for x_col in range(len(self.cols)-1, -1, -1):
-            box = self.cols[x_col][0]   #The first person in this col
+        for x_col in range(len(self.layout.cols)-1, -1, -1):
+            box = self.layout.cols[x_col][0]   #The first person in this col
             while box:
                 left_group, right_group = self.__next_family_group(box)
                 if not left_group:
@@ -1072,8 +1056,9 @@ class MakeReport:
         return a right y_cm and a left y_cm.  these points will be used
         to move parents/children down.
         """
-        left_up = left_group[0].y_cm
-        right_up = right_group[0].y_cm
+        get_y = self.layout.get_y
+        left_up = get_y(left_group[0])
+        right_up = get_y(right_group[0])
 
         left_center = left_up
         right_center = right_up
@@ -1083,14 +1068,14 @@ class MakeReport:
             for left_line in left_group:
                 if left_line.line_to:
                     break
-            left_center = left_line.y_cm + (left_line.height /2)
+            left_center = get_y(left_line) + (left_line.height /2)
 
-            left_down = left_group[-1].y_cm + left_group[-1].height
-            right_down = right_group[-1].y_cm + right_group[-1].height
+            left_down = get_y(left_group[-1]) + left_group[-1].height
+            right_down = get_y(right_group[-1]) + right_group[-1].height
 
             #Lazy.  Move down either side only as much as we NEED to.
             if left_center < right_up:
-                right_center = right_group[0].y_cm
+                right_center = right_up
             elif left_up == right_up:
                 left_center = left_up #Lets keep it.  top line.
             elif left_center > right_down:
@@ -1140,8 +1125,9 @@ class MakeReport:
                 #only do Dad and Mom.  len(left_line) > 1
                 seen_parents = True
 
-                mom_cm = left_group[-1].y_cm + left_group[-1].height/2
-                last_child_cm = right_group[-1].y_cm
+                mom_cm = (self.layout.get_y(left_group[-1]) +
+                          left_group[-1].height/2)
+                last_child_cm = self.layout.get_y(right_group[-1])
                 if not self.compress_tree:
                     last_child_cm += right_group[-1].height/2
                 move_amt = last_child_cm - mom_cm
@@ -1160,6 +1146,9 @@ class MakeReport:
                 if left_line.end[0].boxstr == 'None':
                     left_line.end = []
 
+        #now everyone can be moved where they belong
+        self.layout.apply()
+
     def start(self):
         """Make the report"""
         #for person in self.persons.depth_first_gen():
@@ -1169,11 +1158,10 @@ class MakeReport:
         #Width of each column of people - self.rept_opt.box_width
         #width of each column (or row) of lines - self.rept_opt.col_width
 
-        if not self.cols[0]:
+        if all(box.level[0] for box in self.canvas.boxes):
             #We wanted to print parents of starting person/family but
             #there were none!
             #remove column 0 and move everyone back one level
-            self.cols.pop(0)
             for box in self.canvas.boxes:
                 box.level = (box.level[0] - 1, box.level[1])
 
@@ -1181,14 +1169,13 @@ class MakeReport:
         width = self.canvas.report_opts.max_box_width
         for box in self.canvas.boxes:
             box.width = width - box.x_cm
-            box.x_cm += self.canvas.report_opts.littleoffset
-            box.x_cm += (box.level[0] *
-                         (self.canvas.report_opts.col_width +
-                          self.canvas.report_opts.max_box_width))
+            box.x_cm += self.layout.column_x(box.level[0])
 
             box.y_cm += self.canvas.report_opts.littleoffset
             box.y_cm += self.canvas.title.height
 
+            self.layout.add_box(box)
+
         self.Make_report()
 
 
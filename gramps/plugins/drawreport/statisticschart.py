@@ -32,6 +32,7 @@
 #
 #------------------------------------------------------------------------
 import time
+from collections import Counter
 from functools import partial
 
 #------------------------------------------------------------------------
@@ -255,6 +256,13 @@ def estimate_age(dbase, person,
         else:
             return (-1, -1)
 
+    return _estimate_date_age(bdata, ddata)
+
+def _estimate_date_age(bdata, ddata):
+    """
+    Estimate the lower and upper bounds of the number of years between two
+    dates, as :func:`estimate_age`.
+    """
     # if the date is not valid, return an error message
     if not bdata.get_valid() or not ddata.get_valid():
         return (-1, -1)
@@ -317,6 +325,105 @@ def _T_(value): # enable deferred translations (see Python docs 22.1.3.4)
     return value
 # _T_ is a gramps-defined keyword -- see po/update_po.py and po/genpot.sh
 
+#------------------------------------------------------------------------
+#
+# Facts of a person shared by the charts
+#
+#------------------------------------------------------------------------
+_UNSET = object()
+
+class _PersonFacts:
+    """
+    The facts of a person used by the charts. Each fact is read from the
+    database the first time a chart needs it, and then shared by the other
+    charts, so that the people are gone through only once whatever the
+    number of charts.
+    """
+
+    def __init__(self, dbase, person):
+        self.db = dbase
+        self.person = person
+        self.__birth = _UNSET
+        self.__death = _UNSET
+        self.__families = None
+        self.__children = None
+        self.__marriages = None
+        self.__ages = {}
+
+    def __get_event(self, event_ref):
+        if event_ref:
+            return self.db.get_event_from_handle(event_ref.ref)
+        return None
+
+    @property
+    def birth(self):
+        "the birth event of the person, or None"
+        if self.__birth is _UNSET:
+            self.__birth = self.__get_event(self.person.get_birth_ref())
+        return self.__birth
+
+    @property
+    def death(self):
+        "the death event of the person, or None"
+        if self.__death is _UNSET:
+            self.__death = self.__get_event(self.person.get_death_ref())
+        return self.__death
+
+    @property
+    def families(self):
+        "the families in which the person is a parent"
+        if self.__families is None:
+            self.__families = [
+                self.db.get_family_from_handle(handle)
+                for handle in self.person.get_family_handle_list()]
+        return self.__families
+
+    @property
+    def children(self):
+        "the handles of the children of the person"
+        if self.__children is None:
+            self.__children = [child_ref.ref
+                               for family in self.families
+                               for child_ref in family.get_child_ref_list()]
+        return self.__children
+
+    @property
+    def marriages(self):
+        "the handles of the marriage events of the person"
+        if self.__marriages is None:
+            self.__marriages = []
+            for family in self.families:
+                if int(family.get_relationship()) != FamilyRelType.MARRIED:
+                    continue
+                for event_ref in family.get_event_ref_list():
+                    event = self.db.get_event_from_handle(event_ref.ref)
+                    if (event.get_type() == EventType.MARRIAGE and
+                            (event_ref.get_role() == EventRoleType.FAMILY or
+                             event_ref.get_role() == EventRoleType.PRIMARY)):
+                        self.__marriages.append(event_ref.ref)
+        return self.__marriages
+
+    def age(self, end_handle=None):
+        """
+        Return the lower and upper bounds of the age of the person at the
+        given event, or at death or today if None, as :func:`estimate_age`.
+        """
+        if end_handle not in self.__ages:
+            age = (-1, -1)
+            if self.birth:
+                if end_handle:
+                    end = self.db.get_event_from_handle(end_handle)
+                else:
+                    end = self.death
+                if end:
+                    age = _estimate_date_age(self.birth.get_date_object(),
+                                             end.get_date_object())
+                else:
+                    age = _estimate_date_age(self.birth.get_date_object(),
+                                             _TODAY)
+            self.__ages[end_handle] = age
+        return self.__ages[end_handle]
+
 #------------------------------------------------------------------------
 #
 # Data extraction methods from the database
@@ -367,9 +474,9 @@ class Extract:
             'data_mage':   ("Age at marriage", _T_("Age at marriage"),
                             self.get_marriage_handles, self.get_event_ages),
             'data_dage':   ("Age at death", _T_("Age at death"),
-                            self.get_person, self.get_death_age),
+                            self.get_facts, self.get_death_age),
             'data_age':    ("Age", _T_("Age"),
-                            self.get_person, self.get_person_age),
+                            self.get_facts, self.get_person_age),
             'data_etypes': ("Event type", _T_("Event type"),
                             self.get_event_handles, self.get_event_type)
         }
@@ -426,21 +533,11 @@ class Extract:
 
     def get_month(self, event):
         "return month for given event"
-        date_displayer = self._locale.date_displayer
-        CAL_TO_LONG_MONTHS_NAMES = {
-            Date.CAL_GREGORIAN  : date_displayer.long_months,
-            Date.CAL_JULIAN     : date_displayer.long_months,
-            Date.CAL_HEBREW     : date_displayer.hebrew,
-            Date.CAL_FRENCH     : date_displayer.french,
-            Date.CAL_PERSIAN    : date_displayer.persian,
-            Date.CAL_ISLAMIC    : date_displayer.islamic,
-            Date.CAL_SWEDISH    : date_displayer.swedish }
-
         date = event.get_date_object()
         if date:
             month = date.get_month()
             if month:
-                month_names = CAL_TO_LONG_MONTHS_NAMES[date.get_calendar()]
+                month_names = self._month_names[date.get_calendar()]
                 return [month_names[month]]
         return [_T_("Date(s) missing")]
 
@@ -454,9 +551,9 @@ class Extract:
         return [_T_("Place missing")]
 
     def get_places(self, data):
-        "return places for given (person,event_handles)"
+        "return places for given (person facts,event_handles)"
         places = []
-        person, event_handles = data
+        facts, event_handles = data
         for event_handle in event_handles:
             event = self.db.get_event_from_handle(event_handle)
             place_handle = event.get_place_handle()
@@ -468,32 +565,32 @@ class Extract:
                 places.append(_T_("Place missing"))
         return places
 
-    def get_person_age(self, person):
-        "return age for given person, if alive"
-        death_ref = person.get_death_ref()
+    def get_person_age(self, facts):
+        "return age for given person facts, if alive"
+        death_ref = facts.person.get_death_ref()
         if not death_ref:
-            return [self.estimate_age(person)]
+            return [self.estimate_age(facts)]
         return [_T_("Already dead")]
 
-    def get_death_age(self, person):
-        "return age at death for given person, if dead"
-        death_ref = person.get_death_ref()
+    def get_death_age(self, facts):
+        "return age at death for given person facts, if dead"
+        death_ref = facts.person.get_death_ref()
         if death_ref:
-            return [self.estimate_age(person, death_ref.ref)]
+            return [self.estimate_age(facts, death_ref.ref)]
         return [_T_("Still alive")]
 
     def get_event_ages(self, data):
-        "return ages at given (person,event_handles)"
-        person, event_handles = data
-        ages = [self.estimate_age(person, h) for h in event_handles]
+        "return ages at given (person facts,event_handles)"
+        facts, event_handles = data
+        ages = [self.estimate_age(facts, h) for h in event_handles]
         if ages:
             return ages
         return [_T_("Events missing")]
 
     def get_event_type(self, data):
-        "return event types at given (person,event_handles)"
+        "return event types at given (person facts,event_handles)"
         types = []
-        person, event_handles = data
+        facts, event_handles = data
         for event_handle in event_handles:
             event = self.db.get_event_from_handle(event_handle)
             event_type = self._(self._get_type(event.get_type()))
@@ -503,7 +600,7 @@ class Extract:
         return [_T_("Events missing")]
 
     def get_first_child_age(self, data):
-        "return age when first child in given (person,child_handles) was born"
+        "return age when first child in given (facts,child_handles) was born"
         ages, errors = self.get_sorted_child_ages(data)
         if ages:
             errors.append(ages[0])
@@ -511,7 +608,7 @@ class Extract:
         return [_T_("Children missing")]
 
     def get_last_child_age(self, data):
-        "return age when last child in given (person,child_handles) was born"
+        "return age when last child in given (facts,child_handles) was born"
         ages, errors = self.get_sorted_child_ages(data)
         if ages:
             errors.append(ages[-1])
@@ -520,7 +617,7 @@ class Extract:
 
     def get_handle_count(self, data):
         """
-        return number of handles in given (person, handle_list)
+        return number of handles in given (person facts, handle_list)
         used for child count, family count
         """
         return ["%3d" % len(data[1])]
@@ -528,25 +625,26 @@ class Extract:
     # ------------------- utility methods -------------------------
 
     def get_sorted_child_ages(self, data):
-        "return (sorted_ages,errors) for given (person,child_handles)"
+        "return (sorted_ages,errors) for given (person facts,child_handles)"
         ages = []
         errors = []
-        person, child_handles = data
+        facts, child_handles = data
         for child_handle in child_handles:
             child = self.db.get_person_from_handle(child_handle)
             birth_ref = child.get_birth_ref()
             if birth_ref:
-                ages.append(self.estimate_age(person, birth_ref.ref))
+                ages.append(self.estimate_age(facts, birth_ref.ref))
             else:
                 errors.append(_T_("Birth missing"))
                 continue
         ages.sort()
         return (ages, errors)
 
-    def estimate_age(self, person, end=None, begin=None):
-        """return estimated age (range) for given person or error message.
-           age string is padded with spaces so that it can be sorted"""
-        age = estimate_age(self.db, person, end, begin)
+    def estimate_age(self, facts, end=None):
+        """return estimated age (range) for given person facts or error
+           message. age string is padded with spaces so that it can be
+           sorted"""
+        age = facts.age(end)
         if age[0] < 0 or age[1] < 0:
             # inadequate information
             return _T_("Date(s) missing")
@@ -558,95 +656,73 @@ class Extract:
             return "%3d-%d" % (age[0], age[1])
 
     # ------------------- type methods -------------------------
-    # take db and person and return suitable gramps object(s)
+    # take the facts of a person and return suitable gramps object(s)
 
-    def get_person(self, person):
+    def get_facts(self, facts):
+        "return the facts of the person"
+        return facts
+
+    def get_person(self, facts):
         "return person"
-        return person
+        return facts.person
 
-    def get_birth(self, person):
-        "return birth event for given person or None"
-        birth_ref = person.get_birth_ref()
-        if birth_ref:
-            return self.db.get_event_from_handle(birth_ref.ref)
-        return None
+    def get_birth(self, facts):
+        "return birth event for given person facts or None"
+        return facts.birth
 
-    def get_death(self, person):
-        "return death event for given person or None"
-        death_ref = person.get_death_ref()
-        if death_ref:
-            return self.db.get_event_from_handle(death_ref.ref)
-        return None
+    def get_death(self, facts):
+        "return death event for given person facts or None"
+        return facts.death
 
-    def get_child_handles(self, person):
-        "return list of child handles for given person or None"
-        children = []
-        for fam_handle in person.get_family_handle_list():
-            fam = self.db.get_family_from_handle(fam_handle)
-            for child_ref in fam.get_child_ref_list():
-                children.append(child_ref.ref)
+    def get_child_handles(self, facts):
+        "return list of child handles for given person facts or None"
         # TODO: it would be good to return only biological children,
         # but Gramps doesn't offer any efficient way to check that
         # (I don't want to check each children's parent family mother
         # and father relations as that would make this *much* slower)
-        if children:
-            return (person, children)
+        if facts.children:
+            return (facts, facts.children)
         return None
 
-    def get_marriage_handles(self, person):
-        "return list of marriage event handles for given person or None"
-        marriages = []
-        for family_handle in person.get_family_handle_list():
-            family = self.db.get_family_from_handle(family_handle)
-            if int(family.get_relationship()) == FamilyRelType.MARRIED:
-                for event_ref in family.get_event_ref_list():
-                    event = self.db.get_event_from_handle(event_ref.ref)
-                    if (event.get_type() == EventType.MARRIAGE and
-                            (event_ref.get_role() == EventRoleType.FAMILY or
-                             event_ref.get_role() == EventRoleType.PRIMARY)):
-                        marriages.append(event_ref.ref)
-        if marriages:
-            return (person, marriages)
+    def get_marriage_handles(self, facts):
+        "return list of marriage event handles for given person facts or None"
+        if facts.marriages:
+            return (facts, facts.marriages)
         return None
 
-    def get_any_family_handles(self, person):
-        "return list of family handles for given person or None"
-        families = person.get_family_handle_list()
+    def get_any_family_handles(self, facts):
+        "return list of family handles for given person facts or None"
+        families = facts.person.get_family_handle_list()
 
         if families:
-            return (person, families)
+            return (facts, families)
         return None
 
-    def get_event_handles(self, person):
-        "return list of event handles for given person or None"
-        events = [ref.ref for ref in person.get_event_ref_list()]
+    def get_event_handles(self, facts):
+        "return list of event handles for given person facts or None"
+        events = [ref.ref for ref in facts.person.get_event_ref_list()]
 
         if events:
-            return (person, events)
+            return (facts, events)
         return None
 
     # ----------------- data collection methods --------------------
 
-    def get_person_data(self, person, collect):
-        """Add data from the database to 'collect' for the given person,
-           using methods from the 'collect' data dict tuple
+    def get_person_data(self, facts, collect):
+        """Add data from the database to 'collect' for the given person
+           facts, using methods from the 'collect' data dict tuple
         """
         for chart in collect:
             # get the information
             type_func = chart[2]
             data_func = chart[3]
-            obj = type_func(person)        # e.g. get_date()
+            obj = type_func(facts)        # e.g. get_date()
             if obj:
                 value = data_func(obj)        # e.g. get_year()
             else:
                 value = [_T_("Personal information missing")]
             # list of information found
-            for key in value:
-                if key in chart[1]:
-                    chart[1][key] += 1
-                else:
-                    chart[1][key] = 1
-
+            chart[1].update(value)
 
     def collect_data(self, dbase, people, menu, genders,
                      year_from, year_to, no_years, cb_progress, rlocale):
@@ -665,13 +741,22 @@ class Extract:
 
         Returns an array of tuple of:
         - Extraction method title
-        - Dict of values with their counts
+        - Counter of the values
         (- Method)
         """
         self.db = dbase        # store for use by methods
         self._locale = rlocale
         self._ = rlocale.translation.sgettext
         self._get_type = rlocale.get_type
+        date_displayer = rlocale.date_displayer
+        self._month_names = {
+            Date.CAL_GREGORIAN  : date_displayer.long_months,
+            Date.CAL_JULIAN     : date_displayer.long_months,
+            Date.CAL_HEBREW     : date_displayer.hebrew,
+            Date.CAL_FRENCH     : date_displayer.french,
+            Date.CAL_PERSIAN    : date_displayer.persian,
+            Date.CAL_ISLAMIC    : date_displayer.islamic,
+            Date.CAL_SWEDISH    : date_displayer.swedish }
 
         data = []
         ext = self.extractors
@@ -680,18 +765,21 @@ class Extract:
             option = menu.get_option_by_name(name)
             if option.get_value() == True:
                 # localized data title, value dict, type and data method
-                data.append((ext[name][1], {}, ext[name][2], ext[name][3]))
+                data.append((ext[name][1], Counter(),
+                             ext[name][2], ext[name][3]))
 
-        # go through the people and collect data
+        # go through the people once, the facts of each person being
+        # shared by all the charts
         for person_handle in people:
             cb_progress()
             person = dbase.get_person_from_handle(person_handle)
             # check whether person has suitable gender
             if person.gender != genders and genders != Person.UNKNOWN:
                 continue
+            facts = _PersonFacts(dbase, person)
 
             # check whether birth year is within required range
-            birth = self.get_birth(person)
+            birth = facts.birth
             if birth:
                 birthdate = birth.get_date_object()
                 if birthdate.get_year_valid():
@@ -702,7 +790,7 @@ class Extract:
                         continue
                 else:
                     # if death before range, person's out of range too...
-                    death = self.get_death(person)
+                    death = facts.death
                     if death:
                         deathdate = death.get_date_object()
                         if deathdate.get_year_valid():
@@ -718,7 +806,7 @@ class Extract:
             else:
                 continue
 
-            self.get_person_data(person, data)
+            self.get_person_data(facts, data)
         return data
 
 # GLOBAL: required so that we get access to _Extract.extractors[]
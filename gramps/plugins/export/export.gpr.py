@@ -61,7 +61,7 @@ plg.status = STABLE
 plg.fname = 'exportftree.py'
 plg.ptype = EXPORT
 plg.export_function = 'writeData'
-plg.export_options = 'WriterOptionBox'
+plg.export_options = 'gramps.gui.plug.export.WriterOptionBox'
 plg.export_options_title = _('Web Family Tree export options')
 plg.extension = "wft"
 
@@ -83,7 +83,7 @@ plg.status = STABLE
 plg.fname = 'exportgedcom.py'
 plg.ptype = EXPORT
 plg.export_function = 'export_data'
-plg.export_options = 'WriterOptionBox'
+plg.export_options = 'gramps.gui.plug.export.WriterOptionBox'
 plg.export_options_title = _('GEDCOM export options')
 plg.extension = "ged"
 
@@ -104,7 +104,7 @@ plg.status = STABLE
 plg.fname = 'exportgeneweb.py'
 plg.ptype = EXPORT
 plg.export_function = 'exportData'
-plg.export_options = 'WriterOptionBox'
+plg.export_options = 'gramps.gui.plug.export.WriterOptionBox'
 plg.export_options_title = _('GeneWeb export options')
 plg.extension = "gw"
 
@@ -126,7 +126,7 @@ plg.status = STABLE
 plg.fname = 'exportpkg.py'
 plg.ptype = EXPORT
 plg.export_function = 'writeData'
-plg.export_options = 'WriterOptionBox'
+plg.export_options = 'gramps.gui.plug.export.WriterOptionBox'
 plg.export_options_title = _('Gramps package export options')
 plg.extension = "gpkg"
 
@@ -149,7 +149,8 @@ plg.status = STABLE
 plg.fname = 'exportxml.py'
 plg.ptype = EXPORT
 plg.export_function = 'export_data'
-plg.export_options = 'WriterOptionBoxWithCompression'
+plg.export_options = \
+    'gramps.gui.plug.export.WriterOptionBoxWithCompression'
 plg.export_options_title = _('Gramps XML export options')
 plg.extension = "gramps"
 
@@ -170,7 +171,7 @@ plg.status = STABLE
 plg.fname = 'exportvcalendar.py'
 plg.ptype = EXPORT
 plg.export_function = 'exportData'
-plg.export_options = 'WriterOptionBox'
+plg.export_options = 'gramps.gui.plug.export.WriterOptionBox'
 plg.export_options_title = _('vCalendar export options')
 plg.extension = "vcs"
 
@@ -191,6 +192,6 @@ plg.status = STABLE
 plg.fname = 'exportvcard.py'
 plg.ptype = EXPORT
 plg.export_function = 'exportData'
-plg.export_options = 'WriterOptionBox'
+plg.export_options = 'gramps.gui.plug.export.WriterOptionBox'
 plg.export_options_title = _('vCard export options')
 plg.extension = "vcf"
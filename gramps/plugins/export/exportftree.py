@@ -42,9 +42,6 @@ log = logging.getLogger(".WriteFtree")
 # Gramps modules
 #
 #-------------------------------------------------------------------------
-# keep the following line even though not obviously used (works on import)
-from gramps.gui.plug.export import WriterOptionBox
-from gramps.gui.dialog import ErrorDialog
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 
@@ -133,7 +130,7 @@ class FtreeWriter:
                 return self._export_data(file, id_name, id_map)
         except IOError as msg:
             msg2 = _("Could not create %s") % self.filename
-            ErrorDialog(msg2, str(msg), parent=self.option_box.window)
+            self.user.notify_error(msg2, str(msg))
             return False
 
     def _export_data(self, file, id_name, id_map):
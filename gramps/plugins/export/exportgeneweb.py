@@ -48,9 +48,7 @@ log = logging.getLogger(".WriteGeneWeb")
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
 from gramps.gen.lib import Date, Event, EventType, FamilyRelType, Person
-from gramps.gui.plug.export import WriterOptionBox
 from gramps.gen.utils.alive import probably_alive
-from gramps.gui.glade import Glade
 from gramps.gen.config import config
 from gramps.gen.display.place import displayer as _pd
 
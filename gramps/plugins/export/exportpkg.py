@@ -45,19 +45,11 @@ _ = glocale.translation.gettext
 import logging
 log = logging.getLogger(".WritePkg")
 
-#-------------------------------------------------------------------------
-#
-# GNOME/GTK modules
-#
-#-------------------------------------------------------------------------
-from gi.repository import Gtk
-
 #-------------------------------------------------------------------------
 #
 # Gramps modules
 #
 #-------------------------------------------------------------------------
-from gramps.gui.plug.export import WriterOptionBox
 from gramps.plugins.export.exportxml import XmlWriter
 from gramps.gen.utils.file import media_path_full
 from gramps.gen.constfunc import win
@@ -48,10 +48,8 @@ log = logging.getLogger(".ExportVCal")
 #-------------------------------------------------------------------------
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 _ = glocale.translation.gettext
-from gramps.gui.plug.export import WriterOptionBox
 from gramps.gen.utils.db import family_name
 from gramps.gen.lib import Date, EventType
-from gramps.gui.glade import Glade
 from gramps.gen.display.place import displayer as _pd
 
 class CalendarWriter:
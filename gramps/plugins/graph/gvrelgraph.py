@@ -147,6 +147,8 @@ class RelGraphReport(Report):
         self.use_subgraphs = get_value('usesubgraphs')
         self.event_choice = get_value('event_choice')
         self.occupation = get_value('occupation')
+        # the place strings of the labels, by place and date
+        self._place_strings = {}
         self.use_html_output = False
 
         self.colorize = get_value('color')
@@ -733,8 +735,16 @@ class RelGraphReport(Report):
             empty string
         """
         if event and self.event_choice in [2, 3, 5, 6, 7]:
-            place = _pd.display_event(self._db, event)
-            return place.replace('<', '&#60;').replace('>', '&#62;')
+            place_handle = event.get_place_handle()
+            if not place_handle:
+                return ''
+            # the name of a place can depend on the date of the event
+            key = (place_handle, event.get_date_object().serialize())
+            if key not in self._place_strings:
+                place = _pd.display_event(self._db, event)
+                self._place_strings[key] = place.replace(
+                    '<', '&#60;').replace('>', '&#62;')
+            return self._place_strings[key]
         return ''
 
 #------------------------------------------------------------------------
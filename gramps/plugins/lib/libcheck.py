@@ -0,0 +1,297 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+The checks of the Check and Repair tool which do not need the user
+interface.
+
+The references of the objects of a class are read in a single pass over
+the table of the class, and compared with the references stored in the
+reference map of the database, as two sets.
+
+The references to missing objects are also found in a single pass over
+each table, for all the classes of referenced objects at once, in worker
+processes for large tables. The checks only read the database: the tool
+repairs what they found afterwards.
+"""
+
+#------------------------------------------------------------------------
+#
+# standard python modules
+#
+#------------------------------------------------------------------------
+import os
+
+#------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#------------------------------------------------------------------------
+from gramps.gen.db import CLASS_TO_KEY_MAP
+from gramps.gen.errors import HandleError
+from gramps.gen.utils.fork import get_work, worker_pool
+import gramps.gen.lib
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# An object has a reference with no corresponding backlink
+NO_BACKLINK = 0
+
+# An object has a backlink from a missing object
+MISSING_OBJECT = 1
+
+# An object has a backlink from an object without a reference to it
+NO_REFERENCE = 2
+
+# Number of objects from which the references are read in worker processes
+POOL_ROWS = 20000
+
+# Number of objects handed to a worker process at a time
+CHUNK_ROWS = 2000
+
+#-------------------------------------------------------------------------
+#
+# BacklinkChecker
+#
+#-------------------------------------------------------------------------
+class BacklinkChecker:
+    """
+    Compare the references of the objects of a database with its reference
+    map.
+
+    The problems found are (kind, class name, Gramps ID, other class name)
+    tuples, where kind is NO_BACKLINK for an object with a reference to an
+    object of the other class, and MISSING_OBJECT or NO_REFERENCE for an
+    object with a backlink from an object of the other class.
+    """
+    def __init__(self, db):
+        self.db = db
+
+    def check(self, callback=None):
+        """
+        Return the problems found, in the order of the classes. callback is
+        called once for each object of the database.
+        """
+        problems = []
+        if hasattr(self.db, 'dbapi'):
+            # the rows of the reference table can be read by class, so only
+            # the references of one class are kept in memory at a time
+            for obj_class in CLASS_TO_KEY_MAP:
+                problems += self.__check_classes([obj_class], callback)
+        else:
+            problems += self.__check_classes(list(CLASS_TO_KEY_MAP), callback)
+        return problems
+
+    def __check_classes(self, classes, callback):
+        """
+        Return the problems of the references from the objects of classes.
+        """
+        # (class, handle) of the objects, and the (handle, referenced
+        # handle) pairs of their references
+        objects = set()
+        references = set()
+        for obj_class in classes:
+            class_func = getattr(gramps.gen.lib, obj_class)
+            with self.__get_cursor(obj_class)() as cursor:
+                for handle, data in cursor:
+                    if callback:
+                        callback()
+                    objects.add((obj_class, handle))
+                    obj = class_func.create(data)
+                    for item in obj.get_referenced_handles_recursively():
+                        references.add((handle, item[1]))
+
+        problems = []
+        for obj_class, obj_handle, ref_class, ref_handle in \
+                self.__iter_backlinks(classes):
+            key = (obj_handle, ref_handle)
+            if key in references:
+                references.discard(key)
+                continue
+            if (obj_class, obj_handle) not in objects:
+                kind = MISSING_OBJECT
+            else:
+                kind = NO_REFERENCE
+            problems.append((kind, ref_class,
+                             self.__get_gramps_id(ref_class, ref_handle),
+                             obj_class))
+
+        # the remaining references have no backlink
+        missing = {}
+        for obj_handle, ref_handle in references:
+            missing.setdefault(obj_handle, set()).add(ref_handle)
+        for obj_class, obj_handle in sorted(objects):
+            if obj_handle not in missing:
+                continue
+            obj = self.__get_object(obj_class, obj_handle)
+            for item in obj.get_referenced_handles_recursively():
+                if item[1] in missing[obj_handle]:
+                    missing[obj_handle].discard(item[1])
+                    problems.append((NO_BACKLINK, obj_class, obj.gramps_id,
+                                     item[0]))
+        return problems
+
+    def __iter_backlinks(self, classes):
+        """
+        Iterate over the distinct (class, handle, referenced class,
+        referenced handle) rows of the reference map, for the references
+        from the objects of classes.
+        """
+        if hasattr(self.db, 'dbapi'):
+            for obj_class in classes:
+                with self.db.dbapi.cursor() as cursor:
+                    cursor.execute("SELECT DISTINCT obj_handle, ref_class, "
+                                   "ref_handle FROM reference "
+                                   "WHERE obj_class = ?", [obj_class])
+                    rows = cursor.fetchmany()
+                    while rows:
+                        for obj_handle, ref_class, ref_handle in rows:
+                            yield (obj_class, obj_handle, ref_class,
+                                   ref_handle)
+                        rows = cursor.fetchmany()
+            return
+        # other backends: the backlinks of each object
+        seen = set()
+        for ref_class in CLASS_TO_KEY_MAP:
+            for ref_handle in getattr(self.db, "iter_%s_handles"
+                                      % ref_class.lower())():
+                for obj_class, obj_handle in \
+                        self.db.find_backlink_handles(ref_handle):
+                    row = (obj_class, obj_handle, ref_class, ref_handle)
+                    if obj_class in classes and row not in seen:
+                        seen.add(row)
+                        yield row
+
+    def __get_cursor(self, obj_class):
+        return getattr(self.db, "get_%s_cursor" % obj_class.lower())
+
+    def __get_object(self, obj_class, handle):
+        return getattr(self.db, "get_%s_from_handle" % obj_class.lower())(
+            handle)
+
+    def __get_gramps_id(self, obj_class, handle):
+        """
+        Return the Gramps ID of an object, or its handle if it is missing.
+        """
+        try:
+            obj = self.__get_object(obj_class, handle)
+        except HandleError:
+            obj = None
+        return obj.gramps_id if obj is not None else handle
+
+#-------------------------------------------------------------------------
+#
+# ReferenceScan
+#
+#-------------------------------------------------------------------------
+class ReferenceScan:
+    """
+    Find the references to missing objects of some classes, reading each
+    object of the database once.
+    """
+    def __init__(self, db, classes):
+        """
+        @param: db      -- The database
+        @param: classes -- The names of the classes of the referenced
+                           objects to check
+        """
+        self.db = db
+        self.classes = classes
+
+    def scan(self, callback=None, known=None):
+        """
+        Return a dictionary with, for each class of classes, the list of
+        (class, handle, referenced handle) of the references to a missing
+        object of the class, or without a handle (the referenced handle is
+        None). callback is called once for each object of the database.
+
+        known has, for some classes, handles of objects to consider as
+        present, eg objects the tool will add.
+        """
+        handles = {}
+        for ref_class in self.classes:
+            handles[ref_class] = set(getattr(
+                self.db, "iter_%s_handles" % ref_class.lower())())
+            if known and ref_class in known:
+                handles[ref_class].update(known[ref_class])
+
+        problems = dict((ref_class, []) for ref_class in self.classes)
+        n_tasks = 2 * (os.cpu_count() or 1)
+        with worker_pool(handles,
+                         self.db.get_total() >= POOL_ROWS) as pool_map:
+            for tasks in self.__iter_tasks(callback, n_tasks):
+                for result in pool_map(_scan_rows, tasks):
+                    self.__add(problems, result)
+        return problems
+
+    def __iter_tasks(self, callback, n_tasks):
+        """
+        Iterate over lists of n_tasks (class, raw data list) tasks, with the
+        objects of all tables, read in this process.
+        """
+        tasks = []
+        for obj_class in CLASS_TO_KEY_MAP:
+            rows = []
+            with getattr(self.db, "get_%s_cursor" % obj_class.lower())() \
+                    as cursor:
+                for dummy, data in cursor:
+                    if callback:
+                        callback()
+                    rows.append(data)
+                    if len(rows) == CHUNK_ROWS:
+                        tasks.append((obj_class, rows))
+                        rows = []
+                        if len(tasks) == n_tasks:
+                            yield tasks
+                            tasks = []
+            if rows:
+                tasks.append((obj_class, rows))
+        if tasks:
+            yield tasks
+
+    @staticmethod
+    def __add(problems, result):
+        for obj_class, handle, ref_class, ref_handle in result:
+            problems[ref_class].append((obj_class, handle, ref_handle))
+
+#-------------------------------------------------------------------------
+#
+# Worker processes
+#
+#-------------------------------------------------------------------------
+def _scan_rows(task):
+    """
+    Return the (class, handle, referenced class, referenced handle) of the
+    references to missing objects from the objects of a class.
+    """
+    obj_class, rows = task
+    class_func = getattr(gramps.gen.lib, obj_class)
+    handles = get_work()
+    result = []
+    for data in rows:
+        obj = class_func.create(data)
+        for ref_class, ref_handle in obj.get_referenced_handles_recursively():
+            if ref_class in handles and (ref_handle is None or
+                                         ref_handle not in handles[ref_class]):
+                result.append((obj_class, obj.handle, ref_class, ref_handle))
+    return result
@@ -0,0 +1,646 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2000-2007  Donald N. Allingham
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Detection of people who may be duplicates of each other.
+
+A person is only compared with the people sharing a blocking key with him:
+the same gender group, sound of the surname and initial of a given name,
+and a birth in the same band of years. A pair not sharing any of these
+keys can never be a match. The values compared are read once for each
+person, and for large databases the pairs are scored in worker processes.
+
+The values and the scores are kept in a candidate index, stored with the
+other files Gramps keeps for a family tree, so that a later run only reads
+and scores again the people changed since.
+"""
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+from collections import namedtuple, defaultdict
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.lib import Date, Event, Person
+from gramps.gen.soundex import soundex
+from gramps.gen.utils.file import (get_stored_filename, load_stored,
+                                   save_stored)
+from gramps.gen.utils.fork import get_work, worker_pool
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+_ = glocale.translation.gettext
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+# Version of the stored index, to be increased when the features change
+INDEX_VERSION = 1
+
+# Number of years in a band of birth years
+YEAR_BAND = 10
+
+# Number of pairs from which they are scored in worker processes
+POOL_PAIRS = 20000
+
+# Number of pairs handed to a worker process at a time
+CHUNK_PAIRS = 2000
+
+#-------------------------------------------------------------------------
+#
+# Features of a person
+#
+#-------------------------------------------------------------------------
+NameFeatures = namedtuple('NameFeatures', 'surnames suffix first_name')
+EventFeatures = namedtuple('EventFeatures', 'date place_handle place_title')
+
+# parents is None without main parents, else the names of the father and
+# mother; families has (father handle, father name, mother handle, mother
+# name) for each family of the person
+Features = namedtuple('Features', 'gender name birth death parents families')
+
+def get_surnames(name):
+    """Construct a full surname of the surnames"""
+    return ' '.join([surn.get_surname() for surn in name.get_surname_list()])
+
+def get_name_features(person):
+    """
+    Return the NameFeatures of the primary name of a person, or None.
+    """
+    if person is None:
+        return None
+    name = person.get_primary_name()
+    return NameFeatures(get_surnames(name), name.get_suffix(),
+                        name.get_first_name())
+
+def is_initial(name):
+    if len(name) > 2:
+        return 0
+    elif len(name) == 2:
+        if name[0] == name[0].upper() and name[1] == '.':
+            return 1
+    else:
+        return name[0] == name[0].upper()
+
+#-------------------------------------------------------------------------
+#
+# Scoring of a pair
+#
+#-------------------------------------------------------------------------
+def name_compare(str1, str2, use_soundex):
+    if use_soundex:
+        return soundex(str1) == soundex(str2)
+    else:
+        return str1 == str2
+
+def name_match(name, name1, use_soundex):
+    if not name1 or not name:
+        return 0
+
+    if not name_compare(name.surnames, name1.surnames, use_soundex):
+        return -1
+    if name.suffix != name1.suffix:
+        if name.suffix != "" and name1.suffix != "":
+            return -1
+
+    if name.first_name == name1.first_name:
+        return 1
+    else:
+        list1 = name.first_name.split()
+        list2 = name1.first_name.split()
+
+        if len(list1) < len(list2):
+            return list_reduce(list1, list2, use_soundex)
+        else:
+            return list_reduce(list2, list1, use_soundex)
+
+def date_match(date1, date2):
+    if date1.is_empty() or date2.is_empty():
+        return 0
+    if date1.is_equal(date2):
+        return 1
+
+    if date1.is_compound() or date2.is_compound():
+        return range_compare(date1, date2)
+
+    if date1.get_year() == date2.get_year():
+        if date1.get_month() == date2.get_month():
+            return 0.75
+        if not date1.get_month_valid() or not date2.get_month_valid():
+            return 0.75
+        else:
+            return -1
+    else:
+        return -1
+
+def range_compare(date1, date2):
+    start_date_1 = date1.get_start_date()[0:3]
+    start_date_2 = date2.get_start_date()[0:3]
+    stop_date_1 = date1.get_stop_date()[0:3]
+    stop_date_2 = date2.get_stop_date()[0:3]
+    if date1.is_compound() and date2.is_compound():
+        if (start_date_2 <= start_date_1 <= stop_date_2 or
+                start_date_1 <= start_date_2 <= stop_date_1 or
+                start_date_2 <= stop_date_1 <= stop_date_2 or
+                start_date_1 <= stop_date_2 <= stop_date_1):
+            return 0.5
+        else:
+            return -1
+    elif date2.is_compound():
+        if start_date_2 <= start_date_1 <= stop_date_2:
+            return 0.5
+        else:
+            return -1
+    else:
+        if start_date_1 <= start_date_2 <= stop_date_1:
+            return 0.5
+        else:
+            return -1
+
+def place_match(event1, event2, use_soundex):
+    if event1.place_handle == event2.place_handle:
+        return 1
+
+    name1 = event1.place_title
+    name2 = event2.place_title
+    if not (name1 and name2):
+        return 0
+    if name1 == name2:
+        return 1
+
+    list1 = name1.replace(",", " ").split()
+    list2 = name2.replace(",", " ").split()
+
+    value = 0
+    for name in list1:
+        for name2 in list2:
+            if name == name2:
+                value += 0.5
+            elif name[0] == name2[0] and name_compare(name, name2,
+                                                      use_soundex):
+                value += 0.25
+    return min(value, 1) if value else -1
+
+def list_reduce(list1, list2, use_soundex):
+    value = 0
+    for name in list1:
+        for name2 in list2:
+            if is_initial(name) and name[0] == name2[0]:
+                value += 0.25
+            elif is_initial(name2) and name2[0] == name[0]:
+                value += 0.25
+            elif name == name2:
+                value += 0.5
+            elif name[0] == name2[0] and name_compare(name, name2,
+                                                      use_soundex):
+                value += 0.25
+    return min(value, 1) if value else -1
+
+def score_pair(person1, person2, use_soundex):
+    """
+    Return the chance that the people with the Features person1 and person2
+    are the same person, or -1 if they cannot be.
+
+    Whether one person is an ancestor of the other is not checked here.
+    """
+    chance = name_match(person1.name, person2.name, use_soundex)
+    if chance == -1:
+        return -1
+
+    value = date_match(person1.birth.date, person2.birth.date)
+    if value == -1:
+        return -1
+    chance += value
+
+    value = date_match(person1.death.date, person2.death.date)
+    if value == -1:
+        return -1
+    chance += value
+
+    value = place_match(person1.birth, person2.birth, use_soundex)
+    if value == -1:
+        return -1
+    chance += value
+
+    value = place_match(person1.death, person2.death, use_soundex)
+    if value == -1:
+        return -1
+    chance += value
+
+    if person1.parents and person2.parents:
+        dad1, mom1 = person1.parents
+        dad2, mom2 = person2.parents
+
+        value = name_match(dad1, dad2, use_soundex)
+        if value == -1:
+            return -1
+        chance += value
+
+        value = name_match(mom1, mom2, use_soundex)
+        if value == -1:
+            return -1
+        chance += value
+
+    if person1.gender == Person.FEMALE:
+        # compare the husbands
+        index = 0
+    else:
+        # compare the wives
+        index = 2
+    for family1 in person1.families:
+        for family2 in person2.families:
+            partner1_id = family1[index]
+            partner2_id = family2[index]
+            if partner1_id and partner2_id:
+                if partner1_id == partner2_id:
+                    chance += 1
+                else:
+                    value = name_match(family1[index + 1],
+                                       family2[index + 1], use_soundex)
+                    if value != -1:
+                        chance += value
+    return chance
+
+#-------------------------------------------------------------------------
+#
+# Blocking keys
+#
+#-------------------------------------------------------------------------
+def blocking_keys(person, use_soundex):
+    """
+    Return the blocking keys of the person with the given Features.
+
+    Two people can only be a match if they share one of these keys, and
+    are born in the same band of years, see birth_band.
+    """
+    surnames = person.name.surnames
+    if use_soundex:
+        surnames = soundex(surnames)
+    male = person.gender == Person.MALE
+    initials = set(word[0] for word in person.name.first_name.split())
+    return [(male, surnames, initial) for initial in (initials or [''])]
+
+def birth_band(person):
+    """
+    Return the band of birth years of the person with the given Features,
+    or None if the birth date may match any date.
+    """
+    date = person.birth.date
+    if (date.is_empty() or date.is_compound() or
+            date.get_modifier() == Date.MOD_TEXTONLY):
+        return None
+    return date.get_year() // YEAR_BAND
+
+#-------------------------------------------------------------------------
+#
+# Worker processes
+#
+#-------------------------------------------------------------------------
+def _score_pairs(pairs):
+    """
+    Score the pairs of handles, in both directions, and return the pairs
+    that are not rejected, with their scores.
+    """
+    features, use_soundex = get_work()
+    result = []
+    for handle1, handle2 in pairs:
+        person1 = features[handle1]
+        person2 = features[handle2]
+        chance = score_pair(person1, person2, use_soundex)
+        if chance == -1:
+            continue
+        if person1.gender == person2.gender:
+            reverse = chance
+        else:
+            reverse = score_pair(person2, person1, use_soundex)
+        result.append(((handle1, handle2), (chance, reverse)))
+    return result
+
+#-------------------------------------------------------------------------
+#
+# DupesIndex
+#
+#-------------------------------------------------------------------------
+class DupesIndex:
+    """
+    Candidate index of the people of a database who may be duplicates.
+
+    Holds the Features of each person, the handles and change times of the
+    objects they were read from, and the scores of the pairs of people
+    which are not rejected. Typical use::
+
+        index = DupesIndex(db, use_soundex)
+        index.load()
+        index.update()
+        index.save()
+        matches = index.find(threshold)
+    """
+
+    def __init__(self, db, use_soundex=True):
+        self.db = db
+        self.use_soundex = bool(use_soundex)
+        # handle -> Features
+        self.features = {}
+        # handle of person -> handles of the other objects read
+        self.deps = {}
+        # handle of object read -> its change time
+        self.seen = {}
+        # (handle1, handle2) with handle1 < handle2 -> (score of handle1
+        # compared with handle2, score of handle2 compared with handle1)
+        self.scores = {}
+        self.filename = self._get_filename()
+
+    def _get_filename(self):
+        """
+        Return the file the index of the database is stored in, or None if
+        the database is not stored in a directory.
+        """
+        db_filename = self.db.get_save_path()
+        if not db_filename or not os.path.isdir(db_filename):
+            return None
+        return get_stored_filename(db_filename, 'dupes')
+
+    def load(self):
+        """
+        Load the stored index. Return True if it could be used.
+        """
+        if self.filename is None:
+            return False
+        data = load_stored(self.filename)
+        if (not isinstance(data, dict) or
+                data.get('version') != INDEX_VERSION or
+                data.get('soundex') != self.use_soundex):
+            return False
+        self.features = data['features']
+        self.deps = data['deps']
+        self.seen = data['seen']
+        self.scores = data['scores']
+        return True
+
+    def save(self):
+        """
+        Store the index. Return True on success.
+        """
+        if self.filename is None:
+            return False
+        data = {'version': INDEX_VERSION,
+                'soundex': self.use_soundex,
+                'features': self.features,
+                'deps': self.deps,
+                'seen': self.seen,
+                'scores': self.scores}
+        return save_stored(self.filename, data)
+
+    def update(self, progress=None):
+        """
+        Bring the index up to date with the database: read the features of
+        the people added since the last update, or changed, or read from
+        objects changed since, and score the pairs they are in.
+
+        :param progress: a ProgressMeter, or None
+        """
+        db = self.db
+        if progress:
+            total = db.get_number_of_people()
+            if self.seen:
+                total += (db.get_number_of_families() +
+                          db.get_number_of_events() +
+                          db.get_number_of_places())
+            progress.set_pass(_('Pass 1: Looking for changes'), total)
+
+        current = {}
+        people = []
+        for person in db.iter_people():
+            if progress:
+                progress.step()
+            current[person.handle] = person.change
+            people.append(person.handle)
+        if self.seen:
+            # the other objects can only have changed since the last update
+            for iter_objects in (db.iter_families, db.iter_events,
+                                 db.iter_places):
+                for obj in iter_objects():
+                    if progress:
+                        progress.step()
+                    current[obj.handle] = obj.change
+
+        changed = set(handle for handle, change in self.seen.items()
+                      if current.get(handle) != change)
+        dirty = set(handle for handle in people
+                    if handle not in self.features)
+        for handle, deps in self.deps.items():
+            if handle in changed or not changed.isdisjoint(deps):
+                dirty.add(handle)
+        stale = dirty.union(set(self.features).difference(current))
+        for handle in stale:
+            self.features.pop(handle, None)
+            self.deps.pop(handle, None)
+        if stale:
+            self.scores = dict(
+                (pair, scores) for pair, scores in self.scores.items()
+                if pair[0] not in stale and pair[1] not in stale)
+        dirty.intersection_update(current)
+
+        if progress:
+            progress.set_pass(_('Pass 2: Reading people'), len(dirty))
+        for handle in dirty:
+            if progress:
+                progress.step()
+            self.__read_features(handle)
+
+        keep = set(self.features)
+        for deps in self.deps.values():
+            keep.update(deps)
+        self.seen = dict((handle, change)
+                         for handle, change in self.seen.items()
+                         if handle in keep)
+
+        self.__score(self.__pairs(dirty), progress)
+
+    def __read_features(self, handle):
+        """
+        Read the features of the person with the given handle.
+        """
+        db = self.db
+        deps = []
+
+        def fetch(get_object, obj_handle):
+            obj = get_object(obj_handle)
+            self.seen[obj_handle] = obj.change
+            deps.append(obj_handle)
+            return obj
+
+        def event_features(event_ref):
+            if event_ref:
+                event = fetch(db.get_event_from_handle, event_ref.ref)
+            else:
+                event = Event()
+            place_handle = event.get_place_handle()
+            if place_handle:
+                place = fetch(db.get_place_from_handle, place_handle)
+                title = place.get_title()
+            else:
+                title = ""
+            return EventFeatures(event.get_date_object(), place_handle, title)
+
+        def name_features(person_handle):
+            if person_handle:
+                return get_name_features(
+                    fetch(db.get_person_from_handle, person_handle))
+            return None
+
+        person = db.get_person_from_handle(handle)
+        self.seen[handle] = person.change
+
+        family_handle = person.get_main_parents_family_handle()
+        if family_handle:
+            family = fetch(db.get_family_from_handle, family_handle)
+            parents = (name_features(family.get_father_handle()),
+                       name_features(family.get_mother_handle()))
+        else:
+            parents = None
+
+        families = []
+        for family_handle in person.get_family_handle_list():
+            family = fetch(db.get_family_from_handle, family_handle)
+            father_handle = family.get_father_handle()
+            mother_handle = family.get_mother_handle()
+            families.append((father_handle, name_features(father_handle),
+                             mother_handle, name_features(mother_handle)))
+
+        self.features[handle] = Features(
+            person.get_gender(), get_name_features(person),
+            event_features(person.get_birth_ref()),
+            event_features(person.get_death_ref()),
+            parents, tuple(families))
+        self.deps[handle] = tuple(set(deps))
+
+    def __pairs(self, handles):
+        """
+        Return the pairs of people sharing a blocking key with one of the
+        people with the given handles.
+        """
+        if not handles:
+            return []
+        # key -> band -> handles
+        blocks = defaultdict(lambda: defaultdict(list))
+        for handle, person in self.features.items():
+            band = birth_band(person)
+            for key in blocking_keys(person, self.use_soundex):
+                blocks[key][band].append(handle)
+
+        pairs = set()
+        for handle in handles:
+            person = self.features[handle]
+            band = birth_band(person)
+            for key in blocking_keys(person, self.use_soundex):
+                bands = blocks[key]
+                if band is None:
+                    groups = bands.values()
+                else:
+                    groups = (bands.get(band, []), bands.get(None, []))
+                for group in groups:
+                    for other in group:
+                        if other < handle:
+                            pairs.add((other, handle))
+                        elif other > handle:
+                            pairs.add((handle, other))
+        return sorted(pairs)
+
+    def __score(self, pairs, progress):
+        """
+        Score the pairs, in worker processes if there are many of them.
+        """
+        chunks = [pairs[index:index + CHUNK_PAIRS]
+                  for index in range(0, len(pairs), CHUNK_PAIRS)]
+        if progress:
+            progress.set_pass(_('Pass 3: Calculating potential matches'),
+                              len(chunks))
+        with worker_pool((self.features, self.use_soundex),
+                         len(pairs) >= POOL_PAIRS) as pool_map:
+            for result in pool_map(_score_pairs, chunks):
+                if progress:
+                    progress.step()
+                self.scores.update(result)
+
+    def find(self, thresh):
+        """
+        Return the potential duplicates, as a dictionary of the handle of a
+        person to the handle of the person he may be a duplicate of, and
+        the chance of it.
+
+        :param thresh: the minimum chance of a match
+        """
+        ancestors = {}
+        neighbours = defaultdict(list)
+        for (handle1, handle2), scores in self.scores.items():
+            if max(scores) < thresh:
+                continue
+            if (handle2 in self.__ancestors(handle1, ancestors) or
+                    handle1 in self.__ancestors(handle2, ancestors)):
+                continue
+            neighbours[handle1].append(handle2)
+            neighbours[handle2].append(handle1)
+
+        position = {}
+        for handle in self.db.iter_person_handles():
+            position[handle] = len(position)
+        matches = {}
+        for p1key in sorted(neighbours, key=position.get):
+            for p2key in sorted(neighbours[p1key], key=position.get):
+                if p2key in matches and matches[p2key][0] == p1key:
+                    continue
+                if p1key < p2key:
+                    chance = self.scores[(p1key, p2key)][0]
+                else:
+                    chance = self.scores[(p2key, p1key)][1]
+                if chance >= thresh:
+                    if p1key not in matches or matches[p1key][1] > chance:
+                        matches[p1key] = (p2key, chance)
+        return matches
+
+    def __ancestors(self, handle, cache):
+        """
+        Return the handles of the ancestors of a person, and of himself.
+        """
+        if handle not in cache:
+            result = set()
+            todo = [handle]
+            while todo:
+                person_handle = todo.pop()
+                if not person_handle or person_handle in result:
+                    continue
+                result.add(person_handle)
+                person = self.db.get_person_from_handle(person_handle)
+                family_handle = person.get_main_parents_family_handle()
+                if family_handle:
+                    family = self.db.get_family_from_handle(family_handle)
+                    todo.append(family.get_father_handle())
+                    todo.append(family.get_mother_handle())
+            cache[handle] = result
+        return cache[handle]
@@ -23,13 +23,15 @@
 """
 HTML operations.
 
-This module exports the Html class
+This module exports the Html class, and the HtmlStream class to write a
+page whose largest section is produced a piece at a time.
 
 """
 
 #------------------------------------------------------------------------
 # Python modules
 #------------------------------------------------------------------------
+from itertools import islice
 import re
 
 #------------------------------------------------------------------------
@@ -44,7 +46,7 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 # Constants
 #
 #------------------------------------------------------------------------
-__all__ = ['Html']
+__all__ = ['Html', 'HtmlStream']
 
 #------------------------------------------------------------------------
 #
@@ -375,14 +377,14 @@ class Html(list):
         :rtype:  string
         :returns: string representation of object
         """
-        return '%s'*len(self) % tuple(self[:])
+        return ''.join(map(str, list.__iter__(self)))
 #
     def __iter__(self):
         """
         Iterator function: returns a generator that performs an
         insertion-order tree traversal and yields each item found.
         """
-        for item in self[:]:                    # loop through all list elements
+        for item in list.__iter__(self):        # loop through all list elements
             if isinstance(item, Html):     # if nested list found
                 for sub_item in item:           #     recurse
                     yield sub_item
@@ -408,14 +410,14 @@ class Html(list):
         elif self.indent:
             tabs += indent
         if self.inline:                         # if inline, write all list and
-            method(str('%s%s' % (tabs, self)))       # nested list elements
+            method('%s%s' % (tabs, self))       # nested list elements
 #
         else:
-            for item in self[:]:                # else write one at a time
+            for item in list.__iter__(self):    # else write one at a time
                 if isinstance(item, Html):      # recurse if nested Html class
                     item.write(method=method, indent=indent, tabs=tabs)
                 else:
-                    method(str('%s%s' % (tabs, item)))  # else write the line
+                    method('%s%s' % (tabs, item))  # else write the line
 #
     def addXML(self, version=1.0, encoding="UTF-8", standalone="no"):
         """
@@ -566,6 +568,114 @@ class Html(list):
     def __exit__(self, exc_type, exc_val, exc_tb):
         return exc_type is None
 
+#------------------------------------------------------------------------
+#
+# HtmlStream class.
+#
+#------------------------------------------------------------------------
+
+class HtmlStream:
+    """
+    Writes a page built with the Html class, while the contents of one of
+    its sections are produced, so that they never all have to be in memory.
+
+    begin() writes the page up to the end of the current contents of the
+    section, write() writes each new piece of the section, and end() writes
+    the closing tag of the section and the rest of the page. Objects may
+    still be added to the page after the section, eg a footer, until end()
+    is called. The output is the same as the one of Html.write with the
+    pieces added to the section.
+    """
+    def __init__(self, page, method=print, indent='\t'):
+        """
+        :type  page: Html
+        :param page: the page to write
+        :type  method: function reference
+        :param method: function to call with each line
+        :type  indent: string
+        :param indent: string to use for indentation. Default = '\t' (tab)
+        """
+        self.method = method
+        self.indent = indent
+        self.section = None
+        self.tabs = ''
+        # the objects being written: (iterator on their items, indentation,
+        # True for the section)
+        self.__stack = [(iter([page]), '', False)]
+
+    def __walk(self):
+        """
+        Write the objects of the page, until the end of the contents of the
+        section, or of the page.
+        """
+        method, indent, stack = self.method, self.indent, self.__stack
+        while stack:
+            items, tabs, in_section = stack[-1]
+            for item in items:
+                if not isinstance(item, Html):
+                    method('%s%s' % (tabs, item))
+                    continue
+                if item.indent is None:
+                    sub_tabs = ''
+                elif item.indent:
+                    sub_tabs = tabs + indent
+                else:
+                    sub_tabs = tabs
+                if item is self.section:
+                    if item.inline:
+                        raise ValueError('An inline section cannot be '
+                                         'written a piece at a time')
+                    items = islice(list.__iter__(item),
+                                   len(item) - 1 if item.close else None)
+                    stack.append((items, sub_tabs, True))
+                    break
+                if item.inline:
+                    method('%s%s' % (sub_tabs, item))
+                else:
+                    stack.append((list.__iter__(item), sub_tabs, False))
+                    break
+            else:
+                if in_section:
+                    return
+                stack.pop()
+
+    def begin(self, section):
+        """
+        Write the page up to the end of the current contents of section.
+
+        :type  section: Html
+        :param section: the section of the page, not inline
+        """
+        self.section = section
+        self.__walk()
+        if not self.__stack:
+            raise ValueError('The section is not in the page')
+        self.tabs = self.__stack[-1][1]
+
+    def write(self, value):
+        """
+        Write a new piece of the contents of the section.
+
+        :type  value: Html or string
+        :param value: the piece to write
+        """
+        if isinstance(value, Html):
+            value.write(method=self.method, indent=self.indent,
+                        tabs=self.tabs)
+        else:
+            self.method('%s%s' % (self.tabs, value))
+
+    def end(self):
+        """
+        Write the closing tag of the section, and the rest of the page.
+        """
+        if self.section is not None:
+            self.__stack.pop()
+            if self.section.close:
+                self.method('%s%s' % (self.tabs, self.section[-1]))
+            self.section = None
+        self.__walk()
+
 #------------------------------------------------------------------------
 #
 # Functions
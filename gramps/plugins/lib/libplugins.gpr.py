@@ -306,3 +306,54 @@ authors = ["The Gramps project"],
 authors_email = ["http://gramps-project.org"],
 )
 
+
+#------------------------------------------------------------------------
+#
+# libdupes
+#
+#------------------------------------------------------------------------
+register(GENERAL,
+id    = 'libdupes',
+name  = "Duplicate people lib",
+description =  _("Provides the detection of possible duplicate people.") ,
+version = '1.0',
+gramps_target_version = MODULE_VERSION,
+status = STABLE,
+fname = 'libdupes.py',
+authors = ["The Gramps project"],
+authors_email = ["http://gramps-project.org"],
+)
+
+#------------------------------------------------------------------------
+#
+# libverify
+#
+#------------------------------------------------------------------------
+register(GENERAL,
+id    = 'libverify',
+name  = "Verify lib",
+description =  _("Provides the rules of the Verify tool.") ,
+version = '1.0',
+gramps_target_version = MODULE_VERSION,
+status = STABLE,
+fname = 'libverify.py',
+authors = ["The Gramps project"],
+authors_email = ["http://gramps-project.org"],
+)
+
+#------------------------------------------------------------------------
+#
+# libcheck
+#
+#------------------------------------------------------------------------
+register(GENERAL,
+id    = 'libcheck',
+name  = "Check lib",
+description =  _("Provides the checks of the Check and Repair tool.") ,
+version = '1.0',
+gramps_target_version = MODULE_VERSION,
+status = STABLE,
+fname = 'libcheck.py',
+authors = ["The Gramps project"],
+authors_email = ["http://gramps-project.org"],
+)
@@ -896,6 +896,147 @@ class LineBase:
                 doc.draw_line(linestr, x34, yme, xend, yme)
 
 
+#------------------------------------------------------------------------
+#
+# Class ColumnLayout
+#
+#------------------------------------------------------------------------
+class ColumnLayout:
+    """ Places the boxes of a tree report in columns, one column per
+    generation (box.level[0]), the boxes of a column going down in the
+    order they were added.
+
+    Boxes are moved down with the boxes under them in their column, and
+    optionally with the boxes they lead to in the next columns.  As in the
+    tree drawing algorithm of Walker (after Reingold and Tilford), a move
+    is not done at once: it is kept where it starts, and only passed on
+    along the thread to the next column when a box there is looked at.
+    So a move takes the same time whatever the number of boxes it moves,
+    instead of walking through them all.  get_y() gives where a box is
+    moved to, and apply() moves all the boxes there.
+
+    The boxes and their lines must not change once they are moved.
+    """
+    def __init__(self, report_opts):
+        self.report_opts = report_opts
+        #the boxes of each column, top down
+        self.cols = []
+        self.__index = {}
+        #for each column:
+        # the moves, kept at the index of the first box moved
+        # their sums, as a binary indexed (Fenwick) tree, for get_y()
+        # the moves still to pass on to the next column {index: amount}
+        # the threads to the next column
+        self.__moves = []
+        self.__sums = []
+        self.__pending = []
+        self.__threads = []
+
+    def add_box(self, box):
+        """ Add the box at the bottom of its column """
+        level = box.level[0]
+        while len(self.cols) <= level:
+            self.cols.append([])
+            self.__moves.append(None)
+            self.__sums.append(None)
+            self.__pending.append({})
+            self.__threads.append(None)
+        self.__index[box] = len(self.cols[level])
+        self.cols[level].append(box)
+
+    def column_x(self, level):
+        """ the x_cm of a column """
+        return (self.report_opts.littleoffset +
+                level * (self.report_opts.col_width +
+                         self.report_opts.max_box_width))
+
+    def __add_move(self, level, index, amount):
+        """ record a move of the boxes of a column, from index down """
+        if self.__moves[level] is None:
+            self.__moves[level] = [0.0] * len(self.cols[level])
+            self.__sums[level] = [0.0] * (len(self.cols[level]) + 1)
+        self.__moves[level][index] += amount
+        sums = self.__sums[level]
+        index += 1
+        while index < len(sums):
+            sums[index] += amount
+            index += index & -index
+
+    def __get_threads(self, level):
+        """ For each box of a column, the index in the next column where
+        the boxes moved with it (and everyone below it) start.  That is
+        the first box that the first box leading somewhere leads to. """
+        threads = self.__threads[level]
+        if threads is None:
+            threads = [None] * len(self.cols[level])
+            thread = None
+            for index in range(len(threads) - 1, -1, -1):
+                line = self.cols[level][index].line_to
+                if line and line.end:
+                    thread = self.__index[line.end[0]]
+                threads[index] = thread
+            self.__threads[level] = threads
+        return threads
+
+    def __pass_on(self, level):
+        """ pass the pending moves of a column on to the next one """
+        pending = self.__pending[level]
+        if not pending:
+            return
+        if level + 1 < len(self.cols):
+            threads = self.__get_threads(level)
+            next_pending = self.__pending[level + 1]
+            for index, amount in pending.items():
+                thread = threads[index]
+                if thread is not None:
+                    self.__add_move(level + 1, thread, amount)
+                    next_pending[thread] = (next_pending.get(thread, 0.0) +
+                                            amount)
+        pending.clear()
+
+    def move_down(self, box, amount, next_cols=False):
+        """ Move the box, and everyone below it in its column, down.
+        With next_cols, also move the boxes that they lead to (their
+        children, and their children's children...) and everyone below
+        them in their columns. """
+        level = box.level[0]
+        index = self.__index[box]
+        self.__add_move(level, index, amount)
+        if next_cols:
+            pending = self.__pending[level]
+            pending[index] = pending.get(index, 0.0) + amount
+
+    def get_y(self, box):
+        """ the y_cm of the box, including the moves not yet applied """
+        level = box.level[0]
+        for col in range(level):
+            self.__pass_on(col)
+        sums = self.__sums[level]
+        if sums is None:
+            return box.y_cm
+        y_cm = box.y_cm
+        index = self.__index[box] + 1
+        while index:
+            y_cm += sums[index]
+            index -= index & -index
+        return y_cm
+
+    def apply(self):
+        """ Move all the boxes to where they were moved """
+        for level in range(len(self.cols)):
+            self.__pass_on(level)
+            moves = self.__moves[level]
+            if moves is None:
+                continue
+            amount = 0.0
+            for index, box in enumerate(self.cols[level]):
+                amount += moves[index]
+                box.y_cm += amount
+            self.__moves[level] = None
+            self.__sums[level] = None
+        self.__threads = [None] * len(self.cols)
+
+
 #------------------------------------------------------------------------
 #
 # Class report_options
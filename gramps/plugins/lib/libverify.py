@@ -0,0 +1,1380 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2000-2007  Donald N. Allingham
+# Copyright (C) 2008       Brian G. Matherly
+# Copyright (C) 2010       Jakim Friant
+# Copyright (C) 2011       Paul Franklin
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+The rules of the Verify tool, and the table of facts they are checked on.
+
+The dates, counts and names the rules need are read from the database in a
+single pass, into a PersonFacts row for each person and a FamilyFacts row
+for each family. Each rule is then checked on all the rows of the table,
+without reading the database again, in worker processes for large tables.
+
+The table and the results are stored with the other files Gramps keeps for
+a family tree, so a later run only reads and checks again the people and
+families changed since.
+"""
+
+#------------------------------------------------------------------------
+#
+# standard python modules
+#
+#------------------------------------------------------------------------
+import os
+from collections import namedtuple
+
+#------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#------------------------------------------------------------------------
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+_ = glocale.translation.sgettext
+from gramps.gen.lib import (ChildRefType, EventRoleType, EventType,
+                            FamilyRelType, NameType, Person)
+from gramps.gen.lib.date import Today
+from gramps.gen.display.name import displayer as name_displayer
+from gramps.gen.utils.db import family_name
+from gramps.gen.utils.file import (get_stored_filename, load_stored,
+                                   save_stored)
+from gramps.gen.utils.fork import get_work, worker_pool
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+_today = Today().get_sort_value()
+
+# Version of the stored table, to be increased when the facts change
+TABLE_VERSION = 1
+
+# Number of rows from which the rules are checked in worker processes
+POOL_ROWS = 20000
+
+# Number of rows handed to a worker process at a time
+CHUNK_ROWS = 2000
+
+#-------------------------------------------------------------------------
+#
+# Facts
+#
+#-------------------------------------------------------------------------
+# Dates are sort values, 0 if unknown. The dates without suffix are 0 if
+# not exact; the _est dates are estimated from the baptism or burial if
+# unknown. bury is None without a primary burial. first_marriage is the
+# marriage date of the first family, or None without family. birth_surname
+# is None unless the primary name is a birth name.
+PersonFacts = namedtuple('PersonFacts',
+                         'handle gramps_id name gender '
+                         'birth birth_est death death_est bapt bury dead '
+                         'invalid_birth invalid_death '
+                         'n_parent_families n_families n_children '
+                         'first_marriage birth_surname')
+
+# children has (handle, birth relation to father, birth relation to mother)
+# for each child.
+FamilyFacts = namedtuple('FamilyFacts',
+                         'handle gramps_id name father mother married '
+                         'marriage children')
+
+def get_event_date(event, estimate=False):
+    """ get the date of an event """
+    date_obj = event.get_date_object()
+    if (not estimate
+            and (date_obj.get_day() == 0 or date_obj.get_month() == 0)):
+        return 0
+    return date_obj.get_sort_value()
+
+def get_birth_date(person, estimate=False):
+    """ get a person's birth date (or baptism date if 'estimated') """
+    if not person:
+        return 0
+    return person.birth_est if estimate else person.birth
+
+def get_death_date(person, estimate=False):
+    """ get a person's death date (or burial date if 'estimated') """
+    if not person:
+        return 0
+    return person.death_est if estimate else person.death
+
+def get_age_at_death(person, estimate):
+    """ get a person's age at death """
+    birth_date = get_birth_date(person, estimate)
+    death_date = get_death_date(person, estimate)
+    if (birth_date > 0) and (death_date > 0):
+        return death_date - birth_date
+    return 0
+
+#-------------------------------------------------------------------------
+#
+# FactTable
+#
+#-------------------------------------------------------------------------
+class FactTable:
+    """
+    The facts of the people and families of a database, and the results of
+    the rules checked on them.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        # handle -> PersonFacts, FamilyFacts
+        self.people = {}
+        self.families = {}
+        # handle of a row -> handles of the other objects read for it
+        self.deps = {}
+        # handle of an object read -> its change time
+        self.seen = {}
+        # handle of a row -> results of the rules on it
+        self.results = {}
+        # ids of the rules of the results, and the day they were checked
+        self.signature = None
+        # handles of the rows read by the last update
+        self.dirty = set()
+        # handles of the rows, in database order
+        self.person_order = []
+        self.family_order = []
+        self.filename = self._get_filename()
+
+    def _get_filename(self):
+        """
+        Return the file the table of the database is stored in, or None if
+        the database is not stored in a directory.
+        """
+        db_filename = self.db.get_save_path()
+        if not db_filename or not os.path.isdir(db_filename):
+            return None
+        return get_stored_filename(db_filename, 'vfc')
+
+    def _get_meta(self):
+        """
+        Return what the stored names and messages depend on.
+        """
+        return (TABLE_VERSION, glocale.lang,
+                name_displayer.get_name_format(also_default=True))
+
+    def load(self):
+        """
+        Load the stored table. Return True if it could be used.
+        """
+        if self.filename is None:
+            return False
+        data = load_stored(self.filename)
+        if not isinstance(data, dict) or data.get('meta') != self._get_meta():
+            return False
+        self.people = data['people']
+        self.families = data['families']
+        self.deps = data['deps']
+        self.seen = data['seen']
+        self.results = data['results']
+        self.signature = data['signature']
+        return True
+
+    def save(self):
+        """
+        Store the table. Return True on success.
+        """
+        if self.filename is None:
+            return False
+        data = {'meta': self._get_meta(),
+                'people': self.people,
+                'families': self.families,
+                'deps': self.deps,
+                'seen': self.seen,
+                'results': self.results,
+                'signature': self.signature}
+        return save_stored(self.filename, data)
+
+    def update(self, callback=None):
+        """
+        Bring the table up to date with the database: read the facts of the
+        people and families added since the last update, or changed, or
+        read from objects changed since.
+
+        :param callback: called for each person and family
+        """
+        db = self.db
+        current = {}
+        if self.seen:
+            # the events can only have changed since the last update
+            for event in db.iter_events():
+                current[event.handle] = event.change
+        for family in db.iter_families():
+            current[family.handle] = family.change
+
+        # the objects read for the rows, changed since the last update
+        changed = set(handle for handle, change in self.seen.items()
+                      if handle not in self.people
+                      and current.get(handle) != change)
+
+        self.dirty = set()
+        for person in db.iter_people():
+            if callback:
+                callback()
+            handle = person.handle
+            current[handle] = person.change
+            if (handle not in self.people
+                    or self.seen.get(handle) != person.change
+                    or not changed.isdisjoint(self.deps[handle])):
+                self.__read_person(person)
+                self.dirty.add(handle)
+        removed = set(self.people).difference(current)
+        changed.update(self.dirty, removed)
+
+        self.person_order = list(db.iter_person_handles())
+        self.family_order = list(db.iter_family_handles())
+        for handle in self.family_order:
+            if callback:
+                callback()
+            facts = self.families.get(handle)
+            if (facts is None or handle in changed
+                    or not changed.isdisjoint(self.deps[handle])
+                    or facts.father in changed or facts.mother in changed
+                    or any(child[0] in changed for child in facts.children)):
+                self.__read_family(db.get_family_from_handle(handle))
+                self.dirty.add(handle)
+        removed.update(set(self.families).difference(current))
+
+        for handle in removed:
+            self.people.pop(handle, None)
+            self.families.pop(handle, None)
+            self.deps.pop(handle, None)
+            self.results.pop(handle, None)
+        keep = set(self.people).union(self.families)
+        for deps in self.deps.values():
+            keep.update(deps)
+        self.seen = dict((handle, change)
+                         for handle, change in self.seen.items()
+                         if handle in keep)
+
+    def __fetcher(self, deps):
+        """
+        Return a function reading an object, and recording it in deps.
+        """
+        def fetch(get_object, handle):
+            obj = get_object(handle)
+            if obj:
+                self.seen[handle] = obj.change
+                deps.append(handle)
+            return obj
+        return fetch
+
+    def __marriage_date(self, family, fetch):
+        """ get a family's marriage date """
+        for event_ref in family.get_event_ref_list():
+            event = fetch(self.db.get_event_from_handle, event_ref.ref)
+            if (event.get_type() == EventType.MARRIAGE
+                    and (event_ref.get_role() == EventRoleType.FAMILY
+                         or event_ref.get_role() == EventRoleType.PRIMARY)):
+                date_obj = event.get_date_object()
+                return date_obj.get_sort_value()
+        return 0
+
+    def __read_person(self, person):
+        """
+        Read the facts of a person.
+        """
+        db = self.db
+        deps = []
+        fetch = self.__fetcher(deps)
+        self.seen[person.handle] = person.change
+
+        bapt = burial = None
+        for event_ref in person.get_event_ref_list():
+            event = fetch(db.get_event_from_handle, event_ref.ref)
+            if not event:
+                continue
+            if event.get_type() == EventType.BURIAL:
+                if (burial is None
+                        and event_ref.get_role() == EventRoleType.PRIMARY):
+                    burial = event
+            elif event.get_type() == EventType.BAPTISM:
+                if bapt is None:
+                    bapt = event
+
+        birth = birth_est = invalid_birth = 0
+        birth_ref = person.get_birth_ref()
+        if birth_ref:
+            event = fetch(db.get_event_from_handle, birth_ref.ref)
+            if event:
+                birth = get_event_date(event)
+                birth_est = get_event_date(event, True)
+                invalid_birth = not event.get_date_object().get_valid()
+        if birth_est == 0 and bapt:
+            birth_est = get_event_date(bapt, True)
+
+        death = death_est = invalid_death = 0
+        death_ref = person.get_death_ref()
+        if death_ref:
+            event = fetch(db.get_event_from_handle, death_ref.ref)
+            if event:
+                death = get_event_date(event)
+                death_est = get_event_date(event, True)
+                invalid_death = not event.get_date_object().get_valid()
+        if death_est == 0 and burial:
+            death_est = get_event_date(burial, True)
+
+        n_children = 0
+        for family_handle in person.get_family_handle_list():
+            family = fetch(db.get_family_from_handle, family_handle)
+            if family:
+                n_children += len(family.get_child_ref_list())
+        first_marriage = None
+        if person.get_family_handle_list():
+            family = fetch(db.get_family_from_handle,
+                           person.get_family_handle_list()[0])
+            first_marriage = (self.__marriage_date(family, fetch)
+                              if family else 0)
+
+        name = person.get_primary_name()
+        if name.get_type() == NameType.BIRTH:
+            birth_surname = name.get_surname()
+        else:
+            birth_surname = None
+
+        self.people[person.handle] = PersonFacts(
+            person.handle, person.gramps_id, name.get_name(),
+            person.get_gender(), birth, birth_est, death, death_est,
+            get_event_date(bapt) if bapt else 0,
+            get_event_date(burial) if burial else None,
+            bool(death_ref), bool(invalid_birth), bool(invalid_death),
+            len(person.get_parent_family_handle_list()),
+            len(person.get_family_handle_list()), n_children,
+            first_marriage, birth_surname)
+        self.deps[person.handle] = tuple(set(deps))
+
+    def __read_family(self, family):
+        """
+        Read the facts of a family.
+        """
+        deps = []
+        fetch = self.__fetcher(deps)
+        self.seen[family.handle] = family.change
+        children = tuple((child_ref.ref,
+                          child_ref.frel == ChildRefType.BIRTH,
+                          child_ref.mrel == ChildRefType.BIRTH)
+                         for child_ref in family.get_child_ref_list())
+        self.families[family.handle] = FamilyFacts(
+            family.handle, family.gramps_id, family_name(family, self.db),
+            family.get_father_handle() or None,
+            family.get_mother_handle() or None,
+            family.get_relationship() == FamilyRelType.MARRIED,
+            self.__marriage_date(family, fetch), children)
+        self.deps[family.handle] = tuple(set(deps))
+
+    def verify(self, person_rules, family_rules):
+        """
+        Check the rules on the rows read by the last update, or on all rows
+        if the rules have changed since the results were stored, and return
+        the results of all rows, in database order.
+        """
+        for rule in family_rules:
+            rule.people = self.people
+        signature = (tuple(rule.get_rule_id()
+                           for rule in person_rules + family_rules), _today)
+        if signature == self.signature:
+            handles = self.dirty
+        else:
+            handles = set(self.people).union(self.families)
+        self.signature = signature
+
+        tasks = []
+        for kind, table in (('Person', self.people),
+                            ('Family', self.families)):
+            rows = [table[handle] for handle in handles if handle in table]
+            tasks.extend((kind, rows[index:index + CHUNK_ROWS])
+                         for index in range(0, len(rows), CHUNK_ROWS))
+        self.__check(tasks, len(handles),
+                     {'Person': person_rules, 'Family': family_rules})
+
+        results = []
+        for handle in self.person_order + self.family_order:
+            results.extend(self.results.get(handle, []))
+        return results
+
+    def __check(self, tasks, n_rows, rules):
+        """
+        Check the rules on the rows of the tasks, in worker processes if
+        there are many of them.
+        """
+        with worker_pool(rules, n_rows >= POOL_ROWS) as pool_map:
+            for results in pool_map(_check_rows, tasks):
+                self.results.update(results)
+
+#-------------------------------------------------------------------------
+#
+# Worker processes
+#
+#-------------------------------------------------------------------------
+def _check_rows(task):
+    """
+    Check the rules on the rows of a kind, and return the results of each
+    row.
+    """
+    kind, rows = task
+    results = dict((facts.handle, []) for facts in rows)
+    for rule in get_work()[kind]:
+        for facts in rows:
+            msg = rule.check(facts)
+            if msg:
+                results[facts.handle].append(rule.report_itself(facts, msg))
+    return results
+
+#-------------------------------------------------------------------------
+#
+# Base classes for different tests -- the rules
+#
+#-------------------------------------------------------------------------
+class Rule:
+    """
+    Basic class for use in this tool.
+
+    Other rules must inherit from this.
+    """
+    ID = 0
+    TYPE = ''
+
+    ERROR = 1
+    WARNING = 2
+
+    SEVERITY = WARNING
+
+    def broken(self, facts):
+        """
+        Return boolean indicating whether this rule is violated.
+        """
+        return False
+
+    def check(self, facts):
+        """
+        Return the rule's error message if it is violated by the row of
+        facts, else None.
+        """
+        if self.broken(facts):
+            return self.get_message()
+        return None
+
+    def get_message(self):
+        """ return the rule's error message """
+        assert False, "Need to be overriden in the derived class"
+
+    def get_rule_id(self):
+        """ return the rule's identification number, and parameters """
+        params = self._get_params()
+        return (self.ID, params)
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return tuple()
+
+    def report_itself(self, facts, msg):
+        """ return the details about a rule """
+        return (msg, facts.gramps_id, facts.name, self.TYPE,
+                self.get_rule_id(), self.SEVERITY, facts.handle)
+
+class PersonRule(Rule):
+    """
+    Person-based class.
+    """
+    TYPE = 'Person'
+
+class FamilyRule(Rule):
+    """
+    Family-based class.
+    """
+    TYPE = 'Family'
+
+    # handle -> PersonFacts, set by the FactTable
+    people = {}
+
+    def get_father(self, facts):
+        """ get a family's father """
+        return self.people.get(facts.father) if facts.father else None
+
+    def get_mother(self, facts):
+        """ get a family's mother """
+        return self.people.get(facts.mother) if facts.mother else None
+
+    def get_child_birth_dates(self, facts, estimate):
+        """ get a family's children's birth dates """
+        dates = []
+        for child_handle, dummy, dummy in facts.children:
+            child_birth_date = get_birth_date(self.people.get(child_handle),
+                                              estimate)
+            if child_birth_date > 0:
+                dates.append(child_birth_date)
+        return dates
+
+#-------------------------------------------------------------------------
+#
+# Actual rules for testing
+#
+#-------------------------------------------------------------------------
+class BirthAfterBapt(PersonRule):
+    """ test if a person was baptised before their birth """
+    ID = 1
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return facts.birth > 0 and facts.bapt > 0 and facts.birth > facts.bapt
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Baptism before birth")
+
+class DeathBeforeBapt(PersonRule):
+    """ test if a person died before their baptism """
+    ID = 2
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return facts.death > 0 and facts.bapt > 0 and facts.bapt > facts.death
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Death before baptism")
+
+class BirthAfterBury(PersonRule):
+    """ test if a person was buried before their birth """
+    ID = 3
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        bury_ok = facts.bury is not None and facts.bury > 0
+        return facts.birth > 0 and bury_ok and facts.birth > facts.bury
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Burial before birth")
+
+class DeathAfterBury(PersonRule):
+    """ test if a person was buried before their death """
+    ID = 4
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        bury_ok = facts.bury is not None and facts.bury > 0
+        return facts.death > 0 and bury_ok and facts.death > facts.bury
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Burial before death")
+
+class BirthAfterDeath(PersonRule):
+    """ test if a person died before their birth """
+    ID = 5
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return (facts.birth > 0 and facts.death > 0 and
+                facts.birth > facts.death)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Death before birth")
+
+class BaptAfterBury(PersonRule):
+    """ test if a person was buried before their baptism """
+    ID = 6
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        bury_ok = facts.bury is not None and facts.bury > 0
+        return facts.bapt > 0 and bury_ok and facts.bapt > facts.bury
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Burial before baptism")
+
+class OldAge(PersonRule):
+    """ test if a person died beyond the age the user has set """
+    ID = 7
+    SEVERITY = Rule.WARNING
+    def __init__(self, old_age, est):
+        """ initialize the rule """
+        self.old_age = old_age
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.old_age, self.est)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        age_at_death = get_age_at_death(facts, self.est)
+        return age_at_death / 365 > self.old_age
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Old age at death")
+
+class UnknownGender(PersonRule):
+    """ test if a person is neither a male nor a female """
+    ID = 8
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        female = facts.gender == Person.FEMALE
+        male = facts.gender == Person.MALE
+        return not (male or female)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Unknown gender")
+
+class MultipleParents(PersonRule):
+    """ test if a person belongs to multiple families """
+    ID = 9
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return facts.n_parent_families > 1
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Multiple parents")
+
+class MarriedOften(PersonRule):
+    """ test if a person was married 'often' """
+    ID = 10
+    SEVERITY = Rule.WARNING
+    def __init__(self, wedder):
+        """ initialize the rule """
+        self.wedder = wedder
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.wedder,)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return facts.n_families > self.wedder
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Married often")
+
+class OldUnmarried(PersonRule):
+    """ test if a person was married when they died """
+    ID = 11
+    SEVERITY = Rule.WARNING
+    def __init__(self, old_unm, est):
+        """ initialize the rule """
+        self.old_unm = old_unm
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.old_unm, self.est)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        age_at_death = get_age_at_death(facts, self.est)
+        return age_at_death / 365 > self.old_unm and facts.n_families == 0
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Old and unmarried")
+
+class TooManyChildren(PersonRule):
+    """ test if a person had 'too many' children """
+    ID = 12
+    SEVERITY = Rule.WARNING
+    def __init__(self, mx_child_dad, mx_child_mom):
+        """ initialize the rule """
+        self.mx_child_dad = mx_child_dad
+        self.mx_child_mom = mx_child_mom
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.mx_child_dad, self.mx_child_mom)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        if (facts.gender == Person.MALE
+                and facts.n_children > self.mx_child_dad):
+            return True
+
+        if (facts.gender == Person.FEMALE
+                and facts.n_children > self.mx_child_mom):
+            return True
+
+        return False
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Too many children")
+
+class SameSexFamily(FamilyRule):
+    """ test if a family's parents are both male or both female """
+    ID = 13
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        mother = self.get_mother(facts)
+        father = self.get_father(facts)
+        same_sex = (mother and father and
+                    (mother.gender == father.gender))
+        unknown_sex = (mother and
+                       (mother.gender == Person.UNKNOWN))
+        return same_sex and not unknown_sex
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Same sex marriage")
+
+class FemaleHusband(FamilyRule):
+    """ test if a family's 'husband' is female """
+    ID = 14
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        father = self.get_father(facts)
+        return father and (father.gender == Person.FEMALE)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Female husband")
+
+class MaleWife(FamilyRule):
+    """ test if a family's 'wife' is male """
+    ID = 15
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        mother = self.get_mother(facts)
+        return mother and (mother.gender == Person.MALE)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Male wife")
+
+class SameSurnameFamily(FamilyRule):
+    """ test if a family's parents were born with the same surname """
+    ID = 16
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        mother = self.get_mother(facts)
+        father = self.get_father(facts)
+
+        # Make sure both mother and father exist, and only compare birth
+        # names (not married names). Empty names don't count.
+        return bool(mother and father
+                    and mother.birth_surname and father.birth_surname
+                    and mother.birth_surname == father.birth_surname)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Husband and wife with the same surname")
+
+class LargeAgeGapFamily(FamilyRule):
+    """ test if a family's parents were born far apart """
+    ID = 17
+    SEVERITY = Rule.WARNING
+    def __init__(self, hw_diff, est):
+        """ initialize the rule """
+        self.hw_diff = hw_diff
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.hw_diff, self.est)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        mother_birth_date = get_birth_date(self.get_mother(facts), self.est)
+        father_birth_date = get_birth_date(self.get_father(facts), self.est)
+        mother_birth_date_ok = mother_birth_date > 0
+        father_birth_date_ok = father_birth_date > 0
+        large_diff = abs(
+            father_birth_date-mother_birth_date) / 365 > self.hw_diff
+        return mother_birth_date_ok and father_birth_date_ok and large_diff
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Large age difference between spouses")
+
+class MarriageBeforeBirth(FamilyRule):
+    """ test if each family's parent was born before the marriage """
+    ID = 18
+    SEVERITY = Rule.ERROR
+    def __init__(self, est):
+        """ initialize the rule """
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.est,)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        marr_date = facts.marriage
+        marr_date_ok = marr_date > 0
+
+        mother_birth_date = get_birth_date(self.get_mother(facts), self.est)
+        father_birth_date = get_birth_date(self.get_father(facts), self.est)
+        mother_birth_date_ok = mother_birth_date > 0
+        father_birth_date_ok = father_birth_date > 0
+
+        father_broken = (father_birth_date_ok and marr_date_ok
+                         and (father_birth_date > marr_date))
+        mother_broken = (mother_birth_date_ok and marr_date_ok
+                         and (mother_birth_date > marr_date))
+
+        return father_broken or mother_broken
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Marriage before birth")
+
+class MarriageAfterDeath(FamilyRule):
+    """ test if each family's parent died before the marriage """
+    ID = 19
+    SEVERITY = Rule.ERROR
+    def __init__(self, est):
+        """ initialize the rule """
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.est,)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        marr_date = facts.marriage
+        marr_date_ok = marr_date > 0
+
+        mother_death_date = get_death_date(self.get_mother(facts), self.est)
+        father_death_date = get_death_date(self.get_father(facts), self.est)
+        mother_death_date_ok = mother_death_date > 0
+        father_death_date_ok = father_death_date > 0
+
+        father_broken = (father_death_date_ok and marr_date_ok
+                         and (father_death_date < marr_date))
+        mother_broken = (mother_death_date_ok and marr_date_ok
+                         and (mother_death_date < marr_date))
+
+        return father_broken or mother_broken
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Marriage after death")
+
+class EarlyMarriage(FamilyRule):
+    """ test if each family's parent was 'too young' at the marriage """
+    ID = 20
+    SEVERITY = Rule.WARNING
+    def __init__(self, yng_mar, est):
+        """ initialize the rule """
+        self.yng_mar = yng_mar
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.yng_mar, self.est,)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        marr_date = facts.marriage
+        marr_date_ok = marr_date > 0
+
+        mother_birth_date = get_birth_date(self.get_mother(facts), self.est)
+        father_birth_date = get_birth_date(self.get_father(facts), self.est)
+        mother_birth_date_ok = mother_birth_date > 0
+        father_birth_date_ok = father_birth_date > 0
+
+        father_broken = (
+            father_birth_date_ok and marr_date_ok and
+            father_birth_date < marr_date and
+            ((marr_date - father_birth_date) / 365 < self.yng_mar))
+        mother_broken = (
+            mother_birth_date_ok and marr_date_ok and
+            mother_birth_date < marr_date and
+            ((marr_date - mother_birth_date) / 365 < self.yng_mar))
+
+        return father_broken or mother_broken
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Early marriage")
+
+class LateMarriage(FamilyRule):
+    """ test if each family's parent was 'too old' at the marriage """
+    ID = 21
+    SEVERITY = Rule.WARNING
+    def __init__(self, old_mar, est):
+        """ initialize the rule """
+        self.old_mar = old_mar
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.old_mar, self.est)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        marr_date = facts.marriage
+        marr_date_ok = marr_date > 0
+
+        mother_birth_date = get_birth_date(self.get_mother(facts), self.est)
+        father_birth_date = get_birth_date(self.get_father(facts), self.est)
+        mother_birth_date_ok = mother_birth_date > 0
+        father_birth_date_ok = father_birth_date > 0
+
+        father_broken = (
+            father_birth_date_ok and marr_date_ok and
+            ((marr_date - father_birth_date) / 365 > self.old_mar))
+        mother_broken = (
+            mother_birth_date_ok and marr_date_ok and
+            ((marr_date - mother_birth_date) / 365 > self.old_mar))
+
+        return father_broken or mother_broken
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Late marriage")
+
+class OldParent(FamilyRule):
+    """ test if each family's parent was 'too old' at a child's birth """
+    ID = 22
+    SEVERITY = Rule.WARNING
+    def __init__(self, old_mom, old_dad, est):
+        """ initialize the rule """
+        self.old_mom = old_mom
+        self.old_dad = old_dad
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.old_mom, self.old_dad, self.est)
+
+    def check(self, facts):
+        """ return the rule's error message if it is violated """
+        mother_birth_date = get_birth_date(self.get_mother(facts), self.est)
+        father_birth_date = get_birth_date(self.get_father(facts), self.est)
+        mother_birth_date_ok = mother_birth_date > 0
+        father_birth_date_ok = father_birth_date > 0
+
+        for child_handle, dummy, dummy in facts.children:
+            child_birth_date = get_birth_date(self.people.get(child_handle),
+                                              self.est)
+            child_birth_date_ok = child_birth_date > 0
+            if not child_birth_date_ok:
+                continue
+            father_broken = (
+                father_birth_date_ok and
+                ((child_birth_date - father_birth_date) / 365 > self.old_dad))
+            if father_broken:
+                return self.father_message()
+
+            mother_broken = (
+                mother_birth_date_ok and
+                ((child_birth_date - mother_birth_date) / 365 > self.old_mom))
+            if mother_broken:
+                return self.mother_message()
+        return None
+
+    def father_message(self):
+        """ return the rule's error message """
+        return _("Old father")
+
+    def mother_message(self):
+        """ return the rule's error message """
+        return _("Old mother")
+
+class YoungParent(FamilyRule):
+    """ test if each family's parent was 'too young' at a child's birth """
+    ID = 23
+    SEVERITY = Rule.WARNING
+    def __init__(self, yng_mom, yng_dad, est):
+        """ initialize the rule """
+        self.yng_dad = yng_dad
+        self.yng_mom = yng_mom
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.yng_mom, self.yng_dad, self.est)
+
+    def check(self, facts):
+        """ return the rule's error message if it is violated """
+        mother_birth_date = get_birth_date(self.get_mother(facts), self.est)
+        father_birth_date = get_birth_date(self.get_father(facts), self.est)
+        mother_birth_date_ok = mother_birth_date > 0
+        father_birth_date_ok = father_birth_date > 0
+
+        for child_handle, dummy, dummy in facts.children:
+            child_birth_date = get_birth_date(self.people.get(child_handle),
+                                              self.est)
+            child_birth_date_ok = child_birth_date > 0
+            if not child_birth_date_ok:
+                continue
+            father_broken = (
+                father_birth_date_ok and
+                ((child_birth_date - father_birth_date) / 365 < self.yng_dad))
+            if father_broken:
+                return self.father_message()
+
+            mother_broken = (
+                mother_birth_date_ok and
+                ((child_birth_date - mother_birth_date) / 365 < self.yng_mom))
+            if mother_broken:
+                return self.mother_message()
+        return None
+
+    def father_message(self):
+        """ return the rule's error message """
+        return _("Young father")
+
+    def mother_message(self):
+        """ return the rule's error message """
+        return _("Young mother")
+
+class UnbornParent(FamilyRule):
+    """ test if each family's parent was not yet born at a child's birth """
+    ID = 24
+    SEVERITY = Rule.ERROR
+    def __init__(self, est):
+        """ initialize the rule """
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.est,)
+
+    def check(self, facts):
+        """ return the rule's error message if it is violated """
+        mother_birth_date = get_birth_date(self.get_mother(facts), self.est)
+        father_birth_date = get_birth_date(self.get_father(facts), self.est)
+        mother_birth_date_ok = mother_birth_date > 0
+        father_birth_date_ok = father_birth_date > 0
+
+        for child_handle, dummy, dummy in facts.children:
+            child_birth_date = get_birth_date(self.people.get(child_handle),
+                                              self.est)
+            child_birth_date_ok = child_birth_date > 0
+            if not child_birth_date_ok:
+                continue
+            father_broken = (father_birth_date_ok
+                             and (father_birth_date > child_birth_date))
+            if father_broken:
+                return self.father_message()
+
+            mother_broken = (mother_birth_date_ok
+                             and (mother_birth_date > child_birth_date))
+            if mother_broken:
+                return self.mother_message()
+        return None
+
+    def father_message(self):
+        """ return the rule's error message """
+        return _("Unborn father")
+
+    def mother_message(self):
+        """ return the rule's error message """
+        return _("Unborn mother")
+
+class DeadParent(FamilyRule):
+    """ test if each family's parent was dead at a child's birth """
+    ID = 25
+    SEVERITY = Rule.ERROR
+    def __init__(self, est):
+        """ initialize the rule """
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.est,)
+
+    def check(self, facts):
+        """ return the rule's error message if it is violated """
+        mother_death_date = get_death_date(self.get_mother(facts), self.est)
+        father_death_date = get_death_date(self.get_father(facts), self.est)
+        mother_death_date_ok = mother_death_date > 0
+        father_death_date_ok = father_death_date > 0
+
+        for (child_handle, has_birth_rel_to_father,
+             has_birth_rel_to_mother) in facts.children:
+            child_birth_date = get_birth_date(self.people.get(child_handle),
+                                              self.est)
+            child_birth_date_ok = child_birth_date > 0
+            if not child_birth_date_ok:
+                continue
+
+            father_broken = (
+                has_birth_rel_to_father
+                and father_death_date_ok
+                and ((father_death_date + 294) < child_birth_date))
+            if father_broken:
+                return self.father_message()
+
+            mother_broken = (has_birth_rel_to_mother
+                             and mother_death_date_ok
+                             and (mother_death_date < child_birth_date))
+            if mother_broken:
+                return self.mother_message()
+        return None
+
+    def father_message(self):
+        """ return the rule's error message """
+        return _("Dead father")
+
+    def mother_message(self):
+        """ return the rule's error message """
+        return _("Dead mother")
+
+class LargeChildrenSpan(FamilyRule):
+    """ test if a family's first and last children were born far apart """
+    ID = 26
+    SEVERITY = Rule.WARNING
+    def __init__(self, cb_span, est):
+        """ initialize the rule """
+        self.cbs = cb_span
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.cbs, self.est)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        child_birh_dates = self.get_child_birth_dates(facts, self.est)
+        child_birh_dates.sort()
+
+        return (child_birh_dates and
+                ((child_birh_dates[-1] - child_birh_dates[0]) / 365 > self.cbs))
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Large year span for all children")
+
+class LargeChildrenAgeDiff(FamilyRule):
+    """ test if any of a family's children were born far apart """
+    ID = 27
+    SEVERITY = Rule.WARNING
+    def __init__(self, c_space, est):
+        """ initialize the rule """
+        self.c_space = c_space
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.c_space, self.est)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        child_birh_dates = self.get_child_birth_dates(facts, self.est)
+        child_birh_dates_diff = [child_birh_dates[i+1] - child_birh_dates[i]
+                                 for i in range(len(child_birh_dates)-1)]
+
+        return (child_birh_dates_diff and
+                max(child_birh_dates_diff) / 365 > self.c_space)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Large age differences between children")
+
+class Disconnected(PersonRule):
+    """ test if a person has no children and no parents """
+    ID = 28
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return facts.n_parent_families + facts.n_families == 0
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Disconnected individual")
+
+class InvalidBirthDate(PersonRule):
+    """ test if a person has an 'invalid' birth date """
+    ID = 29
+    SEVERITY = Rule.ERROR
+    def __init__(self, invdate):
+        """ initialize the rule """
+        self._invdate = invdate
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        # should we check?
+        return bool(self._invdate) and facts.invalid_birth
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self._invdate,)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Invalid birth date")
+
+class InvalidDeathDate(PersonRule):
+    """ test if a person has an 'invalid' death date """
+    ID = 30
+    SEVERITY = Rule.ERROR
+    def __init__(self, invdate):
+        """ initialize the rule """
+        self._invdate = invdate
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        # should we check?
+        return bool(self._invdate) and facts.invalid_death
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self._invdate,)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Invalid death date")
+
+class MarriedRelation(FamilyRule):
+    """ test if a family has a marriage date but is not marked 'married' """
+    ID = 31
+    SEVERITY = Rule.WARNING
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return not facts.married and facts.marriage > 0
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Marriage date but not married")
+
+class OldAgeButNoDeath(PersonRule):
+    """ test if a person is 'too old' but is not shown as dead """
+    ID = 32
+    SEVERITY = Rule.WARNING
+    def __init__(self, old_age, est):
+        """ initialize the rule """
+        self.old_age = old_age
+        self.est = est
+
+    def _get_params(self):
+        """ return the rule's parameters """
+        return (self.old_age, self.est)
+
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        birth_date = get_birth_date(facts, self.est)
+        death_date = get_death_date(facts, True) # or burial date
+        if facts.dead or death_date or not birth_date:
+            return False
+        age = (_today - birth_date) / 365
+        return age > self.old_age
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Old age but no death")
+
+class BirthEqualsDeath(PersonRule):
+    """ test if a person's birth date is the same as their death date """
+    ID = 33
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        return (facts.death > 0 and facts.birth > 0 and
+                facts.birth == facts.death)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Birth equals death")
+
+class BirthEqualsMarriage(PersonRule):
+    """ test if a person's birth date is the same as their marriage date """
+    ID = 34
+    SEVERITY = Rule.ERROR
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        # only the first family is checked
+        marr_date = facts.first_marriage
+        return (bool(marr_date) and marr_date > 0 and facts.birth > 0 and
+                facts.birth == marr_date)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Birth equals marriage")
+
+class DeathEqualsMarriage(PersonRule):
+    """ test if a person's death date is the same as their marriage date """
+    ID = 35
+    SEVERITY = Rule.WARNING # it's possible
+    def broken(self, facts):
+        """ return boolean indicating whether this rule is violated """
+        # only the first family is checked
+        marr_date = facts.first_marriage
+        return (bool(marr_date) and marr_date > 0 and facts.death > 0 and
+                facts.death == marr_date)
+
+    def get_message(self):
+        """ return the rule's error message """
+        return _("Death equals marriage")
+
+def get_rules(options):
+    """
+    Return the person rules and the family rules, with the parameters in
+    the options of the Verify tool.
+    """
+    oldage = options['oldage']
+    estimate_age = options['estimate_age']
+    person_rules = [
+        BirthAfterBapt(),
+        DeathBeforeBapt(),
+        BirthAfterBury(),
+        DeathAfterBury(),
+        BirthAfterDeath(),
+        BaptAfterBury(),
+        OldAge(oldage, estimate_age),
+        OldAgeButNoDeath(oldage, estimate_age),
+        UnknownGender(),
+        MultipleParents(),
+        MarriedOften(options['wedder']),
+        OldUnmarried(options['oldunm'], estimate_age),
+        TooManyChildren(options['mxchilddad'], options['mxchildmom']),
+        Disconnected(),
+        InvalidBirthDate(options['invdate']),
+        InvalidDeathDate(options['invdate']),
+        BirthEqualsDeath(),
+        BirthEqualsMarriage(),
+        DeathEqualsMarriage(),
+        ]
+    family_rules = [
+        SameSexFamily(),
+        FemaleHusband(),
+        MaleWife(),
+        SameSurnameFamily(),
+        LargeAgeGapFamily(options['hwdif'], estimate_age),
+        MarriageBeforeBirth(estimate_age),
+        MarriageAfterDeath(estimate_age),
+        EarlyMarriage(options['yngmar'], estimate_age),
+        LateMarriage(options['oldmar'], estimate_age),
+        OldParent(options['oldmom'], options['olddad'], estimate_age),
+        YoungParent(options['yngmom'], options['yngdad'], estimate_age),
+        UnbornParent(estimate_age),
+        DeadParent(estimate_age),
+        LargeChildrenSpan(options['cbspan'], estimate_age),
+        LargeChildrenAgeDiff(options['cspace'], estimate_age),
+        MarriedRelation(),
+        ]
+    return person_rules, family_rules
@@ -0,0 +1,168 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for libcheck.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.lib import Person, Event, EventRef, Note
+from gramps.plugins.lib import libcheck
+from gramps.plugins.lib.libcheck import (BacklinkChecker, ReferenceScan,
+                                         NO_BACKLINK, MISSING_OBJECT,
+                                         NO_REFERENCE)
+from gramps.test.test_util import make_memory_db
+
+class NoDbapi:
+    '''
+    A database without the DB-API reference table, as with other backends.
+    '''
+    def __init__(self, db):
+        self.__db = db
+
+    def __getattr__(self, name):
+        if name == 'dbapi':
+            raise AttributeError(name)
+        return getattr(self.__db, name)
+
+#-------------------------------------------------------------------------
+#
+# BacklinkTest class
+#
+#-------------------------------------------------------------------------
+class BacklinkTest(unittest.TestCase):
+    '''
+    Tests of the check of the reference map.
+    '''
+
+    def setUp(self):
+        self.db = make_memory_db()
+        with DbTxn('Add people', self.db) as trans:
+            self.note = Note()
+            self.note.set_gramps_id('N0001')
+            self.db.add_note(self.note, trans)
+            self.event = Event()
+            self.event.set_gramps_id('E0001')
+            self.event.add_note(self.note.handle)
+            self.db.add_event(self.event, trans)
+            self.person = Person()
+            self.person.set_gramps_id('I0001')
+            ref = EventRef()
+            ref.set_reference_handle(self.event.handle)
+            self.person.add_event_ref(ref)
+            self.db.add_person(self.person, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def check(self):
+        problems = sorted(BacklinkChecker(self.db).check())
+        self.assertEqual(sorted(BacklinkChecker(NoDbapi(self.db)).check()),
+                         problems)
+        return problems
+
+    def test_consistent(self):
+        self.assertEqual(self.check(), [])
+
+    def test_no_backlink(self):
+        self.db.dbapi.execute("DELETE FROM reference WHERE obj_handle = ?",
+                              [self.person.handle])
+        self.assertEqual(self.check(),
+                         [(NO_BACKLINK, 'Person', 'I0001', 'Event')])
+
+    def test_missing_object(self):
+        self.db.dbapi.execute("INSERT INTO reference (obj_handle, obj_class, "
+                              "ref_handle, ref_class) VALUES (?, ?, ?, ?)",
+                              ['missing', 'Person', self.event.handle,
+                               'Event'])
+        self.assertEqual(self.check(),
+                         [(MISSING_OBJECT, 'Event', 'E0001', 'Person')])
+
+    def test_no_reference(self):
+        self.db.dbapi.execute("INSERT INTO reference (obj_handle, obj_class, "
+                              "ref_handle, ref_class) VALUES (?, ?, ?, ?)",
+                              [self.person.handle, 'Person',
+                               self.note.handle, 'Note'])
+        self.assertEqual(self.check(),
+                         [(NO_REFERENCE, 'Note', 'N0001', 'Person')])
+
+#-------------------------------------------------------------------------
+#
+# ReferenceScanTest class
+#
+#-------------------------------------------------------------------------
+class ReferenceScanTest(unittest.TestCase):
+    '''
+    Tests of the scan of the references to missing objects.
+    '''
+
+    def setUp(self):
+        self.db = make_memory_db()
+        with DbTxn('Add people', self.db) as trans:
+            self.note = Note()
+            self.db.add_note(self.note, trans)
+            self.people = []
+            for dummy in range(5):
+                person = Person()
+                person.add_note(self.note.handle)
+                self.db.add_person(person, trans)
+                self.people.append(person)
+            person = self.people[0]
+            person.add_note('missing')
+            person.add_citation(None)
+            self.db.commit_person(person, trans)
+
+    def tearDown(self):
+        self.db.close()
+
+    def scan(self, known=None):
+        return ReferenceScan(self.db, ('Citation', 'Note')).scan(known=known)
+
+    def test_scan(self):
+        handle = self.people[0].handle
+        self.assertEqual(self.scan(),
+                         {'Citation': [('Person', handle, None)],
+                          'Note': [('Person', handle, 'missing')]})
+        self.assertEqual(self.scan({'Note': ['missing']}),
+                         {'Citation': [('Person', handle, None)],
+                          'Note': []})
+
+    def test_pool(self):
+        expected = self.scan()
+        pool_rows, chunk_rows = libcheck.POOL_ROWS, libcheck.CHUNK_ROWS
+        libcheck.POOL_ROWS, libcheck.CHUNK_ROWS = 0, 2
+        try:
+            self.assertEqual(self.scan(), expected)
+        finally:
+            libcheck.POOL_ROWS, libcheck.CHUNK_ROWS = pool_rows, chunk_rows
+
+
+if __name__ == "__main__":
+    unittest.main()
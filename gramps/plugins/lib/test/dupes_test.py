@@ -0,0 +1,208 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for libdupes.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import random
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.lib import Person, Date
+from gramps.gen.soundex import soundex
+from gramps.plugins.lib import libdupes
+from gramps.plugins.lib.libdupes import DupesIndex, score_pair
+from gramps.test.test_util import add_family, add_person, make_memory_db
+
+SURNAMES = ['Smith', 'Smyth', 'Smit', 'Jones', 'Johns', 'Garner']
+GIVEN = ['John', 'J.', 'Jon', 'Mary', 'Mary Ann', 'Ann', 'Anna', 'M', '']
+
+#-------------------------------------------------------------------------
+#
+# DupesTest class
+#
+#-------------------------------------------------------------------------
+class DupesTest(unittest.TestCase):
+    '''
+    Tests of the duplicate people detection.
+    '''
+
+    def setUp(self):
+        self.db = make_memory_db()
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_person(self, trans, surname, first_name, gender=Person.MALE,
+                   year=None, modifier=Date.MOD_NONE):
+        birth = None
+        if year is not None:
+            birth = Date()
+            if modifier == Date.MOD_RANGE:
+                birth.set(modifier=modifier,
+                          value=(0, 0, year, False, 0, 0, year + 5, False))
+            else:
+                birth.set_yr_mon_day(year, 0, 0)
+                birth.set_modifier(modifier)
+        return add_person(self.db, trans, surname, first_name, gender,
+                          birth=birth)
+
+    def find(self, thresh=0.25, use_soundex=True):
+        index = DupesIndex(self.db, use_soundex)
+        index.update()
+        return index.find(thresh)
+
+    def brute_force(self, thresh=0.25, use_soundex=True):
+        """
+        Compare all the people of the same gender group and surname, as the
+        tool did before the blocking keys.
+        """
+        index = DupesIndex(self.db, use_soundex)
+        index.update()
+        ancestors = {}
+        handles = list(self.db.iter_person_handles())
+        matches = {}
+        for p1key in handles:
+            f1 = index.features[p1key]
+            for p2key in handles:
+                f2 = index.features[p2key]
+                key1 = f1.name.surnames
+                key2 = f2.name.surnames
+                if use_soundex:
+                    key1, key2 = soundex(key1), soundex(key2)
+                if (p1key == p2key or key1 != key2 or
+                        (f1.gender == Person.MALE) !=
+                        (f2.gender == Person.MALE)):
+                    continue
+                if p2key in matches and matches[p2key][0] == p1key:
+                    continue
+                chance = score_pair(f1, f2, use_soundex)
+                if chance >= thresh:
+                    if (p2key in index._DupesIndex__ancestors(p1key,
+                                                              ancestors) or
+                            p1key in index._DupesIndex__ancestors(p2key,
+                                                                  ancestors)):
+                        continue
+                    if p1key not in matches or matches[p1key][1] > chance:
+                        matches[p1key] = (p2key, chance)
+        return matches
+
+    def test_match(self):
+        with DbTxn('Add people', self.db) as trans:
+            john1 = self.add_person(trans, 'Smith', 'John', year=1850)
+            john2 = self.add_person(trans, 'Smyth', 'J.', year=1850)
+            self.add_person(trans, 'Smith', 'John', year=1851)
+            self.add_person(trans, 'Smith', 'John', gender=Person.FEMALE,
+                            year=1850)
+            self.add_person(trans, 'Jones', 'John', year=1850)
+        matches = self.find()
+        pair = set(matches.items())
+        self.assertEqual(len(matches), 1)
+        key, (other, chance) = pair.pop()
+        self.assertEqual({key, other}, {john1.handle, john2.handle})
+        self.assertEqual(chance, 3.25)
+
+    def test_ancestor(self):
+        with DbTxn('Add people', self.db) as trans:
+            father = self.add_person(trans, 'Smith', 'John')
+            son = self.add_person(trans, 'Smith', 'John')
+            add_family(self.db, trans, father, children=[son])
+        self.assertEqual(self.find(), {})
+
+    def test_blocking(self):
+        rand = random.Random(1234)
+        with DbTxn('Add people', self.db) as trans:
+            for dummy in range(300):
+                modifier = rand.choice([Date.MOD_NONE, Date.MOD_NONE,
+                                        Date.MOD_ABOUT, Date.MOD_RANGE])
+                year = rand.choice([None, 1800, 1805, 1809, 1810, 1840])
+                self.add_person(trans, rand.choice(SURNAMES),
+                                rand.choice(GIVEN),
+                                gender=rand.choice([Person.MALE,
+                                                    Person.FEMALE,
+                                                    Person.UNKNOWN]),
+                                year=year, modifier=modifier)
+        for use_soundex in (True, False):
+            for thresh in (0.25, 1.0, 2.0):
+                self.assertEqual(self.find(thresh, use_soundex),
+                                 self.brute_force(thresh, use_soundex))
+
+    def test_pool(self):
+        with DbTxn('Add people', self.db) as trans:
+            for year in range(200):
+                self.add_person(trans, 'Smith', 'John', year=1800 + year % 3)
+                self.add_person(trans, 'Smith', 'John')
+        expected = self.find()
+        pool_pairs = libdupes.POOL_PAIRS
+        libdupes.POOL_PAIRS = 0
+        try:
+            self.assertEqual(self.find(), expected)
+        finally:
+            libdupes.POOL_PAIRS = pool_pairs
+
+    def test_update(self):
+        with DbTxn('Add people', self.db) as trans:
+            john1 = self.add_person(trans, 'Smith', 'John', year=1850)
+            john2 = self.add_person(trans, 'Smith', 'John', year=1850)
+            mary = self.add_person(trans, 'Smith', 'Mary',
+                                   gender=Person.FEMALE)
+        index = DupesIndex(self.db)
+        index.update()
+        self.assertEqual(len(index.find(0.25)), 1)
+
+        # a change to an event of a person
+        event = self.db.get_event_from_handle(
+            john2.get_birth_ref().ref)
+        event.get_date_object().set_yr_mon_day(1860, 0, 0)
+        with DbTxn('Edit event', self.db) as trans:
+            self.db.commit_event(event, trans, event.change + 1)
+        index.update()
+        self.assertEqual(index.find(0.25), {})
+
+        # a new person, and a removed one
+        with DbTxn('Add and remove', self.db) as trans:
+            mary2 = self.add_person(trans, 'Smith', 'Mary',
+                                    gender=Person.FEMALE)
+            self.db.remove_person(john1.handle, trans)
+        index.update()
+        self.assertNotIn(john1.handle, index.features)
+        matches = index.find(0.25)
+        self.assertEqual(len(matches), 1)
+        key, (other, chance) = matches.popitem()
+        self.assertEqual({key, other}, {mary.handle, mary2.handle})
+        self.assertEqual(index.scores, self.fresh_scores())
+
+    def fresh_scores(self):
+        index = DupesIndex(self.db)
+        index.update()
+        return index.scores
+
+
+if __name__ == "__main__":
+    unittest.main()
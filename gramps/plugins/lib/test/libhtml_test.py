@@ -0,0 +1,101 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for libhtml.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.plugins.lib.libhtml import Html, HtmlStream
+
+#-------------------------------------------------------------------------
+#
+# HtmlStreamTest class
+#
+#-------------------------------------------------------------------------
+class HtmlStreamTest(unittest.TestCase):
+    '''
+    Tests of the writing of a page a piece at a time.
+    '''
+
+    def build(self, stream_rows):
+        """
+        Build a page with a table of rows, written by a stream if
+        stream_rows is True, and return its lines.
+        """
+        lines = []
+        page, dummy, body = Html.page('Test')
+        with Html('div', class_='content') as division:
+            body += division
+            division += Html('p', 'Some people', inline=True)
+            with Html('table') as table:
+                division += table
+                tbody = Html('tbody')
+                table += tbody
+                tbody += Html('tr') + Html('td', 'First', inline=True)
+        if stream_rows:
+            stream = HtmlStream(page, lines.append)
+            stream.begin(tbody)
+        for index in range(3):
+            trow = (Html('tr') + Html('td', str(index), inline=True) +
+                    Html('td', Html('a', 'Link', href='#'), indent=None))
+            if stream_rows:
+                stream.write(trow)
+                stream.write('<!-- row %d -->' % index)
+            else:
+                tbody += (trow, '<!-- row %d -->' % index)
+        body += Html('div', 'Footer', id='footer')
+        if stream_rows:
+            stream.end()
+        else:
+            page.write(lines.append)
+        return lines
+
+    def test_stream(self):
+        self.assertEqual(self.build(True), self.build(False))
+
+    def test_section(self):
+        page = Html('div') + Html('p', 'Text')
+        stream = HtmlStream(page, [].append)
+        self.assertRaises(ValueError, stream.begin, Html('tbody'))
+        inline = Html('p', 'Text', inline=True)
+        page += inline
+        stream = HtmlStream(page, [].append)
+        self.assertRaises(ValueError, stream.begin, inline)
+
+    def test_write(self):
+        page = Html('div') + Html('p', 'Text', inline=True)
+        lines = []
+        page.write(lines.append)
+        self.assertEqual(lines, ['\t<div>', '\t\t<p>Text</p>', '\t</div>'])
+        self.assertEqual(str(page), '<div><p>Text</p></div>')
+
+
+if __name__ == "__main__":
+    unittest.main()
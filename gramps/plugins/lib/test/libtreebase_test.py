@@ -0,0 +1,183 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for libtreebase.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import random
+import time
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.plugins.lib.libtreebase import BoxBase, LineBase, ColumnLayout
+
+# time in seconds allowed to lay out a tree of 10000 boxes
+LAYOUT_TARGET = 0.5
+
+class Options:
+    """ The report options used by the layout """
+    littleoffset = 0.1
+    col_width = 1.0
+    max_box_width = 4.0
+
+def make_tree(columns, children, seed, size=None):
+    """
+    Make the boxes of a descendant tree, each column being one generation,
+    and each box having up to children children, with up to size boxes.
+    """
+    rand = random.Random(seed)
+    cols = [[BoxBase()]]
+    count = 1
+    for level in range(1, columns):
+        cols.append([])
+        for parent in cols[level-1]:
+            for dummy in range(rand.randint(0, children)):
+                if count == size:
+                    break
+                count += 1
+                box = BoxBase()
+                box.level = (level, 0)
+                if parent.line_to is None:
+                    parent.line_to = LineBase(parent)
+                parent.line_to.add_to(box)
+                cols[level].append(box)
+    boxes = []
+    for col in cols:
+        for index, box in enumerate(col):
+            box.y_cm = index * 1.5
+            box.height = 1.0
+            box.linked_box = col[index+1] if index+1 < len(col) else None
+            boxes.append(box)
+    return boxes
+
+def move_col(box, amount):
+    """ The moves done box by box """
+    while box:
+        box.y_cm += amount
+        box = box.linked_box
+
+def move_next_cols(box, amount):
+    col = [box]
+    while col:
+        if len(col) == 1 and col[0].line_to:
+            col.append(col[0].line_to.end[0])
+        col[0].y_cm += amount
+        col[0] = col[0].linked_box
+        if col[0] is None:
+            col.pop(0)
+
+#-------------------------------------------------------------------------
+#
+# ColumnLayoutTest class
+#
+#-------------------------------------------------------------------------
+class ColumnLayoutTest(unittest.TestCase):
+    '''
+    Tests of the placement of the boxes of tree reports.
+    '''
+
+    def layout(self, boxes):
+        layout = ColumnLayout(Options())
+        for box in boxes:
+            layout.add_box(box)
+        return layout
+
+    def test_column_x(self):
+        layout = ColumnLayout(Options())
+        self.assertAlmostEqual(layout.column_x(0), 0.1)
+        self.assertAlmostEqual(layout.column_x(2), 10.1)
+
+    def test_move_down(self):
+        root, first, second, child = boxes = [BoxBase() for dummy in range(4)]
+        root.line_to = LineBase(root)
+        for box, level, y_cm in ((first, 1, 0.0), (second, 1, 2.0),
+                                 (child, 2, 0.0)):
+            box.level = (level, 0)
+            box.y_cm = y_cm
+        root.line_to.add_to(first)
+        root.line_to.add_to(second)
+        second.line_to = LineBase(second)
+        second.line_to.add_to(child)
+        layout = self.layout(boxes)
+        layout.move_down(first, 1.0)
+        self.assertEqual(second.y_cm, 2.0)
+        self.assertEqual(layout.get_y(second), 3.0)
+        self.assertEqual(layout.get_y(child), 0.0)
+        layout.move_down(second, 0.5, next_cols=True)
+        self.assertEqual(layout.get_y(first), 1.0)
+        self.assertEqual(layout.get_y(second), 3.5)
+        self.assertEqual(layout.get_y(child), 0.5)
+        layout.move_down(root, 2.0, next_cols=True)
+        layout.apply()
+        self.assertEqual([box.y_cm for box in boxes], [2.0, 3.0, 5.5, 2.5])
+        self.assertEqual(layout.get_y(second), 5.5)
+
+    def test_moves(self):
+        for seed in range(20):
+            boxes = make_tree(6, 3, seed)
+            expected = make_tree(6, 3, seed)
+            layout = self.layout(boxes)
+            rand = random.Random(seed)
+            for dummy in range(50):
+                index = rand.randrange(len(boxes))
+                amount = rand.random()
+                if rand.random() < 0.5:
+                    layout.move_down(boxes[index], amount)
+                    move_col(expected[index], amount)
+                else:
+                    layout.move_down(boxes[index], amount, next_cols=True)
+                    move_next_cols(expected[index], amount)
+                index = rand.randrange(len(boxes))
+                self.assertAlmostEqual(layout.get_y(boxes[index]),
+                                       expected[index].y_cm)
+            layout.apply()
+            for box, expected_box in zip(boxes, expected):
+                self.assertAlmostEqual(box.y_cm, expected_box.y_cm)
+
+    def test_benchmark(self):
+        boxes = make_tree(50, 3, 0, 10000)
+        self.assertEqual(len(boxes), 10000)
+        start = time.perf_counter()
+        layout = self.layout(boxes)
+        #as the descendant tree: move each family down, from right to left
+        for col in reversed(layout.cols):
+            for box in col:
+                if box.line_to:
+                    layout.get_y(box)
+                    layout.get_y(box.line_to.end[0])
+                    layout.move_down(box.line_to.end[0], 0.1,
+                                     next_cols=True)
+                    layout.move_down(box, 0.1)
+        layout.apply()
+        elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, LAYOUT_TARGET,
+                        "10000 boxes laid out in %.3fs" % elapsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for libverify.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.lib import Date, Person
+from gramps.plugins.lib import libverify
+from gramps.plugins.lib.libverify import FactTable, get_rules
+from gramps.test.test_util import add_family, add_person, make_memory_db
+
+OPTIONS = {
+    'oldage'       : 90,
+    'hwdif'        : 30,
+    'cspace'       : 8,
+    'cbspan'       : 25,
+    'yngmar'       : 17,
+    'oldmar'       : 50,
+    'oldmom'       : 48,
+    'yngmom'       : 17,
+    'yngdad'       : 18,
+    'olddad'       : 65,
+    'wedder'       : 3,
+    'mxchildmom'   : 12,
+    'mxchilddad'   : 15,
+    'lngwdw'       : 30,
+    'oldunm'       : 99,
+    'estimate_age' : 0,
+    'invdate'      : 1,
+}
+
+#-------------------------------------------------------------------------
+#
+# VerifyTest class
+#
+#-------------------------------------------------------------------------
+class VerifyTest(unittest.TestCase):
+    '''
+    Tests of the verification of the data.
+    '''
+
+    def setUp(self):
+        self.db = make_memory_db()
+
+    def tearDown(self):
+        self.db.close()
+
+    def add_person(self, trans, surname, gender=Person.MALE, birth=None,
+                   death=None):
+        dates = []
+        for year in (birth, death):
+            date = None
+            if year is not None:
+                date = Date()
+                date.set_yr_mon_day(year, 6, 1)
+            dates.append(date)
+        return add_person(self.db, trans, surname, gender=gender,
+                          birth=dates[0], death=dates[1])
+
+    def add_family(self, trans, father, mother, children):
+        return add_family(self.db, trans, father, mother, children)
+
+    def verify(self, table=None, options=OPTIONS):
+        if table is None:
+            table = FactTable(self.db)
+        table.update()
+        return table.verify(*get_rules(options))
+
+    def rule_ids(self, results, handle):
+        return sorted(result[4][0] for result in results
+                      if result[6] == handle)
+
+    def test_rules(self):
+        with DbTxn('Add people', self.db) as trans:
+            old = self.add_person(trans, 'Smith', birth=1800, death=1850)
+            young = self.add_person(trans, 'Jones', gender=Person.FEMALE,
+                                    birth=1830)
+            child = self.add_person(trans, 'Smith', birth=1835, death=1834)
+            family = self.add_family(trans, old, young, [child])
+        results = self.verify()
+        # birth after death
+        self.assertEqual(self.rule_ids(results, child.handle), [5])
+        # young mother
+        self.assertIn(23, self.rule_ids(results, family.handle))
+        self.assertEqual(self.rule_ids(results, old.handle), [])
+
+    def test_too_many_children(self):
+        with DbTxn('Add people', self.db) as trans:
+            father = self.add_person(trans, 'Smith')
+            mother = self.add_person(trans, 'Jones', gender=Person.FEMALE)
+            children = [self.add_person(trans, 'Smith') for dummy in range(13)]
+            self.add_family(trans, father, mother, children)
+        results = self.verify()
+        self.assertIn(12, self.rule_ids(results, mother.handle))
+        self.assertNotIn(12, self.rule_ids(results, father.handle))
+
+    def test_pool(self):
+        with DbTxn('Add people', self.db) as trans:
+            for dummy in range(20):
+                father = self.add_person(trans, 'Smith', birth=1800)
+                mother = self.add_person(trans, 'Smith', gender=Person.FEMALE,
+                                         birth=1850)
+                child = self.add_person(trans, 'Smith', birth=1840)
+                self.add_family(trans, father, mother, [child])
+        expected = self.verify()
+        pool_rows, chunk_rows = libverify.POOL_ROWS, libverify.CHUNK_ROWS
+        libverify.POOL_ROWS, libverify.CHUNK_ROWS = 0, 7
+        try:
+            self.assertEqual(self.verify(), expected)
+        finally:
+            libverify.POOL_ROWS, libverify.CHUNK_ROWS = pool_rows, chunk_rows
+
+    def test_update(self):
+        with DbTxn('Add people', self.db) as trans:
+            father = self.add_person(trans, 'Smith', birth=1800)
+            mother = self.add_person(trans, 'Jones', gender=Person.FEMALE,
+                                     birth=1802)
+            child = self.add_person(trans, 'Smith', birth=1830)
+            other = self.add_person(trans, 'Brown', birth=1700)
+            family = self.add_family(trans, father, mother, [child])
+        table = FactTable(self.db)
+        self.verify(table)
+        self.assertEqual(table.dirty,
+                         {father.handle, mother.handle, child.handle,
+                          other.handle, family.handle})
+        self.verify(table)
+        self.assertEqual(table.dirty, set())
+
+        # the birth of the child moved before the birth of the mother
+        event = self.db.get_event_from_handle(child.get_birth_ref().ref)
+        event.get_date_object().set_yr_mon_day(1790, 6, 1)
+        with DbTxn('Edit event', self.db) as trans:
+            self.db.commit_event(event, trans, event.change + 1)
+        results = self.verify(table)
+        self.assertEqual(table.dirty, {child.handle, family.handle})
+        self.assertIn(24, self.rule_ids(results, family.handle))
+        self.assertEqual(results, self.verify())
+
+        # a removed person
+        with DbTxn('Remove person', self.db) as trans:
+            self.db.remove_person(other.handle, trans)
+        results = self.verify(table)
+        self.assertNotIn(other.handle, table.people)
+        self.assertEqual(results, self.verify())
+
+    def test_options(self):
+        with DbTxn('Add people', self.db) as trans:
+            person = self.add_person(trans, 'Smith', birth=1800)
+            event = self.db.get_event_from_handle(person.get_birth_ref().ref)
+            event.get_date_object().set_as_text('in the spring')
+            self.db.commit_event(event, trans)
+        table = FactTable(self.db)
+        # invalid birth date
+        self.assertIn(29, self.rule_ids(self.verify(table), person.handle))
+        options = dict(OPTIONS, invdate=0)
+        self.assertNotIn(29, self.rule_ids(self.verify(table, options),
+                                           person.handle))
+        self.assertIn(29, self.rule_ids(self.verify(table), person.handle))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -132,15 +132,22 @@ class KinshipReport(Report):
             if spouse_handles:
                 self.write_people(self._("Spouses"), spouse_handles)
 
-        # Collect all descendants of the person
-        self.traverse_down(self.person.get_handle(), 0, 1)
-
-        # Collect all ancestors/aunts/uncles/nephews/cousins of the person
-        self.traverse_up(self.person.get_handle(), 1, 0)
+        # Collect all ancestors, descendants, aunts/uncles/nephews/cousins
+        # of the person
+        table = self.rel_calc.get_relationship_table(
+            self.__db, self.person, max_ascend=self.max_ascend,
+            max_descend=self.max_descend)
+        for Ga, Gb, handles in table.get_groups():
+            for person_handle in handles:
+                self.add_kin(person_handle, Ga, Gb)
+                if self.inc_spouses and Gb > 0:
+                    for spouse_handle in self.get_spouse_handles(
+                            person_handle):
+                        self.add_spouse(spouse_handle, Ga, Gb)
 
         # Write Kin
-        for Ga, Gbs in self.kinship_map.items():
-            for Gb in Gbs:
+        for Ga in sorted(self.kinship_map):
+            for Gb in sorted(self.kinship_map[Ga]):
                 # To understand these calculations, see:
                 # http://en.wikipedia.org/wiki/Cousin#Mathematical_definitions
                 _x_ = min(Ga, Gb)
@@ -162,57 +169,6 @@ class KinshipReport(Report):
                     title = get_rel_str(Ga, Gb, in_law_b=True)
                     self.write_people(self._(title), self.spouse_map[Ga][Gb])
 
-    def traverse_down(self, person_handle, Ga, Gb, skip_handle=None):
-        """
-        Populate a map of arrays containing person handles for the descendants
-        of the passed person. This function calls itself recursively until it
-        reaches max_descend.
-
-        Parameters:
-        person_handle: the handle of the person to go to next
-        Ga: The number of generations from the main person to the common
-           ancestor. This should be incremented when going up generations, and
-           left alone when going down generations.
-        Gb: The number of generations from this person (person_handle) to the
-           common ancestor. This should be incremented when going down
-           generations and set back to zero when going up generations.
-        skip_handle: an optional handle to skip when going down. This is useful
-           to skip the descendant that brought you this generation in the first
-           place.
-        """
-        for child_handle in self.get_children_handles(person_handle):
-            if child_handle != skip_handle:
-                self.add_kin(child_handle, Ga, Gb)
-
-                if self.inc_spouses:
-                    for spouse_handle in self.get_spouse_handles(child_handle):
-                        self.add_spouse(spouse_handle, Ga, Gb)
-
-                if Gb < self.max_descend:
-                    self.traverse_down(child_handle, Ga, Gb+1)
-
-    def traverse_up(self, person_handle, Ga, Gb):
-        """
-        Populate a map of arrays containing person handles for the ancestors
-        of the passed person. This function calls itself recursively until it
-        reaches max_ascend.
-
-        Parameters:
-        person_handle: the handle of the person to go to next
-        Ga: The number of generations from the main person to the common
-           ancestor. This should be incremented when going up generations, and
-           left alone when going down generations.
-        Gb: The number of generations from this person (person_handle) to the
-           common ancestor. This should be incremented when going down
-           generations and set back to zero when going up generations.
-        """
-        parent_handles = self.get_parent_handles(person_handle)
-        for parent_handle in parent_handles:
-            self.add_kin(parent_handle, Ga, Gb)
-            self.traverse_down(parent_handle, Ga, Gb+1, person_handle)
-            if Ga < self.max_ascend:
-                self.traverse_up(parent_handle, Ga+1, 0)
-
     def add_kin(self, person_handle, Ga, Gb):
         """
         Add a person handle to the kin map.
@@ -235,24 +191,6 @@ class KinshipReport(Report):
         if spouse_handle not in self.spouse_map[Ga][Gb]:
             self.spouse_map[Ga][Gb].append(spouse_handle)
 
-    def get_parent_handles(self, person_handle):
-        """
-        Return an array of handles for all the parents of the
-        given person handle.
-        """
-        parent_handles = []
-        person = self.__db.get_person_from_handle(person_handle)
-        family_handle = person.get_main_parents_family_handle()
-        if family_handle:
-            family = self.__db.get_family_from_handle(family_handle)
-            father_handle = family.get_father_handle()
-            if father_handle:
-                parent_handles.append(father_handle)
-            mother_handle = family.get_mother_handle()
-            if mother_handle:
-                parent_handles.append(mother_handle)
-        return parent_handles
-
     def get_spouse_handles(self, person_handle):
         """
         Return an array of handles for all the spouses of the
@@ -274,19 +212,6 @@ class KinshipReport(Report):
                 spouses.append(spouse_handle)
         return spouses
 
-    def get_children_handles(self, person_handle):
-        """
-        Return an array of handles for all the children of the
-        given person handle.
-        """
-        children = []
-        person = self.__db.get_person_from_handle(person_handle)
-        for family_handle in person.get_family_handle_list():
-            family = self.__db.get_family_from_handle(family_handle)
-            for child_ref in family.get_child_ref_list():
-                children.append(child_ref.get_reference_handle())
-        return children
-
     def write_people(self, title, people_handles):
         """
         Write information about a group of people - including the title.
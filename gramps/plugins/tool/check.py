@@ -61,7 +61,7 @@ ngettext = glocale.translation.ngettext  # else "nearby" comments are ignored
 from gramps.gen.lib import (Citation, Event, EventType, Family, Media,
                             Name, Note, Person, Place, Repository, Source,
                             StyledText, Tag)
-from gramps.gen.db import DbTxn, CLASS_TO_KEY_MAP
+from gramps.gen.db import DbTxn
 from gramps.gen.config import config
 from gramps.gen.utils.id import create_id
 from gramps.gen.utils.db import family_name
@@ -74,6 +74,8 @@ from gramps.gui.dialog import OkDialog, MissingMediaDialog
 from gramps.gen.display.name import displayer as _nd
 from gramps.gui.glade import Glade
 from gramps.gen.errors import HandleError
+from gramps.plugins.lib.libcheck import (BacklinkChecker, ReferenceScan,
+                                         NO_BACKLINK, MISSING_OBJECT)
 
 # table for handling control chars in notes.
 # All except 09, 0A, 0D are replaced with space.
@@ -217,6 +219,7 @@ class Check(tool.BatchTool):
             checker.check_family_references()
             checker.check_place_references()
             checker.check_source_references()
+            checker.scan_references()
             checker.check_citation_references()
             checker.check_media_references()
             checker.check_repo_references()
@@ -290,6 +293,7 @@ class CheckIntegrity:
         self.place_errors = 0
         self.duplicated_gramps_ids = 0
         self.bad_backlinks = 0
+        self.bad_references = {}
         self.text = StringIO()
         self.last_img_dir = config.get('behavior.addmedia-image-dir')
         self.progress = ProgressMeter(_('Checking Database'), '',
@@ -1241,48 +1245,23 @@ class CheckIntegrity:
                                total)
         logging.info('Looking for backlink reference problems')
 
-        for obj_class in CLASS_TO_KEY_MAP.keys():
-            obj_type = obj_class.lower()
-            for handle in getattr(self.db, "iter_%s_handles" % obj_type)():
-                self.progress.step()
-                pri_obj = getattr(self.db, "get_%s_from_handle"
-                                  % obj_type)(handle)
-                handle_list = pri_obj.get_referenced_handles_recursively()
-                # check that each reference has a backlink
-                for item in handle_list:
-                    bl_list = list(self.db.find_backlink_handles(item[1]))
-                    if (obj_class, handle) not in bl_list:
-                        # Object has reference with no cooresponding backlink
-                        self.bad_backlinks += 1
-                        logging.warning('    FAIL: the "%(cls)s" [%(gid)s] '
-                                        'has a "%(cls2)s" reference'
-                                        ' with no corresponding backlink.',
-                                        {'gid': pri_obj.gramps_id,
-                                         'cls': obj_class, 'cls2': item[0]})
-                # Check for backlinks that don't have a reference
-                bl_list = self.db.find_backlink_handles(handle)
-                for item in bl_list:
-                    if not getattr(self.db, "has_%s_handle"
-                                   % item[0].lower())(item[1]):
-                        # backlink to object entirely missing
-                        self.bad_backlinks += 1
-                        logging.warning('    FAIL: the "%(cls)s" [%(gid)s] '
-                                        'has a backlink to a missing'
-                                        ' "%(cls2)s".',
-                                        {'gid': pri_obj.gramps_id,
-                                         'cls': obj_class, 'cls2': item[0]})
-                        continue
-                    obj = getattr(self.db, "get_%s_from_handle"
-                                  % item[0].lower())(item[1])
-                    handle_list = obj.get_referenced_handles_recursively()
-                    if (obj_class, handle) not in handle_list:
-                        # backlink to object which doesn't have reference
-                        self.bad_backlinks += 1
-                        logging.warning('    FAIL: the "%(cls)s" [%(gid)s] '
-                                        'has a backlink to a "%(cls2)s"'
-                                        ' with no corresponding reference.',
-                                        {'gid': pri_obj.gramps_id,
-                                         'cls': obj_class, 'cls2': item[0]})
+        problems = BacklinkChecker(self.db).check(self.progress.step)
+        for kind, obj_class, gramps_id, other_class in problems:
+            self.bad_backlinks += 1
+            if kind == NO_BACKLINK:
+                # Object has reference with no cooresponding backlink
+                msg = ('    FAIL: the "%(cls)s" [%(gid)s] has a "%(cls2)s" '
+                       'reference with no corresponding backlink.')
+            elif kind == MISSING_OBJECT:
+                # backlink to object entirely missing
+                msg = ('    FAIL: the "%(cls)s" [%(gid)s] has a backlink to '
+                       'a missing "%(cls2)s".')
+            else:
+                # backlink to object which doesn't have reference
+                msg = ('    FAIL: the "%(cls)s" [%(gid)s] has a backlink to '
+                       'a "%(cls2)s" with no corresponding reference.')
+            logging.warning(msg, {'gid': gramps_id, 'cls': obj_class,
+                                  'cls2': other_class})
 
     def callback(self, *args):
         self.progress.step()
@@ -1481,123 +1460,41 @@ class CheckIntegrity:
         if len(self.invalid_place_references) == 0:
             logging.info('    OK: no place reference problems found')
 
+    def scan_references(self):
+        '''Looking for citation, media, note and tag reference problems'''
+        self.progress.set_pass(_('Looking for reference problems'),
+                               self.db.get_total())
+        logging.info('Looking for citation, media, note and tag reference '
+                     'problems')
+        # the references to the note explaining the objects created by the
+        # earlier checks are fine: it is added with the missing notes
+        self.bad_references = ReferenceScan(
+            self.db, ('Citation', 'Media', 'Note', 'Tag')).scan(
+                self.progress.step, {'Note': [self.explanation.handle]})
+
+    def fix_references(self, ref_class, invalid_references):
+        """
+        Give a handle to the references without one, of the references
+        to objects of ref_class found by scan_references, and add the
+        handles of the missing objects to invalid_references.
+        """
+        for obj_class, handle, ref_handle in self.bad_references[ref_class]:
+            if ref_handle is not None:
+                invalid_references.add(ref_handle)
+                continue
+            obj = getattr(self.db, "get_%s_from_handle"
+                          % obj_class.lower())(handle)
+            new_handle = create_id()
+            getattr(obj, "replace_%s_references"
+                    % ref_class.lower())(None, new_handle)
+            getattr(self.db, "commit_%s" % obj_class.lower())(obj, self.trans)
+            invalid_references.add(new_handle)
+
     def check_citation_references(self):
         '''Looking for citation reference problems'''
-        known_handles = self.db.get_citation_handles()
-
-        total = (
-            self.db.get_number_of_people() +
-            self.db.get_number_of_families() +
-            self.db.get_number_of_events() +
-            self.db.get_number_of_places() +
-            self.db.get_number_of_citations() +
-            self.db.get_number_of_sources() +
-            self.db.get_number_of_media() +
-            self.db.get_number_of_repositories()
-            )
-
-        self.progress.set_pass(_('Looking for citation reference problems'),
-                               total)
         logging.info('Looking for citation reference problems')
 
-        for handle in self.db.get_person_handles():
-            self.progress.step()
-            person = self.db.get_person_from_handle(handle)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_citation_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for handle in self.db.get_family_handles():
-            self.progress.step()
-            family = self.db.get_family_from_handle(handle)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_citation_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for handle in self.db.get_place_handles():
-            self.progress.step()
-            place = self.db.get_place_from_handle(handle)
-            handle_list = place.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        place.replace_citation_references(None, new_handle)
-                        self.db.commit_place(place, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for handle in self.db.get_citation_handles():
-            self.progress.step()
-            citation = self.db.get_citation_from_handle(handle)
-            handle_list = citation.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        citation.replace_citation_references(None, new_handle)
-                        self.db.commit_citation(citation, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for handle in self.db.get_repository_handles():
-            self.progress.step()
-            repository = self.db.get_repository_from_handle(handle)
-            handle_list = repository.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        repository.replace_citation_references(None,
-                                                               new_handle)
-                        self.db.commit_repository(repository, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for handle in self.db.get_media_handles():
-            self.progress.step()
-            obj = self.db.get_media_from_handle(handle)
-            handle_list = obj.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        obj.replace_citation_references(None, new_handle)
-                        self.db.commit_media(obj, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
-
-        for handle in self.db.get_event_handles():
-            self.progress.step()
-            event = self.db.get_event_from_handle(handle)
-            handle_list = event.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Citation':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        event.replace_citation_references(None, new_handle)
-                        self.db.commit_event(event, self.trans)
-                        self.invalid_citation_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_citation_references.add(item[1])
+        self.fix_references('Citation', self.invalid_citation_references)
 
         for bad_handle in self.invalid_citation_references:
             created = make_unknown(bad_handle, self.explanation.handle,
@@ -1645,104 +1542,9 @@ class CheckIntegrity:
 
     def check_media_references(self):
         '''Looking for media object reference problems'''
-        known_handles = self.db.get_media_handles(False)
-
-        total = (
-            self.db.get_number_of_people() +
-            self.db.get_number_of_families() +
-            self.db.get_number_of_events() +
-            self.db.get_number_of_places() +
-            self.db.get_number_of_citations() +
-            self.db.get_number_of_sources()
-            )
-
-        self.progress.set_pass(_('Looking for media object reference '
-                                 'problems'), total)
         logging.info('Looking for media object reference problems')
 
-        for handle in self.db.get_person_handles():
-            self.progress.step()
-            person = self.db.get_person_from_handle(handle)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Media':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_media_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for handle in self.db.get_family_handles():
-            self.progress.step()
-            family = self.db.get_family_from_handle(handle)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Media':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_media_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for handle in self.db.get_place_handles():
-            self.progress.step()
-            place = self.db.get_place_from_handle(handle)
-            handle_list = place.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Media':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        place.replace_media_references(None, new_handle)
-                        self.db.commit_place(place, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for handle in self.db.get_event_handles():
-            self.progress.step()
-            event = self.db.get_event_from_handle(handle)
-            handle_list = event.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Media':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        event.replace_media_references(None, new_handle)
-                        self.db.commit_event(event, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for handle in self.db.get_citation_handles():
-            self.progress.step()
-            citation = self.db.get_citation_from_handle(handle)
-            handle_list = citation.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Media':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        citation.replace_media_references(None, new_handle)
-                        self.db.commit_citation(citation, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
-
-        for handle in self.db.get_source_handles():
-            self.progress.step()
-            source = self.db.get_source_from_handle(handle)
-            handle_list = source.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Media':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        source.replace_media_references(None, new_handle)
-                        self.db.commit_source(source, self.trans)
-                        self.invalid_media_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_media_references.add(item[1])
+        self.fix_references('Media', self.invalid_media_references)
 
         for bad_handle in self.invalid_media_references:
             make_unknown(bad_handle, self.explanation.handle, self.class_media,
@@ -1767,132 +1569,9 @@ class CheckIntegrity:
         if missing_references:
             self.db.add_note(self.explanation, self.trans, set_gid=True)
 
-        known_handles = self.db.get_note_handles()
-
-        total = (self.db.get_number_of_people() +
-                 self.db.get_number_of_families() +
-                 self.db.get_number_of_events() +
-                 self.db.get_number_of_places() +
-                 self.db.get_number_of_media() +
-                 self.db.get_number_of_citations() +
-                 self.db.get_number_of_sources() +
-                 self.db.get_number_of_repositories())
-
-        self.progress.set_pass(_('Looking for note reference problems'),
-                               total)
         logging.info('Looking for note reference problems')
 
-        for handle in self.db.get_person_handles():
-            self.progress.step()
-            person = self.db.get_person_from_handle(handle)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_note_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for handle in self.db.get_family_handles():
-            self.progress.step()
-            family = self.db.get_family_from_handle(handle)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_note_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for handle in self.db.get_place_handles():
-            self.progress.step()
-            place = self.db.get_place_from_handle(handle)
-            handle_list = place.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        place.replace_note_references(None, new_handle)
-                        self.db.commit_place(place, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for handle in self.db.get_citation_handles():
-            self.progress.step()
-            citation = self.db.get_citation_from_handle(handle)
-            handle_list = citation.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        citation.replace_note_references(None, new_handle)
-                        self.db.commit_citation(citation, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for handle in self.db.get_source_handles():
-            self.progress.step()
-            source = self.db.get_source_from_handle(handle)
-            handle_list = source.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        source.replace_note_references(None, new_handle)
-                        self.db.commit_source(source, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for handle in self.db.get_media_handles():
-            self.progress.step()
-            obj = self.db.get_media_from_handle(handle)
-            handle_list = obj.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        obj.replace_note_references(None, new_handle)
-                        self.db.commit_media(obj, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for handle in self.db.get_event_handles():
-            self.progress.step()
-            event = self.db.get_event_from_handle(handle)
-            handle_list = event.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        event.replace_note_references(None, new_handle)
-                        self.db.commit_event(event, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
-
-        for handle in self.db.get_repository_handles():
-            self.progress.step()
-            repo = self.db.get_repository_from_handle(handle)
-            handle_list = repo.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Note':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        repo.replace_note_references(None, new_handle)
-                        self.db.commit_repository(repo, self.trans)
-                        self.invalid_note_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_note_references.add(item[1])
+        self.fix_references('Note', self.invalid_note_references)
 
         for bad_handle in self.invalid_note_references:
             make_unknown(bad_handle, self.explanation.handle,
@@ -1920,147 +1599,9 @@ class CheckIntegrity:
 
     def check_tag_references(self):
         '''Looking for tag reference problems'''
-        known_handles = self.db.get_tag_handles()
-
-        total = (self.db.get_number_of_people() +
-                 self.db.get_number_of_families() +
-                 self.db.get_number_of_media() +
-                 self.db.get_number_of_notes() +
-                 self.db.get_number_of_events() +
-                 self.db.get_number_of_citations() +
-                 self.db.get_number_of_sources() +
-                 self.db.get_number_of_places() +
-                 self.db.get_number_of_repositories())
-
-        self.progress.set_pass(_('Looking for tag reference problems'),
-                               total)
         logging.info('Looking for tag reference problems')
 
-        for handle in self.db.get_person_handles():
-            self.progress.step()
-            person = self.db.get_person_from_handle(handle)
-            handle_list = person.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        person.replace_tag_references(None, new_handle)
-                        self.db.commit_person(person, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_family_handles():
-            self.progress.step()
-            family = self.db.get_family_from_handle(handle)
-            handle_list = family.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        family.replace_tag_references(None, new_handle)
-                        self.db.commit_family(family, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_media_handles():
-            self.progress.step()
-            obj = self.db.get_media_from_handle(handle)
-            handle_list = obj.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        obj.replace_tag_references(None, new_handle)
-                        self.db.commit_media(obj, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_note_handles():
-            self.progress.step()
-            note = self.db.get_note_from_handle(handle)
-            handle_list = note.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        note.replace_tag_references(None, new_handle)
-                        self.db.commit_note(note, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_event_handles():
-            self.progress.step()
-            event = self.db.get_event_from_handle(handle)
-            handle_list = event.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        event.replace_tag_references(None, new_handle)
-                        self.db.commit_event(event, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_citation_handles():
-            self.progress.step()
-            citation = self.db.get_citation_from_handle(handle)
-            handle_list = citation.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        citation.replace_tag_references(None, new_handle)
-                        self.db.commit_citation(citation, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_source_handles():
-            self.progress.step()
-            source = self.db.get_source_from_handle(handle)
-            handle_list = source.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        source.replace_tag_references(None, new_handle)
-                        self.db.commit_source(source, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_place_handles():
-            self.progress.step()
-            place = self.db.get_place_from_handle(handle)
-            handle_list = place.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        place.replace_tag_references(None, new_handle)
-                        self.db.commit_place(place, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
-
-        for handle in self.db.get_repository_handles():
-            self.progress.step()
-            repository = self.db.get_repository_from_handle(handle)
-            handle_list = repository.get_referenced_handles_recursively()
-            for item in handle_list:
-                if item[0] == 'Tag':
-                    if item[1] is None:
-                        new_handle = create_id()
-                        repository.replace_tag_references(None, new_handle)
-                        self.db.commit_repository(repository, self.trans)
-                        self.invalid_tag_references.add(new_handle)
-                    elif item[1] not in known_handles:
-                        self.invalid_tag_references.add(item[1])
+        self.fix_references('Tag', self.invalid_tag_references)
 
         for bad_handle in self.invalid_tag_references:
             make_unknown(bad_handle, None, self.class_tag,
@@ -2148,7 +1689,7 @@ class CheckIntegrity:
         self.progress.set_pass(_('Looking for Duplicated Gramps ID '
                                  'problems'), total)
         logging.info('Looking for Duplicated Gramps ID problems')
-        gid_list = []
+        gid_list = set()
         for citation in self.db.iter_citations():
             self.progress.step()
             ogid = gid = citation.get_gramps_id()
@@ -2159,8 +1700,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for event in self.db.iter_events():
             self.progress.step()
             ogid = gid = event.get_gramps_id()
@@ -2171,8 +1712,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for family in self.db.iter_families():
             self.progress.step()
             ogid = gid = family.get_gramps_id()
@@ -2183,8 +1724,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for media in self.db.iter_media():
             self.progress.step()
             ogid = gid = media.get_gramps_id()
@@ -2195,8 +1736,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for note in self.db.iter_notes():
             ogid = gid = note.get_gramps_id()
             if gid in gid_list:
@@ -2206,8 +1747,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for person in self.db.iter_people():
             self.progress.step()
             ogid = gid = person.get_gramps_id()
@@ -2218,8 +1759,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for place in self.db.iter_places():
             self.progress.step()
             ogid = gid = place.get_gramps_id()
@@ -2230,8 +1771,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for repository in self.db.iter_repositories():
             self.progress.step()
             ogid = gid = repository.get_gramps_id()
@@ -2242,8 +1783,8 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
-        gid_list = []
+            gid_list.add(gid)
+        gid_list = set()
         for source in self.db.iter_sources():
             self.progress.step()
             ogid = gid = source.get_gramps_id()
@@ -2254,7 +1795,7 @@ class CheckIntegrity:
                 logging.warning('    FAIL: Duplicated Gramps ID found, '
                                 'Original: "%s" changed to: "%s"', ogid, gid)
                 self.duplicated_gramps_ids += 1
-            gid_list.append(gid)
+            gid_list.add(gid)
 
     def class_person(self, handle):
         person = Person()
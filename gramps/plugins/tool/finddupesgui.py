@@ -0,0 +1,273 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2000-2007  Donald N. Allingham
+# Copyright (C) 2008       Brian G. Matherly
+# Copyright (C) 2010       Jakim Friant
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+The windows of the Find Possible Duplicate People tool, only imported with
+the GUI.
+"""
+
+#-------------------------------------------------------------------------
+#
+# GNOME libraries
+#
+#-------------------------------------------------------------------------
+from gi.repository import Gtk
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.const import URL_MANUAL_PAGE
+from gramps.gui.utils import ProgressMeter
+from gramps.gen.display.name import displayer as name_displayer
+from gramps.gui.dialog import OkDialog
+from gramps.gui.listmodel import ListModel
+from gramps.gen.errors import WindowActiveError
+from gramps.gui.merge import MergePerson
+from gramps.gui.display import display_help
+from gramps.gui.managedwindow import ManagedWindow
+from gramps.gui.dialog import RunDatabaseRepair
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+_ = glocale.translation.sgettext
+from gramps.gui.glade import Glade
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+_val2label = {
+    0.25 : _("Low"),
+    1.0  : _("Medium"),
+    2.0  : _("High"),
+    }
+
+WIKI_HELP_PAGE = '%s_-_Tools' % URL_MANUAL_PAGE
+WIKI_HELP_SEC = _('manual|Find_Possible_Duplicate_People')
+
+#-------------------------------------------------------------------------
+#
+# The windows of the tool
+#
+#-------------------------------------------------------------------------
+class DuplicatePeopleWindow(ManagedWindow):
+    """
+    The settings of the tool, looking for the matches when they are given.
+    """
+
+    def __init__(self, dupes_tool, dbstate, uistate, callback):
+        ManagedWindow.__init__(self, uistate, [], self.__class__)
+        self.tool = dupes_tool
+        self.dbstate = dbstate
+        self.uistate = uistate
+        self.update = callback
+
+        top = Glade(filename="finddupes.glade", toplevel="finddupes",
+                    also_load=["liststore1"])
+
+        my_menu = Gtk.ListStore(str, object)
+        for val in sorted(_val2label):
+            my_menu.append([_val2label[val], val])
+
+        self.soundex_obj = top.get_object("soundex")
+        self.soundex_obj.set_active(dupes_tool.use_soundex)
+        self.soundex_obj.show()
+
+        self.menu = top.get_object("menu")
+        self.menu.set_model(my_menu)
+        self.menu.set_active(0)
+
+        window = top.toplevel
+        self.set_window(window, top.get_object('title'),
+                        _('Find Possible Duplicate People'))
+        self.setup_configs('interface.duplicatepeopletool', 350, 220)
+
+        top.connect_signals({
+            "on_do_merge_clicked"   : self.__dummy,
+            "on_help_show_clicked"  : self.__dummy,
+            "on_delete_show_event"  : self.__dummy,
+            "on_merge_ok_clicked"   : self.on_merge_ok_clicked,
+            "destroy_passed_object" : self.close,
+            "on_help_clicked"       : self.on_help_clicked,
+            "on_delete_merge_event" : self.close,
+            "on_delete_event"       : self.close,
+            })
+
+        self.show()
+
+    def build_menu_names(self, obj):
+        return (_("Tool settings"),_("Find Duplicates tool"))
+
+    def on_help_clicked(self, obj):
+        """Display the relevant portion of Gramps manual"""
+
+        display_help(WIKI_HELP_PAGE , WIKI_HELP_SEC)
+
+    def on_merge_ok_clicked(self, obj):
+        threshold = self.menu.get_model()[self.menu.get_active()][1]
+        self.tool.use_soundex = int(self.soundex_obj.get_active())
+        progress = ProgressMeter(_('Find Duplicates'),
+                                 _('Looking for duplicate people'),
+                                 parent=self.window)
+        try:
+            self.tool.find_potentials(threshold, progress)
+        except AttributeError as msg:
+            RunDatabaseRepair(str(msg), parent=self.window)
+            return
+        finally:
+            progress.close()
+
+        options_dict = self.tool.options.handler.options_dict
+        options_dict['threshold'] = threshold
+        options_dict['soundex'] = self.tool.use_soundex
+        # Save options
+        self.tool.options.handler.save_options()
+
+        if len(self.tool.map) == 0:
+            OkDialog(
+                _("No matches found"),
+                _("No potential duplicate people were found"),
+                parent=self.window)
+        else:
+            try:
+                DuplicatePeopleToolMatches(self.dbstate, self.uistate,
+                                           self.track, self.tool.list,
+                                           self.tool.map, self.update)
+            except WindowActiveError:
+                pass
+
+    def __dummy(self, obj):
+        """dummy callback, needed because a shared glade file is used for
+        both toplevel windows and all signals must be handled.
+        """
+        pass
+
+
+class DuplicatePeopleToolMatches(ManagedWindow):
+
+    def __init__(self, dbstate, uistate, track, the_list, the_map, callback):
+        ManagedWindow.__init__(self,uistate,track,self.__class__)
+
+        self.dellist = {}
+        self.list = the_list
+        self.map = the_map
+        self.length = len(self.list)
+        self.update = callback
+        self.db = dbstate.db
+        self.dbstate = dbstate
+        self.uistate = uistate
+
+        top = Glade(filename="finddupes.glade", toplevel="mergelist")
+        window = top.toplevel
+        self.set_window(window, top.get_object('title'),
+                        _('Potential Merges'))
+        self.setup_configs('interface.duplicatepeopletoolmatches', 500, 350)
+
+        self.mlist = top.get_object("mlist")
+        top.connect_signals({
+            "destroy_passed_object" : self.close,
+            "on_do_merge_clicked"   : self.on_do_merge_clicked,
+            "on_help_show_clicked"  : self.on_help_clicked,
+            "on_delete_show_event"  : self.close,
+            "on_merge_ok_clicked"   : self.__dummy,
+            "on_help_clicked"       : self.__dummy,
+            "on_delete_merge_event" : self.__dummy,
+            "on_delete_event"       : self.__dummy,
+            })
+
+        mtitles = [
+                (_('Rating'),3,75),
+                (_('First Person'),1,200),
+                (_('Second Person'),2,200),
+                ('',-1,0)
+                ]
+        self.list = ListModel(self.mlist,mtitles,
+                              event_func=self.on_do_merge_clicked)
+
+        self.redraw()
+        self.show()
+
+    def build_menu_names(self, obj):
+        return (_("Merge candidates"), _("Merge persons"))
+
+    def on_help_clicked(self, obj):
+        """Display the relevant portion of Gramps manual"""
+
+        display_help(WIKI_HELP_PAGE , WIKI_HELP_SEC)
+    def redraw(self):
+        list = []
+        for p1key, p1data in self.map.items():
+            if p1key in self.dellist:
+                continue
+            (p2key,c) = p1data
+            if p2key in self.dellist:
+                continue
+            if p1key == p2key:
+                continue
+            list.append((c,p1key,p2key))
+
+        self.list.clear()
+        for (c,p1key,p2key) in list:
+            c1 = "%5.2f" % c
+            c2 = "%5.2f" % (100-c)
+            p1 = self.db.get_person_from_handle(p1key)
+            p2 = self.db.get_person_from_handle(p2key)
+            if not p1 or not p2:
+                continue
+            pn1 = name_displayer.display(p1)
+            pn2 = name_displayer.display(p2)
+            self.list.add([c1, pn1, pn2,c2],(p1key,p2key))
+
+    def on_do_merge_clicked(self, obj):
+        store,iter = self.list.selection.get_selected()
+        if not iter:
+            return
+
+        (self.p1,self.p2) = self.list.get_object(iter)
+        MergePerson(self.dbstate, self.uistate, self.track, self.p1, self.p2,
+                    self.on_update, True)
+
+    def on_update(self):
+        if self.db.has_person_handle(self.p1):
+            phoenix = self.p1
+            titanic = self.p2
+        else:
+            phoenix = self.p2
+            titanic = self.p1
+
+        self.dellist[titanic] = phoenix
+        for key, data in self.dellist.items():
+            if data == titanic:
+                self.dellist[key] = phoenix
+        self.update()
+        self.redraw()
+
+    def update_and_destroy(self, obj):
+        self.update(1)
+        self.close()
+
+    def __dummy(self, obj):
+        """dummy callback, needed because a shared glade file is used for
+        both toplevel windows and all signals must be handled.
+        """
+        pass
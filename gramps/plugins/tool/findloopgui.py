@@ -0,0 +1,172 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2007-2009   Stephane Charette
+# Copyright (C) 2016-       Serge Noiraud
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+The window of the Find database loop tool, only imported with the GUI.
+"""
+
+#------------------------------------------------------------------------
+#
+# GNOME/GTK modules
+#
+#------------------------------------------------------------------------
+from gi.repository import Gtk
+from gi.repository import GObject
+
+#------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#------------------------------------------------------------------------
+from gramps.gen.const import URL_MANUAL_PAGE
+from gramps.gui.editors import EditFamily
+from gramps.gen.errors import WindowActiveError
+from gramps.gui.managedwindow import ManagedWindow
+from gramps.gui.utils import ProgressMeter
+from gramps.gui.display import display_help
+from gramps.gui.glade import Glade
+from gramps.gen.utils.loops import find_loops
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.plugins.tool.findloop import get_links
+_ = glocale.translation.sgettext
+
+#-------------------------------------------------------------------------
+#
+# Constants
+#
+#-------------------------------------------------------------------------
+WIKI_HELP_PAGE = '%s_-_Tools' % URL_MANUAL_PAGE
+WIKI_HELP_SEC = _('manual|Find_database_loop')
+
+
+#------------------------------------------------------------------------
+#
+# FindLoopWindow class
+#
+#------------------------------------------------------------------------
+class FindLoopWindow(ManagedWindow):
+    """
+    The loops of the family tree, in a window.
+    """
+    def __init__(self, dbstate, uistate):
+        self.title = _('Find database loop')
+        ManagedWindow.__init__(self, uistate, [], self.__class__)
+        self.dbstate = dbstate
+        self.uistate = uistate
+        self.db = dbstate.db
+
+        top_dialog = Glade(filename="findloop.glade")
+
+        top_dialog.connect_signals({
+            "destroy_passed_object" : self.close,
+            "on_help_clicked"       : self.on_help_clicked,
+            "on_delete_event"       : self.close,
+        })
+
+        window = top_dialog.toplevel
+        title = top_dialog.get_object("title")
+        self.set_window(window, title, self.title)
+
+        # start the progress indicator
+        self.progress = ProgressMeter(self.title, _('Starting'),
+                                      parent=uistate.window)
+        self.progress.set_pass(_('Looking for possible loop for each person'),
+                               self.db.get_number_of_families())
+
+        self.model = Gtk.ListStore(
+            GObject.TYPE_STRING,    # 0==father id
+            GObject.TYPE_STRING,    # 1==father
+            GObject.TYPE_STRING,    # 2==son id
+            GObject.TYPE_STRING,    # 3==son
+            GObject.TYPE_STRING,    # 4==family gid
+            GObject.TYPE_STRING)    # 5==loop number
+        self.model.set_sort_column_id(
+            Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID, 0)
+
+        self.treeview = top_dialog.get_object("treeview")
+        self.treeview.set_model(self.model)
+        col0 = Gtk.TreeViewColumn('',
+                                  Gtk.CellRendererText(), text=5)
+        col1 = Gtk.TreeViewColumn(_('Gramps ID'),
+                                  Gtk.CellRendererText(), text=0)
+        col2 = Gtk.TreeViewColumn(_('Parent'),
+                                  Gtk.CellRendererText(), text=1)
+        col3 = Gtk.TreeViewColumn(_('Gramps ID'),
+                                  Gtk.CellRendererText(), text=2)
+        col4 = Gtk.TreeViewColumn(_('Child'),
+                                  Gtk.CellRendererText(), text=3)
+        col5 = Gtk.TreeViewColumn(_('Family ID'),
+                                  Gtk.CellRendererText(), text=4)
+        col1.set_resizable(True)
+        col2.set_resizable(True)
+        col3.set_resizable(True)
+        col4.set_resizable(True)
+        col5.set_resizable(True)
+        col1.set_sizing(Gtk.TreeViewColumnSizing.AUTOSIZE)
+        col2.set_sizing(Gtk.TreeViewColumnSizing.AUTOSIZE)
+        col3.set_sizing(Gtk.TreeViewColumnSizing.AUTOSIZE)
+        col4.set_sizing(Gtk.TreeViewColumnSizing.AUTOSIZE)
+        col5.set_sizing(Gtk.TreeViewColumnSizing.AUTOSIZE)
+        self.treeview.append_column(col0)
+        self.treeview.append_column(col1)
+        self.treeview.append_column(col2)
+        self.treeview.append_column(col3)
+        self.treeview.append_column(col4)
+        self.treeview.append_column(col5)
+        self.treeselection = self.treeview.get_selection()
+        self.treeview.connect('row-activated', self.rowactivated_cb)
+
+        for number, loop in enumerate(find_loops(self.db,
+                                                 self.progress.step)):
+            for parent_id, parent_name, pers_id, pers_name, fam_id in \
+                    get_links(self.db, loop):
+                self.model.append((parent_id, parent_name, pers_id,
+                                   pers_name, fam_id, str(number + 1)))
+
+        # close the progress bar
+        self.progress.close()
+
+        self.show()
+
+    def rowactivated_cb(self, treeview, path, column):
+        """
+        Called when a row is activated.
+        """
+        # first we need to check that the row corresponds to a person
+        iter_ = self.model.get_iter(path)
+        fam_id = self.model.get_value(iter_, 4)
+        fam = self.dbstate.db.get_family_from_gramps_id(fam_id)
+        if fam:
+            try:
+                EditFamily(self.dbstate, self.uistate, [], fam)
+            except WindowActiveError:
+                pass
+            return True
+        return False
+
+    def on_help_clicked(self, obj):
+        """
+        Display the relevant portion of Gramps manual.
+        """
+        display_help(webpage=WIKI_HELP_PAGE, section=WIKI_HELP_SEC)
+
+    def close(self, *obj):
+        ManagedWindow.close(self, *obj)
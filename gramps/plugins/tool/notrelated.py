@@ -42,7 +42,6 @@ ngettext = glocale.translation.ngettext # else "nearby" comments are ignored
 from gramps.gen.const import URL_MANUAL_PAGE
 from gramps.gen.errors import WindowActiveError
 from gramps.gui.plug import tool
-from gramps.gen.plug.report import utils
 from gramps.gui.editors import EditPerson, EditFamily
 from gramps.gui.managedwindow import ManagedWindow
 from gramps.gui.utils import ProgressMeter
@@ -50,6 +49,7 @@ from gramps.gui.display import display_help
 from gramps.gui.glade import Glade
 from gramps.gen.lib import Tag
 from gramps.gen.db import DbTxn
+from gramps.gen.relationship import get_related_handles
 
 #-------------------------------------------------------------------------
 #
@@ -155,13 +155,11 @@ class NotRelated(tool.ActivePersonTool, ManagedWindow) :
         self.numberOfUnrelatedPeople     = 0
 
         # create the sets used to track related and unrelated people
-        self.handlesOfPeopleToBeProcessed       = set()
         self.handlesOfPeopleAlreadyProcessed    = set()
         self.handlesOfPeopleNotRelated          = set()
 
         # build a set of all people related to the selected person
-        self.handlesOfPeopleToBeProcessed.add(person.get_handle())
-        self.findRelatedPeople()
+        self.findRelatedPeople(person)
 
         # now that we have our list of related people, find everyone
         # in the database who isn't on our list
@@ -297,7 +295,7 @@ class NotRelated(tool.ActivePersonTool, ManagedWindow) :
         if progress:
             progress.close()
 
-    def findRelatedPeople(self) :
+    def findRelatedPeople(self, person) :
 
         self.progress.set_pass(
             # translators: leave all/any {...} untranslated
@@ -308,66 +306,10 @@ class NotRelated(tool.ActivePersonTool, ManagedWindow) :
                     ).format(number_of=self.numberOfPeopleInDatabase),
             self.numberOfPeopleInDatabase)
 
-        # as long as we have people we haven't processed yet, keep looping
-        while len(self.handlesOfPeopleToBeProcessed) > 0:
-            handle = self.handlesOfPeopleToBeProcessed.pop()
-
-### DEBUG DEBUG DEBUG
-#            if len(self.handlesOfPeopleAlreadyProcessed) > 50:
-#                break
-###
-
-            # see if we've already processed this person
-            if handle in self.handlesOfPeopleAlreadyProcessed:
-                continue
-
-            person = self.db.get_person_from_handle(handle)
-
-            # if we get here, then we're dealing with someone new
-            self.progress.step()
-
-            # remember that we've now seen this person
-            self.handlesOfPeopleAlreadyProcessed.add(handle)
-
-            # we have 4 things to do:  find (1) spouses, (2) parents, siblings(3), and (4) children
-
-            # step 1 -- spouses
-            for familyHandle in person.get_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                spouseHandle = utils.find_spouse(person, family)
-                if spouseHandle and \
-                  spouseHandle not in self.handlesOfPeopleAlreadyProcessed:
-                    self.handlesOfPeopleToBeProcessed.add(spouseHandle)
-
-            # step 2 -- parents
-            for familyHandle in person.get_parent_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                fatherHandle = family.get_father_handle()
-                motherHandle = family.get_mother_handle()
-                if fatherHandle and \
-                  fatherHandle not in self.handlesOfPeopleAlreadyProcessed:
-                    self.handlesOfPeopleToBeProcessed.add(fatherHandle)
-                if motherHandle and \
-                  motherHandle not in self.handlesOfPeopleAlreadyProcessed:
-                    self.handlesOfPeopleToBeProcessed.add(motherHandle)
-
-            # step 3 -- siblings
-            for familyHandle in person.get_parent_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                for childRef in family.get_child_ref_list():
-                    childHandle = childRef.ref
-                    if childHandle and \
-                      childHandle not in self.handlesOfPeopleAlreadyProcessed:
-                        self.handlesOfPeopleToBeProcessed.add(childHandle)
-
-            # step 4 -- children
-            for familyHandle in person.get_family_handle_list():
-                family = self.db.get_family_from_handle(familyHandle)
-                for childRef in family.get_child_ref_list():
-                    childHandle = childRef.ref
-                    if childHandle and \
-                      childHandle not in self.handlesOfPeopleAlreadyProcessed:
-                        self.handlesOfPeopleToBeProcessed.add(childHandle)
+        # the people connected to the person by spouses, parents, siblings
+        # and children, in a single search over the families
+        self.handlesOfPeopleAlreadyProcessed = get_related_handles(
+            self.db, person.handle, callback=self.progress.step)
 
 
     def findUnrelatedPeople(self) :
@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Narrative Web Page generator.
+
+This module writes the archive of the web site: a tar file compressed with
+gzip, a tar file, or a zip file. The compression is done by threads, while
+the pages are being written.
+"""
+#------------------------------------------------
+# python modules
+#------------------------------------------------
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import os
+import queue
+import shutil
+import tarfile
+import threading
+import time
+import zipfile
+
+# The size of the blocks of a tar file compressed by each thread
+_BLOCK_SIZE = 1 << 20
+
+# The number of members of a zip file waiting to be compressed
+_QUEUE_SIZE = 64
+
+# The earliest modification time of a member of a zip file
+_ZIP_EPOCH = time.mktime((1980, 1, 1, 0, 0, 0, 0, 0, -1))
+
+def open_archive(name, archive_format, threads=1):
+    """
+    Open an archive for writing, with the interface of a tar file.
+
+    @param: name           -- The name of the archive file
+    @param: archive_format -- 'tar.gz', 'tar' or 'zip'
+    @param: threads        -- The number of threads compressing a tar file
+                              with gzip
+    """
+    if archive_format == 'tar':
+        return tarfile.open(name, 'w')
+    if archive_format == 'zip':
+        return ZipArchive(name)
+    writer = GzipBlockWriter(open(name, 'wb'), threads)
+    try:
+        archive = _GzipTarFile.open(fileobj=writer, mode='w|')
+    except (OSError, ValueError, tarfile.TarError):
+        writer.close()
+        raise
+    archive.writer = writer
+    return archive
+
+#------------------------------------------------
+# tar file compressed with gzip
+#------------------------------------------------
+class GzipBlockWriter:
+    """
+    A file object compressing what is written to it with gzip, by blocks
+    compressed by threads at the same time. Each block is a gzip member:
+    their concatenation is a gzip file.
+    """
+    def __init__(self, fileobj, threads=1):
+        """
+        @param: fileobj -- The file object the compressed blocks are
+                           written to
+        @param: threads -- The number of threads compressing the blocks
+        """
+        self.fileobj = fileobj
+        self.threads = threads
+        self.executor = ThreadPoolExecutor(threads)
+        self.buffer = bytearray()
+        # the blocks being compressed, in their order
+        self.pending = deque()
+
+    def write(self, data):
+        """
+        Write data.
+        """
+        self.buffer += data
+        if len(self.buffer) >= _BLOCK_SIZE:
+            self.__compress()
+        return len(data)
+
+    def __compress(self):
+        """
+        Compress the buffer as a block, and write the compressed blocks,
+        keeping at most two blocks per thread in memory.
+        """
+        block, self.buffer = self.buffer, bytearray()
+        self.pending.append(self.executor.submit(gzip.compress, block))
+        while len(self.pending) > 2 * self.threads:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def close(self):
+        """
+        Write the last blocks, and close the file object.
+        """
+        try:
+            if self.buffer:
+                self.__compress()
+            while self.pending:
+                self.fileobj.write(self.pending.popleft().result())
+        finally:
+            self.executor.shutdown()
+            self.fileobj.close()
+
+class _GzipTarFile(tarfile.TarFile):
+    """
+    A tar file written to a GzipBlockWriter.
+    """
+    writer = None
+
+    def close(self):
+        """
+        Close the tar file, and the file it is compressed to.
+        """
+        try:
+            tarfile.TarFile.close(self)
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+
+#------------------------------------------------
+# zip file
+#------------------------------------------------
+class ZipArchive:
+    """
+    A zip file with the interface of the tar files used by the report. The
+    members are compressed, each on its own, by a thread while the pages are
+    being written.
+    """
+    def __init__(self, name):
+        """
+        @param: name -- The name of the zip file
+        """
+        self.zipfile = zipfile.ZipFile(name, 'w', zipfile.ZIP_DEFLATED)
+        self.queue = queue.Queue(_QUEUE_SIZE)
+        self.error = None
+        self.thread = threading.Thread(target=self.__write_members,
+                                       daemon=True)
+        self.thread.start()
+
+    def gettarinfo(self, name, arcname=None):
+        """
+        Return the member of the file name.
+        """
+        statres = os.stat(name)
+        tarinfo = tarfile.TarInfo(name if arcname is None else arcname)
+        tarinfo.size = statres.st_size
+        tarinfo.mtime = statres.st_mtime
+        tarinfo.mode = statres.st_mode & 0o7777
+        return tarinfo
+
+    def addfile(self, tarinfo, fileobj=None):
+        """
+        Add a member with the content of a file object.
+        """
+        data = fileobj.read(tarinfo.size) if fileobj is not None else b''
+        self.__put((tarinfo, data, None))
+
+    def add(self, name, arcname=None, filter=None):
+        """
+        Add a member with the content of the file name.
+        """
+        tarinfo = self.gettarinfo(name, arcname)
+        if filter is not None:
+            tarinfo = filter(tarinfo)
+        if tarinfo is not None:
+            self.__put((tarinfo, None, name))
+
+    def __put(self, member):
+        """
+        Hand a member to the thread writing them.
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put(member)
+
+    def __write_members(self):
+        """
+        Write the members to the zip file, until the archive is closed.
+        """
+        while True:
+            member = self.queue.get()
+            if member is None:
+                return
+            if self.error is not None:
+                continue
+            tarinfo, data, name = member
+            zipinfo = zipfile.ZipInfo(
+                tarinfo.name,
+                time.localtime(max(tarinfo.mtime, _ZIP_EPOCH))[:6])
+            zipinfo.compress_type = zipfile.ZIP_DEFLATED
+            zipinfo.external_attr = (tarinfo.mode & 0xFFFF) << 16
+            try:
+                if name is None:
+                    self.zipfile.writestr(zipinfo, data)
+                else:
+                    zipinfo.file_size = tarinfo.size
+                    with open(name, 'rb') as src, \
+                            self.zipfile.open(zipinfo, 'w') as dest:
+                        shutil.copyfileobj(src, dest)
+            except (IOError, OSError, ValueError) as err:
+                self.error = err
+
+    def close(self):
+        """
+        Write the last members, and close the zip file.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        self.zipfile.close()
+        if self.error is not None:
+            raise self.error
@@ -74,7 +74,7 @@ from gramps.gen.display.place import displayer as _pd
 from gramps.plugins.lib.libhtmlconst import _CC
 from gramps.gen.utils.db import get_birth_or_fallback, get_death_or_fallback
 from gramps.gen.datehandler import parser as _dp
-from gramps.plugins.lib.libhtml import Html, xml_lang
+from gramps.plugins.lib.libhtml import Html, HtmlStream, xml_lang
 from gramps.plugins.lib.libhtmlbackend import HtmlBackend, process_spaces
 from gramps.gen.utils.place import conv_lat_lon
 from gramps.gen.utils.location import get_main_location
@@ -703,13 +703,14 @@ class BasePage: # pylint: disable=C1001
         trow2 += Html("td", srcrefs, class_="ColumnSources")
 
         # get event notes
-        notelist = event.get_note_list()
+        # copy the lists of the event, it is shared with the other pages
+        notelist = event.get_note_list()[:]
         notelist.extend(event_ref.get_note_list())
         htmllist = self.dump_notes(notelist)
 
         # if the event or event reference has an attribute attached to it,
         # get the text and format it correctly?
-        attrlist = event.get_attribute_list()
+        attrlist = event.get_attribute_list()[:]
         attrlist.extend(event_ref.get_attribute_list())
         for attr in attrlist:
             htmllist.extend(Html("p",
@@ -2846,6 +2847,22 @@ class BasePage: # pylint: disable=C1001
     # -------------------------------------------------------------------------
     #              # Web Page Fortmatter and writer
     # -------------------------------------------------------------------------
+    def xhtml_stream(self, htmlinstance, output_file, section):
+        """
+        Will write the page up to the contents of section, and return the
+        stream writing the rest of it. The rows of the section are then
+        written with the write method of the stream, as they are created,
+        and the stream is passed to xhtml_writer instead of the page.
+
+        @param: htmlinstance -- Web page created with libhtml
+        @param: output_file  -- Open file that is being written to
+        @param: section      -- The section of the page written a piece at
+                                a time, eg the body of a large table
+        """
+        stream = HtmlStream(htmlinstance, partial(print, file=output_file))
+        stream.begin(section)
+        return stream
+
     def xhtml_writer(self, htmlinstance, output_file, sio, date):
         """
         Will format, write, and close the file
@@ -2853,8 +2870,12 @@ class BasePage: # pylint: disable=C1001
         @param: output_file  -- Open file that is being written to
         @param: htmlinstance -- Web page created with libhtml
                                 src/plugins/lib/libhtml.py
+                                or the stream writing it, see xhtml_stream
         """
-        htmlinstance.write(partial(print, file=output_file))
+        if isinstance(htmlinstance, HtmlStream):
+            htmlinstance.end()
+        else:
+            htmlinstance.write(partial(print, file=output_file))
 
         # closes the file
         self.report.close_file(output_file, sio, date)
@@ -42,6 +42,7 @@ Classe:
 # python modules
 #------------------------------------------------
 from collections import defaultdict
+from functools import partial
 from decimal import getcontext
 import logging
 
@@ -104,14 +105,12 @@ class FamilyPages(BasePage):
             LOG.debug("    %s", str(item))
 
         message = _("Creating family pages...")
-        index = 1
         with self.r_user.progress(_("Narrated Web Site Report"), message,
                                   len(self.report.obj_dict[Family]) + 1
                                  ) as step:
-            for family_handle in self.report.obj_dict[Family]:
-                step()
-                index += 1
-                self.familypage(self.report, title, family_handle)
+            self.report.write_pages(
+                partial(self.familypage, self.report, title),
+                list(self.report.obj_dict[Family]), step)
             step()
             self.familylistpage(self.report, title,
                                 self.report.obj_dict[Family].keys())
@@ -337,7 +336,7 @@ class FamilyPages(BasePage):
 
             # family media list for initial thumbnail
             if self.create_media:
-                media_list = family.get_media_list()
+                media_list = family.get_media_list()[:]
                 # If Event pages are not being created, then we need to display
                 # the family event media here
                 if not self.inc_events:
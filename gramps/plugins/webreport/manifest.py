@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/env python
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Narrative Web Page generator.
+
+This module keeps the manifest of the pages written by the report, used to
+write again only the pages whose data changed since the last time.
+"""
+#------------------------------------------------
+# python modules
+#------------------------------------------------
+from collections import defaultdict
+from hashlib import md5
+import os
+
+#------------------------------------------------
+# Gramps module
+#------------------------------------------------
+from gramps.gen.const import VERSION
+from gramps.gen.proxy import CacheProxyDb
+from gramps.gen.utils.file import (get_stored_filename, load_stored,
+                                   save_stored)
+
+# Version of the stored manifest
+_MANIFEST_VERSION = 2
+
+# The tables of the database: the class of their objects, and the plural
+# and singular of the names of their methods
+_TABLES = (('Person', 'people', 'person'),
+           ('Family', 'families', 'family'),
+           ('Event', 'events', 'event'),
+           ('Place', 'places', 'place'),
+           ('Source', 'sources', 'source'),
+           ('Citation', 'citations', 'citation'),
+           ('Media', 'media', 'media'),
+           ('Repository', 'repositories', 'repository'),
+           ('Note', 'notes', 'note'),
+           ('Tag', 'tags', 'tag'))
+
+# The prefix of the dependencies on the back references of an object in the
+# report, in the database, and on all the objects of a table
+_BKREF = '<'
+_BACKLINKS = '^'
+_TABLE = '*'
+
+#------------------------------------------------
+# PageManifest
+#------------------------------------------------
+class PageManifest:
+    """
+    The pages written to a directory by the report, with for each page the
+    files it wrote, and the handles of the objects it was written from.
+
+    An object a page depends on is stamped with its change time and its
+    entry in the object dictionary of the report (page, name and ID), or
+    with its back references when the page looked them up, in the report or
+    in the database. A page that went through all the objects of a table
+    depends on the change times of all of them. A page whose stamps are the
+    same as when it was written, and whose files are still there, does not
+    need to be written again.
+    """
+    def __init__(self, report, signature):
+        """
+        @param: report    -- The instance of the main report class
+        @param: signature -- What all pages depend on, eg the options
+        """
+        self.report = report
+        self.signature = (_MANIFEST_VERSION, VERSION, signature)
+        # key of a page -> (created files, copied files, deps, digest),
+        # with the indexes of the deps of the page
+        self.pages = {}
+        # the pages written, or kept, by this run
+        self.written = {}
+        # the other files created by the last run, and by this one
+        self.old_files = set()
+        self.files = set()
+        # the dependencies of the pages, and their indexes
+        self.deps = []
+        self.__index = {}
+        # handle -> change time
+        self.changes = {}
+        # class of the objects of a table -> digest of their change times
+        self.tables = {}
+        self.filename = get_stored_filename(os.path.abspath(report.html_dir),
+                                            'nwm')
+
+    def load(self):
+        """
+        Load the manifest of the last run, if it was written with the same
+        signature.
+        """
+        data = load_stored(self.filename)
+        if isinstance(data, dict) and data.get('signature') == self.signature:
+            self.pages = data['pages']
+            self.old_files = data['files']
+            self.deps = data['deps']
+            self.__index = dict((dep, index)
+                                for index, dep in enumerate(self.deps))
+
+    def save(self):
+        """
+        Store the manifest of this run.
+        """
+        # only keep the deps of the pages of this run
+        self.deps = []
+        self.__index = {}
+        pages = {}
+        for key, (created, copied, deps, digest) in self.written.items():
+            pages[key] = (created, copied, self.__encode(deps), digest)
+        data = {'signature': self.signature,
+                'files': self.files,
+                'deps': self.deps,
+                'pages': pages}
+        save_stored(self.filename, data)
+
+    def scan(self, database):
+        """
+        Read the change times of all objects of the database.
+        """
+        self.changes = {}
+        self.tables = {}
+        for obj_class, plural, dummy in _TABLES:
+            changes = sorted((obj.handle, obj.change)
+                             for obj in getattr(database, 'iter_' + plural)())
+            self.changes.update(changes)
+            self.tables[obj_class] = md5(
+                repr(changes).encode('utf-8')).hexdigest()
+
+    def stamp(self, dep):
+        """
+        Return the stamp of a dependency of a page.
+        """
+        entries = []
+        if dep.startswith(_TABLE):
+            return self.tables.get(dep[len(_TABLE):])
+        if dep.startswith(_BACKLINKS):
+            backlinks = self.report.basedb.find_backlink_handles(
+                dep[len(_BACKLINKS):])
+            return sorted((obj_class, handle, self.changes.get(handle))
+                          for obj_class, handle in backlinks)
+        if dep.startswith(_BKREF):
+            for obj_class, objects in self.report.bkref_dict.items():
+                # do not record this lookup in the deps of a page
+                value = defaultdict.get(objects, dep[len(_BKREF):])
+                if value:
+                    entries.append((obj_class.__name__,
+                                    sorted(_plain(bkref) for bkref in value)))
+            return entries
+        for obj_class, objects in self.report.obj_dict.items():
+            value = defaultdict.get(objects, dep)
+            if value:
+                entries.append((obj_class.__name__, _plain(value)))
+        return (self.changes.get(dep), entries)
+
+    def digest(self, deps):
+        """
+        Return the digest of the stamps of the dependencies of a page.
+        """
+        stamps = repr([(dep, self.stamp(dep)) for dep in sorted(deps)])
+        return md5(stamps.encode('utf-8')).hexdigest()
+
+    def __encode(self, deps):
+        """
+        Return the indexes in deps of the dependencies of a page.
+        """
+        indexes = []
+        for dep in deps:
+            index = self.__index.get(dep)
+            if index is None:
+                index = self.__index[dep] = len(self.deps)
+                self.deps.append(dep)
+            indexes.append(index)
+        return tuple(indexes)
+
+    def is_current(self, key):
+        """
+        Return True if the page of key does not need to be written again.
+        """
+        entry = self.pages.get(key)
+        if entry is None:
+            return False
+        created, copied, deps, digest = entry
+        html_dir = self.report.html_dir
+        if not all(os.path.isfile(os.path.join(html_dir, fname))
+                   for fname in created + copied):
+            return False
+        return self.digest(self.deps[index] for index in deps) == digest
+
+    def keep(self, key):
+        """
+        Keep the page of key, written by an earlier run.
+        """
+        created, copied, deps, digest = self.pages[key]
+        self.written[key] = (created, copied,
+                             [self.deps[index] for index in deps], digest)
+
+    def add(self, key, created, copied, deps, digest=None):
+        """
+        Add the page of key, written by this run, from the objects of deps.
+        """
+        if digest is None:
+            digest = self.digest(deps)
+        self.written[key] = (created, copied, deps, digest)
+
+    def remove_stale(self):
+        """
+        Remove the files created by the last run, and not by this one, eg
+        the pages of removed people.
+        """
+        current = set(self.files)
+        for created, dummy, dummy, dummy in self.written.values():
+            current.update(created)
+        stale = self.old_files - current
+        for created, dummy, dummy, dummy in self.pages.values():
+            stale.update(fname for fname in created if fname not in current)
+        for fname in stale:
+            fname = os.path.join(self.report.html_dir, fname)
+            if os.path.isfile(fname):
+                os.remove(fname)
+
+def _plain(entry):
+    """
+    Return an entry of the object dictionaries of the report, with the
+    classes replaced by their names and the objects by their handles.
+    """
+    return tuple(value.__name__ if isinstance(value, type) else
+                 getattr(value, 'handle', value) for value in entry)
+
+#------------------------------------------------
+# Recording of the dependencies
+#------------------------------------------------
+class DepsDict(defaultdict):
+    """
+    A dictionary of the objects, or back references, of a class in the
+    report, recording the handles looked up in the dependencies of the page
+    being written.
+    """
+    def __init__(self, report, bkref=False):
+        defaultdict.__init__(self, set)
+        self.report = report
+        self.prefix = _BKREF if bkref else ''
+
+    def __record(self, handle):
+        if self.report.page_deps is not None:
+            self.report.page_deps.add(self.prefix + handle)
+
+    def __getitem__(self, handle):
+        self.__record(handle)
+        return defaultdict.__getitem__(self, handle)
+
+    def get(self, handle, default=None):
+        self.__record(handle)
+        return defaultdict.get(self, handle, default)
+
+    def __contains__(self, handle):
+        self.__record(handle)
+        return defaultdict.__contains__(self, handle)
+
+def _recorded(get_object):
+    """
+    Return a method calling get_object, and recording the handle of the
+    object in the dependencies of the page being written.
+    """
+    def get_recorded(self, key):
+        obj = get_object(self, key)
+        if self.report.page_deps is not None and obj is not None:
+            self.report.page_deps.add(obj.handle)
+        return obj
+    get_recorded.__doc__ = get_object.__doc__
+    return get_recorded
+
+def _recorded_raw(name):
+    """
+    Return a method calling the method name of the database, reading the
+    raw data of an object, and recording the handle of the object in the
+    dependencies of the page being written.
+    """
+    def get_raw_data(self, handle):
+        """
+        Return the raw data of the object of handle.
+        """
+        data = getattr(self.db, name)(handle)
+        if self.report.page_deps is not None and data is not None:
+            self.report.page_deps.add(handle)
+        return data
+    return get_raw_data
+
+def _recorded_table(name, obj_class):
+    """
+    Return a method calling the method name of the database, reading a
+    table, and recording all the objects of obj_class in the dependencies of
+    the page being written.
+    """
+    def read_table(self, *args, **kwargs):
+        """
+        Read the objects, or the handles, of the table.
+        """
+        if self.report.page_deps is not None:
+            self.report.page_deps.add(_TABLE + obj_class)
+        return getattr(self.db, name)(*args, **kwargs)
+    return read_table
+
+def _from_gramps_id(name):
+    """
+    Return a method calling the method name of the database.
+    """
+    def get_object(self, gramps_id):
+        """
+        Find an object in the database from the passed Gramps ID.
+        """
+        return getattr(self.db, name)(gramps_id)
+    return get_object
+
+class DepsProxyDb(CacheProxyDb):
+    """
+    The database of the report, recording the handles of the objects read,
+    the back references and the tables looked up, in the dependencies of the
+    page being written.
+    """
+    def __init__(self, database, report):
+        CacheProxyDb.__init__(self, database)
+        self.report = report
+
+    get_person_from_handle = _recorded(CacheProxyDb.get_person_from_handle)
+    get_event_from_handle = _recorded(CacheProxyDb.get_event_from_handle)
+    get_family_from_handle = _recorded(CacheProxyDb.get_family_from_handle)
+    get_repository_from_handle = _recorded(
+        CacheProxyDb.get_repository_from_handle)
+    get_place_from_handle = _recorded(CacheProxyDb.get_place_from_handle)
+    get_citation_from_handle = _recorded(
+        CacheProxyDb.get_citation_from_handle)
+    get_source_from_handle = _recorded(CacheProxyDb.get_source_from_handle)
+    get_note_from_handle = _recorded(CacheProxyDb.get_note_from_handle)
+    get_media_from_handle = _recorded(CacheProxyDb.get_media_from_handle)
+    get_tag_from_handle = _recorded(CacheProxyDb.get_tag_from_handle)
+
+    get_person_from_gramps_id = _recorded(
+        _from_gramps_id('get_person_from_gramps_id'))
+    get_family_from_gramps_id = _recorded(
+        _from_gramps_id('get_family_from_gramps_id'))
+    get_media_from_gramps_id = _recorded(
+        _from_gramps_id('get_media_from_gramps_id'))
+    get_note_from_gramps_id = _recorded(
+        _from_gramps_id('get_note_from_gramps_id'))
+
+    def find_backlink_handles(self, handle, include_classes=None):
+        """
+        Find the objects that hold a reference to the object of handle,
+        recording its back references in the dependencies of the page being
+        written.
+        """
+        if self.report.page_deps is not None:
+            self.report.page_deps.add(_BACKLINKS + handle)
+        return self.db.find_backlink_handles(handle, include_classes)
+
+def _add_recorded_methods():
+    """
+    Add to DepsProxyDb the methods reading the raw data of the objects, and
+    the tables.
+    """
+    for obj_class, plural, singular in _TABLES:
+        name = 'get_raw_%s_data' % singular
+        setattr(DepsProxyDb, name, _recorded_raw(name))
+        for name in ('iter_' + plural, 'iter_%s_handles' % singular,
+                     'get_%s_handles' % singular, 'get_number_of_' + plural,
+                     'get_%s_cursor' % singular):
+            setattr(DepsProxyDb, name, _recorded_table(name, obj_class))
+
+_add_recorded_methods()
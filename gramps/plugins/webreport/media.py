@@ -137,11 +137,12 @@ class MediaPages(BasePage):
                 self.report.obj_dict[Media].keys(),
                 key=lambda x: sort_by_desc_and_gid(
                     self.r_db.get_media_from_handle(x)))
+            # the handle, and the (prev, next, index, count) of each page
+            pages = []
             prev = None
             total = len(sorted_media_handles)
             index = 1
             for handle in sorted_media_handles:
-                gc.collect() # Reduce memory usage when there are many images.
                 if index == media_count:
                     next_ = None
                 elif index < total:
@@ -150,10 +151,8 @@ class MediaPages(BasePage):
                     next_ = self.unused_media_handles[0]
                 else:
                     next_ = None
-                self.mediapage(self.report, title,
-                               handle, (prev, next_, index, media_count))
+                pages.append((handle, (prev, next_, index, media_count)))
                 prev = handle
-                step()
                 index += 1
 
             total = len(self.unused_media_handles)
@@ -162,20 +161,23 @@ class MediaPages(BasePage):
             prev = sorted_media_handles[total_m-1] if total_m > 0 else 0
             if total > 0:
                 for media_handle in self.unused_media_handles:
-                    media = self.r_db.get_media_from_handle(media_handle)
-                    gc.collect() # Reduce memory usage when many images.
                     if index == media_count:
                         next_ = None
                     else:
                         next_ = self.unused_media_handles[idx]
-                    self.mediapage(self.report, title,
-                                   media_handle,
-                                   (prev, next_, index, media_count))
+                    pages.append((media_handle,
+                                  (prev, next_, index, media_count)))
                     prev = media_handle
-                    step()
                     index += 1
                     idx += 1
 
+            def page(args):
+                """ write the page of a media """
+                gc.collect() # Reduce memory usage when there are many images.
+                handle, info = args
+                self.mediapage(self.report, title, handle, info)
+            self.report.write_pages(page, pages, step)
+
         self.medialistpage(self.report, title, sorted_media_handles)
 
     def medialistpage(self, report, title, sorted_media_handles):
@@ -673,9 +675,9 @@ class MediaPages(BasePage):
                 self.report.archive.add(fullpath, str(newpath))
             else:
                 to_dir = os.path.join(self.html_dir, to_dir)
-                if not os.path.isdir(to_dir):
-                    os.makedirs(to_dir)
+                os.makedirs(to_dir, exist_ok=True)
                 new_file = os.path.join(self.html_dir, newpath)
+                self.report.add_copied_file(newpath)
                 shutil.copyfile(fullpath, new_file)
                 os.utime(new_file, (mtime, mtime))
             return newpath
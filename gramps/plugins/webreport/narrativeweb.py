@@ -73,10 +73,13 @@ from gramps.gen.plug.report import utils
 from gramps.gen.plug.report import MenuReportOptions
 from gramps.gen.plug.report import stdoptions
 from gramps.gen.constfunc import win, get_curr_dir
+from gramps.gen.utils.fork import can_fork, get_work, worker_pool
 from gramps.gen.config import config
 from gramps.gen.display.name import displayer as _nd
 from gramps.gen.display.place import displayer as _pd
 from gramps.gen.proxy import CacheProxyDb
+from gramps.gen.proxy.proxybase import ProxyDbBase
+from gramps.gen.user import User
 from gramps.plugins.lib.libhtmlconst import _CHARACTER_SETS, _CC, _COPY_OPTIONS
 from gramps.gen.relationship import get_relationship_calculator
 
@@ -107,6 +110,9 @@ from gramps.plugins.webreport.common import (get_gendex_data,
                                              HTTP, HTTPS, _WEB_EXT, CSS,
                                              _NARRATIVESCREEN, _NARRATIVEPRINT,
                                              _WRONGMEDIAPATH, sort_people)
+from gramps.plugins.webreport.manifest import (PageManifest, DepsDict,
+                                               DepsProxyDb)
+from gramps.plugins.webreport.archive import open_archive
 
 LOG = logging.getLogger(".NarrativeWeb")
 _ = glocale.translation.sgettext
@@ -118,6 +124,10 @@ getcontext().prec = 8
 _DEFAULT_MAX_IMG_WIDTH = 800   # resize images that are wider than this
 _DEFAULT_MAX_IMG_HEIGHT = 600  # resize images that are taller than this
                                # The two values above are settable in options.
+
+# Number of pages written by a worker process at a time
+_CHUNK_PAGES = 50
+
 class NavWebReport(Report):
     """
     Create WebReport object that produces the report.
@@ -142,9 +152,17 @@ class NavWebReport(Report):
         stdoptions.run_date_format_option(self, menu)
         self.rlocale = self._locale
 
+        # the database under the proxies, see write_pages
+        self.basedb = self.database
         stdoptions.run_private_data_option(self, menu)
         stdoptions.run_living_people_option(self, menu)
-        self.database = CacheProxyDb(self.database)
+        # only write the pages whose data changed, see write_pages
+        self.incremental = (self.options['incremental'] and
+                            not self.options['archive'])
+        if self.incremental:
+            self.database = DepsProxyDb(self.database, self)
+        else:
+            self.database = CacheProxyDb(self.database)
         self._db = self.database
 
         filters_option = menu.get_option_by_name('filter')
@@ -166,6 +184,9 @@ class NavWebReport(Report):
         self.opts = self.options
         self.inc_contact = self.opts['contactnote'] or self.opts['contactimg']
 
+        # number of processes writing the pages of the objects
+        self.processes = self.options['processes']
+
         # name format options
         self.name_format = self.options['name_format']
 
@@ -255,6 +276,11 @@ class NavWebReport(Report):
         else:
             self.html_dir = self.target_path
         self.warn_dir = True       # Only give warning once.
+        self.manifest = None
+        # the handles, and the created and copied files, of the page being
+        # written in incremental mode
+        self.page_deps = None
+        self.page_files = None
         self.obj_dict = None
         self.visited = None
         self.bkref_dict = None
@@ -269,9 +295,9 @@ class NavWebReport(Report):
         """
         The first method called to write the Narrative Web after loading options
         """
-        global _WRONGMEDIAPATH
-
-        _WRONGMEDIAPATH = []
+        # the pages add the missing media to the list of common, do not
+        # replace it
+        del _WRONGMEDIAPATH[:]
         if not self.use_archive:
             dir_name = self.target_path
             if dir_name is None:
@@ -322,7 +348,9 @@ class NavWebReport(Report):
                     _('The archive file must be a file, not a directory'))
                 return
             try:
-                self.archive = tarfile.open(self.target_path, "w:gz")
+                self.archive = open_archive(self.target_path,
+                                            self.options['archive_format'],
+                                            self.processes)
             except (OSError, IOError) as value:
                 self.user.notify_error(
                     _("Could not create %s") % self.target_path,
@@ -395,6 +423,11 @@ class NavWebReport(Report):
 
         self._build_obj_dict()
 
+        if self.incremental:
+            self.manifest = PageManifest(self, self.__get_signature())
+            self.manifest.load()
+            self.manifest.scan(self.basedb)
+
         #################################################
         #
         # Pass 2 Generate the web pages
@@ -449,6 +482,10 @@ class NavWebReport(Report):
         # copy all of the neccessary files
         self.copy_narrated_files()
 
+        if self.manifest is not None:
+            self.manifest.remove_stale()
+            self.manifest.save()
+
         # if an archive is being used, close it?
         if self.archive:
             self.archive.close()
@@ -481,13 +518,19 @@ class NavWebReport(Report):
                            Media, Repository, Note, Tag)
 
         # setup a dictionary of the required structure
-        self.obj_dict = defaultdict(lambda: defaultdict(set))
-        self.bkref_dict = defaultdict(lambda: defaultdict(set))
+        if self.incremental:
+            # record the lookups in the dependencies of the pages
+            new_dict = partial(DepsDict, self)
+            new_bkref_dict = partial(DepsDict, self, True)
+        else:
+            new_dict = new_bkref_dict = partial(defaultdict, set)
+        self.obj_dict = defaultdict(new_dict)
+        self.bkref_dict = defaultdict(new_bkref_dict)
 
         # initialise the dictionary to empty in case no objects of any
         # particular class are incuded in the web report
         for obj_class in _obj_class_list:
-            self.obj_dict[obj_class] = defaultdict(set)
+            self.obj_dict[obj_class] = new_dict()
 
         ind_list = self._db.iter_person_handles()
         ind_list = self.filter.apply(self._db, ind_list, user=self.user)
@@ -509,6 +552,17 @@ class NavWebReport(Report):
                   "".join(("%s: %s\n" % item)
                           for item in self.bkref_dict.items()))
 
+    def __get_signature(self):
+        """
+        Return what all the pages depend on, besides the objects they are
+        written from: the options, and whether there are repositories to
+        link to in the navigation menu.
+        """
+        options = sorted((name, value)
+                         for name, value in self.options.items()
+                         if name not in ('processes', 'incremental'))
+        return (repr(options), bool(self._db.get_repository_handles()))
+
     def _add_person(self, person_handle, bkref_class, bkref_handle):
         """
         Add person_handle to the obj_dict, and recursively all referenced
@@ -1395,6 +1449,10 @@ class NavWebReport(Report):
                 self.cur_fname = os.path.join(subdir, fname) + ext
             else:
                 self.cur_fname = fname + ext
+        if self.page_files is not None:
+            self.page_files[0].append(self.cur_fname)
+        elif self.manifest is not None:
+            self.manifest.files.add(self.cur_fname)
         if self.archive:
             string_io = BytesIO()
             output_file = TextIOWrapper(string_io, encoding=self.encoding,
@@ -1403,8 +1461,8 @@ class NavWebReport(Report):
             string_io = None
             if subdir:
                 subdir = os.path.join(self.html_dir, subdir)
-                if not os.path.isdir(subdir):
-                    os.makedirs(subdir)
+                # other processes may create it too, see write_pages
+                os.makedirs(subdir, exist_ok=True)
             fname = os.path.join(self.html_dir, self.cur_fname)
             output_file = open(fname, 'w', encoding=self.encoding,
                                errors='xmlcharrefreplace')
@@ -1424,7 +1482,8 @@ class NavWebReport(Report):
         if self.archive:
             output_file.flush()
             tarinfo = tarfile.TarInfo(self.cur_fname)
-            tarinfo.size = len(string_io.getvalue())
+            # the page was written from the start of string_io
+            tarinfo.size = string_io.tell()
             tarinfo.mtime = date if date != 0 else time.time()
             if not win():
                 tarinfo.uid = os.getuid()
@@ -1483,11 +1542,11 @@ class NavWebReport(Report):
             dest = os.path.join(to_dir, to_fname)
             self.archive.add(from_fname, dest, filter=set_mtime)
         else:
+            self.add_copied_file(os.path.join(to_dir, to_fname))
             dest = os.path.join(self.html_dir, to_dir, to_fname)
 
             destdir = os.path.dirname(dest)
-            if not os.path.isdir(destdir):
-                os.makedirs(destdir)
+            os.makedirs(destdir, exist_ok=True)
 
             if from_fname != dest:
                 try:
@@ -1507,6 +1566,145 @@ class NavWebReport(Report):
                       "web pages."))
                 self.warn_dir = False
 
+    def add_copied_file(self, fname):
+        """
+        Add a file copied to the destination by the page being written.
+
+        @param: fname -- The path of the file, relative to the destination
+        """
+        if self.page_files is not None:
+            self.page_files[1].append(fname)
+
+    def write_pages(self, page, items, step):
+        """
+        Write the page of each item, by calling page with the item, and call
+        step after each page.
+
+        In incremental mode, the pages written by the last run from objects
+        which did not change since then are not written again.
+
+        With more than one process, the pages are written by worker
+        processes, forked from this one, each reading the database with its
+        own connection under the same proxies. Their archive members,
+        warnings, missing media, dumped places and manifest entries are
+        handed back and merged here, in the order of the items.
+
+        @param: page  -- The function writing the page of an item
+        @param: items -- The list of items
+        @param: step  -- The progress step function
+        """
+        if self.manifest is not None:
+            todo = []
+            for item in items:
+                if self.manifest.is_current(item):
+                    self.manifest.keep(item)
+                    step()
+                else:
+                    todo.append(item)
+            items = todo
+            page = partial(self.write_page, page)
+
+        if (self.processes < 2 or len(items) <= _CHUNK_PAGES
+                or not self.__can_fork()):
+            for item in items:
+                step()
+                page(item)
+            return
+
+        chunks = [items[index:index + _CHUNK_PAGES]
+                  for index in range(0, len(items), _CHUNK_PAGES)]
+        with worker_pool((self, page), processes=self.processes,
+                         initializer=_start_worker) as pool_map:
+            for chunk, result in zip(chunks, pool_map(_write_pages, chunks)):
+                self.__merge_pages(*result)
+                for dummy in chunk:
+                    step()
+
+    def write_page(self, page, item):
+        """
+        Write the page of item, and add it to the manifest.
+        """
+        self.page_deps = set()
+        self.page_files = ([], [])
+        try:
+            page(item)
+            (created, copied), deps = self.page_files, self.page_deps
+        finally:
+            self.page_deps = self.page_files = None
+        self.manifest.add(item, created, copied, tuple(deps))
+
+    def __can_fork(self):
+        """
+        Return True if worker processes can read the database.
+        """
+        if not can_fork() or not self.basedb.get_feature("reader"):
+            return False
+        reader = self.basedb.open_reader()
+        if reader is None:
+            return False
+        reader.close()
+        return True
+
+    def start_worker(self):
+        """
+        Prepare this copy of the report to write pages in a worker process.
+        """
+        reader = self.basedb.open_reader()
+        proxy = self.database
+        while isinstance(proxy, (CacheProxyDb, ProxyDbBase)):
+            if isinstance(proxy, ProxyDbBase):
+                proxy.basedb = reader
+            if proxy.db is self.basedb:
+                proxy.db = reader
+            proxy = proxy.db
+        self.basedb = reader
+        self.user = _WorkerUser()
+        for tab in self.tab.values():
+            tab.r_user = self.user
+        if self.archive:
+            self.archive = _ArchiveMembers(self.archive)
+        if self.manifest is not None:
+            self.manifest.written = {}
+
+    def write_chunk(self, page, items):
+        """
+        Write the pages of items in a worker process, and return what the
+        main process has to merge.
+        """
+        missing = len(_WRONGMEDIAPATH)
+        visited = len(self.visited)
+        for item in items:
+            page(item)
+        members = []
+        if self.archive:
+            members, self.archive.members = self.archive.members, []
+        messages, self.user.messages = self.user.messages, []
+        written = {}
+        if self.manifest is not None:
+            written, self.manifest.written = self.manifest.written, {}
+        return (members, messages, _WRONGMEDIAPATH[missing:],
+                [place.handle for place in self.visited[visited:]], written)
+
+    def __merge_pages(self, members, messages, missing, visited, written):
+        """
+        Merge what a worker process returned from write_chunk.
+        """
+        for tarinfo, data, name in members:
+            if name is None:
+                self.archive.addfile(tarinfo, BytesIO(data))
+            elif tarinfo.isreg():
+                with open(name, 'rb') as fileobj:
+                    self.archive.addfile(tarinfo, fileobj)
+            else:
+                self.archive.addfile(tarinfo)
+        for method, title, text in messages:
+            getattr(self.user, method)(title, text)
+        _WRONGMEDIAPATH.extend(missing)
+        self.visited.extend(self._db.get_place_from_handle(handle)
+                            for handle in visited)
+        if self.manifest is not None:
+            self.manifest.written.update(written)
+
     def person_in_webreport(self, person_handle):
         """
         Return the handle if we created a page for this person.
@@ -1515,6 +1713,67 @@ class NavWebReport(Report):
         """
         return person_handle in self.obj_dict[Person]
 
+#-------------------------------------------------------------------------
+#
+# Worker processes
+#
+#-------------------------------------------------------------------------
+def _start_worker():
+    """
+    Initialize a worker process.
+    """
+    get_work()[0].start_worker()
+
+def _write_pages(items):
+    """
+    Write the pages of items in a worker process.
+    """
+    report, page = get_work()
+    return report.write_chunk(page, items)
+
+class _WorkerUser(User):
+    """
+    The user of a worker process: the warnings and errors are handed to
+    the user of the report in the main process.
+    """
+    def __init__(self):
+        User.__init__(self)
+        self.messages = []
+
+    def warn(self, title, warning=""):
+        self.messages.append(('warn', title, warning))
+
+    def notify_error(self, title, error=""):
+        self.messages.append(('notify_error', title, error))
+
+class _ArchiveMembers:
+    """
+    The archive of a worker process: the members are handed to the report
+    in the main process, which adds them to the archive.
+    """
+    def __init__(self, archive):
+        self.archive = archive
+        self.members = []
+
+    def addfile(self, tarinfo, fileobj=None):
+        """
+        Add a member with the content of a file object.
+        """
+        data = fileobj.read(tarinfo.size) if fileobj else b''
+        self.members.append((tarinfo, data, None))
+
+    def add(self, name, arcname=None, filter=None):
+        """
+        Add a member with the content of the file name.
+        """
+        tarinfo = self.archive.gettarinfo(name, arcname)
+        # do not send the archive to the main process
+        tarinfo.tarfile = None
+        if filter is not None:
+            tarinfo = filter(tarinfo)
+        if tarinfo is not None:
+            self.members.append((tarinfo, None, name))
+
 #################################################
 #
 #    Creates the NarrativeWeb Report Menu Options
@@ -1531,6 +1790,7 @@ class NavWebOptions(MenuReportOptions):
         """
         self.__db = dbase
         self.__archive = None
+        self.__archive_format = None
         self.__target = None
         self.__target_uri = None
         self.__pid = None
@@ -1595,13 +1855,27 @@ class NavWebOptions(MenuReportOptions):
         category_name = _("Report Options")
         addopt = partial(menu.add_option, category_name)
 
-        self.__archive = BooleanOption(_('Store web pages in .tar.gz archive'),
+        self.__archive = BooleanOption(_('Store web pages in an archive'),
                                        False)
         self.__archive.set_help(_('Whether to store the web pages in an '
                                   'archive file'))
         addopt("archive", self.__archive)
         self.__archive.connect('value-changed', self.__archive_changed)
 
+        self.__archive_format = EnumeratedListOption(_('Archive format'),
+                                                     'tar.gz')
+        self.__archive_format.add_item('tar.gz',
+                                       _('tar archive compressed with gzip'))
+        self.__archive_format.add_item('tar', _('tar archive'))
+        self.__archive_format.add_item('zip', _('zip archive'))
+        self.__archive_format.set_help(
+            _('The format of the archive file. A tar archive compressed '
+              'with gzip is compressed by as many threads as processes, and '
+              'a zip archive file by file, while the web pages are '
+              'written.'))
+        addopt("archive_format", self.__archive_format)
+        self.__archive_format.connect('value-changed', self.__archive_changed)
+
         dbname = self.__db.get_dbname()
         default_dir = dbname + "_" + "NAVWEB"
         self.__target = DestinationOption(
@@ -1941,6 +2215,21 @@ class NavWebOptions(MenuReportOptions):
               "step-siblings with the parents and siblings"))
         addopt('showhalfsiblings', showallsiblings)
 
+        processes = NumberOption(_("Processes"), 1, 1, 64)
+        processes.set_help(
+            _("The number of processes writing the pages of people, "
+              "families, places, sources and media at the same time"))
+        addopt("processes", processes)
+
+        incremental = BooleanOption(
+            _("Only write the pages whose data changed"), False)
+        incremental.set_help(
+            _("Whether to write again only the pages of people, families, "
+              "places, sources and media whose data changed since the last "
+              "time the report was written to this directory. "
+              "Not used for archives."))
+        addopt("incremental", incremental)
+
     def __add_advanced_options_2(self, menu):
         """
         Continue options on the "Advanced" tab.
@@ -2125,10 +2414,13 @@ class NavWebOptions(MenuReportOptions):
         Update the change of storage: archive or directory
         """
         if self.__archive.get_value() is True:
-            self.__target.set_extension(".tar.gz")
+            self.__target.set_extension(
+                "." + self.__archive_format.get_value())
             self.__target.set_directory_entry(False)
+            self.__archive_format.set_available(True)
         else:
             self.__target.set_directory_entry(True)
+            self.__archive_format.set_available(False)
 
     def __update_filters(self):
         """
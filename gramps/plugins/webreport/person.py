@@ -136,12 +136,12 @@ class PersonPages(BasePage):
         with self.r_user.progress(_("Narrated Web Site Report"), message,
                                   len(self.report.obj_dict[Person]) + 1
                                  ) as step:
-            index = 1
-            for person_handle in sorted(self.report.obj_dict[Person]):
-                step()
-                index += 1
+            def page(person_handle):
+                """ write the page of a person """
                 person = self.r_db.get_person_from_handle(person_handle)
                 self.individualpage(self.report, title, person)
+            self.report.write_pages(page,
+                                    sorted(self.report.obj_dict[Person]), step)
             step()
             self.individuallistpage(self.report, title,
                                     self.report.obj_dict[Person].keys())
@@ -230,6 +230,9 @@ class PersonPages(BasePage):
             tbody = Html("tbody")
             table += tbody
 
+            # write the page up to the rows, and each row once created
+            stream = self.xhtml_stream(indlistpage, output_file, tbody)
+
             ppl_handle_list = sort_people(self.r_db, ppl_handle_list,
                                           self.rlocale)
             first = True
@@ -262,7 +265,6 @@ class PersonPages(BasePage):
 
                     # surname column
                     trow = Html("tr")
-                    tbody += trow
                     tcell = Html("td", class_="ColumnSurname", inline=True)
                     trow += tcell
 
@@ -404,15 +406,16 @@ class PersonPages(BasePage):
                             samerow = True
                         trow += Html("td", class_="ColumnParents",
                                      inline=samerow) + tcell
+                    stream.write(trow)
 
         # create clear line for proper styling
         # create footer section
         footer = self.write_footer(date)
         body += (FULLCLEAR, footer)
 
-        # send page out for processing
+        # send the rest of the page out for processing
         # and close the file
-        self.xhtml_writer(indlistpage, output_file, sio, date)
+        self.xhtml_writer(stream, output_file, sio, date)
 
 #################################################
 #
@@ -42,6 +42,7 @@ Classe:
 # python modules
 #------------------------------------------------
 from collections import defaultdict
+from functools import partial
 from decimal import getcontext
 import logging
 
@@ -117,11 +118,9 @@ class PlacePages(BasePage):
         with self.r_user.progress(_("Narrated Web Site Report"), message,
                                   len(self.report.obj_dict[Place]) + 1
                                  ) as step:
-            index = 1
-            for place_handle in self.report.obj_dict[Place]:
-                step()
-                index += 1
-                self.placepage(self.report, title, place_handle)
+            self.report.write_pages(
+                partial(self.placepage, self.report, title),
+                list(self.report.obj_dict[Place]), step)
             step()
             self.placelistpage(self.report, title,
                                self.report.obj_dict[Place].keys())
@@ -42,6 +42,7 @@ Classe:
 # python modules
 #------------------------------------------------
 from collections import defaultdict
+from functools import partial
 from decimal import getcontext
 import logging
 
@@ -106,11 +107,9 @@ class SourcePages(BasePage):
             self.sourcelistpage(self.report, title,
                                 self.report.obj_dict[Source].keys())
 
-            index = 1
-            for source_handle in self.report.obj_dict[Source]:
-                step()
-                index += 1
-                self.sourcepage(self.report, title, source_handle)
+            self.report.write_pages(
+                partial(self.sourcepage, self.report, title),
+                list(self.report.obj_dict[Source]), step)
 
     def sourcelistpage(self, report, title, source_handles):
         """
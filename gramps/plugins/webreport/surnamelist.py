@@ -160,6 +160,10 @@ class SurnameListPage(BasePage):
                 # begin table body
                 with Html("tbody") as tbody:
                     table += tbody
+                    # write the page up to the rows, and each row once
+                    # created
+                    stream = self.xhtml_stream(surnamelistpage, output_file,
+                                               tbody)
 
                     ppl_handle_list = sort_people(self.r_db, ppl_handle_list,
                                                   self.rlocale)
@@ -192,7 +196,6 @@ class SurnameListPage(BasePage):
                             surname = self._("<absent>")
 
                         trow = Html("tr")
-                        tbody += trow
 
                         tcell = Html("td", class_="ColumnLetter", inline=True)
                         trow += tcell
@@ -229,15 +232,16 @@ class SurnameListPage(BasePage):
 
                         trow += Html("td", len(data_list),
                                      class_="ColumnQuantity", inline=True)
+                        stream.write(trow)
 
         # create footer section
         # add clearline for proper styling
         footer = self.write_footer(None)
         body += (FULLCLEAR, footer)
 
-        # send page out for processing
+        # send the rest of the page out for processing
         # and close the file
-        self.xhtml_writer(surnamelistpage,
+        self.xhtml_writer(stream,
                           output_file, sio, 0) # 0 => current date modification
 
     def surname_link(self, fname, name, opt_val=None, uplink=False):
@@ -0,0 +1,141 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for manifest.py """
+
+#-------------------------------------------------------------------------
+#
+# Standard python modules
+#
+#-------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import unittest
+
+#-------------------------------------------------------------------------
+#
+# Gramps modules
+#
+#-------------------------------------------------------------------------
+from gramps.gen.db import DbTxn
+from gramps.gen.lib import Event, EventRef, Note, Person
+from gramps.plugins.webreport.manifest import PageManifest, DepsProxyDb
+from gramps.test.test_util import make_memory_db
+
+class Report:
+    """
+    The parts of the report used by the manifest.
+    """
+    def __init__(self, database, html_dir):
+        self.basedb = database
+        self.database = DepsProxyDb(database, self)
+        self.html_dir = html_dir
+        self.obj_dict = {}
+        self.bkref_dict = {}
+        self.page_deps = None
+
+#-------------------------------------------------------------------------
+#
+# ManifestTest class
+#
+#-------------------------------------------------------------------------
+class ManifestTest(unittest.TestCase):
+    '''
+    Tests of the pages written again by the incremental web report.
+    '''
+
+    def setUp(self):
+        self.db = make_memory_db()
+        self.html_dir = tempfile.mkdtemp()
+        self.filename = None
+        self.person = Person()
+        self.event = Event()
+        self.note = Note("note")
+        with DbTxn("Add objects", self.db) as trans:
+            self.db.add_event(self.event, trans)
+            self.db.add_note(self.note, trans)
+            self.add_participant(self.person, trans)
+        self.pages = {
+            'raw': lambda db: db.get_raw_person_data(self.person.handle),
+            'backlinks': lambda db: len(list(
+                db.find_backlink_handles(self.event.handle))),
+            'table': lambda db: list(db.iter_person_handles()),
+            'note': lambda db: db.get_note_from_handle(self.note.handle),
+            }
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.html_dir)
+        if self.filename and os.path.exists(self.filename):
+            os.remove(self.filename)
+
+    def add_participant(self, person, trans):
+        ref = EventRef()
+        ref.set_reference_handle(self.event.handle)
+        person.add_event_ref(ref)
+        self.db.add_person(person, trans)
+
+    def write(self):
+        """
+        Run the report, and return the pages written again.
+        """
+        report = Report(self.db, self.html_dir)
+        manifest = PageManifest(report, 'test')
+        self.filename = manifest.filename
+        manifest.load()
+        manifest.scan(self.db)
+        written = set()
+        for key, page in self.pages.items():
+            if manifest.is_current(key):
+                manifest.keep(key)
+                continue
+            report.page_deps = set()
+            try:
+                page(report.database)
+            finally:
+                deps, report.page_deps = report.page_deps, None
+            fname = key + '.html'
+            open(os.path.join(self.html_dir, fname), 'w').close()
+            manifest.add(key, [fname], [], tuple(deps))
+            written.add(key)
+        manifest.save()
+        return written
+
+    def test_deps(self):
+        self.assertEqual(self.write(), set(self.pages))
+        self.assertEqual(self.write(), set())
+
+        # read through the raw data, and a back reference
+        self.person.set_gender(Person.MALE)
+        with DbTxn("Edit person", self.db) as trans:
+            self.db.commit_person(self.person, trans,
+                                  change_time=self.person.change + 1)
+        self.assertEqual(self.write(), {'raw', 'backlinks', 'table'})
+
+        # a new back reference, and object of the table
+        with DbTxn("Add person", self.db) as trans:
+            self.add_participant(Person(), trans)
+        self.assertEqual(self.write(), {'backlinks', 'table'})
+        self.assertEqual(self.write(), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
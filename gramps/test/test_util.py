@@ -37,6 +37,9 @@ from gramps.cli.grampscli import CLIManager
 from gramps.cli.argparser import ArgParser
 from gramps.cli.arghandler import ArgHandler
 from gramps.gen.const import USER_DIRLIST
+from gramps.gen.db.utils import make_database
+from gramps.gen.lib import (ChildRef, Date, Event, EventRef, EventType,
+                            Family, Person, Surname)
 
 # _caller_context is primarily here to support and document the process
 # of determining the test-module's directory.
@@ -247,4 +250,83 @@ class Gramps:
 
         return output
 
+### Support for testing with a database
+
+def make_memory_db():
+    """
+    Return a new empty SQLite database, kept in memory.
+    """
+    db = make_database("sqlite")
+    db.load(":memory:")
+    return db
+
+def add_event(db, trans, person=None, event_type=EventType.UNKNOWN,
+              date=None):
+    """
+    Add an event with the date, a Date or a year, and add a reference to it
+    to the person, as his birth or death for these types. The person is
+    not committed.
+    """
+    event = Event()
+    event.set_type(event_type)
+    if isinstance(date, Date):
+        event.set_date_object(date)
+    elif date is not None:
+        event.get_date_object().set_yr_mon_day(date, 0, 0)
+    db.add_event(event, trans)
+    if person is not None:
+        ref = EventRef()
+        ref.set_reference_handle(event.handle)
+        person.add_event_ref(ref)
+        if event_type == EventType.BIRTH:
+            person.set_birth_ref(ref)
+        elif event_type == EventType.DEATH:
+            person.set_death_ref(ref)
+    return event
+
+def add_person(db, trans, surname=None, first_name=None, gender=Person.MALE,
+               birth=None, death=None):
+    """
+    Add a person, with a birth and death event if their date, a Date or a
+    year, is given.
+    """
+    person = Person()
+    person.set_gender(gender)
+    name = person.get_primary_name()
+    if first_name is not None:
+        name.set_first_name(first_name)
+    if surname is not None:
+        surn = Surname()
+        surn.set_surname(surname)
+        name.add_surname(surn)
+    if birth is not None:
+        add_event(db, trans, person, EventType.BIRTH, birth)
+    if death is not None:
+        add_event(db, trans, person, EventType.DEATH, death)
+    db.add_person(person, trans)
+    return person
+
+def add_family(db, trans, father=None, mother=None, children=()):
+    """
+    Add a family of the people, and commit them with the family.
+    """
+    family = Family()
+    if father is not None:
+        family.set_father_handle(father.handle)
+    if mother is not None:
+        family.set_mother_handle(mother.handle)
+    for child in children:
+        ref = ChildRef()
+        ref.set_reference_handle(child.handle)
+        family.add_child_ref(ref)
+    db.add_family(family, trans)
+    for parent in (father, mother):
+        if parent is not None:
+            parent.add_family_handle(family.handle)
+            db.commit_person(parent, trans)
+    for child in children:
+        child.add_parent_family_handle(family.handle)
+        db.commit_person(child, trans)
+    return family
+
 #===eof===
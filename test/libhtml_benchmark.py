@@ -0,0 +1,198 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+# test/libhtml_benchmark.py
+
+"""
+Benchmark of the writing of a large Narrated Web Site page.
+
+Builds a page with the rows of the individual list page, as
+IndividualListPage does, and writes it to a file three times: with the
+whole page tree written by the former Html.write, with the whole page tree
+written by the current Html.write, and with the rows written by an
+HtmlStream as they are created. Reports the time and the peak memory of
+each, and checks that the files are the same. Run from the root directory
+with:
+
+    python3 test/libhtml_benchmark.py [-p PEOPLE]
+"""
+from functools import partial
+import filecmp
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from gramps.plugins.lib.libhtml import Html, HtmlStream
+
+#-------------------------------------------------------------------------
+#
+# The former writer: recursion over copies of each level of the tree
+#
+#-------------------------------------------------------------------------
+def former_write(html, method, indent='\t', tabs=''):
+    if html.indent is None:
+        tabs = ''
+    elif html.indent:
+        tabs += indent
+    if html.inline:
+        method(str('%s%s' % (tabs, '%s'*len(html) % tuple(html[:]))))
+    else:
+        for item in html[:]:
+            if isinstance(item, Html):
+                former_write(item, method, indent, tabs)
+            else:
+                method(str('%s%s' % (tabs, item)))
+
+#-------------------------------------------------------------------------
+#
+# Sample page
+#
+#-------------------------------------------------------------------------
+SURNAMES = ['Smith', 'Garner', 'Jones', 'Zieliński', 'Müller', 'Dubois',
+            'Rossi', 'Nguyen', 'García', 'Andersson', 'Kowalski', 'Novak']
+GIVEN = ['John', 'Mary', 'Anna', 'James', 'Peter', 'Maria', 'José', 'Eva',
+         'Lars', 'Sophie', 'Thomas', 'Elizabeth', 'Ingrid', 'Marek']
+
+def people(count):
+    """
+    Return (surname, handle, given name, birth, death) sorted by surname.
+    """
+    rand = random.Random(count)
+    rows = []
+    for index in range(count):
+        rows.append(('%s%d' % (rand.choice(SURNAMES),
+                               rand.randrange(count // 20 + 1)),
+                     '%08x%012d' % (index, index), rand.choice(GIVEN),
+                     '%d-%02d-%02d' % (rand.randrange(1700, 2000),
+                                       rand.randrange(1, 13),
+                                       rand.randrange(1, 29)),
+                     rand.choice(['', '1900-01-01', '1950-06-15'])))
+    rows.sort()
+    return rows
+
+def person_row(surname, handle, given, birth, death, first_surname):
+    """
+    Return the row of a person, with the cells of IndividualListPage.
+    """
+    trow = Html("tr")
+    tcell = Html("td", class_="ColumnSurname", inline=True)
+    trow += tcell
+    if first_surname:
+        tcell += Html("a", surname, title="Surnames " + surname)
+    else:
+        tcell += "&nbsp;"
+    link = Html("a", href="ppl/%s/%s/%s.html" % (handle[-1], handle[-2],
+                                                 handle),
+                title=given) + Html("span", given, class_="grampsid",
+                                    inline=True)
+    trow += Html("td", link, class_="ColumnName")
+    trow += Html("td", birth, class_="ColumnBirth", inline=True)
+    trow += Html("td", death or "&nbsp;", class_="ColumnDeath", inline=True)
+    trow += Html("td", "&nbsp;", class_="ColumnPartner")
+    return trow
+
+def write_page(rows, output_file, mode):
+    """
+    Write the individual list page of rows.
+    """
+    method = partial(print, file=output_file)
+    page, dummy, body = Html.page("Individuals")
+    with Html("div", class_="content", id="Individuals") as individuallist:
+        body += individuallist
+        individuallist += Html("p", "An index of all the individuals",
+                               id="description")
+        with Html("table",
+                  class_="infolist primobjlist IndividualList") as table:
+            individuallist += table
+            thead = Html("thead")
+            table += thead
+            thead += Html("tr") + Html("th", "Surname", inline=True)
+            tbody = Html("tbody")
+            table += tbody
+    if mode == 'stream':
+        stream = HtmlStream(page, method)
+        stream.begin(tbody)
+    prev_surname = None
+    for (surname, handle, given, birth, death) in rows:
+        trow = person_row(surname, handle, given, birth, death,
+                          surname != prev_surname)
+        prev_surname = surname
+        if mode == 'stream':
+            stream.write(trow)
+        else:
+            tbody += trow
+    body += Html("div", "Generated by Gramps", id="footer")
+    if mode == 'stream':
+        stream.end()
+    elif mode == 'former':
+        former_write(page, method)
+    else:
+        page.write(method)
+
+#-------------------------------------------------------------------------
+#
+# Benchmark
+#
+#-------------------------------------------------------------------------
+def measure(rows, fname, mode):
+    """
+    Return the peak memory in bytes used to write the page, and the time.
+    The time is measured without tracing the memory.
+    """
+    start = time.perf_counter()
+    with open(fname, 'w', encoding='utf-8') as output_file:
+        write_page(rows, output_file, mode)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    with open(fname, 'w', encoding='utf-8') as output_file:
+        write_page(rows, output_file, mode)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak, elapsed
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-p", "--people", type="int", dest="people",
+                      default=100000, help="Number of people")
+    options = parser.parse_args()[0]
+    rows = people(options.people)
+    print("%-8s %8s %16s %8s" % ('writer', 'rows', 'peak memory (MB)',
+                                 'time (s)'))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fnames = []
+        for mode in ('former', 'tree', 'stream'):
+            fname = os.path.join(tmpdir, mode + '.html')
+            fnames.append(fname)
+            peak, elapsed = measure(rows, fname, mode)
+            print("%-8s %8d %16.2f %8.2f" % (mode, len(rows), peak / 2**20,
+                                             elapsed))
+        for fname in fnames[1:]:
+            if not filecmp.cmp(fnames[0], fname, shallow=False):
+                print("%s differs from the former output" %
+                      os.path.basename(fname))
+
+if __name__ == '__main__':
+    main()
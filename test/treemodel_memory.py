@@ -0,0 +1,199 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2017       The Gramps Project
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+# test/treemodel_memory.py
+
+"""
+Memory benchmark of the node storage of the tree views.
+
+Builds the nodes of a grouped person tree and of a place hierarchy, as the
+person and place tree models do, once with the NodeStore used by
+TreeBaseModel and once with the former layout of one Node object per row,
+and reports the memory used by each. Run from the root directory with:
+
+    python3 test/treemodel_memory.py [-p PEOPLE] [-l PLACES]
+"""
+import os
+import sys
+import random
+import time
+import tracemalloc
+from bisect import bisect_right
+from optparse import OptionParser
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.gui.views.treemodels.treebasemodel import NodeStore
+
+#-------------------------------------------------------------------------
+#
+# The former node layout: a Node object per row, mapped by id
+#
+#-------------------------------------------------------------------------
+class ObjectNode:
+    __slots__ = ('name', 'sortkey', 'ref', 'handle', 'secondary', 'parent',
+                 'prev', 'next', 'children')
+
+    def __init__(self, ref, parent, sortkey, handle, secondary):
+        self.name = sortkey or ''
+        self.sortkey = glocale.sort_key(self.name) or glocale.sort_key('')
+        self.ref = ref
+        self.handle = handle
+        self.secondary = secondary
+        self.parent = parent
+        self.prev = None
+        self.next = None
+        self.children = []
+
+    def add_child(self, node, id2node):
+        nodeid = id(node)
+        index = bisect_right(self.children, (node.sortkey, nodeid))
+        if index:
+            prev = self.children[index - 1][1]
+            id2node[prev].next = nodeid
+            node.prev = prev
+        if index < len(self.children):
+            next = self.children[index][1]
+            id2node[next].prev = nodeid
+            node.next = next
+        self.children.insert(index, (node.sortkey, nodeid))
+
+class ObjectTree:
+    def __init__(self):
+        root = ObjectNode(None, None, None, None, False)
+        self.id2node = {id(root): root}
+        self.tree = {None: root}
+        self.handle2node = {}
+
+    def add_node(self, parent, child, sortkey, handle):
+        parent_node = self.tree[parent]
+        node = ObjectNode(child, id(parent_node), sortkey, handle, False)
+        parent_node.add_child(node, self.id2node)
+        self.id2node[id(node)] = node
+        self.tree[child] = node
+        if handle:
+            self.handle2node[handle] = node
+
+class StoreTree:
+    def __init__(self):
+        self.nodemap = NodeStore()
+        self.tree = {None: NodeStore.ROOT}
+        self.handle2node = {}
+
+    def add_node(self, parent, child, sortkey, handle):
+        nodeid = self.nodemap.add(child, self.tree[parent], sortkey, handle)
+        self.tree[child] = nodeid
+        if handle:
+            self.handle2node[handle] = nodeid
+
+#-------------------------------------------------------------------------
+#
+# Sample data
+#
+#-------------------------------------------------------------------------
+SURNAMES = ['Smith', 'Garner', 'Jones', 'Zieliński', 'Müller', 'Dubois',
+            'Rossi', 'Nguyen', 'García', 'Andersson', 'Kowalski', 'Novak']
+GIVEN = ['John', 'Mary', 'Anna', 'James', 'Peter', 'Maria', 'José', 'Eva',
+         'Lars', 'Sophie', 'Thomas', 'Elizabeth', 'Ingrid', 'Marek']
+
+def people(count):
+    """
+    Yield (group, handle, sortkey) for a grouped person tree.
+    """
+    rand = random.Random(count)
+    for index in range(count):
+        surname = '%s%d' % (rand.choice(SURNAMES),
+                             rand.randrange(count // 20 + 1))
+        yield surname, '%08x%012d' % (index, index), \
+                '%s, %s' % (surname, rand.choice(GIVEN))
+
+def places(count):
+    """
+    Yield (parent, handle, sortkey) for a place hierarchy of four levels.
+    """
+    rand = random.Random(count)
+    levels = [[None]]
+    sizes = [max(1, count // 1000), max(1, count // 100), max(1, count // 10)]
+    index = 0
+    for size in sizes + [count - sum(sizes)]:
+        level = []
+        for dummy in range(size):
+            handle = '%08x%012d' % (index, index)
+            index += 1
+            level.append(handle)
+            yield rand.choice(levels[-1]), handle, \
+                    'Place %s %d' % (rand.choice(SURNAMES), index)
+        levels.append(level)
+
+#-------------------------------------------------------------------------
+#
+# Benchmark
+#
+#-------------------------------------------------------------------------
+def build_people(tree, rows):
+    for group, handle, sortkey in rows:
+        if group not in tree.tree:
+            tree.add_node(None, group, group, None)
+        tree.add_node(group, handle, sortkey, handle)
+
+def build_places(tree, rows):
+    for parent, handle, sortkey in rows:
+        tree.add_node(parent, handle, sortkey, handle)
+
+def measure(tree_class, build, rows):
+    """
+    Return the memory in bytes retained by the tree, and the build time.
+    The memory of the rows themselves is not included.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    tree = tree_class()
+    build(tree, rows)
+    if isinstance(tree, StoreTree):
+        # as done by TreeBaseModel.rebuild_data
+        tree.nodemap.forget_keys()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del tree
+    return size, elapsed
+
+def main():
+    parser = OptionParser()
+    parser.add_option("-p", "--people", type="int", dest="people",
+                      default=100000, help="Number of people")
+    parser.add_option("-l", "--places", type="int", dest="places",
+                      default=100000, help="Number of places")
+    options = parser.parse_args()[0]
+    print("%-8s %-12s %8s %12s %10s %8s" %
+          ('view', 'storage', 'rows', 'memory (MB)', 'bytes/row', 'time (s)'))
+    for view, build, rows in (
+            ('person', build_people, list(people(options.people))),
+            ('place', build_places, list(places(options.places)))):
+        count = len(rows)
+        for name, tree_class in (('Node', ObjectTree),
+                                 ('NodeStore', StoreTree)):
+            size, elapsed = measure(tree_class, build, rows)
+            print("%-8s %-12s %8d %12.1f %10d %8.2f" %
+                  (view, name, count, size / 2**20, size // count, elapsed))
+
+if __name__ == '__main__':
+    main()